@@ -6,7 +6,7 @@ from fastapi import APIRouter
 #                             composio, feedback, stripe, onboarding,
 #                             guided_setup, outbound)
 
-from app.api.routes import (guided_setup, clerk, twilio, stripe, vapi, knowledge_base, conversation, user, hubspot)
+from app.api.routes import (guided_setup, clerk, twilio, stripe, vapi, knowledge_base, conversation, user, hubspot, outbound, admin, voice)
 
 api_router = APIRouter()
 
@@ -20,10 +20,13 @@ api_router.include_router(vapi.router, prefix="/vapi", tags=["vapi"])
 api_router.include_router(conversation.router, prefix="/conversation", tags=["conversation"])
 api_router.include_router(user.router, prefix="/user", tags=["user"])
 api_router.include_router(hubspot.router, prefix="/hubspot", tags=["hubspot"])
+api_router.include_router(outbound.router, prefix="/outbound", tags=["outbound"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
+# LiveKit room webhooks keep the room registry current
+api_router.include_router(voice.router, prefix="/voice", tags=["voice"])
 
 
 # api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
-# api_router.include_router(voice.router, prefix="/voice", tags=["voice"])
 # api_router.include_router(livekit.router, prefix="/livekit", tags=["livekit"])
 # api_router.include_router(agents.router, prefix="/agents", tags=["agents"])
 # api_router.include_router(settings.router, prefix="/settings", tags=["settings"])
@@ -32,4 +35,3 @@ api_router.include_router(hubspot.router, prefix="/hubspot", tags=["hubspot"])
 # api_router.include_router(feedback.router, prefix="/feedback", tags=["feedback"])
 # api_router.include_router(whatsapp.router, prefix="/whatsapp", tags=["whatsapp"])
 # api_router.include_router(onboarding.router, prefix="/onboarding", tags=["onboarding"])
-# api_router.include_router(outbound.router, prefix="/outbound", tags=["outbound"])
\ No newline at end of file
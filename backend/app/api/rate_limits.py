@@ -0,0 +1,52 @@
+from typing import List, Tuple
+
+import redis.asyncio as redis
+from fastapi import HTTPException
+
+from app.core.logging_setup import throttled
+from app.services.redis_service import (
+    RedisRateLimiter,
+    acquire_all,
+    chat_agent_limiter,
+    chat_global_limiter,
+    chat_room_limiter,
+    crawl_global_limiter,
+    crawl_limiter,
+    scrape_global_limiter,
+    scrape_limiter,
+)
+
+GLOBAL = "global"
+
+
+def chat_limits(agent_id: str, room_name: str) -> List[Tuple[RedisRateLimiter, str]]:
+    return [(chat_room_limiter, room_name), (chat_agent_limiter, agent_id), (chat_global_limiter, GLOBAL)]
+
+
+def scrape_limits(user_id: str) -> List[Tuple[RedisRateLimiter, str]]:
+    return [(scrape_limiter, user_id), (scrape_global_limiter, GLOBAL)]
+
+
+def crawl_limits(user_id: str) -> List[Tuple[RedisRateLimiter, str]]:
+    return [(crawl_limiter, user_id), (crawl_global_limiter, GLOBAL)]
+
+
+async def enforce_rate_limits(limits: List[Tuple[RedisRateLimiter, str]], cost: int = 1) -> None:
+    """
+    Raise 429 with a Retry-After header unless every limit allows the
+    request, or 413 if `cost` is more than a limit allows at all.
+    """
+    try:
+        result = await acquire_all(limits, cost)
+    except (redis.ConnectionError, redis.TimeoutError) as e:
+        # Fail open: an unreachable Redis should not take the endpoint down
+        throttled("rate_limit:unavailable").warning(f"Rate limiting skipped, Redis unavailable: {str(e)}")
+        return
+    if result.max_cost is not None:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Request too large: costs {cost}, at most {result.max_cost} allowed per request",
+            headers=result.headers()
+        )
+    if not result.allowed:
+        raise HTTPException(status_code=429, detail="Rate limit exceeded", headers=result.headers())
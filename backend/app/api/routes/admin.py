@@ -0,0 +1,51 @@
+import secrets
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.core.config import settings
+from app.services.redis_service import redis_pools
+from app.utils.flow_tracker import FlowTracker
+from app.utils.loop_monitor import loop_monitor
+
+router = APIRouter()
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def require_admin_token(token: Optional[str] = Header(None, alias=ADMIN_TOKEN_HEADER)) -> None:
+    # Hidden entirely unless a token is configured
+    if not settings.ADMIN_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not secrets.compare_digest(token, settings.ADMIN_API_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/latency", dependencies=[Depends(require_admin_token)])
+async def latency_report() -> Dict[str, Any]:
+    """Per-step latency histograms and percentiles recorded by FlowTracker in this process."""
+    return FlowTracker.latency_report()
+
+
+@router.delete("/latency", dependencies=[Depends(require_admin_token)])
+async def reset_latency() -> Dict[str, str]:
+    FlowTracker.recorder.reset()
+    return {"status": "success"}
+
+
+@router.get("/event_loop", dependencies=[Depends(require_admin_token)])
+async def event_loop_report() -> Dict[str, Any]:
+    """Event loop lag and the call sites that blocked it, worst first (LOOP_MONITOR_ENABLED)."""
+    return loop_monitor.report()
+
+
+@router.delete("/event_loop", dependencies=[Depends(require_admin_token)])
+async def reset_event_loop_report() -> Dict[str, str]:
+    loop_monitor.reset()
+    return {"status": "success"}
+
+
+@router.get("/redis", dependencies=[Depends(require_admin_token)])
+async def redis_pool_report() -> Dict[str, Any]:
+    """Per-workload Redis pool usage, acquire latency and exhaustion counts in this process."""
+    return {"pools": redis_pools.stats(), "reachable": await redis_pools.ping()}
@@ -9,6 +9,8 @@ from datetime import datetime
 from app.services.chat.lk_chat import lk_chat_process
 from app.services.redis_service import RedisChatStorage
 
+router = APIRouter()
+
 class ChatMessage(BaseModel):
     message: str
     agent_id: str
@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Optional
-import asyncio
+import json
 from app.core.logging_setup import logger
+from app.core.lifecycle import lifecycle
 from collections import defaultdict
 from datetime import datetime
 import httpx
@@ -8,18 +9,27 @@ import httpx
 from fastapi import Request, HTTPException, APIRouter, Depends, Query
 from fastapi.responses import JSONResponse, Response
 from sse_starlette.sse import EventSourceResponse
-from starlette.concurrency import run_in_threadpool
 from app.core.auth import get_current_user
 from pydantic import BaseModel, Field, UUID4
 
-from app.services.cache import get_agent_metadata
 from app.clients.supabase_client import get_supabase
 from app.services.chat.lk_chat import save_chat_history_to_supabase, form_data_to_chat, get_chat_rag_results
-from app.services.conversation import transcript_summary
+from app.services.post_call import post_call_pipeline
+from app.services.event_bus import event_bus
 from app.core.config import settings
+from app.api.rate_limits import chat_limits, enforce_rate_limits
 
 router = APIRouter()
 
+
+def agent_id_from_identity(participant_identity: str) -> str:
+    """Chat rooms and their visitors are named agent_<agent_id>_..."""
+    return (
+        participant_identity.split('_')[1]
+        if '_' in participant_identity
+        else participant_identity
+    )
+
 # Define Pydantic models for request and response schemas
 class ConversationLog(BaseModel):
     id: UUID4
@@ -80,7 +90,6 @@ class SuccessResponse(BaseModel):
 
 # Global state variables
 chat_messages: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-event_broadcasters: Dict[str, asyncio.Event] = {}
 conversation_logs: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
 
 @router.get("/history", response_model=List[ConversationLog])
@@ -136,40 +145,22 @@ async def livekit_room_webhook(request: Request) -> Dict[str, str]:
     data: Dict[str, Any] = await request.json()
     logger.info(f"📥 Received webhook data for job_id: {data.get('job_id', 'unknown')}")
     
-    user_id = await get_agent_metadata(data['agent_id'])
-    if user_id is None:
-        logger.error(f"❌ User ID not found for agent_id: {data['agent_id']}")
-        raise HTTPException(status_code=400, detail="User ID not found")
-    
-    user_id = user_id['userId']
-    logger.info(f"⏱️ call_duration: {data['call_duration']}")
-    logger.info(f"📋 Full webhook data: {data}")
-
     try:
-        supabase = await get_supabase()
-        if data['transcript']:
-            logger.info(f"💾 Saving transcript to conversation_logs for job_id: {data['job_id']}")
-            await supabase.table("conversation_logs").insert({
-                "transcript": data['transcript'],
-                "job_id": data['job_id'],
-                "participant_identity": data['participant_identity'],
-                "room_name": data['room_name'],
-                "user_id": user_id,
-                "agent_id": data['agent_id'],
-                "lead": data['prospect_status'],
-                "call_duration": data['call_duration'],
-                "call_type": data['call_type']
-            }).execute()
-            logger.info(f"✅ Successfully saved conversation log")
-        else:
-            logger.info(f"⚠️ No transcript received for job {data['job_id']}")
-
-        logger.info(f"🔄 Generating summary for job_id: {data['job_id']}")
-        await transcript_summary(data['transcript'], data['job_id'])
-        logger.info(f"✅ Summary generation initiated")
-
+        await post_call_pipeline.enqueue({
+            "transcript": data.get('transcript'),
+            "job_id": data['job_id'],
+            "participant_identity": data.get('participant_identity'),
+            "room_name": data['room_name'],
+            "user_id": data.get('user_id'),
+            "agent_id": data['agent_id'],
+            "prospect_status": data.get('prospect_status'),
+            "call_duration": data.get('call_duration', 0),
+            "call_type": data.get('call_type', 'web')
+        })
+        logger.info(f"✅ Queued post-call processing for job_id: {data['job_id']}")
     except Exception as e:
-        logger.error(f"❌ Error saving to Supabase: {str(e)}", exc_info=True)
+        logger.error(f"❌ Error queueing post-call job: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to queue conversation")
     return {"message": "Webhook received successfully", "status": "success"}
 
 @router.post("/create_embeddings")
@@ -186,6 +177,8 @@ async def chat_message(request: Request) -> Response:
         try:
             chat_message_data = await request.json()
             logger.info(f"📥 Received chat message data: {chat_message_data}")
+            room_name = chat_message_data['room_name']
+            await enforce_rate_limits(chat_limits(agent_id_from_identity(room_name), room_name))
             
             if chat_message_data['room_name'].endswith("textbot"):
                 logger.info("🤖 Processing textbot message")
@@ -218,6 +211,8 @@ async def chat_message(request: Request) -> Response:
                 content={"status": "success", "message": "Message added"}
             )
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"❌ Error in POST /chat_message: {str(e)}", exc_info=True)
             raise HTTPException(
@@ -267,12 +262,15 @@ async def trigger_show_chat_input(request: Request) -> Response:
         f"🎯 Triggering show_chat_input for participant_identity: "
         f"{participant_identity}"
     )
-    if participant_identity in event_broadcasters:
-        await run_in_threadpool(event_broadcasters[participant_identity].set)
-        logger.info(f"✅ Event set for participant_identity: {participant_identity}")
+    receivers = await event_bus.publish(participant_identity, {"type": "show_chat_input"})
+    if receivers:
+        logger.info(
+            f"✅ Event published for participant_identity: {participant_identity} "
+            f"({receivers} subscriber(s))"
+        )
     else:
         logger.warning(
-            f"⚠️ No event broadcaster found for participant_identity: "
+            f"⚠️ No event subscribers found for participant_identity: "
             f"{participant_identity}"
         )
 
@@ -284,47 +282,37 @@ async def events(participant_identity: str) -> EventSourceResponse:
                 f"{participant_identity}")
 
     async def event_generator() -> Any:
-        if participant_identity not in event_broadcasters:
-            logger.info(f"🆕 Creating new event broadcaster for {participant_identity}")
-            event_broadcasters[participant_identity] = asyncio.Event()
         try:
-            while True:
+            async with event_bus.subscribe(participant_identity) as subscription:
                 logger.info(
-                    f"⏳ Waiting for event in participant_identity: "
+                    f"⏳ Waiting for events in participant_identity: "
                     f"{participant_identity}"
                 )
-                await event_broadcasters[participant_identity].wait()
-                logger.info(
-                    f"🔔 Event triggered for participant_identity: "
-                    f"{participant_identity}"
-                )
-                yield {
-                    "event": "message",
-                    "data": '{"type": "show_chat_input"}'
-                }
-                logger.info(f"✅ Event sent, clearing flag")
-                event_broadcasters[participant_identity].clear()
+                async for event in subscription.events(event_bus.heartbeat_seconds):
+                    if event is None:
+                        yield {"event": "heartbeat", "data": ""}
+                        continue
+                    logger.info(
+                        f"🔔 Event triggered for participant_identity: "
+                        f"{participant_identity}"
+                    )
+                    yield {
+                        "event": "message",
+                        "data": json.dumps(event)
+                    }
         finally:
-            if participant_identity in event_broadcasters:
-                logger.info(f"🧹 Cleaning up event broadcaster for {participant_identity}")
-                del event_broadcasters[participant_identity]
-                # Extract agent_id from participant_identity
-                agent_id = (
-                    participant_identity.split('_')[1]
-                    if '_' in participant_identity
-                    else participant_identity
-                )
-                logger.info(f"💾 Saving chat history to Supabase for agent_id: {agent_id}")
-                await save_chat_history_to_supabase(
-                    agent_id=agent_id,
-                    room_name=participant_identity
-                )
+            agent_id = agent_id_from_identity(participant_identity)
+            logger.info(f"💾 Saving chat history to Supabase for agent_id: {agent_id}")
+            await save_chat_history_to_supabase(
+                agent_id=agent_id,
+                room_name=participant_identity
+            )
             logger.info(
                 f"🔌 SSE connection closed for participant_identity: "
                 f"{participant_identity}"
             )
 
-    return EventSourceResponse(event_generator())
+    return EventSourceResponse(lifecycle.stream(event_generator(), close_on_drain=True))
 
 @router.get("/form_fields/{agent_id}", response_model=FormFieldsResponse)
 async def form_fields(agent_id: str) -> Response:
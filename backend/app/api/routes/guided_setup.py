@@ -1,5 +1,6 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends, Request, Header
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, FileResponse
 import secrets
 from typing import Dict, Optional
 import time
@@ -25,6 +26,7 @@ from app.services.guided_setup import (
     set_trial_plan_service,
     update_training_status_service,
 )
+from app.services.guided_setup.preview_audio import preview_audio_cache, media_type_for
 
 router = APIRouter()
 
@@ -285,6 +287,21 @@ async def options_onboarding_preview():
     logger.debug("[ENDPOINT] /onboarding_preview OPTIONS request received")
     return {}
 
+@router.get("/preview_audio/{audio_key}")
+async def get_preview_audio(audio_key: str):
+    """
+    Stream a cached preview clip. Keys are content hashes, so the response
+    is immutable; FileResponse answers Range requests for seeking.
+    """
+    path = await asyncio.to_thread(preview_audio_cache.path_for, audio_key)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Preview audio not found")
+    return FileResponse(
+        path,
+        media_type=media_type_for(path),
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
 @router.post("/set_trial_plan")
 async def set_trial_plan(
     request: TrialPlanRequest,
@@ -0,0 +1,21 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.lifecycle import lifecycle
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def live() -> Dict[str, Any]:
+    """Liveness: the worker's event loop is serving requests."""
+    return lifecycle.liveness()
+
+
+@router.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness: startup finished, pooled clients are warm and dependencies answer; 503 otherwise."""
+    report = await lifecycle.readiness()
+    return JSONResponse(content=report, status_code=200 if report["ready"] else 503)
@@ -11,6 +11,7 @@ from fastapi import File, UploadFile
 
 from app.services.knowledge_base import knowledge_base
 from app.core.auth import get_current_user
+from app.api.rate_limits import crawl_limits, enforce_rate_limits, scrape_limits
 
 router = APIRouter()
 
@@ -242,6 +243,8 @@ async def scrape_url_handler(
         request_data = await request.json()
         request_data: List[str] = request_data.get('urls')
         urls = request_data if isinstance(request_data, list) else [request_data]
+        # Each URL is a scrape
+        await enforce_rate_limits(scrape_limits(current_user), cost=len(urls))
         
         result = await knowledge_base.start_web_scraping(urls, current_user)
         
@@ -258,6 +261,7 @@ async def scrape_url_handler(
 @router.post("/crawl_url", response_model=List[str])
 async def crawl_url_handler(request: ScrapeUrlRequest, current_user: str = Depends(get_current_user)):
     try:
+        await enforce_rate_limits(crawl_limits(current_user))
         map_result: List[str] = await knowledge_base.crawl_website(request.url)
         return map_result
     except HTTPException as e:
@@ -297,6 +301,7 @@ async def scrape_for_setup_handler(
     try:
         request_data = await request.json()
         website_url = request_data.get('website_url')
+        await enforce_rate_limits(scrape_limits(current_user))
         
         result = await knowledge_base.scrape_for_setup(website_url, current_user, background_tasks)
         
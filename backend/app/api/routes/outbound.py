@@ -1,10 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, File, Form, UploadFile
 from pydantic import BaseModel
 from app.core.logging_setup import logger
-import asyncio
+import uuid
 
-from app.api.deps import get_current_user
-from services.initiate_outbound import initiate_outbound_call
+from app.core.auth import get_current_user
+from app.core.config import settings
+from app.services.campaigns import Campaign, campaign_scheduler, parse_lead_csv
+from app.services.initiate_outbound import initiate_outbound_call
+from app.services.voice.agents import get_agent_content
 
 router = APIRouter()
 
@@ -12,6 +15,12 @@ class OutboundCallRequest(BaseModel):
     phone_number: str
     agent_id: str
 
+async def get_owned_agent(agent_id: str, current_user: str) -> dict:
+    response = await get_agent_content(agent_id)
+    if not response.data or response.data[0].get("userId") != current_user:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return response.data[0]
+
 @router.post("/initiate")
 async def initiate_call_handler(
     request: OutboundCallRequest,
@@ -28,7 +37,8 @@ async def initiate_call_handler(
         A dictionary with status information
     """
     logger.info(f"Initiating outbound call to {request.phone_number} with agent {request.agent_id}")
-    
+    await get_owned_agent(request.agent_id, current_user)
+
     try:
         # Format the phone number to E.164 format if not already
         phone_number = request.phone_number
@@ -53,4 +63,92 @@ async def initiate_call_handler(
         
     except Exception as e:
         logger.error(f"Error initiating outbound call: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to initiate call: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to initiate call: {str(e)}")
+
+
+async def get_owned_campaign(campaign_id: str, current_user: str) -> Campaign:
+    campaign = await campaign_scheduler.store.get_campaign(campaign_id)
+    if campaign is None or campaign.user_id != current_user:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign
+
+@router.post("/campaigns")
+async def create_campaign_handler(
+    file: UploadFile = File(...),
+    agent_id: str = Form(...),
+    name: str = Form(""),
+    calls_per_second: float = Form(1.0, gt=0),
+    max_concurrent_calls: int = Form(5, ge=1),
+    max_attempts: int = Form(3, ge=1),
+    retry_delay_seconds: int = Form(3600, ge=0),
+    quiet_hours_start: int = Form(21, ge=0, le=23),
+    quiet_hours_end: int = Form(9, ge=0, le=23),
+    timezone: str = Form("UTC"),
+    default_country_code: str = Form("1"),
+    current_user: str = Depends(get_current_user)
+) -> dict:
+    """
+    Create an outbound campaign from an uploaded CSV lead list.
+    
+    The CSV needs a phone column (phone/phone_number/number/mobile); name and
+    timezone columns are optional. The campaign is created as a draft;
+    start it with /campaigns/{campaign_id}/start.
+    """
+    await get_owned_agent(agent_id, current_user)
+    content = (await file.read()).decode("utf-8-sig", errors="replace")
+    leads = parse_lead_csv(content, default_country_code)
+    if not leads:
+        raise HTTPException(status_code=400, detail="No leads with a phone number found in file")
+
+    # Campaigns dial through the platform trunk; there is no per-user trunk
+    # record to check a caller-supplied id against
+    trunk_id = settings.SIP_OUTBOUND_TRUNK_ID
+    if not trunk_id:
+        raise HTTPException(status_code=400, detail="No outbound SIP trunk configured")
+
+    campaign = Campaign(
+        id=uuid.uuid4().hex,
+        user_id=current_user,
+        agent_id=agent_id,
+        trunk_id=trunk_id,
+        name=name or file.filename or "",
+        calls_per_second=calls_per_second,
+        max_concurrent_calls=max_concurrent_calls,
+        max_attempts=max_attempts,
+        retry_delay_seconds=retry_delay_seconds,
+        quiet_hours_start=quiet_hours_start,
+        quiet_hours_end=quiet_hours_end,
+        timezone=timezone
+    )
+    added = await campaign_scheduler.create_campaign(campaign, leads)
+    logger.info(f"Created campaign {campaign.id} for user {current_user} with {added} leads")
+    return {"campaign": campaign.to_dict(), "leads": added}
+
+@router.post("/campaigns/{campaign_id}/start")
+async def start_campaign_handler(
+    campaign_id: str,
+    current_user: str = Depends(get_current_user)
+) -> dict:
+    """Start or resume dialing a campaign"""
+    await get_owned_campaign(campaign_id, current_user)
+    campaign = await campaign_scheduler.start(campaign_id)
+    return {"campaign": campaign.to_dict()}
+
+@router.post("/campaigns/{campaign_id}/pause")
+async def pause_campaign_handler(
+    campaign_id: str,
+    current_user: str = Depends(get_current_user)
+) -> dict:
+    """Stop placing new calls; calls in progress finish normally"""
+    await get_owned_campaign(campaign_id, current_user)
+    campaign = await campaign_scheduler.pause(campaign_id)
+    return {"campaign": campaign.to_dict()}
+
+@router.get("/campaigns/{campaign_id}")
+async def get_campaign_handler(
+    campaign_id: str,
+    current_user: str = Depends(get_current_user)
+) -> dict:
+    """Campaign settings and lead counts by status"""
+    await get_owned_campaign(campaign_id, current_user)
+    return await campaign_scheduler.status(campaign_id)
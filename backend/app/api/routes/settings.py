@@ -5,6 +5,7 @@ import traceback
 from typing import Any
 
 from app.clients.supabase_client import get_supabase
+from app.services.notification_routing import notification_routes
 
 router = APIRouter()
 
@@ -36,6 +37,10 @@ async def update_settings(request: Request) -> dict[str, str]:
             logger.error("User not found")
             raise HTTPException(status_code=404, detail="User not found")
 
+        if 'account_settings' in update_data:
+            # Lead emails must go to the new address right away
+            await notification_routes.invalidate_user(user_id)
+
         return {"message": "Settings updated successfully"}
     except HTTPException as he:
         # Re-raise HTTP exceptions without wrapping them
@@ -21,7 +21,7 @@ async def get_country_codes_handler() -> JSONResponse:
     """Get list of available country codes from Twilio"""
     logger.info("Fetching available country codes from Twilio")
     try:
-        twilio_countries = helper.get_country_codes()
+        twilio_countries = await helper.get_country_codes()
         logger.debug(f"Retrieved {len(twilio_countries)} country codes")
         return JSONResponse(content={"countries": twilio_countries})
     except Exception as e:
@@ -34,7 +34,7 @@ async def get_country_codes_handler() -> JSONResponse:
 async def get_available_numbers_handler(country_code: str) -> AvailableNumbersResponse:
     """Get list of available numbers for a given country code from Twilio"""
     logger.info(f"Fetching available numbers for country code: {country_code}")
-    available_numbers = helper.get_available_numbers(country_code)
+    available_numbers = await helper.get_available_numbers(country_code)
     print(f"Available numbers: {available_numbers}")
     logger.debug(f"Retrieved {len(available_numbers) if available_numbers else 0} numbers for {country_code}")
     return {"numbers": available_numbers or {}}  # Return empty dict if no numbers found
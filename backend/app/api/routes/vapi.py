@@ -154,8 +154,8 @@ async def vapi_webhook(request: Request):
     try:
         # Parse the raw JSON
         event_data = await request.json()
-        # Log the full event for debugging
-        logger.info(f"Webhook payload: {json.dumps(event_data, indent=2)}")
+        # Log the full event for debugging; only serialized when DEBUG is on
+        logger.opt(lazy=True).debug("Webhook payload: {}", lambda: json.dumps(event_data))
         
         # Process the event using the service
         response = await vapi_service.process_webhook_event(event_data)
@@ -2,19 +2,49 @@ from app.core.logging_setup import logger
 from typing import List, Dict, Any, Optional
 import json
 
-from fastapi import Request, APIRouter
+from fastapi import Request, APIRouter, HTTPException
+from livekit import api
 
+from app.core.config import settings
 from app.services.cache import call_data
+from app.services.voice.room_lifecycle import room_service
 
 router = APIRouter()
 # global variable to store the jobs
 jobs: Dict[str, Dict[str, List[Dict[str, str]]]] = {}
 
+_webhook_receiver: Optional[api.WebhookReceiver] = None
+
+
+def get_webhook_receiver() -> api.WebhookReceiver:
+    """Built on first use; TokenVerifier refuses to start without credentials."""
+    global _webhook_receiver
+    if _webhook_receiver is None:
+        _webhook_receiver = api.WebhookReceiver(
+            api.TokenVerifier(settings.LIVEKIT_API_KEY, settings.LIVEKIT_API_SECRET)
+        )
+    return _webhook_receiver
+
+
+async def verified_webhook_body(request: Request) -> Dict[str, Any]:
+    """
+    Check the JWT LiveKit signs each webhook with (the Authorization header,
+    carrying a sha256 of the body) and return the parsed payload.
+    """
+    body = (await request.body()).decode()
+    try:
+        get_webhook_receiver().receive(body, request.headers.get("Authorization", ""))
+    except Exception as e:
+        logger.warning(f"Rejected LiveKit webhook: {str(e)}")
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    return json.loads(body)
+
 
 @router.post("/wh")
 async def livekit_room_webhook(request: Request) -> dict[str, str]:
-    data = await request.json()
-    print("call_data id in webhook:", id(call_data))
+    data = await verified_webhook_body(request)
+
+    room_service.handle_webhook_event(data)
 
     webhook_extract = sip_call_extract(data)
     if webhook_extract:
@@ -24,19 +54,7 @@ async def livekit_room_webhook(request: Request) -> dict[str, str]:
             'twilio_account_sid': webhook_extract['twilio_account_sid']
         }
 
-        print(
-            " printing call_data[webhook_extract['room_name']]:",
-            call_data[webhook_extract['room_name']]
-        )
-        # Write call_data to JSON file
-        try:
-            with open('call_data.json', 'w') as f:
-                json.dump(call_data, f, indent=4)
-        except Exception as e:
-            logger.error(f"Error writing to call_data.json: {str(e)}")
-
-    print("\n\ncall_data in /wh:", call_data)
-    logger.info(f"Received webhook data: {data}")
+    logger.debug(f"Received LiveKit webhook {data.get('event')} for room {data.get('room', {}).get('name')}")
     return {"message": "Webhook received successfully"}
 
 
@@ -25,6 +25,8 @@ class AudioPreviewResponse(BaseModel):
     success: bool
     greeting_audio_data_base64: Optional[str] = None  # Base64 encoded audio data for greeting
     message_audio_data_base64: Optional[str] = None   # Base64 encoded audio data for message
+    greeting_audio_url: Optional[str] = None          # Streamable URL of the cached greeting audio
+    message_audio_url: Optional[str] = None           # Streamable URL of the cached message audio
     greeting_text: Optional[str] = None               # Text for greeting audio
     message_text: Optional[str] = None                # Text for message audio
     error: Optional[str] = None
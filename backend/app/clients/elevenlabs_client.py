@@ -8,9 +8,10 @@ using the ElevenLabs API.
 import os
 import uuid
 from app.core.logging_setup import logger
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, AsyncIterator
 from dotenv import load_dotenv
 from elevenlabs import ElevenLabs, Voice
+from elevenlabs.client import AsyncElevenLabs
 
 load_dotenv()
 
@@ -24,6 +25,7 @@ class ElevenLabsClient:
             logger.warning("ELEVENLABS_API_KEY not found in environment variables")
         
         self.client = ElevenLabs(api_key=self.api_key)
+        self.async_client = AsyncElevenLabs(api_key=self.api_key)
         
         # Create audio directory if it doesn't exist
         self.audio_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "static", "audio")
@@ -84,6 +86,32 @@ class ElevenLabsClient:
             logger.error(f"Error generating audio with ElevenLabs: {str(e)}")
             raise
     
+    async def stream_audio(
+        self,
+        text: str,
+        voice_id: str,
+        model_id: str = 'eleven_multilingual_v2',
+        output_format: str = "mp3_44100_96"
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream audio chunks for `text` without blocking the event loop.
+        
+        Args:
+            text: The text to convert to speech
+            voice_id: The ID of the voice to use
+            model_id: ElevenLabs model ID
+            output_format: Audio output format
+            
+        Yields:
+            Audio bytes as they arrive from ElevenLabs
+        """
+        logger.info(f"Streaming audio for text of length {len(text)} with voice {voice_id}")
+        async for chunk in self.async_client.text_to_speech.convert_as_stream(
+            voice_id=voice_id, text=text, model_id=model_id, output_format=output_format
+        ):
+            if chunk:
+                yield chunk
+    
     def get_available_voices(self) -> Dict[str, Any]:
         """
         Get a list of available voices from ElevenLabs.
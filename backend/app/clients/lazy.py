@@ -0,0 +1,97 @@
+"""
+Deferred construction of heavy clients and models.
+
+Modules declare their clients with `lazy_client(name, factory)` instead of
+building them at import, so importing a route or service no longer pays
+for SDK clients, connection setup or model loads it may never use. The
+returned proxy builds the object on first use and forwards attribute
+access and calls to it. Clients registered under the same name are built
+once and shared, and `warm_up` builds them ahead of time where a process
+has an explicit startup phase.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, TypeVar
+
+from app.core.logging_setup import logger
+
+T = TypeVar("T")
+
+
+class LazyClient(Generic[T]):
+    """Proxy that builds its target on first use, once, thread-safely."""
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    @property
+    def built(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> T:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    started = time.perf_counter()
+                    instance = self._factory()
+                    object.__setattr__(self, "_instance", instance)
+                    logger.debug(f"Built {self._name} in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return instance
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self.get(), item)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.get()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<LazyClient {self._name} built={self.built}>"
+
+
+_registry: Dict[str, LazyClient] = {}
+
+
+def lazy_client(name: str, factory: Callable[[], T]) -> LazyClient[T]:
+    """Declare a lazily built client; a name already registered is reused."""
+    client = _registry.get(name)
+    if client is None:
+        client = LazyClient(name, factory)
+        _registry[name] = client
+    return client
+
+
+def registered_clients() -> Dict[str, bool]:
+    """Registered client names and whether each has been built."""
+    return {name: client.built for name, client in _registry.items()}
+
+
+def _select(names: Optional[Iterable[str]]) -> List[LazyClient]:
+    wanted = None if names is None else set(names)
+    return [client for name, client in _registry.items() if wanted is None or name in wanted]
+
+
+def build_clients(names: Optional[Iterable[str]] = None) -> None:
+    """Build the named clients (default: all registered) now, e.g. in a worker prewarm."""
+    for client in _select(names):
+        try:
+            client.get()
+        except Exception as e:
+            logger.warning(f"Could not warm up {client._name}: {str(e)}")
+
+
+async def warm_up(names: Optional[Iterable[str]] = None) -> None:
+    """Build the named clients (default: all registered) concurrently in threads."""
+    selected = _select(names)
+    results = await asyncio.gather(
+        *(asyncio.to_thread(client.get) for client in selected), return_exceptions=True
+    )
+    for client, result in zip(selected, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Could not warm up {client._name}: {str(result)}")
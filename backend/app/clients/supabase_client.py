@@ -2,9 +2,11 @@ from supabase._async.client import AsyncClient
 import os
 from dotenv import load_dotenv
 from app.core.logging_setup import logger 
-from typing import Optional
+from typing import Any, Optional
 import asyncio
 
+from app.clients.lazy import lazy_client
+
 load_dotenv()
 
 # Load the appropriate environment file based on ENVIRONMENT
@@ -69,6 +71,14 @@ class SupabaseConnection:
 # Create the global instance
 supabase_client = SupabaseConnection()
 
+
+def _create_sync_client() -> Any:
+    from supabase import create_client
+    return create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+
+# Sync client for code that runs in threads or LiveKit workers, built on first use
+supabase_sync = lazy_client("supabase_sync", _create_sync_client)
+
 # This is the global variable that will be imported by other modules
 # Add type annotation that explicitly allows None
 supabase: Optional[AsyncClient] = None
@@ -1,7 +1,10 @@
-import httpx
-from typing import Dict
-import os
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 
+import httpx
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt
@@ -27,32 +30,164 @@ if not CLERK_JWT_ISSUER:
 if not CLERK_PUBLIC_KEY:
     logger.error("CLERK_PUBLIC_KEY environment variable is not set")
 
-# Cache for JWKS
-_jwks_cache: Dict = {}
 
-async def get_jwks():
-    """Fetch the JWKS from Clerk"""
-    global _jwks_cache
-    
-    try:
-        # Return cached JWKS if available
-        if _jwks_cache:
-            return _jwks_cache
-            
-        # Construct proper JWKS URL
-        jwks_url = f"{CLERK_JWT_ISSUER}/.well-known/jwks.json"
+class JWKSCache:
+    """
+    TTL cache for the Clerk JWKS.
+
+    Keys are indexed by `kid`. An unseen `kid` triggers a refresh (rate limited
+    by `min_refresh_interval`) so Clerk key rotation is picked up without a
+    restart. Concurrent refreshes are collapsed into a single fetch, and after
+    a failed fetch the cached keys are served for `min_refresh_interval`
+    before Clerk is tried again.
+    """
+
+    def __init__(self, ttl_seconds: int, min_refresh_interval: int):
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_interval = min_refresh_interval
+        self._jwks: Dict = {}
+        self._keys: Dict[str, Dict] = {}
+        self._fetched_at: float = 0.0
+        self._failed_at: float = 0.0
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def jwks_url() -> str:
+        return f"{CLERK_JWT_ISSUER}/.well-known/jwks.json"
+
+    def _is_fresh(self) -> bool:
+        return bool(self._keys) and time.monotonic() - self._fetched_at < self.ttl_seconds
+
+    async def _fetch(self) -> Dict:
+        jwks_url = self.jwks_url()
         logger.debug(f"Fetching JWKS from URL: {jwks_url}")
-        
         async with httpx.AsyncClient() as client:
             response = await client.get(jwks_url)
             response.raise_for_status()
-            
-            _jwks_cache = response.json()
-            return _jwks_cache
-            
-    except Exception as e:
-        logger.error(f"Error fetching JWKS: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error fetching JWKS: {str(e)}")
+            return response.json()
+
+    async def refresh(self, force: bool = False) -> None:
+        """Refresh the JWKS if stale (or if `force`), single-flight."""
+        seen_fetch = self._fetched_at
+        async with self._lock:
+            # Another coroutine refreshed while we were waiting on the lock
+            if self._fetched_at != seen_fetch and self._keys:
+                return
+            if not force and self._is_fresh():
+                return
+            if self._keys and time.monotonic() - self._failed_at < self.min_refresh_interval:
+                return
+            if (
+                force
+                and self._keys
+                and time.monotonic() - self._fetched_at < self.min_refresh_interval
+            ):
+                return
+
+            try:
+                jwks = await self._fetch()
+            except Exception as e:
+                self._failed_at = time.monotonic()
+                if self._keys:
+                    # Keep serving the last known keys rather than failing every request
+                    logger.warning(f"JWKS refresh failed, serving cached keys: {str(e)}")
+                    return
+                logger.error(f"Error fetching JWKS: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Error fetching JWKS: {str(e)}")
+
+            self._jwks = jwks
+            self._keys = {jwk['kid']: jwk for jwk in jwks.get('keys', []) if jwk.get('kid')}
+            self._fetched_at = time.monotonic()
+            logger.info(f"JWKS refreshed with {len(self._keys)} keys")
+
+    async def get_jwks(self) -> Dict:
+        await self.refresh()
+        return self._jwks
+
+    async def get_key(self, kid: str) -> Optional[Dict]:
+        """Return the JWK for `kid`, refreshing once if it is unknown."""
+        if self._is_fresh() and kid in self._keys:
+            return self._keys[kid]
+        await self.refresh(force=kid not in self._keys)
+        return self._keys.get(kid)
+
+    def clear(self) -> None:
+        self._jwks = {}
+        self._keys = {}
+        self._fetched_at = 0.0
+        self._failed_at = 0.0
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens that already passed signature verification.
+
+    Entries are keyed by the SHA-256 of the raw token and are only returned
+    until the token's `exp` claim.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[str]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        user_id, exp = entry
+        if exp <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user_id
+
+    def put(self, token: str, user_id: str, exp: float) -> None:
+        if self.max_size <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = (user_id, exp)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Cache for JWKS
+_jwks_cache = JWKSCache(
+    ttl_seconds=settings.JWKS_CACHE_TTL_SECONDS,
+    min_refresh_interval=settings.JWKS_MIN_REFRESH_INTERVAL_SECONDS,
+)
+_token_cache = VerifiedTokenCache(max_size=settings.AUTH_TOKEN_CACHE_SIZE)
+
+
+async def get_jwks() -> Dict:
+    """Fetch the JWKS from Clerk (cached with a TTL)"""
+    return await _jwks_cache.get_jwks()
+
+
+def clear_auth_caches() -> None:
+    """Drop cached JWKS and verified tokens."""
+    _jwks_cache.clear()
+    _token_cache.clear()
 
 
 async def get_current_user_mock(user_id: str) -> str:
@@ -73,7 +208,7 @@ async def get_current_user(
     try:
         token = credentials.credentials
         return await validate_token(token)
-        
+
     except Exception as e:
         logger.error(f"Unexpected error during token validation: {str(e)}")
         raise HTTPException(status_code=401, detail=str(e))
@@ -82,6 +217,10 @@ async def validate_token(token: str) -> str:
     """
     Helper function to validate a raw JWT token and return the user ID
     """
+    cached_user_id = _token_cache.get(token)
+    if cached_user_id is not None:
+        return cached_user_id
+
     try:
         # Decode header without verification to get the key ID
         try:
@@ -89,24 +228,19 @@ async def validate_token(token: str) -> str:
         except Exception as e:
             logger.error(f"Error decoding token header: {str(e)}")
             raise HTTPException(status_code=401, detail="Invalid token header")
-        
+
         # Get the key ID from the header
         kid = header.get('kid')
         if not kid:
             raise HTTPException(status_code=401, detail="No 'kid' in token header")
-            
-        # Get JWKS and find the matching key
-        jwks = await get_jwks()
-        key = None
-        for jwk in jwks.get('keys', []):
-            if jwk.get('kid') == kid:
-                key = jwk
-                break
-                
+
+        # Find the matching key, refreshing the JWKS if the kid is unseen
+        key = await _jwks_cache.get_key(kid)
+
         if not key:
             logger.error(f"No matching key found for kid: {kid}")
             raise HTTPException(status_code=401, detail="No matching key found")
-            
+
         # Verify the token
         try:
             payload = jwt.decode(
@@ -122,16 +256,20 @@ async def validate_token(token: str) -> str:
         except jwt.JWTError as e:
             logger.error(f"JWT validation error: {str(e)}")
             raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
-            
+
         # Get the user ID from the token
         user_id = payload.get("sub")
         if not user_id:
             logger.error("No user ID found in token payload")
             raise HTTPException(status_code=401, detail="Invalid user ID in token")
-            
+
+        exp = payload.get("exp")
+        if exp is not None:
+            _token_cache.put(token, user_id, float(exp))
+
         logger.info(f"Successfully validated token for user: {user_id}")
         return user_id
-    
+
     except Exception as e:
         logger.error(f"Unexpected error during token validation: {str(e)}")
-        raise HTTPException(status_code=401, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=401, detail=str(e))
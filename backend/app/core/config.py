@@ -79,7 +79,46 @@ class Settings(BaseSettings):
     REDIS_PASSWORD: str = ""
     REDIS_DB: int = 0
     REDIS_TTL: int = 3600
-    
+    # Connection pools: one bounded pool per workload (chat, cache,
+    # rate_limit, streams, default) so a slow workload waits on its own
+    # connections; sizes as "workload=N,...". REDIS_SPLIT_POOLS=False puts
+    # every workload on the default pool. A command waits up to
+    # REDIS_POOL_TIMEOUT_SECONDS for a free connection; timeouts and
+    # dropped connections are retried with exponential backoff.
+    REDIS_SPLIT_POOLS: bool = True
+    REDIS_POOL_SIZES: str = "default=20,chat=20,cache=10,rate_limit=5,streams=10"
+    REDIS_POOL_TIMEOUT_SECONDS: float = 2.0
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 5.0
+    REDIS_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    REDIS_RETRIES: int = 3
+    REDIS_RETRY_BACKOFF_SECONDS: float = 0.05
+    REDIS_HEALTH_CHECK_INTERVAL_SECONDS: int = 30
+
+    # Rate limits, requests per minute. A request must pass every limit of
+    # its endpoint: chat per room, per agent and global; scrape (per URL)
+    # and crawl per user and global
+    RATE_LIMIT_CHAT_PER_ROOM: int = 20
+    RATE_LIMIT_CHAT_PER_AGENT: int = 600
+    RATE_LIMIT_CHAT_GLOBAL: int = 6000
+    RATE_LIMIT_SCRAPE_PER_USER: int = 20
+    RATE_LIMIT_SCRAPE_GLOBAL: int = 200
+    RATE_LIMIT_CRAWL_PER_USER: int = 3
+    RATE_LIMIT_CRAWL_GLOBAL: int = 30
+
+    # SSE event bus
+    EVENT_BUS_HEARTBEAT_SECONDS: float = 15.0
+    EVENT_BUS_QUEUE_SIZE: int = 32
+
+    # Warm chat sessions kept per process
+    CHAT_SESSION_CACHE_SIZE: int = 1000
+    CHAT_SESSION_IDLE_SECONDS: int = 900
+
+    # LLM context window (per-agent override: agents.contextTokenBudget)
+    CHAT_CONTEXT_TOKEN_BUDGET: int = 8000
+    CHAT_CONTEXT_KEEP_TURNS: int = 8
+    CHAT_CONTEXT_FOLD_BATCH_TURNS: int = 8
+    CHAT_CONTEXT_SUMMARY_MAX_TOKENS: int = 600
+
     # Extra fields from .env
     PUBLIC_BASE_URL: str = ""
     TWILIO_WEBHOOK_URL: str = ""
@@ -88,6 +127,11 @@ class Settings(BaseSettings):
     # Clerk settings with defaults
     CLERK_JWT_ISSUER: str = ""
     CLERK_PUBLIC_KEY: str = ""
+
+    # Auth verification caches
+    JWKS_CACHE_TTL_SECONDS: int = 3600
+    JWKS_MIN_REFRESH_INTERVAL_SECONDS: int = 30
+    AUTH_TOKEN_CACHE_SIZE: int = 4096
     
     # Supabase
     SUPABASE_URL: str = ""
@@ -99,7 +143,86 @@ class Settings(BaseSettings):
     LIVEKIT_API_SECRET: str = ""
     LIVEKIT_URL: str = ""
     LIVEKIT_SIP_URL: str = ""
+
+    # Voice call lifecycle timers (seconds)
+    CALL_SILENCE_TIMEOUT_SECONDS: int = 90
+    CALL_MAX_DURATION_SECONDS: int = 3600
+    CALL_PARTICIPANT_JOIN_TIMEOUT_SECONDS: int = 30
+
+    # Comma-separated agent ids to preload in LiveKit workers; empty means
+    # every agent with an assigned phone number
+    LIVEKIT_PRELOAD_AGENT_IDS: str = ""
+    # Room registries are per process and webhooks reach one worker, so this
+    # bounds how stale another worker's view of a room can be
+    LIVEKIT_ROOM_REGISTRY_TTL_SECONDS: float = 30.0
+    CALL_ROUTING_RELOAD_SECONDS: float = 300.0
+
+    # Pre-synthesized opening line audio; the API renders into this directory
+    # and the LiveKit worker plays from it, so both need to see the same one
+    OPENING_LINE_CACHE_DIR: str = "cache/opening_lines"
+    OPENING_LINE_CACHE_MAX_MB: int = 512
+
+    # Onboarding preview audio
+    PREVIEW_AUDIO_CACHE_DIR: str = "cache/preview_audio"
+    PREVIEW_AUDIO_CACHE_MAX_MB: int = 256
     
+    # Twilio number search caches (seconds)
+    TWILIO_PRICING_CACHE_TTL_SECONDS: float = 86400.0
+    TWILIO_AVAILABILITY_CACHE_TTL_SECONDS: float = 60.0
+    TWILIO_COUNTRY_CODES_CACHE_TTL_SECONDS: float = 86400.0
+
+    # Outbound campaign dialer
+    CAMPAIGN_DIALER: str = "livekit"  # "fake" dials nothing, for dry runs
+    CAMPAIGN_MAX_CALLS_PER_TRUNK: int = 10
+    CAMPAIGN_RING_TIMEOUT_SECONDS: float = 30.0
+    CAMPAIGN_MAX_CALL_SECONDS: float = 1800.0
+    CAMPAIGN_POLL_SECONDS: float = 2.0
+
+    # Post-call pipeline (summary, lead detection, email, usage)
+    POST_CALL_WORKERS: int = 2
+    POST_CALL_MAX_ATTEMPTS: int = 5
+    POST_CALL_RETRY_AFTER_SECONDS: float = 120.0
+    POST_CALL_STATE_TTL_SECONDS: int = 604800
+
+    # Lead notification emails
+    NOTIFICATION_ROUTE_TTL_SECONDS: int = 3600
+    NYLAS_SEND_RATE_PER_SECOND: float = 5.0
+    NYLAS_OUTBOX_BATCH_SIZE: int = 10
+
+    # Latency tracing (FlowTracker); the admin endpoints are off while the
+    # token is empty
+    TRACE_SAMPLE_RATE: float = 0.25
+    TRACE_RING_SIZE: int = 1024
+    ADMIN_API_TOKEN: str = ""
+
+    # Voice turn latency; recent turns kept per agent for percentiles
+    VOICE_LATENCY_WINDOW: int = 256
+    VOICE_LATENCY_MAX_AGENTS: int = 512
+
+    # Event loop monitor: lag probe and stack capture of callbacks that
+    # hold the loop for longer than the threshold
+    LOOP_MONITOR_ENABLED: bool = False
+    LOOP_MONITOR_INTERVAL_MS: int = 50
+    LOOP_MONITOR_THRESHOLD_MS: int = 100
+
+    # Logging: console and file levels, per-module console overrides as
+    # "module=LEVEL,..." (e.g. "app.services.redis_service=WARNING"), one
+    # JSON object per line on stdout, and a cap on message/field length
+    LOG_LEVEL: str = "INFO"
+    LOG_FILE_LEVEL: str = "INFO"
+    LOG_MODULE_LEVELS: str = ""
+    LOG_JSON: bool = False
+    LOG_MAX_MESSAGE_CHARS: int = 4000
+
+    # Production server (gunicorn.conf.py): worker processes (0 = one per
+    # CPU), how long a stopping worker lets open streams finish, the lazy
+    # clients each worker builds before reporting ready, and the time each
+    # readiness check gets
+    SERVER_WORKERS: int = 0
+    SERVER_DRAIN_SECONDS: int = 20
+    SERVER_WARM_CLIENTS: str = "openai,openai_async,supabase_sync"
+    READINESS_CHECK_TIMEOUT_SECONDS: float = 2.0
+
     # API Keys
     PINECONE_API_KEY: str = ""
     HUMANLOOP_API_KEY: str = ""
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import time
+from contextlib import suppress
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+
+T = TypeVar("T")
+
+""" WORKER LIFECYCLE """
+
+
+class Lifecycle:
+    """
+    Readiness and drain state of one server process.
+
+    Gunicorn workers import the app after forking, so this state, like the
+    pooled clients built at startup, is per worker. A worker is ready once
+    startup has finished and every readiness check passes; it stops being
+    ready as soon as it starts draining. Streaming responses are counted
+    while open so shutdown can wait for them, and streams that never end on
+    their own (event feeds) are closed when draining begins. The drain has
+    one deadline, set when it begins, so the server's wait for connections
+    and the shutdown hook's wait share the same `drain_seconds`.
+    """
+
+    def __init__(
+        self,
+        check_timeout: float = 2.0,
+        drain_seconds: float = 20.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.check_timeout = check_timeout
+        self.drain_seconds = drain_seconds
+        self.clock = clock
+        self.started_at = clock()
+        self.started = False
+        self.draining = False
+        self.drain_deadline: Optional[float] = None
+        self.streams = 0
+        self._checks: Dict[str, Callable[[], Awaitable[bool]]] = {}
+        self._drained: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def add_check(self, name: str, check: Callable[[], Awaitable[bool]]) -> None:
+        """Register an async readiness check; an exception counts as failing."""
+        self._checks[name] = check
+
+    def mark_started(self) -> None:
+        self.started = True
+        logger.info(f"Worker {os.getpid()} ready")
+
+    def begin_drain(self, timeout: Optional[float] = None) -> None:
+        """Start draining; safe to call from a signal handler."""
+        if not self.draining:
+            self.draining = True
+            self.drain_deadline = self.clock() + (self.drain_seconds if timeout is None else timeout)
+            if self._drained is not None:
+                self._loop.call_soon_threadsafe(self._drained.set)
+            logger.info(f"Worker {os.getpid()} draining with {self.streams} open stream(s)")
+
+    def _drain_event(self) -> asyncio.Event:
+        if self._drained is None:
+            self._loop = asyncio.get_running_loop()
+            self._drained = asyncio.Event()
+            if self.draining:
+                self._drained.set()
+        return self._drained
+
+    async def _until_drained(self, body: AsyncIterator[T]) -> AsyncIterator[T]:
+        drained = asyncio.ensure_future(self._drain_event().wait())
+        next_item: Optional[asyncio.Future] = None
+        try:
+            while True:
+                next_item = asyncio.ensure_future(body.__anext__())
+                await asyncio.wait({next_item, drained}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_item.done():
+                    return
+                try:
+                    item = next_item.result()
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            drained.cancel()
+            if next_item is not None and not next_item.done():
+                # Interrupt the body where it waits and let it run its cleanup
+                next_item.cancel()
+                with suppress(asyncio.CancelledError, StopAsyncIteration):
+                    await next_item
+
+    async def stream(self, body: AsyncIterator[T], close_on_drain: bool = False) -> AsyncIterator[T]:
+        """
+        Wrap a streaming response body so it is counted while open. With
+        `close_on_drain` the stream ends as soon as draining begins.
+        """
+        self.streams += 1
+        items = self._until_drained(body) if close_on_drain else body
+        try:
+            async for item in items:
+                yield item
+        finally:
+            self.streams -= 1
+            if items is not body:
+                await items.aclose()
+            # Close the wrapped body now rather than whenever it is collected
+            aclose = getattr(body, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def drain(self, timeout: Optional[float] = None) -> int:
+        """
+        Stop reporting ready and wait for open streams until the drain
+        deadline (`timeout` from now if draining has not begun yet); returns
+        the streams left.
+        """
+        self.begin_drain(timeout)
+        while self.streams and self.clock() < self.drain_deadline:
+            await asyncio.sleep(0.1)
+        if self.streams:
+            logger.warning(f"Worker {os.getpid()} stopping with {self.streams} stream(s) still open")
+        return self.streams
+
+    async def _run_check(self, check: Callable[[], Awaitable[bool]]) -> bool:
+        try:
+            return bool(await asyncio.wait_for(check(), self.check_timeout))
+        except Exception:
+            return False
+
+    async def readiness(self) -> Dict[str, Any]:
+        names = list(self._checks)
+        results = await asyncio.gather(*(self._run_check(self._checks[name]) for name in names))
+        checks = dict(zip(names, results))
+        return {
+            "ready": self.started and not self.draining and all(results),
+            "started": self.started,
+            "draining": self.draining,
+            "checks": checks,
+            "streams": self.streams,
+        }
+
+    def liveness(self) -> Dict[str, Any]:
+        return {
+            "alive": True,
+            "pid": os.getpid(),
+            "uptime_s": round(self.clock() - self.started_at, 1),
+            "streams": self.streams,
+        }
+
+
+lifecycle = Lifecycle(settings.READINESS_CHECK_TIMEOUT_SECONDS, settings.SERVER_DRAIN_SECONDS)
@@ -1,46 +1,193 @@
 import sys
 import os
+import json
+import random
+import threading
+import time
+import traceback
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
+from typing import Any, Dict, Optional
 from loguru import logger
 
+from app.core.config import settings
+
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(exist_ok=True)
 
 current_time = datetime.now().strftime("%Y-%m-%d")
 log_file = LOG_DIR / f"app_{current_time}.log"
 
+TRUNCATION_MARKER = "... [truncated {} chars]"
+MAX_THROTTLE_KEYS = 1024
+
+
+def truncate(value: str, limit: Optional[int] = None) -> str:
+    """Cap `value` at `limit` characters (LOG_MAX_MESSAGE_CHARS by default)."""
+    limit = settings.LOG_MAX_MESSAGE_CHARS if limit is None else limit
+    if limit <= 0 or len(value) <= limit:
+        return value
+    return value[:limit] + TRUNCATION_MARKER.format(len(value) - limit)
+
+
+def parse_module_levels(spec: str) -> Dict[str, str]:
+    """Parse "module=LEVEL,module=LEVEL" into a loguru filter mapping."""
+    levels = {}
+    for item in spec.split(","):
+        module, _, level = item.partition("=")
+        if module.strip() and level.strip():
+            levels[module.strip()] = level.strip().upper()
+    return levels
+
+
+def _serialize(record: Dict[str, Any]) -> str:
+    data = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    extra = {k: v for k, v in record["extra"].items() if k != "serialized"}
+    if extra:
+        data["extra"] = extra
+    if record["exception"] is not None:
+        exc_type, exc, tb = record["exception"]
+        data["exception"] = truncate("".join(traceback.format_exception(exc_type, exc, tb)))
+    return json.dumps(data, default=str)
+
+
+def _patch_record(record: Dict[str, Any]) -> None:
+    # Runs once per emitted record, after the level check
+    record["message"] = truncate(record["message"])
+    for key, value in record["extra"].items():
+        if isinstance(value, str):
+            record["extra"][key] = truncate(value)
+    if settings.LOG_JSON:
+        record["extra"]["serialized"] = _serialize(record)
+
+
+def _json_format(record: Dict[str, Any]) -> str:
+    return "{extra[serialized]}\n"
+
+
 def setup_logging():
     """
     Configure Loguru logger with standard format and outputs.
-    
+
     This sets up:
-    - Console output with colors
+    - Console output with colors, or one JSON object per line with LOG_JSON
     - File output with rotation
     - Custom format with timestamps, level, and source location
+    - Per-module levels from LOG_MODULE_LEVELS and message truncation
+
+    Both sinks are enqueued, so writing happens on a background thread.
+    Records below every sink's level are dropped before formatting; pass
+    expensive arguments with `logger.opt(lazy=True)` so they are not built
+    either.
     """
     logger.remove()
-    
-    logger.add(
-        sys.stdout,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        colorize=True,
-        level="DEBUG",
-        enqueue=True
+    logger.configure(patcher=_patch_record)
+
+    module_levels = parse_module_levels(settings.LOG_MODULE_LEVELS)
+    console_filter = {"": settings.LOG_LEVEL.upper(), **module_levels}
+    # The sink level is a floor under the filter, so it must let through
+    # the most verbose module override
+    console_level = min(
+        (logger.level(level).no for level in console_filter.values()),
+        default=logger.level(settings.LOG_LEVEL.upper()).no
     )
-    
+
+    if settings.LOG_JSON:
+        logger.add(
+            sys.stdout,
+            format=_json_format,
+            colorize=False,
+            level=console_level,
+            filter=console_filter,
+            enqueue=True
+        )
+    else:
+        logger.add(
+            sys.stdout,
+            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
+            colorize=True,
+            level=console_level,
+            filter=console_filter,
+            enqueue=True
+        )
+
     logger.add(
         log_file,
         rotation="10 MB",
         retention="1 week",
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        level="INFO",
+        level=settings.LOG_FILE_LEVEL.upper(),
         compression="zip",
         enqueue=True
     )
-    
+
     logger.info(f"Logging initialized. Log file: {log_file}")
-    
+
     return logger
 
-logger = setup_logging() 
\ No newline at end of file
+
+class _NullLogger:
+    """Stands in for the logger when a throttled or sampled record is skipped."""
+
+    def _discard(self, *args: Any, **kwargs: Any) -> "_NullLogger":
+        return self
+
+    def __getattr__(self, name: str) -> Any:
+        return self._discard
+
+
+null_logger = _NullLogger()
+
+
+class _Throttle:
+    def __init__(self, max_keys: int = MAX_THROTTLE_KEYS):
+        self.max_keys = max_keys
+        self._last: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key: str, interval: float) -> Optional[int]:
+        """None if `key` logged within `interval`, else how many were skipped since."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._last.get(key)
+            if entry is not None and now - entry[0] < interval:
+                entry[1] += 1
+                return None
+            suppressed = entry[1] if entry is not None else 0
+            self._last[key] = [now, 0]
+            self._last.move_to_end(key)
+            while len(self._last) > self.max_keys:
+                self._last.popitem(last=False)
+            return suppressed
+
+
+_throttle = _Throttle()
+
+
+def throttled(key: str, interval: float = 10.0) -> Any:
+    """
+    Logger for a repetitive message: at most one record per `key` every
+    `interval` seconds. The next record carries the number skipped.
+
+        throttled("redis.save_chat").info(f"Saved chat {key}")
+    """
+    suppressed = _throttle.allow(key, interval)
+    if suppressed is None:
+        return null_logger
+    return logger.bind(suppressed=suppressed) if suppressed else logger
+
+
+def sampled(rate: float) -> Any:
+    """Logger that keeps a `rate` fraction of records."""
+    return logger if rate >= 1.0 or random.random() < rate else null_logger
+
+
+setup_logging()
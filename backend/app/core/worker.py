@@ -0,0 +1,38 @@
+"""
+Gunicorn worker for the production server (see gunicorn.conf.py).
+
+It is uvicorn's worker with two changes: open connections get
+SERVER_DRAIN_SECONDS to finish after a stop signal before they are
+cancelled, so the app's shutdown hooks still run inside gunicorn's
+graceful timeout; and the worker stops reporting ready as soon as the
+signal arrives rather than once its listeners are closed.
+"""
+
+from gunicorn.arbiter import Arbiter
+from uvicorn.server import Server
+from uvicorn.workers import UvicornWorker
+
+from app.core.config import settings
+from app.core.lifecycle import lifecycle
+
+
+class DrainingServer(Server):
+    def handle_exit(self, sig, frame) -> None:
+        lifecycle.begin_drain()
+        super().handle_exit(sig, frame)
+
+
+class AppWorker(UvicornWorker):
+    CONFIG_KWARGS = {
+        "loop": "auto",
+        "http": "auto",
+        "timeout_graceful_shutdown": settings.SERVER_DRAIN_SECONDS,
+    }
+
+    async def _serve(self) -> None:
+        self.config.app = self.wsgi
+        server = DrainingServer(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            raise SystemExit(Arbiter.WORKER_BOOT_ERROR)
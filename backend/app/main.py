@@ -11,8 +11,10 @@ import sentry_sdk
 
 from app.core.config import settings
 from app.api.main import api_router
+from app.api.routes import health
 from app.clients.supabase_client import SupabaseConnection
 from app.core.logging_setup import logger
+from app.core.lifecycle import lifecycle
 
 load_dotenv()
 
@@ -23,21 +25,26 @@ logger.info("Starting application initialization")
 def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
-sentry_sdk.init(
-    dsn="https://e0f7361d6f043e1f2d7a42549e152498@o4508208175906816.ingest.us.sentry.io/4508208188882944",
-    # Set traces_sample_rate to 1.0 to capture 100%
-    # of transactions for tracing.
-    traces_sample_rate=1.0,
-    _experiments={
-        # Set continuous_profiling_auto_start to True
-        # to automatically start the profiler on when
-        # possible.
-        "continuous_profiling_auto_start": True,
-    },
-)
+def init_sentry() -> None:
+    """Must run before the app is built: the FastAPI and Starlette
+    integrations hook in when the app is constructed."""
+    sentry_sdk.init(
+        dsn="https://e0f7361d6f043e1f2d7a42549e152498@o4508208175906816.ingest.us.sentry.io/4508208188882944",
+        # Set traces_sample_rate to 1.0 to capture 100%
+        # of transactions for tracing.
+        traces_sample_rate=1.0,
+        _experiments={
+            # Set continuous_profiling_auto_start to True
+            # to automatically start the profiler on when
+            # possible.
+            "continuous_profiling_auto_start": True,
+        },
+    )
+
+    if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
+        sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
-if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
-    sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)  
+init_sentry()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -62,6 +69,8 @@ app.add_middleware(
 #print("origins",[str(origins).strip(",") for origin in settings.BACKEND_CORS_ORIGINS])
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+# Probes sit outside the versioned API
+app.include_router(health.router, prefix="/health", tags=["health"])
 
 # Define global variable
 livekit_process = None
@@ -101,6 +110,28 @@ async def startup_event():
     logger.info("Initializing Supabase client...")
     supabase = await SupabaseConnection.get_client()
 
+    try:
+        from app.services.campaigns import campaign_scheduler
+        await campaign_scheduler.resume_running()
+    except Exception as e:
+        logger.error(f"Failed to resume outbound campaigns: {e}")
+
+    try:
+        from app.services.post_call import post_call_pipeline
+        await post_call_pipeline.start()
+    except Exception as e:
+        logger.error(f"Failed to start post-call workers: {e}")
+
+    if settings.LOOP_MONITOR_ENABLED:
+        from app.utils.loop_monitor import loop_monitor
+        loop_monitor.start()
+
+    # Each worker builds its own pooled clients before it reports ready
+    from app.clients.lazy import warm_up
+    warm_clients = [name.strip() for name in settings.SERVER_WARM_CLIENTS.split(",") if name.strip()]
+    await warm_up(warm_clients)
+    register_readiness_checks(warm_clients)
+
     try:
         logger.debug("Attempting to start LiveKit server...")
         
@@ -169,12 +200,49 @@ async def startup_event():
         logger.error(f"Error in startup_event: {e}")
         raise
 
+    lifecycle.mark_started()
+
+def register_readiness_checks(warm_clients):
+    from app.clients.lazy import registered_clients
+    from app.services.redis_service import redis_pools
+
+    async def supabase_connected() -> bool:
+        return SupabaseConnection._client is not None
+
+    async def redis_reachable() -> bool:
+        return all((await redis_pools.ping()).values())
+
+    async def clients_warm() -> bool:
+        # Clients whose module this worker never imported are not expected
+        built = registered_clients()
+        return all(built[name] for name in warm_clients if name in built)
+
+    lifecycle.add_check("supabase", supabase_connected)
+    lifecycle.add_check("redis", redis_reachable)
+    lifecycle.add_check("clients", clients_warm)
+
 @app.on_event("shutdown")
 async def shutdown_event():
     from app.services.twilio.call_handle import cleanup
+    from app.services.event_bus import event_bus
+    from app.services.voice.room_lifecycle import room_service
+    from app.services.campaigns import campaign_scheduler
+    from app.services.post_call import post_call_pipeline
+    from app.services.email_outbox import email_outbox
+    from app.utils.loop_monitor import loop_monitor
+    from app.services.redis_service import redis_pools
     global livekit_process
 
+    # Shares its deadline with the server's wait for open connections
+    await lifecycle.drain()
+    await loop_monitor.stop()
+    await campaign_scheduler.close()
+    await post_call_pipeline.close()
+    await email_outbox.close()
+    await event_bus.close()
+    await room_service.aclose()
     await SupabaseConnection.close()
+    await redis_pools.aclose()
     logger.info(f"{settings.PROJECT_NAME} application shutting down")
     print("twilio cleanup")
     cleanup()
@@ -0,0 +1,45 @@
+from app.core.config import settings
+from app.services.redis_service import redis_client
+
+from .dialer import FakeSipDialer, LiveKitSipDialer, SipDialer
+from .leads import normalize_phone, parse_lead_csv
+from .models import CallOutcome, Campaign, CampaignStatus, Lead, LeadStatus
+from .scheduler import CampaignScheduler
+from .store import CampaignStore
+
+__all__ = [
+    'CallOutcome',
+    'Campaign',
+    'CampaignScheduler',
+    'CampaignStatus',
+    'CampaignStore',
+    'FakeSipDialer',
+    'Lead',
+    'LeadStatus',
+    'LiveKitSipDialer',
+    'SipDialer',
+    'campaign_scheduler',
+    'normalize_phone',
+    'parse_lead_csv',
+]
+
+
+def _make_dialer() -> SipDialer:
+    if settings.CAMPAIGN_DIALER == "fake":
+        return FakeSipDialer(call_seconds=5.0)
+    return LiveKitSipDialer(
+        ring_timeout=settings.CAMPAIGN_RING_TIMEOUT_SECONDS,
+        max_call_seconds=settings.CAMPAIGN_MAX_CALL_SECONDS,
+        poll_seconds=settings.CAMPAIGN_POLL_SECONDS,
+    )
+
+
+campaign_scheduler = CampaignScheduler(
+    CampaignStore(redis_client),
+    _make_dialer(),
+    max_calls_per_trunk=settings.CAMPAIGN_MAX_CALLS_PER_TRUNK,
+    poll_seconds=settings.CAMPAIGN_POLL_SECONDS,
+    # A call lasts at most the ring timeout plus the call limit; the margin
+    # covers the hangup
+    slot_lease_seconds=settings.CAMPAIGN_RING_TIMEOUT_SECONDS + settings.CAMPAIGN_MAX_CALL_SECONDS + 60,
+)
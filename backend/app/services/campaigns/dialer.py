@@ -0,0 +1,131 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Protocol
+
+from livekit import api
+
+from app.core.logging_setup import logger
+from app.services.campaigns.models import CallOutcome, Campaign, Lead
+from app.services.initiate_outbound import initiate_outbound_call, sip_identity
+from app.services.voice.room_lifecycle import room_service
+
+# LiveKit SIP participant attribute carrying the call state
+CALL_STATUS_ATTRIBUTE = "sip.callStatus"
+
+
+class SipDialer(Protocol):
+    async def dial(self, campaign: Campaign, lead: Lead) -> CallOutcome:
+        """Place one call and return once it has ended."""
+        ...
+
+
+def outcome_from_sip_error(error: Exception) -> CallOutcome:
+    message = str(getattr(error, 'message', error)).lower()
+    if "486" in message or "busy" in message:
+        return CallOutcome.BUSY
+    if any(marker in message for marker in ("480", "408", "no answer", "timeout", "timed out")):
+        return CallOutcome.NO_ANSWER
+    return CallOutcome.FAILED
+
+
+class LiveKitSipDialer:
+    """
+    Places campaign calls through a LiveKit outbound SIP trunk.
+
+    The room is created with the campaign's agent id as metadata, the lead is
+    dialed into it, and the SIP participant's call status is polled: a call
+    not answered within `ring_timeout` is hung up as a no-answer, and an
+    answered call holds its concurrency slot until the participant leaves or
+    `max_call_seconds` passes.
+    """
+
+    def __init__(self, ring_timeout: float, max_call_seconds: float, poll_seconds: float):
+        self.ring_timeout = ring_timeout
+        self.max_call_seconds = max_call_seconds
+        self.poll_seconds = poll_seconds
+
+    async def _call_status(self, room_name: str, identity: str) -> Optional[str]:
+        try:
+            participants = await room_service.list_participants(room_name)
+        except api.twirp_client.TwirpError as e:
+            if e.code == "not_found":
+                return None
+            raise
+        for participant in participants:
+            if participant.identity == identity:
+                return participant.attributes.get(CALL_STATUS_ATTRIBUTE, "dialing")
+        return None
+
+    async def _wait_while(self, room_name: str, identity: str, statuses: set, seconds: float) -> Optional[str]:
+        """Poll until the call leaves `statuses` or `seconds` pass; returns the last status."""
+        deadline = time.monotonic() + seconds
+        while True:
+            status = await self._call_status(room_name, identity)
+            if status not in statuses or time.monotonic() >= deadline:
+                return status
+            await asyncio.sleep(self.poll_seconds)
+
+    async def dial(self, campaign: Campaign, lead: Lead) -> CallOutcome:
+        room_name = lead.room_name
+        identity = sip_identity(lead.phone_number)
+        try:
+            await initiate_outbound_call(
+                phone_number=lead.phone_number,
+                room_name=room_name,
+                agent_id=campaign.agent_id,
+                trunk_id=campaign.trunk_id,
+                participant_name=lead.name or "SIP Caller"
+            )
+        except api.twirp_client.TwirpError as e:
+            logger.warning(f"Campaign {campaign.id} call to {lead.phone_number} failed: {e.code} {e.message}")
+            await self._cleanup(room_name)
+            return outcome_from_sip_error(e)
+
+        try:
+            status = await self._wait_while(room_name, identity, {"dialing", "ringing"}, self.ring_timeout)
+            if status != "active":
+                # Still ringing at the timeout, or hung up before answering
+                return CallOutcome.NO_ANSWER
+            await self._wait_while(room_name, identity, {"active", "automation"}, self.max_call_seconds)
+            return CallOutcome.ANSWERED
+        finally:
+            await self._cleanup(room_name)
+
+    async def _cleanup(self, room_name: str) -> None:
+        try:
+            await room_service.delete_room(room_name)
+        except Exception as e:
+            logger.debug(f"Could not delete campaign room {room_name}: {str(e)}")
+
+
+class FakeSipDialer:
+    """
+    In-process stand-in for the SIP trunk, for tests and dry runs.
+
+    Each number answers with the next outcome from its script (then
+    `default`) after `call_seconds`. Calls and peak concurrency are recorded.
+    """
+
+    def __init__(
+        self,
+        outcomes: Optional[Dict[str, List[CallOutcome]]] = None,
+        default: CallOutcome = CallOutcome.ANSWERED,
+        call_seconds: float = 0.0
+    ):
+        self.outcomes = {number: list(script) for number, script in (outcomes or {}).items()}
+        self.default = default
+        self.call_seconds = call_seconds
+        self.calls: List[str] = []
+        self.active = 0
+        self.max_active = 0
+
+    async def dial(self, campaign: Campaign, lead: Lead) -> CallOutcome:
+        self.calls.append(lead.phone_number)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.call_seconds)
+        finally:
+            self.active -= 1
+        script = self.outcomes.get(lead.phone_number)
+        return script.pop(0) if script else self.default
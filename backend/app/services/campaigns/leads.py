@@ -0,0 +1,77 @@
+import csv
+import hashlib
+import io
+import re
+from typing import List, Optional
+
+from app.core.logging_setup import logger
+from app.services.campaigns.models import Lead
+
+# Column names accepted for each lead field, lowercased
+PHONE_COLUMNS = ("phone", "phone_number", "number", "mobile")
+NAME_COLUMNS = ("name", "business_name", "company")
+TIMEZONE_COLUMNS = ("timezone", "time_zone", "tz")
+
+
+def normalize_phone(raw: str, default_country_code: str = "1") -> Optional[str]:
+    """E.164 form of a scraped phone number, or None if it cannot be one."""
+    raw = (raw or "").strip()
+    digits = re.sub(r"\D", "", raw)
+    if not digits:
+        return None
+    if raw.startswith("+"):
+        number = digits
+    elif raw.startswith("00"):
+        number = digits[2:]
+    elif default_country_code == "1" and len(digits) == 10:
+        number = "1" + digits
+    else:
+        number = digits
+    if not 8 <= len(number) <= 15:
+        return None
+    return "+" + number
+
+
+def lead_id(phone_number: str) -> str:
+    return hashlib.sha1(phone_number.encode()).hexdigest()[:16]
+
+
+def _column(row: dict, names) -> str:
+    for name in names:
+        value = row.get(name)
+        if value:
+            return value.strip()
+    return ""
+
+
+def parse_lead_csv(content: str, default_country_code: str = "1") -> List[Lead]:
+    """
+    Leads from a CSV lead list such as the scraped data/roofers exports.
+
+    Rows without a usable phone number are skipped, and a number listed more
+    than once is only called once.
+    """
+    reader = csv.DictReader(io.StringIO(content))
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+
+    leads: List[Lead] = []
+    seen = set()
+    skipped = 0
+    for row in reader:
+        phone_number = normalize_phone(_column(row, PHONE_COLUMNS), default_country_code)
+        if phone_number is None:
+            skipped += 1
+            continue
+        if phone_number in seen:
+            continue
+        seen.add(phone_number)
+        leads.append(Lead(
+            id=lead_id(phone_number),
+            phone_number=phone_number,
+            name=_column(row, NAME_COLUMNS),
+            timezone=_column(row, TIMEZONE_COLUMNS),
+        ))
+
+    logger.info(f"Parsed {len(leads)} leads from CSV ({skipped} rows without a phone number)")
+    return leads
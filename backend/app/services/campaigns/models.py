@@ -0,0 +1,132 @@
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.core.logging_setup import logger
+
+
+class CampaignStatus(str, Enum):
+    DRAFT = "draft"
+    RUNNING = "running"
+    PAUSED = "paused"
+    COMPLETED = "completed"
+
+
+class LeadStatus(str, Enum):
+    PENDING = "pending"
+    DIALING = "dialing"
+    RETRY = "retry"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class CallOutcome(str, Enum):
+    ANSWERED = "answered"
+    NO_ANSWER = "no_answer"
+    BUSY = "busy"
+    FAILED = "failed"
+
+
+# Outcomes worth another attempt after the retry delay
+RETRYABLE_OUTCOMES = {CallOutcome.NO_ANSWER, CallOutcome.BUSY}
+
+
+def _from_dict(cls, data: Dict[str, Any]):
+    known = {f.name for f in fields(cls)}
+    return cls(**{key: value for key, value in data.items() if key in known})
+
+
+@dataclass
+class Lead:
+    id: str
+    phone_number: str
+    name: str = ""
+    timezone: str = ""
+    status: LeadStatus = LeadStatus.PENDING
+    attempts: int = 0
+    next_attempt_at: float = 0.0
+    last_outcome: Optional[CallOutcome] = None
+    room_name: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['status'] = self.status.value
+        data['last_outcome'] = self.last_outcome.value if self.last_outcome else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Lead":
+        lead = _from_dict(cls, data)
+        lead.status = LeadStatus(lead.status)
+        lead.last_outcome = CallOutcome(lead.last_outcome) if lead.last_outcome else None
+        return lead
+
+    @property
+    def is_open(self) -> bool:
+        return self.status in (LeadStatus.PENDING, LeadStatus.RETRY, LeadStatus.DIALING)
+
+
+@dataclass
+class Campaign:
+    id: str
+    user_id: str
+    agent_id: str
+    trunk_id: str
+    name: str = ""
+    calls_per_second: float = 1.0
+    max_concurrent_calls: int = 5
+    max_attempts: int = 3
+    retry_delay_seconds: int = 3600
+    # Local hours (0-23) in which leads are not called; may wrap midnight
+    quiet_hours_start: int = 21
+    quiet_hours_end: int = 9
+    # Used for leads without their own time zone
+    timezone: str = "UTC"
+    status: CampaignStatus = CampaignStatus.DRAFT
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['status'] = self.status.value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Campaign":
+        campaign = _from_dict(cls, data)
+        campaign.status = CampaignStatus(campaign.status)
+        return campaign
+
+
+def lead_zone(lead: Lead, campaign: Campaign) -> ZoneInfo:
+    for name in (lead.timezone, campaign.timezone):
+        if not name:
+            continue
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.warning(f"Unknown time zone {name!r} for lead {lead.id}")
+    return ZoneInfo("UTC")
+
+
+def in_quiet_hours(local_hour: int, start: int, end: int) -> bool:
+    if start == end:
+        return False
+    if start < end:
+        return start <= local_hour < end
+    return local_hour >= start or local_hour < end
+
+
+def next_callable_at(lead: Lead, campaign: Campaign, now: float) -> float:
+    """Earliest unix time at or after `now` outside the lead's quiet hours."""
+    zone = lead_zone(lead, campaign)
+    local = datetime.fromtimestamp(now, zone)
+    if not in_quiet_hours(local.hour, campaign.quiet_hours_start, campaign.quiet_hours_end):
+        return now
+    end = local.replace(hour=campaign.quiet_hours_end, minute=0, second=0, microsecond=0)
+    if end <= local:
+        end = datetime.fromtimestamp(end.timestamp() + 86400, zone).replace(
+            hour=campaign.quiet_hours_end, minute=0, second=0, microsecond=0
+        )
+    return end.timestamp()
@@ -0,0 +1,244 @@
+import asyncio
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.logging_setup import logger
+from app.services.campaigns.dialer import SipDialer
+from app.services.campaigns.models import (
+    RETRYABLE_OUTCOMES,
+    CallOutcome,
+    Campaign,
+    CampaignStatus,
+    Lead,
+    LeadStatus,
+    next_callable_at,
+)
+from app.services.campaigns.store import CampaignStore
+
+
+class CampaignScheduler:
+    """
+    Dials the leads of running campaigns.
+
+    Each running campaign has one loop, guarded by a Redis lock so only one
+    process dials it. The loop paces dials to the campaign's calls per second
+    and only starts a call while both the campaign's agent and its SIP trunk
+    are under their concurrency limits. Live calls are counted in Redis, so
+    the limits hold across every campaign and every server worker; a call
+    whose process died stops counting after `slot_lease_seconds`. Leads in
+    their local quiet hours wait for the hours to end;
+    no-answer and busy calls are retried after the campaign's retry delay
+    until `max_attempts`. Every lead transition is persisted before the next
+    step, so a restarted process resumes where the last one stopped; a lead
+    left mid-dial by a crash is retried.
+    """
+
+    def __init__(
+        self,
+        store: CampaignStore,
+        dialer: SipDialer,
+        max_calls_per_trunk: int,
+        poll_seconds: float,
+        lock_ttl_seconds: float = 60,
+        slot_lease_seconds: float = 3600,
+        clock: Callable[[], float] = time.time
+    ):
+        self.store = store
+        self.dialer = dialer
+        self.max_calls_per_trunk = max_calls_per_trunk
+        self.poll_seconds = poll_seconds
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.slot_lease_seconds = slot_lease_seconds
+        self.clock = clock
+        self.owner = uuid.uuid4().hex
+        self._runs: Dict[str, asyncio.Task] = {}
+
+    async def create_campaign(self, campaign: Campaign, leads: List[Lead]) -> int:
+        await self.store.save_campaign(campaign)
+        return await self.store.add_leads(campaign.id, leads)
+
+    async def set_status(self, campaign_id: str, status: CampaignStatus) -> Optional[Campaign]:
+        campaign = await self.store.get_campaign(campaign_id)
+        if campaign is None:
+            return None
+        campaign.status = status
+        await self.store.save_campaign(campaign)
+        if status == CampaignStatus.RUNNING:
+            self._ensure_run(campaign_id)
+        # A paused campaign's loop sees the new status and lets its calls finish
+        return campaign
+
+    async def start(self, campaign_id: str) -> Optional[Campaign]:
+        return await self.set_status(campaign_id, CampaignStatus.RUNNING)
+
+    async def pause(self, campaign_id: str) -> Optional[Campaign]:
+        return await self.set_status(campaign_id, CampaignStatus.PAUSED)
+
+    async def resume_running(self) -> None:
+        """Pick up campaigns left running by a previous process."""
+        for campaign_id in await self.store.running_campaign_ids():
+            self._ensure_run(campaign_id)
+
+    async def status(self, campaign_id: str) -> Optional[Dict]:
+        campaign = await self.store.get_campaign(campaign_id)
+        if campaign is None:
+            return None
+        return {
+            "campaign": campaign.to_dict(),
+            "progress": await self.store.progress(campaign_id),
+            "dialing_here": campaign_id in self._runs and not self._runs[campaign_id].done()
+        }
+
+    def _ensure_run(self, campaign_id: str) -> None:
+        task = self._runs.get(campaign_id)
+        if task is None or task.done():
+            self._runs[campaign_id] = asyncio.create_task(self.run(campaign_id))
+
+    async def wait(self, campaign_id: str) -> None:
+        task = self._runs.get(campaign_id)
+        if task is not None:
+            await task
+
+    async def close(self) -> None:
+        for task in self._runs.values():
+            task.cancel()
+        await asyncio.gather(*self._runs.values(), return_exceptions=True)
+        self._runs.clear()
+
+    async def _recover(self, campaign_id: str) -> None:
+        for lead in await self.store.get_leads(campaign_id):
+            if lead.status == LeadStatus.DIALING:
+                logger.warning(f"Campaign {campaign_id} lead {lead.id} was mid-dial, retrying")
+                lead.status = LeadStatus.RETRY
+                await self.store.save_lead(campaign_id, lead)
+
+    async def run(self, campaign_id: str) -> None:
+        if not await self.store.acquire_lock(campaign_id, self.owner, self.lock_ttl_seconds):
+            logger.info(f"Campaign {campaign_id} is being dialed by another process")
+            return
+
+        in_flight: Set[asyncio.Task] = set()
+        next_dial = 0.0
+        try:
+            await self._recover(campaign_id)
+            logger.info(f"Dialing campaign {campaign_id}")
+            while await self.store.acquire_lock(campaign_id, self.owner, self.lock_ttl_seconds):
+                campaign = await self.store.get_campaign(campaign_id)
+                if campaign is None or campaign.status != CampaignStatus.RUNNING:
+                    break
+
+                due, wake_at = self._due_leads(campaign, await self.store.get_leads(campaign_id))
+                if not due and not in_flight and wake_at is None:
+                    campaign.status = CampaignStatus.COMPLETED
+                    await self.store.save_campaign(campaign)
+                    logger.info(f"Campaign {campaign_id} completed")
+                    break
+
+                dialed, next_dial, held = await self._dial_due(campaign, due, in_flight, next_dial)
+                if not held:
+                    logger.warning(f"Campaign {campaign_id} lock lost, another process took over")
+                    break
+                await self._wait_for_work(in_flight, dialed, wake_at)
+        except asyncio.CancelledError:
+            # Shutting down: abandon live calls, their leads are retried on resume
+            for task in in_flight:
+                task.cancel()
+            raise
+        finally:
+            if in_flight:
+                # Calls already placed run to completion and record their outcome
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            await self.store.release_lock(campaign_id, self.owner)
+
+    def _due_leads(self, campaign: Campaign, leads: List[Lead]) -> Tuple[List[Lead], Optional[float]]:
+        """Leads callable now, and when the earliest of the others comes due."""
+        now = self.clock()
+        due: List[Lead] = []
+        wake_at: Optional[float] = None
+        for lead in leads:
+            if lead.status not in (LeadStatus.PENDING, LeadStatus.RETRY):
+                continue
+            callable_at = next_callable_at(lead, campaign, max(now, lead.next_attempt_at))
+            if callable_at <= now:
+                due.append(lead)
+            else:
+                wake_at = callable_at if wake_at is None else min(wake_at, callable_at)
+        return due, wake_at
+
+    async def _hold_lock_until(self, campaign_id: str, until: float) -> bool:
+        """
+        Sleep until `until` (monotonic), refreshing the campaign lock at
+        least every third of its TTL; False as soon as the lock is lost.
+        """
+        while await self.store.acquire_lock(campaign_id, self.owner, self.lock_ttl_seconds):
+            delay = until - time.monotonic()
+            if delay <= 0:
+                return True
+            await asyncio.sleep(min(delay, self.lock_ttl_seconds / 3))
+        return False
+
+    async def _dial_due(
+        self,
+        campaign: Campaign,
+        due: List[Lead],
+        in_flight: Set[asyncio.Task],
+        next_dial: float
+    ) -> Tuple[int, float, bool]:
+        """Start calls to `due` leads at the campaign's pace while there is capacity."""
+        interval = 1.0 / campaign.calls_per_second if campaign.calls_per_second > 0 else 0.0
+        dialed = 0
+        for lead in due:
+            if not await self._hold_lock_until(campaign.id, next_dial):
+                return dialed, next_dial, False
+            room_name = f"outbound_{campaign.id}_{lead.id}_{lead.attempts + 1}"
+            if not await self.store.take_call_slot(
+                campaign, room_name, self.max_calls_per_trunk, self.slot_lease_seconds
+            ):
+                break
+            next_dial = time.monotonic() + interval
+
+            lead.status = LeadStatus.DIALING
+            lead.attempts += 1
+            lead.room_name = room_name
+            try:
+                await self.store.save_lead(campaign.id, lead)
+            except BaseException:
+                await self.store.release_call_slot(campaign, room_name)
+                raise
+            task = asyncio.create_task(self._dial(campaign, lead))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            dialed += 1
+        return dialed, next_dial, True
+
+    async def _wait_for_work(self, in_flight: Set[asyncio.Task], dialed: int, wake_at: Optional[float]) -> None:
+        """Wake when a call ends, a lead comes due, or to re-check status."""
+        timeout = self.poll_seconds
+        if wake_at is not None:
+            timeout = min(timeout, max(0.0, wake_at - self.clock()))
+        if in_flight:
+            await asyncio.wait(set(in_flight), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        elif not dialed:
+            await asyncio.sleep(timeout)
+
+    async def _dial(self, campaign: Campaign, lead: Lead) -> None:
+        try:
+            try:
+                outcome = await self.dialer.dial(campaign, lead)
+            except Exception as e:
+                logger.error(f"Campaign {campaign.id} call to {lead.phone_number} errored: {str(e)}")
+                outcome = CallOutcome.FAILED
+
+            lead.last_outcome = outcome
+            if outcome == CallOutcome.ANSWERED:
+                lead.status = LeadStatus.COMPLETED
+            elif outcome in RETRYABLE_OUTCOMES and lead.attempts < campaign.max_attempts:
+                lead.status = LeadStatus.RETRY
+                lead.next_attempt_at = self.clock() + campaign.retry_delay_seconds
+            else:
+                lead.status = LeadStatus.FAILED
+            await self.store.save_lead(campaign.id, lead)
+            logger.info(f"Campaign {campaign.id} call to {lead.phone_number}: {outcome.value} ({lead.status.value})")
+        finally:
+            await self.store.release_call_slot(campaign, lead.room_name)
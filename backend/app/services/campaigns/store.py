@@ -0,0 +1,151 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.services.campaigns.models import Campaign, CampaignStatus, Lead
+
+# KEYS is the lock; ARGV is the owner and the TTL in ms. Takes a free lock or
+# extends one the owner already holds, in one step so it never extends a
+# lock that expired and went to someone else in between.
+ACQUIRE_LOCK_SCRIPT = """
+local holder = redis.call('GET', KEYS[1])
+if holder == false then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+if holder == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Live calls are leases in sorted sets scored by expiry, one set per limit
+# (the agent's and the trunk's). KEYS are the sets; ARGV is the call id, the
+# lease in ms, then the limit for each set. A call is added to every set or,
+# if any is full, to none. Leases of calls whose process died expire on
+# their own.
+TAKE_CALL_SLOT_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now)
+    if redis.call('ZCARD', key) >= tonumber(ARGV[i + 2]) then
+        return 0
+    end
+end
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now + tonumber(ARGV[2]), ARGV[1])
+    redis.call('PEXPIRE', key, ARGV[2])
+end
+return 1
+"""
+
+
+class CampaignStore:
+    """
+    Redis persistence for campaigns and their leads.
+
+    A campaign is one JSON document; its leads live in a hash keyed by lead
+    id, so a status change rewrites one field rather than the whole list.
+    Running campaigns are tracked in a set so they can be resumed after a
+    restart, and a per-campaign lock keeps two processes from dialing the
+    same campaign. Live calls per agent and per trunk are counted here too,
+    so concurrency limits hold across every process.
+    """
+
+    def __init__(self, client: Any, prefix: str = "campaign"):
+        self.client = client
+        self.prefix = prefix
+        self._acquire_lock = client.register_script(ACQUIRE_LOCK_SCRIPT)
+        self._release_lock = client.register_script(RELEASE_LOCK_SCRIPT)
+        self._take_call_slot = client.register_script(TAKE_CALL_SLOT_SCRIPT)
+
+    def campaign_key(self, campaign_id: str) -> str:
+        return f"{self.prefix}:{campaign_id}"
+
+    def leads_key(self, campaign_id: str) -> str:
+        return f"{self.prefix}:{campaign_id}:leads"
+
+    def lock_key(self, campaign_id: str) -> str:
+        return f"{self.prefix}:{campaign_id}:lock"
+
+    def agent_calls_key(self, agent_id: str) -> str:
+        return f"{self.prefix}_calls:agent:{agent_id}"
+
+    def trunk_calls_key(self, trunk_id: str) -> str:
+        return f"{self.prefix}_calls:trunk:{trunk_id}"
+
+    @property
+    def running_key(self) -> str:
+        return f"{self.prefix}s:running"
+
+    async def save_campaign(self, campaign: Campaign) -> None:
+        await self.client.set(self.campaign_key(campaign.id), json.dumps(campaign.to_dict()))
+        if campaign.status == CampaignStatus.RUNNING:
+            await self.client.sadd(self.running_key, campaign.id)
+        else:
+            await self.client.srem(self.running_key, campaign.id)
+
+    async def get_campaign(self, campaign_id: str) -> Optional[Campaign]:
+        data = await self.client.get(self.campaign_key(campaign_id))
+        return Campaign.from_dict(json.loads(data)) if data else None
+
+    async def running_campaign_ids(self) -> List[str]:
+        return sorted(await self.client.smembers(self.running_key))
+
+    async def add_leads(self, campaign_id: str, leads: Iterable[Lead]) -> int:
+        """Add leads not already in the campaign; returns how many were new."""
+        key = self.leads_key(campaign_id)
+        existing = set(await self.client.hkeys(key))
+        new_leads = {
+            lead.id: json.dumps(lead.to_dict()) for lead in leads if lead.id not in existing
+        }
+        if new_leads:
+            await self.client.hset(key, mapping=new_leads)
+        return len(new_leads)
+
+    async def save_lead(self, campaign_id: str, lead: Lead) -> None:
+        await self.client.hset(self.leads_key(campaign_id), lead.id, json.dumps(lead.to_dict()))
+
+    async def get_leads(self, campaign_id: str) -> List[Lead]:
+        rows = await self.client.hgetall(self.leads_key(campaign_id))
+        return [Lead.from_dict(json.loads(row)) for row in rows.values()]
+
+    async def progress(self, campaign_id: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for lead in await self.get_leads(campaign_id):
+            counts[lead.status.value] = counts.get(lead.status.value, 0) + 1
+        return counts
+
+    async def acquire_lock(self, campaign_id: str, owner: str, ttl_seconds: float) -> bool:
+        """Take or extend the campaign lock for `owner`."""
+        ttl_ms = max(1, int(ttl_seconds * 1000))
+        return bool(await self._acquire_lock(keys=[self.lock_key(campaign_id)], args=[owner, ttl_ms]))
+
+    async def release_lock(self, campaign_id: str, owner: str) -> None:
+        await self._release_lock(keys=[self.lock_key(campaign_id)], args=[owner])
+
+    async def take_call_slot(
+        self,
+        campaign: Campaign,
+        call_id: str,
+        max_calls_per_trunk: int,
+        lease_seconds: float
+    ) -> bool:
+        """Count a new call against its agent and trunk unless either is at its limit."""
+        taken = await self._take_call_slot(
+            keys=[self.agent_calls_key(campaign.agent_id), self.trunk_calls_key(campaign.trunk_id)],
+            args=[call_id, max(1, int(lease_seconds * 1000)), campaign.max_concurrent_calls, max_calls_per_trunk]
+        )
+        return bool(taken)
+
+    async def release_call_slot(self, campaign: Campaign, call_id: str) -> None:
+        await self.client.zrem(self.agent_calls_key(campaign.agent_id), call_id)
+        await self.client.zrem(self.trunk_calls_key(campaign.trunk_id), call_id)
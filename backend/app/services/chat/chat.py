@@ -3,6 +3,7 @@ from app.core.logging_setup import logger
 import os
 import requests
 import asyncio
+import time
 from typing import List, Dict, Optional, Any, Tuple
 import random
 import re
@@ -12,13 +13,18 @@ from requests.exceptions import Timeout, RequestException
 from openai import OpenAI
 from anthropic import AsyncAnthropic
 
+from app.clients.lazy import lazy_client
 from app.clients.supabase_client import get_supabase
 from app.core.config import settings
+from app.services.chat.context_window import context_window
+from app.utils.flow_tracker import EMBEDDING, LLM, RERANK, RPC, FlowTracker
 
 load_dotenv()
 
-openai = OpenAI()
-anthropic = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+openai: OpenAI = lazy_client("openai", OpenAI)
+anthropic: AsyncAnthropic = lazy_client(
+    "anthropic_async", lambda: AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+)
 
 conversation_histories: Dict[str, Any] = {}
 
@@ -49,13 +55,14 @@ async def get_embedding(text: str) -> Any:
         "input": text
     }
     try:
-        response = requests.post(
-            url, 
-            headers=headers, 
-            data=json.dumps(data),
-            timeout=30
-        )
-        response.raise_for_status()
+        with FlowTracker.span(EMBEDDING):
+            response = requests.post(
+                url, 
+                headers=headers, 
+                data=json.dumps(data),
+                timeout=30
+            )
+            response.raise_for_status()
         return response.json()['data'][0]['embedding']
     except Timeout:
         logger.error("Timeout while getting embedding from Jina AI")
@@ -79,13 +86,14 @@ async def rerank_documents(user_query: str, top_n: int, docs: List) -> List[str]
         "documents": docs
     }
     try:
-        response = requests.post(
-            url, 
-            headers=headers, 
-            json=data,
-            timeout=30
-        )
-        response.raise_for_status()
+        with FlowTracker.span(RERANK):
+            response = requests.post(
+                url, 
+                headers=headers, 
+                json=data,
+                timeout=30
+            )
+            response.raise_for_status()
         reranked_docs = response.json()['results']
         return [i['document']['text'] for i in reranked_docs]
     except Timeout:
@@ -102,14 +110,9 @@ async def llm_response(system_prompt: str, user_prompt: str, conversation_histor
 
     if conversation_history:
         logger.debug(f"Processing conversation history with {len(conversation_history['user_history'])} messages")
-        # Add the conversation history for this session
-        for i, msg in enumerate(conversation_history['user_history']):
-            messages.append({"role": "user", "content": msg['content']})
-            if i < len(conversation_history['assistant_history']):
-                messages.append({
-                    "role": "assistant",
-                    "content": conversation_history['assistant_history'][i]['content']
-                })
+        # Older turns are sent as a summary in the system prompt; only the
+        # recent ones that fit the token budget are replayed verbatim
+        system_prompt, messages = context_window.history_window(conversation_history, system_prompt)
 
         # If the last message is from the user,
         # add a placeholder assistant message
@@ -123,6 +126,7 @@ async def llm_response(system_prompt: str, user_prompt: str, conversation_histor
 
     # print("\n\n\n =-[=-[=-[=-[=-[ \n\n\n\nmessages:", messages)
     for attempt in range(max_retries):
+        started = time.perf_counter()
         try:
             logger.info(f"About to call {model} API with message length: {len(str(messages))}")
             
@@ -168,6 +172,7 @@ async def llm_response(system_prompt: str, user_prompt: str, conversation_histor
                     "Invalid model specified. Choose 'openai' or 'claude'."
                 )
 
+            FlowTracker.record(f"{LLM}:{model}", time.perf_counter() - started)
             logger.debug(f"Response length: {len(response_content)} characters")
             return response_content
 
@@ -215,43 +220,44 @@ async def similarity_search(query: str, data_source: Optional[Dict],
 
     async def fetch_table_data(table: str, query_embedding: List[float]) -> Any:
         try:
-            if table == "user_web_data":
-                return await supabase.rpc(
-                    "user_web_data",
-                    {
-                        'query_embedding': query_embedding,
-                        'embedding_column': embedding_column,
-                        'similarity_threshold': similarity_threshold,
-                        'max_results': max_results,
-                        'root_url_filter': data_source.get('web'),
-                        'user_id_filter': user_id
-                    }
-                ).execute()
-
-            # elif table == "corporate_law":
-            #     return await supabase.rpc(
-            #         "search_corporate_law",
-            #         {
-            #             'query_embedding': query_embedding,
-            #             'embedding_column': embedding_column,
-            #             'similarity_threshold': similarity_threshold,
-            #             'max_results': max_results,
-            #             'user_id_filter': user_id,
-            #         }
-            #     ).execute()
-
-            elif table == "user_text_files":
-                return await supabase.rpc(
-                    "search_chunks",
-                    {
-                        'query_embedding': query_embedding,
-                        'embedding_column': embedding_column,
-                        'similarity_threshold': similarity_threshold,
-                        'max_results': max_results,
-                        'parent_id_filter': data_source.get('text_files'),
-                        'filter_user_id': user_id
-                    }
-                ).execute()
+            async with FlowTracker.span(f"{RPC}:{table}"):
+                if table == "user_web_data":
+                    return await supabase.rpc(
+                        "user_web_data",
+                        {
+                            'query_embedding': query_embedding,
+                            'embedding_column': embedding_column,
+                            'similarity_threshold': similarity_threshold,
+                            'max_results': max_results,
+                            'root_url_filter': data_source.get('web'),
+                            'user_id_filter': user_id
+                        }
+                    ).execute()
+
+                # elif table == "corporate_law":
+                #     return await supabase.rpc(
+                #         "search_corporate_law",
+                #         {
+                #             'query_embedding': query_embedding,
+                #             'embedding_column': embedding_column,
+                #             'similarity_threshold': similarity_threshold,
+                #             'max_results': max_results,
+                #             'user_id_filter': user_id,
+                #         }
+                #     ).execute()
+
+                elif table == "user_text_files":
+                    return await supabase.rpc(
+                        "search_chunks",
+                        {
+                            'query_embedding': query_embedding,
+                            'embedding_column': embedding_column,
+                            'similarity_threshold': similarity_threshold,
+                            'max_results': max_results,
+                            'parent_id_filter': data_source.get('text_files'),
+                            'filter_user_id': user_id
+                        }
+                    ).execute()
         except Exception as e:
             logger.error(f"Error querying table {table}: {str(e)}")
             return None
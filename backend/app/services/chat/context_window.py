@@ -0,0 +1,273 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import tiktoken
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+from app.services.redis_service import chat_redis
+
+""" CONTEXT WINDOW MANAGEMENT """
+
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_HEADING = "## Summary of the earlier conversation"
+
+SUMMARY_SYSTEM_PROMPT = """
+You maintain a running summary of a conversation between an AI agent and a user.
+
+You will be given the current summary (which may be empty) and the next part of the conversation.
+Return the updated summary only. Keep every fact, name, number, request, decision and open question
+the agent needs to carry on the conversation. Use short bullet points and do not assume anything.
+"""
+
+Summarizer = Callable[[str, str], Awaitable[Optional[str]]]
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Any:
+    return tiktoken.get_encoding("o200k_base")
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    return len(_encoding().encode(text)) if text else 0
+
+
+def message_role(message: Any) -> str:
+    if isinstance(message, dict):
+        return str(message.get("role", ""))
+    return str(getattr(message, "role", ""))
+
+
+def message_text(message: Any) -> str:
+    content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(part for part in content if isinstance(part, str))
+    return ""
+
+
+def message_tokens(messages: Sequence[Any]) -> int:
+    return sum(count_tokens(message_text(m)) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+@dataclass
+class ContextState:
+    """
+    Prompt window of one conversation: its system prompt and token budget,
+    plus the running summary of the first `folded` messages.
+    """
+    system_prompt: str = ""
+    budget: int = settings.CHAT_CONTEXT_TOKEN_BUDGET
+    summary: str = ""
+    folded: int = 0
+    folding: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"summary": self.summary, "folded": self.folded}
+
+
+async def summarize_conversation(previous_summary: str, transcript: str) -> Optional[str]:
+    # Imported here: chat.chat uses this module for its own histories
+    from app.services.chat.chat import llm_response
+
+    user_prompt = (
+        f"Current summary:\n{previous_summary or '(empty)'}\n\n"
+        f"Conversation to add:\n{transcript}"
+    )
+    return await llm_response(
+        SUMMARY_SYSTEM_PROMPT,
+        user_prompt,
+        None,
+        token_size=settings.CHAT_CONTEXT_SUMMARY_MAX_TOKENS
+    )
+
+
+class ContextWindowManager:
+    """
+    Keeps an LLM prompt within a token budget however long a conversation runs.
+
+    The system prompt and the most recent turns are sent verbatim. Older turns
+    are folded into a running summary in batches of `fold_batch_turns`, in the
+    background, so prompt size and time to first token stay flat. Until a fold
+    lands, whole turns are dropped from the front of the window if it would
+    otherwise exceed the budget. A turn starts at a user message.
+    """
+
+    def __init__(
+        self,
+        default_budget: int,
+        keep_turns: int,
+        fold_batch_turns: int,
+        summarizer: Summarizer = summarize_conversation
+    ):
+        self.default_budget = default_budget
+        self.keep_turns = max(1, keep_turns)
+        self.fold_batch_turns = max(1, fold_batch_turns)
+        self.summarizer = summarizer
+
+    def budget_for(self, agent: Optional[Dict[str, Any]]) -> int:
+        budget = (agent or {}).get("contextTokenBudget")
+        try:
+            return int(budget) if budget else self.default_budget
+        except (TypeError, ValueError):
+            return self.default_budget
+
+    def new_state(self, system_prompt: str, agent: Optional[Dict[str, Any]] = None) -> ContextState:
+        return ContextState(system_prompt=system_prompt, budget=self.budget_for(agent))
+
+    @staticmethod
+    def system_text(state: ContextState) -> str:
+        if not state.summary:
+            return state.system_prompt
+        return f"{state.system_prompt}\n\n{SUMMARY_HEADING}\n{state.summary}"
+
+    @staticmethod
+    def turn_starts(messages: Sequence[Any], start: int = 0) -> List[int]:
+        return [i for i in range(start, len(messages)) if message_role(messages[i]) == "user"]
+
+    def window_start(self, messages: Sequence[Any], state: ContextState) -> int:
+        """
+        Index of the first message to send verbatim: everything the summary
+        does not cover, less whole turns from the front while over budget.
+        The latest turn is always kept.
+        """
+        start = min(state.folded, len(messages))
+        available = state.budget - count_tokens(self.system_text(state)) - MESSAGE_OVERHEAD_TOKENS
+        tokens = message_tokens(messages[start:])
+        for next_start in self.turn_starts(messages, start + 1):
+            if tokens <= available:
+                break
+            tokens -= message_tokens(messages[start:next_start])
+            start = next_start
+        return start
+
+    def window(self, messages: Sequence[Any], state: ContextState) -> List[Any]:
+        return list(messages[self.window_start(messages, state):])
+
+    def fold_end(self, messages: Sequence[Any], state: ContextState) -> Optional[int]:
+        """
+        Index up to which messages should be folded into the summary, or None
+        if nothing needs folding yet. Folding waits for a full batch of turns
+        beyond the ones kept verbatim, unless the window is already trimmed.
+        """
+        starts = self.turn_starts(messages, state.folded)
+        extra_turns = len(starts) - self.keep_turns
+        end = starts[-self.keep_turns] if extra_turns > 0 else state.folded
+
+        trimmed_to = self.window_start(messages, state)
+        if trimmed_to > state.folded:
+            end = max(end, trimmed_to)
+        elif extra_turns < self.fold_batch_turns:
+            return None
+        return end if end > state.folded else None
+
+    async def fold(self, messages: Sequence[Any], state: ContextState, end: int) -> bool:
+        """Fold messages[state.folded:end] into the summary."""
+        transcript = "\n".join(
+            f"{message_role(m)}: {message_text(m)}"
+            for m in messages[state.folded:end]
+            if message_text(m)
+        )
+        if transcript:
+            summary = await self.summarizer(state.summary, transcript)
+            if not summary:
+                return False
+            state.summary = summary.strip()
+        logger.info(f"Folded messages {state.folded}-{end} into conversation summary")
+        state.folded = end
+        return True
+
+    def schedule_fold(
+        self,
+        messages: Sequence[Any],
+        state: ContextState,
+        on_folded: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> Optional[asyncio.Task]:
+        """
+        Fold older turns in the background if due. `messages` must only ever
+        be appended to, so indices stay valid while the summary is written.
+        """
+        if state.folding or self.fold_end(messages, state) is None:
+            return None
+        state.folding = True
+
+        async def run() -> None:
+            try:
+                end = self.fold_end(messages, state)
+                if end is not None and await self.fold(messages, state, end) and on_folded:
+                    await on_folded()
+            except Exception as e:
+                logger.error(f"Failed to fold conversation summary: {str(e)}", exc_info=True)
+            finally:
+                state.folding = False
+
+        return asyncio.create_task(run())
+
+    # Redis-backed state for text chat rooms
+
+    @staticmethod
+    def state_key(agent_id: str, room_name: str) -> str:
+        return f"chat_summary:{agent_id}:{room_name}"
+
+    async def load_state(self, agent_id: str, room_name: str, state: ContextState) -> ContextState:
+        data = await chat_redis.get(self.state_key(agent_id, room_name))
+        if data:
+            stored = json.loads(data)
+            state.summary = stored.get("summary", "")
+            state.folded = int(stored.get("folded", 0))
+        return state
+
+    async def save_state(self, agent_id: str, room_name: str, state: ContextState) -> None:
+        await chat_redis.set(
+            self.state_key(agent_id, room_name),
+            json.dumps(state.to_dict()),
+            ex=settings.REDIS_TTL
+        )
+
+    async def delete_state(self, agent_id: str, room_name: str) -> None:
+        await chat_redis.delete(self.state_key(agent_id, room_name))
+
+    # In-memory histories passed to chat.llm_response
+
+    @staticmethod
+    def history_messages(conversation_history: Dict[str, Any]) -> List[Dict[str, str]]:
+        messages = []
+        assistant_history = conversation_history['assistant_history']
+        for i, msg in enumerate(conversation_history['user_history']):
+            messages.append({"role": "user", "content": msg['content']})
+            if i < len(assistant_history):
+                messages.append({"role": "assistant", "content": assistant_history[i]['content']})
+        return messages
+
+    def history_window(
+        self,
+        conversation_history: Dict[str, Any],
+        system_prompt: str
+    ) -> Tuple[str, List[Dict[str, str]]]:
+        """
+        System prompt (with summary) and verbatim messages to send for an
+        in-memory conversation history, scheduling a fold if one is due.
+        The summary state lives in the history dict itself.
+        """
+        state = conversation_history.get('context_state')
+        if state is None:
+            state = conversation_history['context_state'] = ContextState(budget=self.default_budget)
+        state.system_prompt = system_prompt
+
+        messages = self.history_messages(conversation_history)
+        window = self.window(messages, state)
+        self.schedule_fold(messages, state)
+        return self.system_text(state), window
+
+
+context_window = ContextWindowManager(
+    default_budget=settings.CHAT_CONTEXT_TOKEN_BUDGET,
+    keep_turns=settings.CHAT_CONTEXT_KEEP_TURNS,
+    fold_batch_turns=settings.CHAT_CONTEXT_FOLD_BATCH_TURNS,
+)
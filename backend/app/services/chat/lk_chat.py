@@ -9,7 +9,7 @@ from datetime import datetime, timedelta
 import os 
 from dotenv import load_dotenv
 from app.core.logging_setup import logger
-import asyncio
+import time
 import httpx
 
 from livekit.agents import llm
@@ -19,10 +19,12 @@ from livekit.agents.llm.chat_context import ChatMessage
 from app.services.cache import get_agent_metadata
 from app.services.chat.chat import similarity_search
 from app.services.voice.tool_use import trigger_show_chat_input
-from app.clients.supabase_client import get_supabase
 from app.services.helper import format_transcript_messages
-from app.services.conversation import transcript_summary
 from app.services.redis_service import RedisChatStorage
+from app.services.post_call import post_call_pipeline
+from app.services.chat.session_runtime import ChatSession, chat_sessions
+from app.services.chat.context_window import context_window
+from app.utils.flow_tracker import LLM_TTFT, FlowTracker
 
 load_dotenv()
 
@@ -93,13 +95,12 @@ class ChatHistory:
             logger.error("Attempted to add RAG results with empty response_id")
             return
         
-        print(f"\n=== Adding RAG Results ===")
-        print(f"Response ID: {response_id}")
+        logger.debug("Adding RAG results for response_id {}", response_id)
         # print(f"Current metadata state: {self.response_metadata}")
         
         # Create or update ResponseMetadata
         if response_id not in self.response_metadata:
-            print(f"Creating new ResponseMetadata for {response_id}")
+            logger.debug(f"Creating new ResponseMetadata for {response_id}")
             self.response_metadata[response_id] = ResponseMetadata(response_id=response_id)
         
         # Add the RAG results
@@ -110,45 +111,63 @@ class ChatHistory:
         # print(f"Stored RAG results for {response_id}: {rag_results}")
 
 
-async def init_new_chat(agent_id: str, room_name: str):
+_llm_instance = None
+# Compare-and-set retries before a chat save gives up
+CHAT_SAVE_ATTEMPTS = 3
+
+
+def get_chat_llm():
+    """Shared LLM client for text chat; it holds no per-conversation state."""
+    global _llm_instance
+    if _llm_instance is None:
+        _llm_instance = openai.LLM(
+            model="gpt-4o",
+        )
+    return _llm_instance
+
+
+def fit_chat_ctx(chat_ctx: llm.ChatContext, chat_history: "ChatHistory") -> None:
+    """
+    Rebuild `chat_ctx` in place from the history's current prompt window.
+    In place because the registered tools hold a reference to it.
+    """
+    state = chat_history.context_state
+    window = context_window.window(chat_history.messages, state)
+    chat_ctx.messages.clear()
+    chat_ctx.append(role="system", text=context_window.system_text(state))
+    for msg in window:
+        chat_ctx.append(role=msg.role, text=msg.content)
+
+
+async def init_new_chat(agent_id: str, room_name: str, chat_history: Optional["ChatHistory"] = None):
     # Initialize new ChatHistory
-    chat_history = ChatHistory()
+    chat_history = chat_history if chat_history is not None else ChatHistory()
     
     # Initialize the LLM instance
-    llm_instance = openai.LLM(
-        model="gpt-4o",
-    )
+    llm_instance = get_chat_llm()
     chat_history.llm_instance = llm_instance
 
     # Check for existing chat history in Redis
     existing_chat = await RedisChatStorage.get_chat(agent_id, room_name)
+    chat_history.version = existing_chat.get("version") if existing_chat else None
     
     # Fetch agent configuration
     agent_metadata = await get_agent_metadata(agent_id)
     if not agent_metadata:
         raise ValueError(f"Agent {agent_id} not found")
 
-    # Create chat context with history
-    chat_ctx = llm.ChatContext()
-    chat_history.chat_ctx = chat_ctx
-    
-    # Add system instructions
-    if agent_metadata.get('instructions'):
-        chat_ctx.append(
-            role="system",
-            text=agent_metadata['instructions']
-        )
-    else:
+    if not agent_metadata.get('instructions'):
         raise ValueError(f"Instructions are empty for agent {agent_id}")
 
+    # Only the system prompt, the summary of older turns and the recent
+    # turns go into the LLM context; the full history stays in ChatHistory
+    context_state = context_window.new_state(agent_metadata['instructions'], agent_metadata)
+    await context_window.load_state(agent_id, room_name, context_state)
+    chat_history.context_state = context_state
+
     # If we have existing chat history, reconstruct it
     if existing_chat and existing_chat.get("messages"):
-        # Add all existing messages to the context
         for msg in existing_chat["messages"]:
-            chat_ctx.append(
-                role=msg["role"],
-                text=msg["content"]
-            )
             chat_history.add_message(
                 role=msg["role"],
                 content=msg["content"],
@@ -166,15 +185,15 @@ async def init_new_chat(agent_id: str, room_name: str):
     else:
         # Only add opening line for new chats
         if agent_metadata.get('openingLine'):
-            chat_ctx.append(
-                role="assistant",
-                text=agent_metadata['openingLine']
-            )
             chat_history.add_message(
                 role="assistant",
                 content=agent_metadata['openingLine']
             )
 
+    chat_ctx = llm.ChatContext()
+    chat_history.chat_ctx = chat_ctx
+    fit_chat_ctx(chat_ctx, chat_history)
+
     # Add null check for features
     features = agent_metadata.get('features', []) or []  # Default to empty list if None
     fnc_ctx = llm.FunctionContext()
@@ -197,14 +216,14 @@ async def init_new_chat(agent_id: str, room_name: str):
         Returns relevant information found in the knowledge base.
         """
         try:
-            print(f"\n\nquestion_and_answer func triggered with question: {question}")
+            logger.debug("question_and_answer func triggered with question: {}", question)
             agent_metadata: Dict = await get_agent_metadata(agent_id)
             user_id: str = agent_metadata['userId']
             data_source: str = agent_metadata.get('dataSource', '{}')
-            print("data_source from get_agent_metadata:", data_source)
+            logger.debug(f"data_source from get_agent_metadata: {data_source}")
             response_id = str(uuid4())
 
-            print(f"response_id in question_and_answer : {response_id}")
+            logger.debug(f"response_id in question_and_answer : {response_id}")
 
             # Handle empty or invalid data_source
             if not data_source or data_source.strip() == '':
@@ -234,25 +253,13 @@ async def init_new_chat(agent_id: str, room_name: str):
                     result_dict['source_url'] = result['url']
                 else:
                     result_dict['source_file'] = result['title']
-                print(f"result_dict: {result_dict}")
+                logger.debug("result_dict: {}", result_dict)
                 rag_results.append(result_dict)
                 
             # Store RAG results immediately in chat history
-            print(f"\n=== Storing RAG Results in question_and_answer ===")
-            print(f"Response ID: {response_id}")
-            
-            # Get the chat history from Redis
-            chat_data = await RedisChatStorage.get_chat(agent_id, room_name)
-            if chat_data:
-                # Update the response metadata
-                if "response_metadata" not in chat_data:
-                    chat_data["response_metadata"] = {}
-                chat_data["response_metadata"][response_id] = {
-                    "response_id": response_id,
-                    "rag_results": rag_results
-                }
-                # Save back to Redis
-                await RedisChatStorage.save_chat(agent_id, room_name, chat_data)
+            logger.debug("Storing RAG results in question_and_answer for response_id {}", response_id)
+            chat_history.add_rag_results(response_id, rag_results)
+            await save_chat_history(agent_id, room_name, chat_history)
 
             # Yield the RAG results marker for downstream processing
             yield f"[RAG_RESULTS]: "
@@ -275,20 +282,10 @@ async def init_new_chat(agent_id: str, room_name: str):
                 - Use markdown, bullet points, and line breaks to make the response more readable
                 """
 
-            # Get chat context from Redis
-            chat_data = await RedisChatStorage.get_chat(agent_id, room_name)
-            if not chat_data:
-                chat_ctx = llm.ChatContext()
-            else:
-                # Reconstruct chat context from messages
-                chat_ctx = llm.ChatContext()
-                for msg in chat_data.get("messages", []):
-                    chat_ctx.append(
-                        role=msg["role"],
-                        text=msg["content"]
-                    )
-            
-            chat_ctx.append(
+            # Answer from a copy of the live session context rather than
+            # rebuilding it from Redis
+            rag_ctx = chat_ctx.copy()
+            rag_ctx.append(
                 role="user",
                 text=rag_prompt
             )
@@ -300,12 +297,12 @@ async def init_new_chat(agent_id: str, room_name: str):
             #     print(f"Content: {msg.content}")
             #     print("---")
 
-            response_stream = llm_instance.chat(chat_ctx=chat_ctx)
+            response_stream = llm_instance.chat(chat_ctx=rag_ctx)
             
             # Then yield the actual response chunks
             async for chunk in response_stream:
                 if not hasattr(chunk, 'choices') or not chunk.choices:
-                    logger.debug(f"Skipping empty chunk: {chunk}")
+                    logger.debug("Skipping empty chunk: {}", chunk)
                     continue
                     
                 if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
@@ -354,7 +351,7 @@ async def init_new_chat(agent_id: str, room_name: str):
         """
         try:
             logger.info("fetch_calendar func triggered")
-            print("\n\nfetch_calendar func triggered")
+            logger.debug("fetch_calendar func triggered")
             
             # Log input parameters
             logger.info(f"Parameters - agent_name: {agent_name}, property_id: {property_id}, start_date: {start_date}, end_date: {end_date}")
@@ -391,7 +388,7 @@ async def init_new_chat(agent_id: str, room_name: str):
             url = f"{base_url}/{agent_name}/{property_id}/{start_date}/{end_date}"
             logger.info(f"Constructed URL: {url}")
 
-            print(f"Attempting to fetch calendar slots from URL: {url}")
+            logger.debug(f"Attempting to fetch calendar slots from URL: {url}")
             
             async with httpx.AsyncClient() as client:
                 try:
@@ -437,7 +434,7 @@ async def init_new_chat(agent_id: str, room_name: str):
                         
                         # Instead of returning directly, add to chat context and process through main LLM
                         calendar_info = f"The following slots are available for booking: {available_slots.content}"
-                        print(f"calendar_info: {calendar_info}")
+                        logger.debug("calendar_info: {}", calendar_info)
                         # Add to chat context - fixing the append method call
                         chat_ctx.messages.append(
                             ChatMessage(
@@ -487,32 +484,31 @@ async def init_new_chat(agent_id: str, room_name: str):
         ]
     ) -> AsyncGenerator[str, None]:
         logger.info(f"Personal data request triggered with message: {message}")
-        print(f"Personal data request triggered with message: {message}")
+        logger.debug(f"Personal data request triggered with message: {message}")
         
         yield message
 
-        print(f"triggering show_chat_input in request_personal_data for room_name: {room_name}")
+        logger.debug(f"triggering show_chat_input in request_personal_data for room_name: {room_name}")
         await trigger_show_chat_input(room_name, room_name, room_name)
 
     # Always register Q&A function
     fnc_ctx._register_ai_function(question_and_answer)
-    print(f"Registered Q&A function")
     logger.info(f"Registered Q&A function")
 
     if 'lead_gen' in features:
         fnc_ctx._register_ai_function(request_personal_data)
-        print(f"Registered lead generation function")
         logger.info(f"Registered lead generation function")
 
     if 'app_booking' in features:
         fnc_ctx._register_ai_function(fetch_calendar)
-        print(f"Registered calendar function")
         logger.info(f"Registered calendar function")
 
     # Save initial chat state to Redis
-    await RedisChatStorage.save_chat(agent_id, room_name, chat_history.to_dict())
-    logger.info(f"lk_chat_process: chat_history saved to redis: {chat_history.to_dict()}")
-    
+    await save_chat_history(agent_id, room_name, chat_history)
+    logger.info(f"lk_chat_process: chat_history saved to redis for room {room_name}")
+
+    chat_history.chat_ctx = chat_ctx
+    chat_history.fnc_ctx = fnc_ctx
     return llm_instance, chat_ctx, fnc_ctx
 
 @dataclass
@@ -557,7 +553,12 @@ class ChatHistory:
         self.llm_instance = None
         self.chat_ctx = None
         self.fnc_ctx = None
-        print("ChatHistory initialized")
+        self.context_state = None
+        # Version of the Redis copy this history was loaded from or last saved as
+        self.version = None
+        # Identity of every stored message, for O(1) duplicate checks
+        self._message_keys: set = set()
+        logger.debug("ChatHistory initialized")
 
     def to_dict(self):
         """Convert the ChatHistory instance to a dictionary"""
@@ -568,43 +569,44 @@ class ChatHistory:
                 for k, v in self.response_metadata.items()
             }
         }
-        print(f"ChatHistory.to_dict() called. Result: {json.dumps(result, indent=2)}")
+        logger.opt(lazy=True).debug("ChatHistory.to_dict() called. Result: {}", lambda: json.dumps(result))
         return result
 
-    def add_message(self, role: str, content: str, name: str = None, response_id: str = None):
-        """Add a message to the chat history"""
-        # Check for duplicates
-        for msg in self.messages:
-            if (msg.role == role and 
-                msg.content == content and 
-                msg.name == name and 
-                msg.response_id == response_id):
-                print(f"Skipping duplicate message: {content[:50]}...")
-                return
-                
+    def add_message(self, role: str, content: str, name: str = None, response_id: str = None) -> bool:
+        """Add a message to the chat history. Returns False if it was a duplicate."""
+        message_key = (role, content, name, response_id)
+        if message_key in self._message_keys:
+            logger.debug(f"Skipping duplicate message: {content[:50]}...")
+            return False
+
         message = ChatMessage(role=role, content=content, name=name, response_id=response_id)
         self.messages.append(message)
-        print(f"Added message to ChatHistory: role={role}, content={content[:50]}..., response_id={response_id}")
+        self._message_keys.add(message_key)
+        logger.debug(f"Added message to ChatHistory: role={role}, content={content[:50]}..., response_id={response_id}")
+        return True
 
     def add_rag_results(self, response_id: str, rag_results: List[dict]):
         """Add RAG results to the response metadata"""
-        print(f"Adding RAG results for response_id {response_id}: {json.dumps(rag_results, indent=2)}")
+        logger.opt(lazy=True).debug("Adding RAG results for response_id {}: {}", lambda: response_id, lambda: json.dumps(rag_results))
         
         if response_id not in self.response_metadata:
-            print(f"Creating new ResponseMetadata for {response_id}")
+            logger.debug(f"Creating new ResponseMetadata for {response_id}")
             self.response_metadata[response_id] = ResponseMetadata(response_id=response_id)
         
         if isinstance(self.response_metadata[response_id], dict):
-            print(f"Converting dict to ResponseMetadata for {response_id}")
+            logger.debug(f"Converting dict to ResponseMetadata for {response_id}")
             self.response_metadata[response_id] = ResponseMetadata(
                 response_id=response_id,
                 rag_results=rag_results
             )
         else:
-            print(f"Updating existing ResponseMetadata for {response_id}")
+            logger.debug(f"Updating existing ResponseMetadata for {response_id}")
             self.response_metadata[response_id].rag_results = rag_results
         
-        print(f"Current response_metadata state: {json.dumps(self.response_metadata, default=lambda x: x.to_dict() if hasattr(x, 'to_dict') else str(x), indent=2)}")
+        logger.opt(lazy=True).debug(
+            "Current response_metadata state: {}",
+            lambda: json.dumps(self.response_metadata, default=lambda x: x.to_dict() if hasattr(x, 'to_dict') else str(x))
+        )
 
 # Global chat history store
 # chat_histories: Dict[str, Dict[str, ChatHistory]] = {}  # nested dict for agent_id -> room_name -> history
@@ -636,63 +638,118 @@ async def get_chat_rag_results(agent_id: str, room_name: str, response_id: str)
         for source in unique_sources
     ]
 
-async def lk_chat_process(message: str, agent_id: str, room_name: str):
-    print(f"\n=== Chat Process Debug ===")
-    print(f"Processing message: {message}")
-    print(f"Agent ID: {agent_id}")
-    print(f"Room name: {room_name}")
+def _message_identity(message: dict) -> tuple:
+    return (message.get("role"), message.get("content"), message.get("name"), message.get("response_id"))
 
-    # Get existing chat from Redis or create new
-    chat_data = await RedisChatStorage.get_chat(agent_id, room_name)
-    print(f"Retrieved chat data from Redis: {bool(chat_data)}")
 
+def merge_chat_data(latest: dict, ours: dict) -> dict:
+    """Messages and response metadata from both copies of a chat."""
+    seen = {_message_identity(msg) for msg in latest.get("messages", [])}
+    messages = list(latest.get("messages", [])) + [
+        msg for msg in ours.get("messages", []) if _message_identity(msg) not in seen
+    ]
+    response_metadata = {**latest.get("response_metadata", {}), **ours.get("response_metadata", {})}
+    return {"messages": messages, "response_metadata": response_metadata}
+
+
+async def save_chat_history(agent_id: str, room_name: str, chat_history: "ChatHistory") -> None:
+    """
+    Write the history to Redis if nobody else has written since it was
+    loaded. Otherwise merge it into the newer copy; the history then stays
+    behind Redis, so a warm session holding it is reloaded on its next turn.
+    """
+    chat_data = chat_history.to_dict()
+    expected_version = chat_history.version
+    for _ in range(CHAT_SAVE_ATTEMPTS):
+        version = await RedisChatStorage.save_chat(agent_id, room_name, chat_data, expected_version=expected_version)
+        if version is not None:
+            if expected_version == chat_history.version:
+                chat_history.version = version
+            return
+        logger.info(f"Chat for room {room_name} was changed elsewhere, merging")
+        latest = await RedisChatStorage.get_chat(agent_id, room_name) or {}
+        chat_data = merge_chat_data(latest, chat_data)
+        expected_version = latest.get("version")
+    raise RuntimeError(f"Chat for room {room_name} kept changing, gave up saving")
+
+
+async def load_chat_session(session: ChatSession) -> None:
+    """(Re)load a session's history and LLM state from Redis."""
+    logger.debug("Building chat session from Redis...")
     chat_history = ChatHistory()
-    
-    if chat_data:
-        print("Reconstructing existing chat history...")
-        # Reconstruct messages with proper role handling
-        for msg in chat_data.get("messages", []):
-            if msg["role"] == "function":
-                # Ensure function messages have the required 'name' parameter
-                chat_history.add_message(
-                    role="function",
-                    content=msg["content"],
-                    name=msg.get("name", "tool_response"),  # Default name if missing
-                    response_id=msg.get("response_id")
-                )
-            else:
-                chat_history.add_message(
-                    role=msg["role"],
-                    content=msg["content"],
-                    response_id=msg.get("response_id")
-                )
+    session.llm_instance, session.chat_ctx, session.fnc_ctx = await init_new_chat(
+        session.agent_id, session.room_name, chat_history
+    )
+    session.chat_history = chat_history
+
+
+async def build_chat_session(agent_id: str, room_name: str) -> ChatSession:
+    """Rebuild a room's chat session from Redis and keep it warm."""
+    session = ChatSession(
+        agent_id=agent_id,
+        room_name=room_name,
+        chat_history=None,
+        llm_instance=None,
+        chat_ctx=None,
+        fnc_ctx=None,
+    )
+    await load_chat_session(session)
+    chat_sessions.put(session)
+    return session
+
+
+async def lk_chat_process(message: str, agent_id: str, room_name: str):
+    logger.debug("lk_chat_process: agent {} room {} message: {}", agent_id, room_name, message)
+
+    session = chat_sessions.get(agent_id, room_name)
+    warm = session is not None
+    if session is None:
+        session = await build_chat_session(agent_id, room_name)
+
+    # One turn at a time per room
+    async with session.lock:
+        # Another worker or route may have written the chat since this copy
+        # was loaded; reload it in place so queued turns see the new state
+        if warm and session.chat_history.version != await RedisChatStorage.get_chat_version(agent_id, room_name):
+            await load_chat_session(session)
+            warm = False
+        logger.debug(f"Using {'warm' if warm else 'rebuilt'} chat session")
+
+        FlowTracker.start_flow(f"{room_name}:{uuid4()}", "chat_turn")
+        try:
+            async for chunk in _process_turn(session, message):
+                yield chunk
+        finally:
+            FlowTracker.end_flow()
+
+
+async def _process_turn(session: ChatSession, message: str):
+    agent_id = session.agent_id
+    room_name = session.room_name
+    chat_history = session.chat_history
+    current_assistant_message = ""
+    response_id = None
 
-    # Initialize LLM and contexts if they don't exist
-    if not chat_history.llm_instance or not chat_history.chat_ctx:
-        print("Initializing LLM and contexts...")
-        llm_instance, chat_ctx, fnc_ctx = await init_new_chat(agent_id, room_name)
-        chat_history.llm_instance = llm_instance
-        chat_history.chat_ctx = chat_ctx
-        chat_history.fnc_ctx = fnc_ctx
-        
     try:
-        current_assistant_message = ""
         chunk_count = 0
         response_id = str(uuid4())
-        print(f"Generated response_id: {response_id}")
+        logger.debug(f"Generated response_id: {response_id}")
 
-        # Add the new message to chat history
+        # Add the new message to chat history and fit the context window
         chat_history.add_message("user", message)
-        print("Added user message to chat history")
+        fit_chat_ctx(session.chat_ctx, chat_history)
+        logger.debug("Added user message to chat history")
         
         # Save to Redis after adding user message
-        await RedisChatStorage.save_chat(agent_id, room_name, chat_history.to_dict())
-        print("Saved updated chat history to Redis")
+        await save_chat_history(agent_id, room_name, chat_history)
+        logger.debug("Saved updated chat history to Redis")
 
         logger.info("Starting LLM response stream")
-        response_stream = chat_history.llm_instance.chat(
-            chat_ctx=chat_history.chat_ctx,
-            fnc_ctx=chat_history.fnc_ctx
+        stream_started = time.perf_counter()
+        first_token = True
+        response_stream = session.llm_instance.chat(
+            chat_ctx=session.chat_ctx,
+            fnc_ctx=session.fnc_ctx
         )
 
         # First yield the response_id separately
@@ -716,6 +773,9 @@ async def lk_chat_process(message: str, agent_id: str, room_name: str):
                 if hasattr(choice.delta, 'content') and choice.delta.content:
                     content = choice.delta.content
                     if content:
+                        if first_token:
+                            FlowTracker.record(LLM_TTFT, time.perf_counter() - stream_started)
+                            first_token = False
                         current_assistant_message += content
                         yield content
 
@@ -735,7 +795,7 @@ async def lk_chat_process(message: str, agent_id: str, room_name: str):
                                 continue
                             
                             yield result
-                            chat_history.add_message("function", result, name="tool_response")
+                            session.record("function", result, name="tool_response")
                         else:
                             tool_response = ""
                             async for result_chunk in result:
@@ -749,7 +809,7 @@ async def lk_chat_process(message: str, agent_id: str, room_name: str):
                                     continue
                                 tool_response += result_chunk
                                 yield result_chunk
-                            chat_history.add_message("function", tool_response, name="tool_response")
+                            session.record("function", tool_response, name="tool_response")
 
             except Exception as chunk_error:
                 logger.error(f"Error processing chunk #{chunk_count}: {str(chunk_error)}", exc_info=True)
@@ -758,22 +818,35 @@ async def lk_chat_process(message: str, agent_id: str, room_name: str):
 
         # Save the final assistant message
         if current_assistant_message:
-            chat_history.add_message("assistant", current_assistant_message, response_id=response_id)
+            session.record("assistant", current_assistant_message, response_id=response_id)
             # Final save to Redis
-            await RedisChatStorage.save_chat(agent_id, room_name, chat_history.to_dict())
-            print(f"Final chat history saved to Redis with message: {current_assistant_message[:100]}...")
+            await save_chat_history(agent_id, room_name, chat_history)
+            logger.debug(f"Final chat history saved to Redis with message: {current_assistant_message[:100]}...")
+
+        # Summarise older turns off the request path once enough have built up
+        context_state = chat_history.context_state
+        context_window.schedule_fold(
+            chat_history.messages,
+            context_state,
+            on_folded=lambda: context_window.save_state(agent_id, room_name, context_state)
+        )
 
     except Exception as e:
         logger.error(f"Error in lk_chat_process: {str(e)}", exc_info=True)
+        # The warm state may be half-updated; rebuild from Redis next time
+        chat_sessions.evict(agent_id, room_name)
         if current_assistant_message:
             chat_history.add_message("assistant", current_assistant_message + " [Message interrupted due to error]", response_id=response_id)
-            await RedisChatStorage.save_chat(agent_id, room_name, chat_history.to_dict())
+            await save_chat_history(agent_id, room_name, chat_history)
         raise Exception(f"Failed to process chat message: {str(e)}")
 
 
 async def save_chat_history_to_supabase(agent_id: str, room_name: str) -> None:
     """Save chat history to Supabase and clean up Redis when chat ends"""
     try:
+        # The chat is over; drop its warm session
+        chat_sessions.evict(agent_id, room_name)
+
         # Get chat history from Redis
         chat_data = await RedisChatStorage.get_chat(agent_id, room_name)
         if not chat_data:
@@ -788,59 +861,26 @@ async def save_chat_history_to_supabase(agent_id: str, room_name: str) -> None:
             logger.warning(f"No messages to save for room: {room_name}")
             return
 
-        # Get agent metadata for user_id
-        agent_metadata = await get_agent_metadata(agent_id)
-        user_id = agent_metadata['userId']
-
-        # Prepare data for Supabase
-        conversation_data = {
+        # Storing the log and summarizing it happen on the post-call workers.
+        # A chat room can be flushed more than once (the visitor reconnects
+        # after the Redis copy was cleared), so each flush is its own job
+        await post_call_pipeline.enqueue({
             "transcript": formatted_transcript,
-            "job_id": room_name,
+            "job_id": f"{room_name}:{uuid4().hex}",
             "participant_identity": room_name,
             "room_name": room_name,
-            "user_id": user_id,
             "agent_id": agent_id,
-            "lead": "unknown",
+            "prospect_status": "unknown",
             "call_duration": 0,
             "call_type": "text-chat"
-        }
+        })
+        logger.info(f"Queued chat history for room: {room_name} ({len(formatted_transcript)} messages)")
 
-        # Save to Supabase and wait for completion
-        print(f"Saving chat history to Supabase for room: {room_name}")
-        print(f"Number of messages: {len(formatted_transcript)}")
-        
-        supabase = await get_supabase()
-        response = await supabase.table("conversation_logs").insert(conversation_data).execute()
-        print(f"Successfully saved chat history to Supabase")
-        
-        # Add error handling for empty transcripts
-        if not formatted_transcript or len(formatted_transcript) < 2:
-            logger.warning("Transcript too short or empty - skipping summary")
-            return
-            
-        try:
-            # Create a background task for the summary
-            async def generate_summary_background():
-                try:
-                    summary = await transcript_summary(str(formatted_transcript), room_name)
-                    if summary:
-                        logger.info(f"Summary generated successfully in background: {summary[:100]}...")
-                except Exception as e:
-                    logger.error(f"Background summary generation failed: {str(e)}", exc_info=True)
-
-            # Launch the summary generation in the background
-            asyncio.create_task(generate_summary_background())
-            
-            # Continue with cleanup immediately
-            print("deleting chat history", room_name)
-            await RedisChatStorage.delete_chat(agent_id, room_name)
-            
-        except Exception as e:
-            logger.error(f"Error saving chat history: {str(e)}", exc_info=True)
+        await RedisChatStorage.delete_chat(agent_id, room_name)
+        await context_window.delete_state(agent_id, room_name)
 
     except Exception as e:
         logger.error(f"Error saving chat history: {str(e)}", exc_info=True)
-        print(f"Error saving chat history: {str(e)}")
 
 async def form_data_to_chat(
     room_name: str, 
@@ -867,7 +907,7 @@ async def form_data_to_chat(
             "\n".join([f"{k}: {v}" for k, v in filtered_content.items()])
             
         chat_history = chat_histories[agent_id][room_name]
-        print("adding message to chat history:", formatted_content)
+        logger.debug("adding message to chat history: {}", formatted_content)
         
         # Add the formatted string message
         chat_history.add_message(
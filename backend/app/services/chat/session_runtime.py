@@ -0,0 +1,102 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+
+""" WARM CHAT SESSIONS """
+
+SessionKey = Tuple[str, str]  # (agent_id, room_name)
+
+
+@dataclass
+class ChatSession:
+    """Per-room chat state kept warm between messages."""
+    agent_id: str
+    room_name: str
+    chat_history: Any
+    llm_instance: Any
+    chat_ctx: Any
+    fnc_ctx: Any
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_used: float = field(default_factory=time.monotonic)
+
+    @property
+    def key(self) -> SessionKey:
+        return (self.agent_id, self.room_name)
+
+    def record(
+        self,
+        role: str,
+        content: str,
+        name: Optional[str] = None,
+        response_id: Optional[str] = None
+    ) -> bool:
+        """
+        Add a message to the history and, if it is new, to the LLM context,
+        mirroring what a rebuild from Redis would produce.
+        """
+        added = self.chat_history.add_message(role, content, name=name, response_id=response_id)
+        if added:
+            self.chat_ctx.append(role=role, text=content)
+        return added
+
+
+class ChatSessionCache:
+    """
+    LRU of warm chat sessions bounded by count and idle time.
+
+    Redis stays the durable store; a session that was evicted, expired or
+    never built in this process is rebuilt from it on the next message.
+    """
+
+    def __init__(self, max_sessions: int, idle_seconds: float):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self._sessions: "OrderedDict[SessionKey, ChatSession]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, agent_id: str, room_name: str) -> Optional[ChatSession]:
+        self._evict_idle()
+        session = self._sessions.get((agent_id, room_name))
+        if session is None:
+            self.misses += 1
+            return None
+        session.last_used = time.monotonic()
+        self._sessions.move_to_end(session.key)
+        self.hits += 1
+        return session
+
+    def put(self, session: ChatSession) -> None:
+        session.last_used = time.monotonic()
+        self._sessions[session.key] = session
+        self._sessions.move_to_end(session.key)
+        while len(self._sessions) > self.max_sessions:
+            evicted_key, _ = self._sessions.popitem(last=False)
+            logger.debug(f"Evicted chat session {evicted_key} (capacity)")
+
+    def evict(self, agent_id: str, room_name: str) -> None:
+        self._sessions.pop((agent_id, room_name), None)
+
+    def _evict_idle(self) -> None:
+        # Sessions are ordered by last use, so idle ones sit at the front
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._sessions:
+            key, oldest = next(iter(self._sessions.items()))
+            if oldest.last_used >= cutoff or oldest.lock.locked():
+                break
+            self._sessions.popitem(last=False)
+            logger.debug(f"Evicted chat session {key} (idle)")
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+chat_sessions = ChatSessionCache(
+    max_sessions=settings.CHAT_SESSION_CACHE_SIZE,
+    idle_seconds=settings.CHAT_SESSION_IDLE_SECONDS
+)
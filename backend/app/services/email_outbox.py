@@ -0,0 +1,98 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+
+""" EMAIL OUTBOX """
+
+Sender = Callable[[str, Dict[str, Any]], Any]
+
+
+class EmailOutbox:
+    """
+    Rate-limited outbox in front of the Nylas send API.
+
+    Callers queue a message and wait for its result; one worker drains the
+    queue in batches of up to `batch_size`, starting at most
+    `rate_per_second` sends per second across the process, and runs the
+    blocking SDK calls in threads. A failed send raises in its caller, so
+    the post-call pipeline still retries the email stage.
+    """
+
+    def __init__(
+        self,
+        sender: Sender,
+        rate_per_second: float,
+        batch_size: int,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._sender = sender
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self.batch_size = batch_size
+        self.clock = clock
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._next_send = 0.0
+
+    async def send(self, grant_id: str, request_body: Dict[str, Any]) -> Any:
+        """Queue one message and return the provider's response once sent."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((grant_id, request_body, future))
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[str, Dict[str, Any], asyncio.Future]]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _deliver(self, grant_id: str, request_body: Dict[str, Any], future: asyncio.Future) -> None:
+        try:
+            result = await asyncio.to_thread(self._sender, grant_id, request_body)
+        except Exception as e:
+            logger.error(f"Failed to send email to {[r.get('email') for r in request_body.get('to', [])]}: {str(e)}")
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            sends = []
+            for grant_id, request_body, future in batch:
+                delay = self._next_send - self.clock()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._next_send = max(self._next_send, self.clock()) + self.interval
+                sends.append(asyncio.create_task(self._deliver(grant_id, request_body, future)))
+            await asyncio.gather(*sends)
+            logger.debug(f"Email outbox sent a batch of {len(batch)}")
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Email outbox closed before sending"))
+
+
+def _nylas_send(grant_id: str, request_body: Dict[str, Any]) -> Any:
+    from app.services.nylas_service import nylas
+    return nylas.messages.send(identifier=grant_id, request_body=request_body)
+
+
+email_outbox = EmailOutbox(
+    _nylas_send,
+    rate_per_second=settings.NYLAS_SEND_RATE_PER_SECOND,
+    batch_size=settings.NYLAS_OUTBOX_BATCH_SIZE
+)
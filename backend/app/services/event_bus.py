@@ -0,0 +1,158 @@
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+from app.services.redis_service import streams_redis
+
+
+class EventSubscription:
+    """A single SSE connection's view of a participant channel."""
+
+    def __init__(self, participant_identity: str, max_queue_size: int):
+        self.participant_identity = participant_identity
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """Enqueue without blocking the listener; drop the oldest event when full."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            logger.warning(
+                f"Event queue full for {self.participant_identity}, "
+                f"dropped oldest event (total dropped={self.dropped})"
+            )
+        self.queue.put_nowait(event)
+
+    async def events(self, heartbeat_seconds: float) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield events as they arrive, or None every `heartbeat_seconds` of silence."""
+        while True:
+            try:
+                yield await asyncio.wait_for(self.queue.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield None
+
+
+class RedisEventBus:
+    """
+    Cross-process event bus over Redis pub/sub with per-participant channels.
+
+    Each process holds one pub/sub connection shared by all of its local
+    subscribers; incoming messages are fanned out to every subscription on
+    the channel through bounded queues.
+    """
+
+    CHANNEL_PREFIX = "events:participant:"
+
+    def __init__(self, client: Any, max_queue_size: int, heartbeat_seconds: float):
+        self.client = client
+        self.max_queue_size = max_queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers: Dict[str, Set[EventSubscription]] = defaultdict(set)
+        self._pubsub: Any = None
+        self._listener: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def channel_for(cls, participant_identity: str) -> str:
+        return f"{cls.CHANNEL_PREFIX}{participant_identity}"
+
+    async def publish(self, participant_identity: str, event: Dict[str, Any]) -> int:
+        """Publish an event to every subscriber of a participant, on any process."""
+        channel = self.channel_for(participant_identity)
+        receivers = await self.client.publish(channel, json.dumps(event))
+        logger.debug(f"Published {event.get('type')} to {channel}, receivers={receivers}")
+        return receivers
+
+    @asynccontextmanager
+    async def subscribe(self, participant_identity: str) -> AsyncIterator[EventSubscription]:
+        subscription = EventSubscription(participant_identity, self.max_queue_size)
+        channel = self.channel_for(participant_identity)
+        async with self._lock:
+            first_local = not self._subscribers[channel]
+            self._subscribers[channel].add(subscription)
+            if self._pubsub is None:
+                self._pubsub = self.client.pubsub()
+            if first_local:
+                await self._pubsub.subscribe(channel)
+            self._ensure_listener()
+        try:
+            yield subscription
+        finally:
+            async with self._lock:
+                self._subscribers[channel].discard(subscription)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+                    try:
+                        await self._pubsub.unsubscribe(channel)
+                    except Exception as e:
+                        logger.warning(f"Failed to unsubscribe from {channel}: {str(e)}")
+
+    def subscriber_count(self, participant_identity: str) -> int:
+        """Number of subscribers to a participant channel in this process."""
+        return len(self._subscribers.get(self.channel_for(participant_identity), ()))
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    def _dispatch(self, channel: str, data: str) -> None:
+        try:
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            logger.error(f"Dropping malformed event on {channel}: {data!r}")
+            return
+        for subscription in list(self._subscribers.get(channel, ())):
+            subscription.offer(event)
+
+    async def _listen(self) -> None:
+        backoff = 0.5
+        while self._subscribers:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self.heartbeat_seconds
+                )
+                backoff = 0.5
+                if message is None or message.get("type") != "message":
+                    continue
+                self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event bus listener error, reconnecting in {backoff}s: {str(e)}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+                try:
+                    await self._resubscribe()
+                except Exception as resubscribe_error:
+                    logger.error(f"Event bus resubscribe failed: {str(resubscribe_error)}")
+
+    async def _resubscribe(self) -> None:
+        async with self._lock:
+            try:
+                if self._pubsub is not None:
+                    await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = self.client.pubsub()
+            if self._subscribers:
+                await self._pubsub.subscribe(*self._subscribers.keys())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+
+event_bus = RedisEventBus(
+    streams_redis,
+    max_queue_size=settings.EVENT_BUS_QUEUE_SIZE,
+    heartbeat_seconds=settings.EVENT_BUS_HEARTBEAT_SECONDS,
+)
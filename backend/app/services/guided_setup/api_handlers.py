@@ -1,3 +1,4 @@
+import asyncio
 from app.core.logging_setup import logger
 from typing import Dict, Any, Optional
 import base64
@@ -111,22 +112,21 @@ async def generate_onboarding_preview_service(
     try:
         logger.info(f"[SERVICE] generate_onboarding_preview: Generating onboarding preview for user {user_id} with business name: {business_name}")
         
-        # Generate greeting audio
-        logger.debug(f"[SERVICE] generate_onboarding_preview: Generating greeting preview for {business_name}")
-        greeting_result = await generate_greeting_preview(
-            user_id=user_id,
-            business_name=business_name,
-            business_description=business_description,
-            business_website=business_website,
-            language=agent_language
-        )
-        
-        # Generate message-taking audio
-        logger.debug(f"[SERVICE] generate_onboarding_preview: Generating message preview for {business_name}")
-        message_result = await generate_message_preview(
-            user_id=user_id,
-            business_name=business_name,
-            language=agent_language
+        # Greeting and message-taking audio are independent, render them together
+        logger.debug(f"[SERVICE] generate_onboarding_preview: Generating greeting and message previews for {business_name}")
+        greeting_result, message_result = await asyncio.gather(
+            generate_greeting_preview(
+                user_id=user_id,
+                business_name=business_name,
+                business_description=business_description,
+                business_website=business_website,
+                language=agent_language
+            ),
+            generate_message_preview(
+                user_id=user_id,
+                business_name=business_name,
+                language=agent_language
+            )
         )
         
         if not greeting_result.get("success") or not message_result.get("success"):
@@ -152,6 +152,8 @@ async def generate_onboarding_preview_service(
             "success": True,
             "greeting_audio_data_base64": greeting_audio_data,
             "message_audio_data_base64": message_audio_data,
+            "greeting_audio_url": greeting_result.get("audio_url"),
+            "message_audio_url": message_result.get("audio_url"),
             "greeting_text": greeting_result.get("text"),
             "message_text": message_result.get("text")
         }
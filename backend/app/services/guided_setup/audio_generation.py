@@ -1,9 +1,14 @@
 from app.core.logging_setup import logger
 from typing import Dict, Any, Optional
 
-from app.clients.elevenlabs_client import elevenlabs_client
+from app.core.config import settings
+from app.services.guided_setup.preview_audio import preview_audio_cache
 from app.services.vapi.constants.voice_ids import get_voice_for_country, get_agent_name_for_voice
 
+def preview_audio_url(audio_key: str) -> str:
+    """Path the frontend can stream (with Range requests) a cached preview from."""
+    return f"{settings.API_V1_STR}/guided_setup/preview_audio/{audio_key}"
+
 async def generate_greeting_preview(
     user_id: str,
     business_name: str,
@@ -56,12 +61,9 @@ async def generate_greeting_preview(
         
         # Generate audio using ElevenLabs client
         try:
-            # Generate the audio using our client and get binary data
-            audio_data = elevenlabs_client.generate_audio(
-                text=greeting_text,
-                voice_id=voice_id,
-                return_bytes=True
-            )
+            # Served from the preview cache when this text was rendered before
+            audio_key = await preview_audio_cache.get_or_create(text=greeting_text, voice_id=voice_id)
+            audio_data = await preview_audio_cache.read_bytes(audio_key)
             logger.info(f"Successfully generated audio for greeting preview")
         except Exception as audio_error:
             logger.error(f"Error generating audio: {str(audio_error)}")
@@ -76,6 +78,7 @@ async def generate_greeting_preview(
         return {
             "success": True,
             "audio_data": audio_data,  # Return the binary audio data
+            "audio_url": preview_audio_url(audio_key),
             "text": greeting_text
         }
     except Exception as e:
@@ -167,12 +170,9 @@ async def generate_message_preview(
         
         # Generate audio using ElevenLabs client
         try:
-            # Generate the audio using our client and get binary data
-            audio_data = elevenlabs_client.generate_audio(
-                text=message_text,
-                voice_id=voice_id,
-                return_bytes=True
-            )
+            # Served from the preview cache when this text was rendered before
+            audio_key = await preview_audio_cache.get_or_create(text=message_text, voice_id=voice_id)
+            audio_data = await preview_audio_cache.read_bytes(audio_key)
             logger.info(f"Successfully generated audio for message preview")
         except Exception as audio_error:
             logger.error(f"Error generating audio: {str(audio_error)}")
@@ -187,6 +187,7 @@ async def generate_message_preview(
         return {
             "success": True,
             "audio_data": audio_data,  # Return the binary audio data
+            "audio_url": preview_audio_url(audio_key),
             "text": message_text
         }
     except Exception as e:
@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+from app.utils.flow_tracker import TTS_FIRST_BYTE, FlowTracker
+
+""" PREVIEW AUDIO CACHE """
+
+DEFAULT_MODEL = 'eleven_multilingual_v2'
+DEFAULT_FORMAT = 'mp3_44100_96'
+
+_KEY_PATTERN = re.compile(r'^[0-9a-f]{40}$')
+_EXTENSIONS = {'mp3': '.mp3', 'pcm': '.pcm', 'ulaw': '.ulaw'}
+_MEDIA_TYPES = {'.mp3': 'audio/mpeg', '.pcm': 'audio/L16', '.ulaw': 'audio/basic'}
+
+Synthesizer = Callable[..., AsyncIterator[bytes]]
+
+
+def _extension(output_format: str) -> str:
+    return _EXTENSIONS.get(output_format.split('_')[0], '.bin')
+
+
+def media_type_for(path: Path) -> str:
+    return _MEDIA_TYPES.get(path.suffix, 'application/octet-stream')
+
+
+class PreviewAudioCache:
+    """
+    Disk cache of onboarding preview audio.
+
+    Entries are content-addressed by (voice, model, format, text), so the
+    same business previewed again is served from disk without a TTS call.
+    Concurrent requests for an entry that is still being rendered share
+    one synthesis. Total size is capped; the least recently served entries
+    are evicted.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, synthesize: Optional[Synthesizer] = None):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._synthesize = synthesize
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key_for(voice_id: str, model_id: str, output_format: str, text: str) -> str:
+        return hashlib.sha256(f"{voice_id}|{model_id}|{output_format}|{text}".encode()).hexdigest()[:40]
+
+    def path_for(self, key: str) -> Optional[Path]:
+        """Cached file for `key`, or None; also marks it as recently used."""
+        if not _KEY_PATTERN.match(key):
+            return None
+        for path in self.cache_dir.glob(f"{key}.*"):
+            if path.suffix in _MEDIA_TYPES:
+                try:
+                    os.utime(path)
+                except FileNotFoundError:
+                    return None
+                return path
+        return None
+
+    def synthesizer(self) -> Synthesizer:
+        if self._synthesize is None:
+            from app.clients.elevenlabs_client import elevenlabs_client
+            self._synthesize = elevenlabs_client.stream_audio
+        return self._synthesize
+
+    async def get_or_create(
+        self,
+        text: str,
+        voice_id: str,
+        model_id: str = DEFAULT_MODEL,
+        output_format: str = DEFAULT_FORMAT
+    ) -> str:
+        """Return the cache key for this audio, synthesizing it on a miss."""
+        key = self.key_for(voice_id, model_id, output_format, text)
+        if await asyncio.to_thread(self.path_for, key) is not None:
+            logger.debug(f"Preview audio cache hit: {key}")
+            return key
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            await asyncio.shield(pending)
+            return key
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            await self._render(key, text, voice_id, model_id, output_format)
+            future.set_result(key)
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters see the failure; nobody else has to retrieve it
+            future.exception()
+            raise
+        finally:
+            self._pending.pop(key, None)
+        return key
+
+    async def _render(self, key: str, text: str, voice_id: str, model_id: str, output_format: str) -> None:
+        path = self.cache_dir / f"{key}{_extension(output_format)}"
+        tmp_path = path.with_suffix('.tmp')
+        size = 0
+        started = time.perf_counter()
+        f = await asyncio.to_thread(open, tmp_path, 'wb')
+        try:
+            async for chunk in self.synthesizer()(
+                text=text, voice_id=voice_id, model_id=model_id, output_format=output_format
+            ):
+                if not size:
+                    FlowTracker.record(TTS_FIRST_BYTE, time.perf_counter() - started)
+                f.write(chunk)
+                size += len(chunk)
+        except BaseException:
+            f.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        f.close()
+        await asyncio.to_thread(os.replace, tmp_path, path)
+        logger.info(f"Cached preview audio {key} ({size} bytes)")
+        await asyncio.to_thread(self._enforce_limit)
+
+    async def read_bytes(self, key: str) -> bytes:
+        path = await asyncio.to_thread(self.path_for, key)
+        if path is None:
+            raise FileNotFoundError(f"Preview audio {key} is not cached")
+        return await asyncio.to_thread(path.read_bytes)
+
+    def _enforce_limit(self) -> None:
+        entries = []
+        total = 0
+        for path in self.cache_dir.iterdir():
+            if path.suffix not in _MEDIA_TYPES:
+                continue
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        while total > self.max_bytes and entries:
+            _, size, path = entries.pop(0)
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+preview_audio_cache = PreviewAudioCache(
+    settings.PREVIEW_AUDIO_CACHE_DIR,
+    settings.PREVIEW_AUDIO_CACHE_MAX_MB * 1024 * 1024
+)
@@ -5,7 +5,8 @@ def format_transcript_messages(messages: List[Any]) -> List[Dict]:
     Format chat messages into a standardized transcript format.
     
     Args:
-        messages: List of ChatMessage objects containing role, content, and optional name
+        messages: ChatMessage objects, or their dicts as stored in Redis, with
+            role, content, and optional name
         
     Returns:
         List of dictionaries with formatted messages following conversation_history schema
@@ -13,17 +14,21 @@ def format_transcript_messages(messages: List[Any]) -> List[Dict]:
     formatted_transcript = []
     
     for msg in messages:
+        if isinstance(msg, dict):
+            role, content, name = msg.get("role"), msg.get("content"), msg.get("name")
+        else:
+            role, content, name = msg.role, msg.content, getattr(msg, 'name', None)
         message_dict = {}
         
         # Convert the role-based format to match conversation_history format
-        if msg.role == "assistant":
-            message_dict["assistant_message"] = msg.content
-        elif msg.role == "user":
-            message_dict["user_message"] = msg.content
-        elif msg.role == "function":  # Handle function/tool messages
+        if role == "assistant":
+            message_dict["assistant_message"] = content
+        elif role == "user":
+            message_dict["user_message"] = content
+        elif role == "function":  # Handle function/tool messages
             message_dict["tool"] = {
-                "name": msg.name if hasattr(msg, 'name') else None,
-                "content": msg.content
+                "name": name,
+                "content": content
             }
         
         if message_dict:  # Only append if we have content
@@ -1,69 +1,54 @@
-from dotenv import load_dotenv
 from livekit import api
-import os
 import asyncio
 
-load_dotenv()
-
-LIVEKIT_URL = os.getenv('LIVEKIT_URL')
-LIVEKIT_API_KEY = os.getenv('LIVEKIT_API_KEY')
-LIVEKIT_API_SECRET = os.getenv('LIVEKIT_API_SECRET')
-SIP_TRUNK_ID = "ST_q8fzfH63TurF"
+from app.core.config import settings
+from app.core.logging_setup import logger
+from app.services.voice.room_lifecycle import room_service
 
 """
 agent should be dispatched in livekit_server.py as defined by our agent_id param. 
 """
 
-async def create_sip_participant(phone_number: str, room_name: str) -> None:
-    print("create_sip_participant method invoked")
-    livekit_api = api.LiveKitAPI(
-        LIVEKIT_URL,
-        LIVEKIT_API_KEY,
-        LIVEKIT_API_SECRET
-    )
-    sip_trunk_id = SIP_TRUNK_ID
-    await livekit_api.sip.create_sip_participant(
+def sip_identity(phone_number: str) -> str:
+    return f"sip_{phone_number}"
+
+async def create_sip_participant(
+    phone_number: str,
+    room_name: str,
+    trunk_id: str = None,
+    participant_name: str = "SIP Caller"
+) -> None:
+    logger.info(f"Dialing {phone_number} into room {room_name}")
+    await room_service.client.sip.create_sip_participant(
         api.CreateSIPParticipantRequest(
-            sip_trunk_id=sip_trunk_id,
+            sip_trunk_id=trunk_id or settings.SIP_OUTBOUND_TRUNK_ID,
             sip_call_to=phone_number,
             room_name=room_name,
-            participant_identity=f"sip_{phone_number}",
-            participant_name="SIP Caller"
+            participant_identity=sip_identity(phone_number),
+            participant_name=participant_name
         )
     )
-    await livekit_api.aclose()
-
-async def initiate_outbound_call(phone_number: str, room_name: str, agent_id: str = None) -> None:
-    # First create the SIP participant
-    await create_sip_participant(phone_number, room_name)
-
-    # Create room if it doesn't exist
-    livekit_api = api.LiveKitAPI(
-        LIVEKIT_URL,
-        LIVEKIT_API_KEY,
-        LIVEKIT_API_SECRET
-    )
 
-    try:
-        # Create the room with metadata containing the agent_id if provided
-        create_request = api.CreateRoomRequest(
-            name=room_name,
-            empty_timeout=120,
-            max_participants=2,
-            metadata=agent_id if agent_id else None
-        )
-        await livekit_api.room.create_room(create_request)
-
-        # The worker process running livekit_server.py will automatically
-        # pick up the room and start the agent when it detects the SIP participant
-        print(f"Created room {room_name} - worker will automatically start agent")
-        if agent_id:
-            print(f"Room created with agent_id: {agent_id}")
-        else:
-            print("Warning: No agent_id provided for outbound call")
+async def initiate_outbound_call(
+    phone_number: str,
+    room_name: str,
+    agent_id: str = None,
+    trunk_id: str = None,
+    participant_name: str = "SIP Caller"
+) -> None:
+    # Create the room first so the worker finds the agent_id in its metadata
+    # when it picks up the room for the SIP participant
+    await room_service.create_room(api.CreateRoomRequest(
+        name=room_name,
+        empty_timeout=120,
+        max_participants=2,
+        metadata=agent_id or ""
+    ))
+    logger.info(f"Created room {room_name} - worker will automatically start agent")
+    if not agent_id:
+        logger.warning("No agent_id provided for outbound call")
 
-    finally:
-        await livekit_api.aclose()
+    await create_sip_participant(phone_number, room_name, trunk_id, participant_name)
 
 if __name__ == "__main__":
     print("Creating SIP participant")
@@ -71,8 +56,11 @@ if __name__ == "__main__":
     # Example agent ID - replace with an actual agent ID from your database
     agent_id = "1bf662cf-4d01-4c82-b919-8534ad071380"
     room_name = f"outbound_{numb_to_call}"
-    asyncio.run(initiate_outbound_call(
-        numb_to_call,
-        room_name,
-        agent_id
-    ))
+
+    async def main():
+        try:
+            await initiate_outbound_call(numb_to_call, room_name, agent_id)
+        finally:
+            await room_service.aclose()
+
+    asyncio.run(main())
@@ -3,9 +3,10 @@ from operator import itemgetter
 from typing import List, Dict, Tuple
 from openai import AsyncOpenAI
 from app.core.logging_setup import logger
+from app.clients.lazy import lazy_client
 from app.clients.supabase_client import get_supabase
 
-openai = AsyncOpenAI()
+openai: AsyncOpenAI = lazy_client("openai_async", AsyncOpenAI)
 
 async def get_kb_items(
     current_user: str,
@@ -2,17 +2,23 @@ from app.core.logging_setup import logger
 from tiktoken import encoding_for_model
 import requests
 import json
-from typing import List, Tuple 
+from typing import Any, List, Tuple 
 
-import spacy
 from openai import AsyncOpenAI
 
 from app.core.config import settings
+from app.clients.lazy import lazy_client
 from app.clients.supabase_client import get_supabase
 
-openai = AsyncOpenAI()
+openai: AsyncOpenAI = lazy_client("openai_async", AsyncOpenAI)
 
-nlp = spacy.load("en_core_web_md")
+
+def _load_spacy() -> Any:
+    import spacy
+    return spacy.load("en_core_web_md")
+
+# Loading the model takes seconds; only knowledge base ingestion needs it
+nlp = lazy_client("spacy_en_core_web_md", _load_spacy)
 
 def clean_data(data: str) -> str:
     doc = nlp(data)
@@ -11,7 +11,9 @@ from fastapi import HTTPException
 from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, SemaphoreDispatcher, RateLimiter, BrowserConfig
 from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
 from tiktoken import encoding_for_model
-from supabase import create_client, Client
+from supabase import Client
+
+from app.clients.supabase_client import supabase_sync
 
 load_dotenv()
 
@@ -72,7 +74,7 @@ SUPABASE_ANON_KEY = os.getenv("SUPABASE_KEY")
 if not SUPABASE_ANON_KEY:
     raise ValueError("SUPABASE_KEY is not set in the environment variables")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+supabase: Client = supabase_sync
 
 async def insert_to_db(data: Dict[str, Any]) -> None:
     try:
@@ -0,0 +1,78 @@
+import json
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+from app.clients.supabase_client import get_supabase
+from app.services.redis_service import cache_redis
+
+""" NOTIFICATION ROUTING CACHE """
+
+
+class NotificationRoutingCache:
+    """
+    Where an agent's lead notifications go: its owner's id, email and
+    account settings, cached in Redis per agent.
+
+    A miss resolves just that agent and its owner with two keyed lookups.
+    Each owner keeps a set of their cached agents so a settings change can
+    drop exactly those routes.
+    """
+
+    def __init__(self, client: Any, ttl_seconds: int, prefix: str = "notification_route"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def route_key(self, agent_id: str) -> str:
+        return f"{self.prefix}:{agent_id}"
+
+    def user_agents_key(self, user_id: str) -> str:
+        return f"{self.prefix}:user:{user_id}"
+
+    async def _load(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        from app.services.cache import get_agent_metadata
+        agent = await get_agent_metadata(agent_id)
+        if not agent:
+            return None
+        user_id = agent['userId']
+
+        supabase = await get_supabase()
+        response = await supabase.table('users').select('id, account_settings').eq('id', user_id).execute()
+        account_settings = (response.data[0].get('account_settings') if response.data else None) or {}
+        return {
+            'user_id': user_id,
+            'email': account_settings.get('email'),
+            'account_settings': account_settings
+        }
+
+    async def get_route(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        cached = await self.client.get(self.route_key(agent_id))
+        if cached:
+            return json.loads(cached)
+
+        route = await self._load(agent_id)
+        if route is None:
+            logger.warning(f"No notification route for agent_id={agent_id}")
+            return None
+        async with self.client.pipeline() as pipe:
+            await pipe.set(self.route_key(agent_id), json.dumps(route), ex=self.ttl_seconds)
+            await pipe.sadd(self.user_agents_key(route['user_id']), agent_id)
+            await pipe.expire(self.user_agents_key(route['user_id']), self.ttl_seconds)
+            await pipe.execute()
+        return route
+
+    async def invalidate_user(self, user_id: str) -> None:
+        """Forget the routes of every agent owned by `user_id`."""
+        index_key = self.user_agents_key(user_id)
+        agent_ids = await self.client.smembers(index_key)
+        keys = [self.route_key(agent_id) for agent_id in agent_ids]
+        await self.client.delete(index_key, *keys)
+        if keys:
+            logger.debug(f"Invalidated {len(keys)} notification routes for user {user_id}")
+
+    async def invalidate_agent(self, agent_id: str) -> None:
+        await self.client.delete(self.route_key(agent_id))
+
+
+notification_routes = NotificationRoutingCache(cache_redis, settings.NOTIFICATION_ROUTE_TTL_SECONDS)
@@ -1,6 +1,6 @@
 # flake8: noqa: E501
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 from nylas import Client # type: ignore
 
@@ -8,7 +8,8 @@ import ast
 import html
 
 from app.clients.supabase_client import get_supabase
-from app.services.cache import get_all_agents
+from app.services.notification_routing import notification_routes
+from app.services.email_outbox import email_outbox
 
 load_dotenv()
 
@@ -22,143 +23,113 @@ nylas = Client(
 )
 
 
-async def get_agent_user_cache() -> dict[str, Any]:
-    supabase = await get_supabase()
-
-    agents = await get_all_agents()
-    # Convert list of agents to a dictionary mapping agent_id to user_id
-    agent_user_cache = {agent['id']: agent['userId'] for agent in agents}
-
-    # Fetch additional user data from Supabase
-    expanded_agent_user_cache = {}
-    user_ids = list(agent_user_cache.values())
-    response = await supabase.table('users').select('id, account_settings').in_('id', user_ids).execute()
-
-    if response.data:
-        # Create a mapping of user_id to their settings
-        user_settings_map = {
-            user['id']: user.get('account_settings', {})
-            for user in response.data
-        }
-
-        # Map the settings back to agent_ids
-        for agent_id, user_id in agent_user_cache.items():
-            user_settings = user_settings_map.get(user_id, {})
-            expanded_agent_user_cache[agent_id] = {
-                'user_id': user_id,
-                'email': user_settings.get('email'),
-                'account_settings': user_settings
-            }
-
-    return expanded_agent_user_cache
-
-
-async def send_email(participant_identity: str, conversation_history: List[Dict[str, Any]], agent_id: str) -> Any:
-    try:
-        supabase = await get_supabase()
-
-        # Get the agent-user cache first
-        agent_user_cache = await get_agent_user_cache()
-
-        # Initialize user_data as None
-        user_data = None
-
-        # Loop through conversation history and extract user input data
-        for message in conversation_history:
-            if "user_message" in message and "user input data:" in message["user_message"]:
-                # Extract the dictionary string and convert to actual dictionary
-                data_str: str = (
-                    message["user_message"].split("user input data:")[1].strip()
-                )
-                # Use ast.literal_eval instead of eval for safety
-                user_data = ast.literal_eval(data_str)
-
-                print("\n\n\n\n +_+_+_ nylas convo extracted user_data:", user_data)
-                print("Email Address:", user_data.get("Email Address"))
-                break
-
-        if not user_data:
-            raise ValueError("No user data found in conversation history")
-
-        # Email to Flowon User
-        recipient_email = agent_user_cache[agent_id]["email"]
-        if recipient_email:
-            print("recipient_email:", recipient_email)
-            user_request_body = {
-                "to": [{"email": recipient_email}],
-                "reply_to": [{"email": recipient_email}],
-                "subject": "New lead from Flowon AI",
-                "body": (
-                    f"<div>"
-                    f"<p>User submitted the following information:</p>"
-                    f"<pre>{user_data}</pre>"
-                    f"<p>Please log in to your dashboard for full transcript</p>"
-                    f"</div>"
-                )
-            }
-
-            # Send email, grant_id default from michael@flowon.ai
-            message = nylas.messages.send(
-                identifier="5ef0555c-25ab-4b4e-b4a1-02fd8ba4d255",
-                request_body=user_request_body
-            )
-
-        # Email to Lead
-        lead_email = user_data.get("Email Address")
-        lead_name = html.escape(user_data.get("Full Name", ""))
-        
-        if lead_email:
-            email_template = """
-                <div>
-                    <p>Hi {name}</p>
-                    <p>Thank you for connecting with our landing page agent! At Flowon AI, 
-                    we're offering a select group of business owners the chance to collaborate 
-                    with us on building bespoke conversational AI agents tailored to their 
-                    unique needs.</p>
-                    <p>These agents are designed to revolutionize customer interactions, 
-                    streamline operations, and give businesses a competitive edge—but we can 
-                    only take on a limited number of projects at a time.</p>
-                    <p>If you'd like to secure your spot, let's chat soon before the 
-                    remaining slots fill up:</p>
-                    <p>Book a quick demo here: 
-                    <a href='https://calendly.com/michael-flowon/30min?month=2024-11'>
-                    https://calendly.com/michael-flowon/30min?month=2024-11</a><br>
-                    Or simply reply to this email to start the conversation.</p>
-                    <p>I'd love to explore how we can create a custom AI solution for 
-                    your business!</p>
-                    <p>Looking forward to hearing from you,<br>
-                    Michael<br>
-                    Founder @ Flowon AI<br>
-                    michael@flowon.ai</p>
-                </div>
-            """
-            
-            lead_request_body = {
-                "to": [{"email": lead_email}],
-                "reply_to": [{"email": recipient_email}],
-                "subject": "Flowon: Custom AI Agents for Visionary Businesses",
-                "body": email_template.format(name=lead_name)
-            }
-
-            # Send email, grant_id default from michael@flowon.ai
-            message = nylas.messages.send(
-                identifier="5ef0555c-25ab-4b4e-b4a1-02fd8ba4d255",
-                request_body=lead_request_body
+# Default sending grant (michael@flowon.ai)
+DEFAULT_GRANT_ID = "5ef0555c-25ab-4b4e-b4a1-02fd8ba4d255"
+
+
+LEAD_EMAIL_TEMPLATE = """
+    <div>
+        <p>Hi {name}</p>
+        <p>Thank you for connecting with our landing page agent! At Flowon AI, 
+        we're offering a select group of business owners the chance to collaborate 
+        with us on building bespoke conversational AI agents tailored to their 
+        unique needs.</p>
+        <p>These agents are designed to revolutionize customer interactions, 
+        streamline operations, and give businesses a competitive edge—but we can 
+        only take on a limited number of projects at a time.</p>
+        <p>If you'd like to secure your spot, let's chat soon before the 
+        remaining slots fill up:</p>
+        <p>Book a quick demo here: 
+        <a href='https://calendly.com/michael-flowon/30min?month=2024-11'>
+        https://calendly.com/michael-flowon/30min?month=2024-11</a><br>
+        Or simply reply to this email to start the conversation.</p>
+        <p>I'd love to explore how we can create a custom AI solution for 
+        your business!</p>
+        <p>Looking forward to hearing from you,<br>
+        Michael<br>
+        Founder @ Flowon AI<br>
+        michael@flowon.ai</p>
+    </div>
+"""
+
+
+def extract_lead_data(conversation_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Contact details the visitor submitted through the form, from the transcript."""
+    for message in conversation_history:
+        if "user_message" in message and "user input data:" in message["user_message"]:
+            # Extract the dictionary string and convert to actual dictionary
+            data_str: str = (
+                message["user_message"].split("user input data:")[1].strip()
             )
+            # Use ast.literal_eval instead of eval for safety
+            user_data = ast.literal_eval(data_str)
+
+            print("\n\n\n\n +_+_+_ nylas convo extracted user_data:", user_data)
+            print("Email Address:", user_data.get("Email Address"))
+            return user_data
+
+    raise ValueError("No user data found in conversation history")
+
+
+async def owner_email(agent_id: str) -> Optional[str]:
+    # Resolve only this agent's owner, not the whole agent table
+    route = await notification_routes.get_route(agent_id)
+    return route["email"] if route else None
+
+
+async def send_owner_email(agent_id: str, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Tell the agent's owner about a new lead; returns the request sent, if any."""
+    recipient_email = await owner_email(agent_id)
+    if not recipient_email:
+        return None
+
+    print("recipient_email:", recipient_email)
+    user_request_body = {
+        "to": [{"email": recipient_email}],
+        "reply_to": [{"email": recipient_email}],
+        "subject": "New lead from Flowon AI",
+        "body": (
+            f"<div>"
+            f"<p>User submitted the following information:</p>"
+            f"<pre>{user_data}</pre>"
+            f"<p>Please log in to your dashboard for full transcript</p>"
+            f"</div>"
+        )
+    }
+    await email_outbox.send(DEFAULT_GRANT_ID, user_request_body)
+    return user_request_body
+
+
+async def send_lead_email(agent_id: str, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Follow up with the lead; returns the request sent, if any."""
+    lead_email = user_data.get("Email Address")
+    if not lead_email:
+        return None
+
+    lead_name = html.escape(user_data.get("Full Name", ""))
+    lead_request_body = {
+        "to": [{"email": lead_email}],
+        "reply_to": [{"email": await owner_email(agent_id)}],
+        "subject": "Flowon: Custom AI Agents for Visionary Businesses",
+        "body": LEAD_EMAIL_TEMPLATE.format(name=lead_name)
+    }
+    await email_outbox.send(DEFAULT_GRANT_ID, lead_request_body)
+    return lead_request_body
+
+
+async def record_email_notification(
+    participant_identity: str,
+    user_request_body: Optional[Dict[str, Any]],
+    lead_request_body: Optional[Dict[str, Any]]
+) -> None:
+    """Store the emails sent for a conversation on its log."""
+    supabase = await get_supabase()
+    nylas_notification = {
+        "participant_identity": participant_identity,
+        "user_request_body": user_request_body,
+        "lead_request_body": lead_request_body
+    }
+    await supabase.table('conversation_logs').update(
+        {"nylas_notification": nylas_notification}
+    ).eq('participant_identity', participant_identity).execute()
 
-        nylas_notification = {
-            "participant_identity": participant_identity,
-            "user_request_body": user_request_body,
-            "lead_request_body": lead_request_body
-        }
-
-        # Store notification in Supabase
-        await supabase.table('conversation_logs').update(
-            {"nylas_notification": nylas_notification}
-        ).eq('participant_identity', participant_identity).execute()
-
-        return message
-
-    except Exception as e:
-        print(f"Error sending email: {str(e)}")
-        raise  # Re-raise the exception for proper error handling upstream
@@ -0,0 +1,313 @@
+import asyncio
+import json
+import os
+import socket
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+from app.clients.supabase_client import get_supabase
+from app.services.redis_service import streams_redis
+
+""" POST-CALL PIPELINE """
+
+Job = Dict[str, Any]
+StageResults = Dict[str, Any]
+Stage = Callable[[Job, StageResults], Awaitable[Any]]
+
+FORM_DATA_MARKER = "user input data:"
+
+
+def call_duration_seconds(job: Job) -> int:
+    duration = job.get('call_duration') or 0
+    if isinstance(duration, dict):
+        return int(duration.get('total_seconds', 0))
+    return int(duration)
+
+
+def detect_lead(job: Job) -> str:
+    """'yes' when the caller was flagged as a prospect or submitted the contact form."""
+    if job.get('prospect_status') == 'yes':
+        return 'yes'
+    for message in job.get('transcript') or []:
+        if FORM_DATA_MARKER in str(message.get('user_message', '')):
+            return 'yes'
+    return job.get('prospect_status') or 'unknown'
+
+
+async def resolve_user_id(job: Job) -> str:
+    if job.get('user_id'):
+        return job['user_id']
+    from app.services.cache import get_agent_metadata
+    agent_metadata = await get_agent_metadata(job['agent_id'])
+    if not agent_metadata:
+        raise ValueError(f"User ID not found for agent_id: {job['agent_id']}")
+    return agent_metadata['userId']
+
+
+async def store_log_stage(job: Job, results: StageResults) -> Dict[str, Any]:
+    supabase = await get_supabase()
+    # A retry after a crash between insert and checkpoint must not insert twice
+    existing = await supabase.table("conversation_logs").select("id").eq("job_id", job['job_id']).execute()
+    if existing.data:
+        return {"stored": True}
+    if not job.get('transcript'):
+        logger.info(f"No transcript received for job {job['job_id']}")
+        return {"stored": False}
+
+    await supabase.table("conversation_logs").insert({
+        "transcript": job['transcript'],
+        "job_id": job['job_id'],
+        "participant_identity": job.get('participant_identity') or job['room_name'],
+        "room_name": job['room_name'],
+        "user_id": await resolve_user_id(job),
+        "agent_id": job['agent_id'],
+        "lead": job.get('prospect_status') or "unknown",
+        "call_duration": job.get('call_duration', 0),
+        "call_type": job.get('call_type', 'web'),
+        "latency": job.get('latency')
+    }).execute()
+    logger.info(f"Saved conversation log for job_id: {job['job_id']}")
+    return {"stored": True}
+
+
+async def summary_stage(job: Job, results: StageResults) -> Dict[str, Any]:
+    transcript = job.get('transcript') or []
+    if not results.get('store_log', {}).get('stored') or len(transcript) < 2:
+        return {"summary": None}
+    from app.services.conversation import transcript_summary
+    summary = await transcript_summary(str(transcript), job['job_id'])
+    if summary is None:
+        raise RuntimeError(f"Summary generation failed for job {job['job_id']}")
+    return {"summary": summary}
+
+
+async def lead_stage(job: Job, results: StageResults) -> Dict[str, Any]:
+    lead = detect_lead(job)
+    if results.get('store_log', {}).get('stored') and lead != (job.get('prospect_status') or "unknown"):
+        supabase = await get_supabase()
+        await supabase.table("conversation_logs").update({"lead": lead}).eq("job_id", job['job_id']).execute()
+    return {"lead": lead}
+
+
+def lead_form_data(job: Job, results: StageResults) -> Optional[Dict[str, Any]]:
+    """The submitted contact details if this call produced a lead to email about."""
+    if results.get('lead', {}).get('lead') != 'yes':
+        return None
+    # Jobs checkpointed before the emails were split already sent both
+    if 'email' in results:
+        return None
+    transcript = job.get('transcript') or []
+    if not any(FORM_DATA_MARKER in str(m.get('user_message', '')) for m in transcript):
+        # Nothing to send without the submitted contact details
+        return None
+    from app.services.nylas_service import extract_lead_data
+    return extract_lead_data(transcript)
+
+
+# The owner and lead emails are separate stages so that a failed lead email
+# is retried without notifying the owner a second time
+async def owner_email_stage(job: Job, results: StageResults) -> Dict[str, Any]:
+    user_data = lead_form_data(job, results)
+    if user_data is None:
+        return {"sent": False}
+    from app.services.nylas_service import send_owner_email
+    request_body = await send_owner_email(job['agent_id'], user_data)
+    return {"sent": request_body is not None, "request_body": request_body}
+
+
+async def lead_email_stage(job: Job, results: StageResults) -> Dict[str, Any]:
+    user_data = lead_form_data(job, results)
+    if user_data is None:
+        return {"sent": False}
+    from app.services.nylas_service import record_email_notification, send_lead_email
+    request_body = await send_lead_email(job['agent_id'], user_data)
+    await record_email_notification(
+        job.get('participant_identity') or job['room_name'],
+        results.get('owner_email', {}).get('request_body'),
+        request_body
+    )
+    return {"sent": request_body is not None}
+
+
+async def usage_stage(job: Job, results: StageResults) -> Dict[str, Any]:
+    seconds = call_duration_seconds(job)
+    # Phone calls are metered from the Twilio status callback
+    if seconds <= 0 or job.get('call_type') == 'tel':
+        return {"seconds": 0}
+    from app.services.user.usage import update_user_minutes
+    await update_user_minutes(await resolve_user_id(job), seconds)
+    return {"seconds": seconds}
+
+
+DEFAULT_STAGES: List[Tuple[str, Stage]] = [
+    ("store_log", store_log_stage),
+    ("summary", summary_stage),
+    ("lead", lead_stage),
+    ("owner_email", owner_email_stage),
+    ("lead_email", lead_email_stage),
+    ("usage", usage_stage),
+]
+
+
+class PostCallPipeline:
+    """
+    Post-call processing on a Redis stream read by a bounded worker pool.
+
+    Call endings only append a job to the stream, so a burst of them queues
+    up instead of running that many LLM summaries at once: at most `workers`
+    jobs are processed per process. Each stage's result is checkpointed in a
+    per-job hash, so a retried job skips the stages it already finished and
+    a job enqueued twice with the same id (a voice call's job) is only
+    processed once. A failed job stays pending in the consumer group and is
+    reclaimed after `retry_after_seconds` (by any process, so a crash does
+    not lose it); after `max_attempts` it is moved to a dead-letter stream.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        stages: List[Tuple[str, Stage]],
+        workers: int,
+        max_attempts: int,
+        retry_after_seconds: float,
+        state_ttl_seconds: int,
+        stream: str = "post_call:jobs",
+        group: str = "post_call",
+        max_stream_length: int = 10000
+    ):
+        self.client = client
+        self.stages = stages
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_after_ms = int(retry_after_seconds * 1000)
+        self.state_ttl_seconds = state_ttl_seconds
+        self.stream = stream
+        self.group = group
+        self.dead_letter_stream = f"{stream}:dead"
+        self.max_stream_length = max_stream_length
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+
+    def state_key(self, job_id: str) -> str:
+        return f"post_call:state:{job_id}"
+
+    async def enqueue(self, job: Job) -> bool:
+        """Queue a finished call; returns False if this job id was already queued."""
+        job_id = job['job_id']
+        if not await self.client.set(f"post_call:queued:{job_id}", 1, nx=True, ex=self.state_ttl_seconds):
+            logger.info(f"Post-call job {job_id} already queued")
+            return False
+        try:
+            await self.client.xadd(
+                self.stream, {"job": json.dumps(job)}, maxlen=self.max_stream_length, approximate=True
+            )
+        except Exception:
+            await self.client.delete(f"post_call:queued:{job_id}")
+            raise
+        logger.info(f"Queued post-call job {job_id}")
+        return True
+
+    async def process(self, entry_id: str, job: Job) -> bool:
+        """Run the stages not yet done for `job`; True once the entry is settled."""
+        key = self.state_key(job['job_id'])
+        state = await self.client.hgetall(key)
+        results: StageResults = {
+            name: json.loads(value) for name, value in state.items() if not name.startswith('_')
+        }
+
+        for name, stage in self.stages:
+            if name in results:
+                continue
+            try:
+                results[name] = await stage(job, results)
+            except Exception as e:
+                attempts = await self.client.hincrby(key, '_attempts', 1)
+                await self.client.expire(key, self.state_ttl_seconds)
+                if attempts >= self.max_attempts:
+                    logger.error(f"Post-call job {job['job_id']} failed at {name} {attempts} times, giving up: {str(e)}")
+                    await self.client.xadd(
+                        self.dead_letter_stream,
+                        {"job": json.dumps(job), "stage": name, "error": str(e)},
+                        maxlen=self.max_stream_length,
+                        approximate=True
+                    )
+                    await self._settle(entry_id)
+                    return True
+                logger.warning(f"Post-call job {job['job_id']} stage {name} failed (attempt {attempts}), will retry: {str(e)}")
+                return False
+            await self.client.hset(key, name, json.dumps(results[name]))
+            await self.client.expire(key, self.state_ttl_seconds)
+
+        await self._settle(entry_id)
+        logger.info(f"Post-call job {job['job_id']} completed")
+        return True
+
+    async def _settle(self, entry_id: str) -> None:
+        await self.client.xack(self.stream, self.group, entry_id)
+        await self.client.xdel(self.stream, entry_id)
+
+    async def _ensure_group(self) -> None:
+        try:
+            await self.client.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _next_entry(self) -> Optional[Tuple[str, Dict[str, str]]]:
+        # Retries first: entries another attempt (or a dead process) left pending
+        claimed = await self.client.xautoclaim(
+            self.stream, self.group, self.consumer, min_idle_time=self.retry_after_ms, count=1
+        )
+        if claimed and claimed[1]:
+            return claimed[1][0]
+        response = await self.client.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"}, count=1, block=5000
+        )
+        if response and response[0][1]:
+            return response[0][1][0]
+        return None
+
+    async def _worker(self, index: int) -> None:
+        backoff = 0.5
+        while True:
+            try:
+                entry = await self._next_entry()
+                backoff = 0.5
+                if entry is None:
+                    continue
+                entry_id, fields = entry
+                if not fields or 'job' not in fields:
+                    # Entry deleted while pending
+                    await self._settle(entry_id)
+                    continue
+                await self.process(entry_id, json.loads(fields['job']))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Post-call worker {index} error, retrying in {backoff}s: {str(e)}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        await self._ensure_group()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Started {self.workers} post-call workers as {self.consumer}")
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+post_call_pipeline = PostCallPipeline(
+    streams_redis,
+    DEFAULT_STAGES,
+    workers=settings.POST_CALL_WORKERS,
+    max_attempts=settings.POST_CALL_MAX_ATTEMPTS,
+    retry_after_seconds=settings.POST_CALL_RETRY_AFTER_SECONDS,
+    state_ttl_seconds=settings.POST_CALL_STATE_TTL_SECONDS,
+)
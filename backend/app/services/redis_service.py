@@ -1,35 +1,197 @@
 import json
-from typing import Optional, Dict, Any
+import math
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple
 import redis.asyncio as redis
+from redis.backoff import ExponentialBackoff
+from redis.retry import Retry
 from datetime import datetime
-from app.core.logging_setup import logger
+from app.core.logging_setup import logger, throttled
 
 from app.core.config import settings
 from app.clients.supabase_client import get_supabase
+from app.utils.flow_tracker import StepLatency
 
 
+""" CONNECTION POOLS """
 
-# Redis connection pool
-redis_client = redis.Redis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    username=settings.REDIS_USER,
-    password=settings.REDIS_PASSWORD,
-    db=settings.REDIS_DB,
-    decode_responses=True
+WORKLOADS = ("default", "chat", "cache", "rate_limit", "streams")
+# Workloads that issue blocking reads (XREADGROUP BLOCK, pub/sub) and so
+# must not be cut off by the socket timeout
+BLOCKING_WORKLOADS = {"streams"}
+DEFAULT_POOL_SIZE = 10
+ACQUIRE_WINDOW = 1024
+RETRY_BACKOFF_CAP_SECONDS = 1.0
+EXHAUSTED_MESSAGE = "No connection available."
+
+
+def parse_pool_sizes(spec: str) -> Dict[str, int]:
+    """Parse "workload=N,workload=N" into pool sizes."""
+    sizes = {}
+    for item in spec.split(","):
+        workload, _, size = item.partition("=")
+        if workload.strip() and size.strip():
+            sizes[workload.strip()] = int(size)
+    return sizes
+
+
+class MeteredConnectionPool(redis.BlockingConnectionPool):
+    """
+    Bounded pool that makes a command wait for a free connection (up to
+    `timeout`) instead of opening more, and records how long acquiring one
+    took and how often none became free in time.
+    """
+
+    def __init__(self, name: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.name = name
+        self.acquire = StepLatency(ACQUIRE_WINDOW)
+        self.exhausted = 0
+
+    async def get_connection(self, command_name: str, *keys: Any, **options: Any):
+        started = time.perf_counter()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        except redis.ConnectionError as e:
+            if str(e) == EXHAUSTED_MESSAGE:
+                self.exhausted += 1
+                throttled(f"redis_pool:{self.name}").warning(
+                    f"Redis pool '{self.name}' exhausted ({self.max_connections} connections in use)"
+                )
+            raise
+        finally:
+            self.acquire.add(time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "in_use": len(self._in_use_connections),
+            "idle": len(self._available_connections),
+            "exhausted": self.exhausted,
+            "acquire": self.acquire.snapshot(),
+        }
+
+
+def connection_kwargs(blocking: bool = False) -> Dict[str, Any]:
+    return {
+        "host": settings.REDIS_HOST,
+        "port": settings.REDIS_PORT,
+        "username": settings.REDIS_USER,
+        "password": settings.REDIS_PASSWORD,
+        "db": settings.REDIS_DB,
+        "decode_responses": True,
+        # Blocking reads carry their own server-side timeout
+        "socket_timeout": None if blocking else settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        "socket_connect_timeout": settings.REDIS_CONNECT_TIMEOUT_SECONDS,
+        "socket_keepalive": True,
+        "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+        "retry": Retry(
+            ExponentialBackoff(cap=RETRY_BACKOFF_CAP_SECONDS, base=settings.REDIS_RETRY_BACKOFF_SECONDS),
+            settings.REDIS_RETRIES
+        ),
+        "retry_on_error": [redis.ConnectionError, redis.TimeoutError],
+    }
+
+
+class RedisPools:
+    """
+    One client per workload, each on its own bounded pool. With `split`
+    off, every workload shares the default pool.
+    """
+
+    def __init__(self, sizes: Dict[str, int], split: bool = True, pool_timeout: float = 2.0, **overrides: Any):
+        self.pools: Dict[str, MeteredConnectionPool] = {}
+        self.clients: Dict[str, redis.Redis] = {}
+        for workload in WORKLOADS if split else ("default",):
+            kwargs = {**connection_kwargs(workload in BLOCKING_WORKLOADS), **overrides}
+            pool = MeteredConnectionPool(
+                workload,
+                max_connections=sizes.get(workload, DEFAULT_POOL_SIZE),
+                timeout=pool_timeout,
+                **kwargs
+            )
+            self.pools[workload] = pool
+            self.clients[workload] = redis.Redis(connection_pool=pool)
+
+    def client(self, workload: str) -> redis.Redis:
+        return self.clients.get(workload, self.clients["default"])
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+    async def ping(self) -> Dict[str, bool]:
+        results = {}
+        for name, client in self.clients.items():
+            try:
+                results[name] = bool(await client.ping())
+            except (redis.ConnectionError, redis.TimeoutError):
+                results[name] = False
+        return results
+
+    async def aclose(self) -> None:
+        for client in self.clients.values():
+            await client.aclose()
+
+
+redis_pools = RedisPools(
+    parse_pool_sizes(settings.REDIS_POOL_SIZES),
+    split=settings.REDIS_SPLIT_POOLS,
+    pool_timeout=settings.REDIS_POOL_TIMEOUT_SECONDS
+)
+redis_client = redis_pools.client("default")
+chat_redis = redis_pools.client("chat")
+cache_redis = redis_pools.client("cache")
+rate_limit_redis = redis_pools.client("rate_limit")
+streams_redis = redis_pools.client("streams")
+
+_pool_sizes = ", ".join(f"{name}={pool.max_connections}" for name, pool in redis_pools.pools.items())
+logger.info(
+    f"Redis client initialized with host={settings.REDIS_HOST}, port={settings.REDIS_PORT}, "
+    f"db={settings.REDIS_DB}, pools: {_pool_sizes}"
 )
 
-logger.info(f"Redis client initialized with host={settings.REDIS_HOST}, port={settings.REDIS_PORT}, db={settings.REDIS_DB}")
+# Every chat write stores a fresh version token next to the chat so warm
+# in-process copies can tell whether anyone else has written since. KEYS are
+# the chat and its version; ARGV is the chat JSON, its new version, the TTL
+# and the version the writer last saw ("" to write unconditionally).
+SAVE_CHAT_SCRIPT = """
+if ARGV[4] ~= '' and redis.call('GET', KEYS[2]) ~= ARGV[4] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+save_chat_script = chat_redis.register_script(SAVE_CHAT_SCRIPT)
+
 
 class RedisChatStorage:
     @staticmethod
     def get_chat_key(agent_id: str, room_name: str) -> str:
         """Generate a unique Redis key for a chat session"""
-        return f"chat:{agent_id}"
+        return f"chat:{agent_id}:{room_name}"
 
     @staticmethod
-    async def save_chat(agent_id: str, room_name: str, chat_data: Dict[str, Any]) -> None:
-        """Save chat data to Redis with TTL"""
+    def get_version_key(agent_id: str, room_name: str) -> str:
+        """Key holding the version token of the last chat write"""
+        return f"chat_version:{agent_id}:{room_name}"
+
+    @staticmethod
+    async def save_chat(
+        agent_id: str,
+        room_name: str,
+        chat_data: Dict[str, Any],
+        expected_version: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Save chat data to Redis with TTL and return its new version.
+
+        With expected_version the write only happens if the chat is still at
+        that version; None is returned if someone else wrote it first.
+        """
         try:
             logger.debug(f"Saving chat data for agent_id={agent_id}, room_name={room_name}")
             key = RedisChatStorage.get_chat_key(agent_id, room_name)
@@ -44,18 +206,25 @@ class RedisChatStorage:
                 if "timestamp" not in message:
                     message["timestamp"] = datetime.utcnow().isoformat()
             
+            version = uuid.uuid4().hex
             serialized_data = json.dumps({
                 "messages": sorted(chat_data.get("messages", []), key=lambda x: x.get("timestamp", "")),
                 "response_metadata": chat_data.get("response_metadata", {}),
-                "last_updated": datetime.utcnow().isoformat()
+                "last_updated": datetime.utcnow().isoformat(),
+                "version": version
             })
             
-            async with redis_client.pipeline() as pipe:
-                await pipe.set(key, serialized_data)
-                await pipe.expire(key, settings.REDIS_TTL)
-                await pipe.execute()
-            
-            logger.info(f"Successfully saved chat to Redis - key: {key}, messages: {len(chat_data.get('messages', []))}")
+            saved = await save_chat_script(
+                keys=[key, RedisChatStorage.get_version_key(agent_id, room_name)],
+                args=[serialized_data, version, settings.REDIS_TTL, expected_version or ""],
+                client=chat_redis
+            )
+            if not saved:
+                logger.debug(f"Chat {key} changed since version {expected_version}, not saved")
+                return None
+
+            logger.debug("Successfully saved chat to Redis - key: {}, messages: {}", key, len(chat_data.get('messages', [])))
+            return version
         except Exception as e:
             logger.error(f"Error saving chat to Redis: {str(e)}", exc_info=True)
             raise
@@ -65,7 +234,7 @@ class RedisChatStorage:
         """Retrieve chat data from Redis"""
         logger.debug(f"Retrieving chat data for agent_id={agent_id}, room_name={room_name}")
         key = RedisChatStorage.get_chat_key(agent_id, room_name)
-        data = await redis_client.get(key)
+        data = await chat_redis.get(key)
         
         if data:
             logger.debug(f"Found chat data for key: {key}")
@@ -73,12 +242,17 @@ class RedisChatStorage:
         logger.debug(f"No chat data found for key: {key}")
         return None
 
+    @staticmethod
+    async def get_chat_version(agent_id: str, room_name: str) -> Optional[str]:
+        """Version token of the last chat write, without loading the chat"""
+        return await chat_redis.get(RedisChatStorage.get_version_key(agent_id, room_name))
+
     @staticmethod
     async def delete_chat(agent_id: str, room_name: str) -> None:
         """Delete chat data from Redis"""
         logger.debug(f"Deleting chat data for agent_id={agent_id}, room_name={room_name}")
         key = RedisChatStorage.get_chat_key(agent_id, room_name)
-        result = await redis_client.delete(key)
+        result = await chat_redis.delete(key, RedisChatStorage.get_version_key(agent_id, room_name))
         if result:
             logger.info(f"Successfully deleted chat with key: {key}")
         else:
@@ -91,11 +265,11 @@ class RedisChatStorage:
         pattern = f"chat:{agent_id}:*"
         chats = {}
         
-        async for key in redis_client.scan_iter(match=pattern):
+        async for key in chat_redis.scan_iter(match=pattern):
             # Extract room name from key
             room_name = key.split(":")[-1]  # Get last part after colon
             logger.debug(f"Found chat key: {key}, room_name: {room_name}")
-            chat_data = await redis_client.get(key)
+            chat_data = await chat_redis.get(key)
             if chat_data:
                 try:
                     chats[room_name] = json.loads(chat_data)
@@ -111,7 +285,7 @@ class RedisChatStorage:
         """Get existing chat data if it exists in Redis"""
         logger.debug(f"Checking if chat exists for agent_id={agent_id}, room_name={room_name}")
         key = RedisChatStorage.get_chat_key(agent_id, room_name)
-        chat_data = await redis_client.get(key)
+        chat_data = await chat_redis.get(key)
         
         if chat_data:
             try:
@@ -124,8 +298,83 @@ class RedisChatStorage:
         return None
 
 
+""" RATE LIMITING """
+
+# Token buckets, checked and charged in one round trip. KEYS are the
+# buckets a request must pass; ARGV is the cost, then capacity and refill
+# per second for each bucket. A bucket is a hash {t: tokens, ts: ms} that
+# expires once it would be full again. The request is charged to every
+# bucket or, if any bucket is short, to none. A cost larger than a bucket's
+# capacity can never be met, so that is returned with a retry of -1.
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local cost = tonumber(ARGV[1])
+local levels = {}
+local retry_after = 0
+local blocked = 0
+local remaining = -1
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i])
+    local rate = tonumber(ARGV[2 * i + 1]) / 1000
+    if cost > capacity then
+        return {0, -1, i, 0}
+    end
+    local state = redis.call('HMGET', key, 't', 'ts')
+    local level = tonumber(state[1])
+    if level == nil then
+        level = capacity
+    else
+        level = math.min(capacity, level + math.max(0, now - tonumber(state[2])) * rate)
+    end
+    levels[i] = level
+    if level < cost then
+        local wait = math.ceil((cost - level) / rate)
+        if wait > retry_after then
+            retry_after = wait
+            blocked = i
+        end
+    end
+    local left = math.floor(math.max(0, level - cost))
+    if remaining < 0 or left < remaining then
+        remaining = left
+    end
+end
+if blocked > 0 then
+    return {0, retry_after, blocked, remaining}
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i])
+    local rate = tonumber(ARGV[2 * i + 1]) / 1000
+    local level = levels[i] - cost
+    redis.call('HSET', key, 't', tostring(level), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil((capacity - level) / rate) + 1000)
+end
+return {1, 0, 0, remaining}
+"""
+
+token_bucket = rate_limit_redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    remaining: int
+    retry_after: float = 0.0
+    limited_by: Optional[str] = None
+    # Set when the cost exceeds the limiting bucket's capacity; retrying
+    # cannot help, so there is no retry hint
+    max_cost: Optional[int] = None
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"X-RateLimit-Remaining": str(self.remaining)}
+        if not self.allowed and self.max_cost is None:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
 class RedisRateLimiter:
-    def __init__(self, key_prefix: str, max_requests: int, window_seconds: int = 60):
+    def __init__(self, key_prefix: str, max_requests: int, window_seconds: int = 60, client: Optional[redis.Redis] = None):
         """
         Initialize a Redis-based rate limiter
         
@@ -133,16 +382,30 @@ class RedisRateLimiter:
             key_prefix: Prefix for the Redis key (e.g., 'rate_limit:scrape')
             max_requests: Maximum number of requests allowed in the time window
             window_seconds: Time window in seconds (default: 60 seconds)
+            client: Redis client (default: the rate_limit pool)
+
+        Each identifier gets a token bucket holding up to `max_requests`
+        tokens and refilling at `max_requests / window_seconds` per second,
+        so memory per key is constant and a full burst is followed by an
+        even rate.
         """
         self.key_prefix = key_prefix
         self.max_requests = max_requests
         self.window_seconds = window_seconds
+        self.client = client or rate_limit_redis
         logger.debug(f"Initialized RedisRateLimiter with prefix={key_prefix}, max={max_requests}, window={window_seconds}s")
 
+    @property
+    def refill_per_second(self) -> float:
+        return self.max_requests / self.window_seconds
+
     def _get_key(self, identifier: str) -> str:
         """Generate a unique Redis key for rate limiting"""
         return f"{self.key_prefix}:{identifier}"
 
+    async def check(self, identifier: str = "default", cost: int = 1) -> RateLimitResult:
+        return await acquire_all([(self, identifier)], cost)
+
     async def acquire(self, identifier: str = "default") -> bool:
         """
         Check if request is allowed and update counter
@@ -150,56 +413,62 @@ class RedisRateLimiter:
         Returns:
             bool: True if request is allowed, False if rate limit exceeded
         """
-        logger.debug(f"Checking rate limit for {self.key_prefix}, identifier={identifier}")
-        key = self._get_key(identifier)
-        current_time = datetime.utcnow().timestamp()
-        window_start = current_time - self.window_seconds
-
-        async with redis_client.pipeline() as pipe:
-            # Remove old entries
-            await pipe.zremrangebyscore(key, '-inf', window_start)
-            # Count requests in current window
-            await pipe.zcard(key)
-            # Add new request
-            await pipe.zadd(key, {str(current_time): current_time})
-            # Set expiration
-            await pipe.expire(key, self.window_seconds)
-            # Execute pipeline
-            _, requests_count, *_ = await pipe.execute()
-
-        allowed = requests_count <= self.max_requests
-        if allowed:
-            logger.debug(f"Rate limit allowed for {key}, count={requests_count}/{self.max_requests}")
-        else:
-            logger.warning(f"Rate limit exceeded for {key}, count={requests_count}/{self.max_requests}")
-        return allowed
+        return (await self.check(identifier)).allowed
 
     async def get_remaining(self, identifier: str = "default") -> dict:
-        """Get remaining requests and reset time"""
-        logger.debug(f"Getting remaining rate limit for {self.key_prefix}, identifier={identifier}")
-        key = self._get_key(identifier)
-        current_time = datetime.utcnow().timestamp()
-        window_start = current_time - self.window_seconds
-
-        async with redis_client.pipeline() as pipe:
-            await pipe.zremrangebyscore(key, '-inf', window_start)
-            await pipe.zcard(key)
-            results = await pipe.execute()
-
-        current_requests = results[1]
-        remaining = max(0, self.max_requests - current_requests)
-        reset_time = datetime.fromtimestamp(window_start + self.window_seconds)
-
-        logger.debug(f"Rate limit status for {key}: {remaining}/{self.max_requests} remaining, resets at {reset_time.isoformat()}")
+        """Get remaining requests and the time the bucket is full again"""
+        result = await self.check(identifier, cost=0)
+        refill_seconds = (self.max_requests - result.remaining) / self.refill_per_second
+        reset_time = datetime.fromtimestamp(datetime.utcnow().timestamp() + refill_seconds)
         return {
-            "remaining": remaining,
+            "remaining": result.remaining,
             "reset_time": reset_time.isoformat(),
             "limit": self.max_requests
         }
 
-# Create rate limiters with the same limits as your original code
-scrape_limiter = RedisRateLimiter("rate_limit:scrape", max_requests=20)  # 20 per minute
-crawl_limiter = RedisRateLimiter("rate_limit:crawl", max_requests=3)     # 3 per minute
+
+async def acquire_all(limits: List[Tuple[RedisRateLimiter, str]], cost: int = 1) -> RateLimitResult:
+    """
+    Charge `cost` to every (limiter, identifier) bucket in one atomic call,
+    e.g. per user, per tenant and global. Either all are charged or, when
+    any is short, none; the result names the limit that would take longest
+    to allow the request.
+    """
+    keys = [limiter._get_key(identifier) for limiter, identifier in limits]
+    args: List[Any] = [cost]
+    for limiter, _ in limits:
+        args += [limiter.max_requests, limiter.refill_per_second]
+
+    allowed, retry_after_ms, blocked, remaining = await token_bucket(
+        keys=keys, args=args, client=limits[0][0].client
+    )
+    if allowed:
+        logger.debug(f"Rate limit allowed for {keys}, remaining={remaining}")
+        return RateLimitResult(allowed=True, remaining=remaining)
+
+    key = keys[blocked - 1]
+    if retry_after_ms < 0:
+        max_cost = limits[blocked - 1][0].max_requests
+        logger.info(f"Cost {cost} exceeds the capacity {max_cost} of {key}")
+        return RateLimitResult(allowed=False, remaining=remaining, limited_by=key, max_cost=max_cost)
+
+    throttled(f"rate_limit:{key}").warning(f"Rate limit exceeded for {key}, retry after {retry_after_ms}ms")
+    return RateLimitResult(
+        allowed=False,
+        remaining=remaining,
+        retry_after=retry_after_ms / 1000,
+        limited_by=key
+    )
+
+
+# Per user (or chat room), per tenant (agent) and global limits per endpoint
+scrape_limiter = RedisRateLimiter("rate_limit:scrape", max_requests=settings.RATE_LIMIT_SCRAPE_PER_USER)
+scrape_global_limiter = RedisRateLimiter("rate_limit:scrape_global", max_requests=settings.RATE_LIMIT_SCRAPE_GLOBAL)
+crawl_limiter = RedisRateLimiter("rate_limit:crawl", max_requests=settings.RATE_LIMIT_CRAWL_PER_USER)
+crawl_global_limiter = RedisRateLimiter("rate_limit:crawl_global", max_requests=settings.RATE_LIMIT_CRAWL_GLOBAL)
+chat_room_limiter = RedisRateLimiter("rate_limit:chat_room", max_requests=settings.RATE_LIMIT_CHAT_PER_ROOM)
+chat_agent_limiter = RedisRateLimiter("rate_limit:chat_agent", max_requests=settings.RATE_LIMIT_CHAT_PER_AGENT)
+chat_global_limiter = RedisRateLimiter("rate_limit:chat_global", max_requests=settings.RATE_LIMIT_CHAT_GLOBAL)
 
 class RedisAgentMetadataCache:
     CACHE_KEY_PREFIX = "agent_metadata:"
@@ -219,7 +488,7 @@ class RedisAgentMetadataCache:
         agents = response.data
         
         # Cache each agent individually
-        async with redis_client.pipeline() as pipe:
+        async with cache_redis.pipeline() as pipe:
             for agent in agents:
                 key = RedisAgentMetadataCache.get_key(agent['id'])
                 await pipe.set(key, json.dumps(agent), ex=RedisAgentMetadataCache.TTL)
@@ -235,7 +504,7 @@ class RedisAgentMetadataCache:
         key = RedisAgentMetadataCache.get_key(agent_id)
         
         # Try to get from cache first
-        cached_data = await redis_client.get(key)
+        cached_data = await cache_redis.get(key)
         if cached_data:
             logger.debug(f"Cache hit for agent_id={agent_id}")
             return json.loads(cached_data)
@@ -243,13 +512,12 @@ class RedisAgentMetadataCache:
         # If not in cache, get from database and cache it
         logger.debug(f"Cache miss for agent_id={agent_id}, fetching from database")
         supabase = await get_supabase()
-        response = supabase.table("agents").select("*").execute()
-        agents_dict = {agent['id']: agent for agent in response.data}
-        agent = agents_dict.get(agent_id)
+        response = await supabase.table("agents").select("*").eq("id", agent_id).execute()
+        agent = response.data[0] if response.data else None
         
         if agent:
             logger.debug(f"Found agent_id={agent_id} in database, updating cache")
-            await redis_client.set(key, json.dumps(agent), ex=RedisAgentMetadataCache.TTL)
+            await cache_redis.set(key, json.dumps(agent), ex=RedisAgentMetadataCache.TTL)
         else:
             logger.warning(f"Agent with id={agent_id} not found in database")
         
@@ -260,8 +528,8 @@ class RedisAgentMetadataCache:
         """Clear all agent metadata from Redis cache"""
         logger.info("Clearing all agent metadata from Redis cache")
         deleted_count = 0
-        async for key in redis_client.scan_iter(f"{RedisAgentMetadataCache.CACHE_KEY_PREFIX}*"):
-            await redis_client.delete(key)
+        async for key in cache_redis.scan_iter(f"{RedisAgentMetadataCache.CACHE_KEY_PREFIX}*"):
+            await cache_redis.delete(key)
             deleted_count += 1
         logger.info(f"Cleared {deleted_count} agent metadata entries from cache")
 
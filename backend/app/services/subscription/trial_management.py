@@ -12,6 +12,7 @@ from app.core.logging_setup import logger
 from datetime import datetime, timezone, timedelta
 
 from app.clients.supabase_client import get_supabase
+from app.services.voice.call_routing import NUMBER_RELEASED, publish_routing_event
 
 async def check_expired_trials():
     """
@@ -129,6 +130,7 @@ async def release_trial_numbers(supabase, user_id):
                 'owner_user_id': None,
                 'status': 'released',
             }).eq('phone_number', phone_number).execute()
+            await publish_routing_event({'type': NUMBER_RELEASED, 'phone_number': phone_number})
             
             logger.info(f"Successfully released trial number {phone_number}")
     
@@ -197,6 +199,7 @@ async def check_trial_numbers():
                     'owner_user_id': None,
                     'status': 'released',
                 }).eq('phone_number', phone_number).execute()
+                await publish_routing_event({'type': NUMBER_RELEASED, 'phone_number': phone_number})
                 
                 # Send notification to user
                 # TODO: Implement email notification about number release
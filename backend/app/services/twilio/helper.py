@@ -1,11 +1,13 @@
+import asyncio
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List
 from enum import Enum
-import math
 from app.core.logging_setup import logger
 
 from app.services.twilio.client import client
+from app.services.twilio.number_search import number_search
 from app.clients.supabase_client import get_supabase
+from app.services.voice.call_routing import NUMBER_RELEASED, publish_routing_event
 
 class NumberType(str, Enum):
     LOCAL = "local"
@@ -23,11 +25,9 @@ class PhoneNumberSchema(BaseModel):
     mobile: NumberGroup | None = None
     national: NumberGroup | None = None
 
-def get_country_codes() -> List[str]:
+async def get_country_codes() -> List[str]:
     try:
-        logger.info("Fetching available country codes from Twilio")
-        countries = client.available_phone_numbers.list()
-        country_codes = [country.country_code for country in countries]
+        country_codes = await number_search.country_codes()
         logger.info(f"Retrieved {len(country_codes)} country codes: {', '.join(country_codes[:10])}{'...' if len(country_codes) > 10 else ''}")
         return country_codes
     except Exception as e:
@@ -58,72 +58,8 @@ async def fetch_twilio_numbers(user_id: str) -> str:
         logger.error(f"Error fetching Twilio number for user {user_id}: {str(e)}")
         raise
 
-def get_available_numbers(country_code: str) -> Dict[str, Dict]:
-    logger.info(f"Fetching available numbers for country code: {country_code}")
-    # Map our internal types to Twilio's pricing types
-    number_type_mapping = {
-        'local': 'local',
-        'toll_free': 'toll free',
-        'mobile': 'mobile',
-        'national': 'national'
-    }
-    
-    # For GB (United Kingdom), prioritize toll-free numbers to avoid regulatory issues
-    if country_code == "GB":
-        logger.info("UK detected - prioritizing toll-free numbers to avoid regulatory complications")
-        number_types = ['toll_free', 'mobile', 'local', 'national']  # Prioritize toll-free for GB
-    else:
-        number_types = list(number_type_mapping.keys())
-        
-    available_numbers: Dict[str, Dict] = {}
-    monthly_cost: Dict[str, float] = {}
-
-    for number_type in number_types:
-        try:
-            logger.info(f"Fetching {number_type} numbers for {country_code}")
-            # Try to list up to 5 numbers of each type
-            numbers = getattr(client.available_phone_numbers(country_code), number_type).list(limit=5)
-            numbers_list = [number.phone_number for number in numbers]
-
-            logger.info(f"Fetching pricing information for {country_code}")
-            country_pricing = client.pricing.v1.phone_numbers.countries(country_code).fetch()
-            country_pricing = country_pricing.phone_number_prices
-
-            # Calculate highest price for each number type
-            for price_info in country_pricing:
-                base = math.ceil(float(price_info['base_price']))
-                current = math.ceil(float(price_info['current_price']))
-                pricing_type = price_info['number_type']
-                
-                # Match Twilio's pricing type to our internal type
-                for our_type, twilio_type in number_type_mapping.items():
-                    if twilio_type == pricing_type:
-                        monthly_cost[our_type] = round(max(base, current) * 1.2, 1)
-
-            # Only add to dictionary if numbers were found
-            if numbers_list:
-                available_numbers[number_type] = {
-                    "monthly_cost": monthly_cost.get(number_type),
-                    "numbers": numbers_list
-                }
-                logger.info(f"Found {len(numbers_list)} {number_type} numbers for {country_code}")
-                
-                # For GB, immediately return if we found mobile numbers
-                if country_code == "GB" and number_type == "mobile" and numbers_list:
-                    logger.info("Found GB mobile numbers, prioritizing these to avoid regulatory issues")
-                    # Create a new dictionary with only mobile numbers at the top
-                    prioritized_numbers = {"mobile": available_numbers["mobile"]}
-                    total_numbers = len(numbers_list)
-                    logger.info(f"Completed fetching numbers for {country_code}: returning {total_numbers} mobile numbers")
-                    return prioritized_numbers
-                
-        except Exception as e:
-            logger.error(f"Error processing {number_type} numbers for {country_code}: {str(e)}")
-            continue
-    
-    total_numbers = sum(len(group["numbers"]) for group in available_numbers.values())
-    logger.info(f"Completed fetching numbers for {country_code}: found {total_numbers} numbers across {len(available_numbers)} types")
-    return available_numbers
+async def get_available_numbers(country_code: str) -> Dict[str, Dict]:
+    return await number_search.available_numbers(country_code)
 
 async def purchase_number(phone_number: str) -> Dict[str, Any]:
     """Purchase a phone number from Twilio
@@ -174,9 +110,10 @@ async def purchase_number(phone_number: str) -> Dict[str, Any]:
         # Purchase number through Twilio with proper webhook configuration
         logger.info(f"Creating number with Twilio: {phone_number}")
         logger.debug(f"Purchase parameters: {purchase_params}")
-        number = client.incoming_phone_numbers.create(**purchase_params)
+        number = await asyncio.to_thread(client.incoming_phone_numbers.create, **purchase_params)
         
         logger.info(f"Successfully purchased number {phone_number} with SID {number.sid}")
+        number_search.discard_number(phone_number)
         logger.info("purchase_number completed successfully")
         
         return {
@@ -189,6 +126,11 @@ async def purchase_number(phone_number: str) -> Dict[str, Any]:
         logger.error(f"Error in purchase_number: {str(e)}")
         raise
 
+async def release_purchased_number(number_sid: str) -> None:
+    """Give a number straight back to Twilio when provisioning could not finish"""
+    logger.info(f"Releasing purchased number {number_sid} from Twilio")
+    await asyncio.to_thread(client.incoming_phone_numbers(number_sid).delete)
+
 async def release_number(user_id: str, phone_number: str) -> Dict[str, Any]:
     """Release a Twilio phone number and remove it from user's telephony_numbers
     
@@ -239,6 +181,7 @@ async def release_number(user_id: str, phone_number: str) -> Dict[str, Any]:
         # Release the number
         logger.info(f"Releasing number from Twilio")
         incoming_numbers[0].delete()
+        await publish_routing_event({'type': NUMBER_RELEASED, 'phone_number': phone_number})
         
         logger.info(f"Successfully released number {phone_number}")
         return {
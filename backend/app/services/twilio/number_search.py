@@ -0,0 +1,191 @@
+import asyncio
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+from app.services.twilio.client import client
+
+""" AVAILABLE NUMBER SEARCH """
+
+# Our internal number types mapped to Twilio's pricing types
+NUMBER_TYPE_PRICING = {
+    'local': 'local',
+    'toll_free': 'toll free',
+    'mobile': 'mobile',
+    'national': 'national'
+}
+
+SEARCH_LIMIT = 5
+
+
+def monthly_costs(phone_number_prices: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Monthly cost we charge per internal number type from Twilio's price list."""
+    costs: Dict[str, float] = {}
+    for price_info in phone_number_prices:
+        base = math.ceil(float(price_info['base_price']))
+        current = math.ceil(float(price_info['current_price']))
+        for our_type, twilio_type in NUMBER_TYPE_PRICING.items():
+            if twilio_type == price_info['number_type']:
+                costs[our_type] = round(max(base, current) * 1.2, 1)
+    return costs
+
+
+class NumberSearchService:
+    """
+    Async front for the Twilio available-number and pricing APIs.
+
+    The Twilio SDK is blocking, so every call runs in a worker thread. Number
+    types for a country are searched concurrently. Country pricing changes
+    rarely and is cached for `pricing_ttl` seconds, the country list for
+    `countries_ttl`, and search results only briefly for `availability_ttl`
+    since numbers are bought by other Twilio customers. Concurrent misses on
+    the same key share one fetch.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        pricing_ttl: float,
+        availability_ttl: float,
+        countries_ttl: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.client = client
+        self.pricing_ttl = pricing_ttl
+        self.availability_ttl = availability_ttl
+        self.countries_ttl = countries_ttl
+        self.clock = clock
+        self._entries: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    async def _cached(
+        self,
+        key: Tuple[str, str],
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > self.clock():
+            return entry[1]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters get the error; nobody else needs to retrieve it
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        if ttl > 0:
+            self._entries[key] = (self.clock() + ttl, value)
+        future.set_result(value)
+        return value
+
+    def _list_countries(self) -> List[str]:
+        return [country.country_code for country in self.client.available_phone_numbers.list()]
+
+    def _fetch_prices(self, country_code: str) -> List[Dict[str, Any]]:
+        pricing = self.client.pricing.v1.phone_numbers.countries(country_code).fetch()
+        return pricing.phone_number_prices
+
+    def _list_numbers(self, country_code: str, number_type: str) -> List[str]:
+        numbers = getattr(
+            self.client.available_phone_numbers(country_code), number_type
+        ).list(limit=SEARCH_LIMIT)
+        return [number.phone_number for number in numbers]
+
+    async def country_codes(self) -> List[str]:
+        async def fetch() -> List[str]:
+            logger.info("Fetching available country codes from Twilio")
+            return await asyncio.to_thread(self._list_countries)
+
+        return list(await self._cached(('countries', ''), self.countries_ttl, fetch))
+
+    async def pricing(self, country_code: str) -> Dict[str, float]:
+        async def fetch() -> Dict[str, float]:
+            logger.info(f"Fetching pricing information for {country_code}")
+            prices = await asyncio.to_thread(self._fetch_prices, country_code)
+            return monthly_costs(prices)
+
+        return await self._cached(('pricing', country_code), self.pricing_ttl, fetch)
+
+    async def _numbers_of_type(self, country_code: str, number_type: str) -> List[str]:
+        try:
+            return await asyncio.to_thread(self._list_numbers, country_code, number_type)
+        except Exception as e:
+            logger.error(f"Error processing {number_type} numbers for {country_code}: {str(e)}")
+            return []
+
+    async def _search(self, country_code: str) -> Dict[str, Dict]:
+        number_types = list(NUMBER_TYPE_PRICING)
+        pricing_task = asyncio.ensure_future(self.pricing(country_code))
+        results = await asyncio.gather(
+            *(self._numbers_of_type(country_code, number_type) for number_type in number_types)
+        )
+        try:
+            costs = await pricing_task
+        except Exception as e:
+            logger.error(f"Error fetching pricing for {country_code}: {str(e)}")
+            costs = {}
+
+        available_numbers: Dict[str, Dict] = {}
+        for number_type, numbers_list in zip(number_types, results):
+            if numbers_list:
+                available_numbers[number_type] = {
+                    "monthly_cost": costs.get(number_type),
+                    "numbers": numbers_list
+                }
+        return available_numbers
+
+    async def available_numbers(self, country_code: str) -> Dict[str, Dict]:
+        logger.info(f"Fetching available numbers for country code: {country_code}")
+        available_numbers = await self._cached(
+            ('available', country_code),
+            self.availability_ttl,
+            lambda: self._search(country_code)
+        )
+
+        # For GB (United Kingdom), offer only mobile numbers when there are
+        # any, to avoid regulatory issues with the other types
+        if country_code == "GB" and "mobile" in available_numbers:
+            logger.info("Found GB mobile numbers, prioritizing these to avoid regulatory issues")
+            return {"mobile": dict(available_numbers["mobile"])}
+
+        total_numbers = sum(len(group["numbers"]) for group in available_numbers.values())
+        logger.info(f"Completed fetching numbers for {country_code}: found {total_numbers} numbers across {len(available_numbers)} types")
+        return {number_type: dict(group) for number_type, group in available_numbers.items()}
+
+    def discard_number(self, phone_number: str) -> None:
+        """Drop a number we just bought from every cached search result."""
+        for key, (expires_at, available_numbers) in list(self._entries.items()):
+            if key[0] != 'available':
+                continue
+            remaining: Dict[str, Dict] = {}
+            for number_type, group in available_numbers.items():
+                numbers = [number for number in group["numbers"] if number != phone_number]
+                if numbers:
+                    remaining[number_type] = {**group, "numbers": numbers}
+            self._entries[key] = (expires_at, remaining)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+number_search = NumberSearchService(
+    client,
+    pricing_ttl=settings.TWILIO_PRICING_CACHE_TTL_SECONDS,
+    availability_ttl=settings.TWILIO_AVAILABILITY_CACHE_TTL_SECONDS,
+    countries_ttl=settings.TWILIO_COUNTRY_CODES_CACHE_TTL_SECONDS,
+)
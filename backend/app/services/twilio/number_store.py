@@ -0,0 +1,211 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from postgrest.exceptions import APIError
+
+from app.core.logging_setup import logger
+from app.clients.supabase_client import get_supabase
+
+""" PROVISIONED NUMBER PERSISTENCE """
+
+STORE_NUMBER_RPC = 'store_provisioned_number'
+
+# PostgREST error code for a function missing from its schema cache
+MISSING_FUNCTION_CODE = 'PGRST202'
+
+
+def new_results() -> Dict[str, Any]:
+    return {
+        'twilio_numbers_success': False,
+        'guided_setup_success': False,
+        'users_success': False,
+        'overall_success': False,
+        'error_messages': []
+    }
+
+
+def with_twilio_number(telephony_numbers: Any, phone_number: str) -> Dict[str, Any]:
+    """Copy of a user's telephony_numbers JSONB with `phone_number` added."""
+    if not isinstance(telephony_numbers, dict):
+        if telephony_numbers:
+            logger.warning(f"telephony_numbers is not a dictionary: {telephony_numbers}")
+        telephony_numbers = {}
+    twilio_numbers = telephony_numbers.get('twilio') or []
+    if not isinstance(twilio_numbers, list):
+        twilio_numbers = []
+    if phone_number not in twilio_numbers:
+        twilio_numbers = [*twilio_numbers, phone_number]
+    return {**telephony_numbers, 'twilio': twilio_numbers}
+
+
+class ProvisioningStore:
+    """
+    Writes a purchased number to twilio_numbers, guided_setup and users as
+    one unit.
+
+    The `store_provisioned_number` database function does all three writes in
+    a single transaction and round trip. Until that migration is applied the
+    store falls back to a batch: the current user and guided_setup rows are
+    read together, the twilio_numbers row is inserted, the two updates are
+    sent concurrently, and any write that went through is undone if the user
+    update fails. Either way the caller sees all writes or none.
+    """
+
+    def __init__(self):
+        self.rpc_available: Optional[bool] = None
+
+    async def store(
+        self,
+        phone_number: str,
+        user_id: str,
+        number_sid: str,
+        account_sid: str,
+        is_trial: bool
+    ) -> Dict[str, Any]:
+        supabase = await get_supabase()
+        if self.rpc_available is not False:
+            try:
+                results = await self._store_rpc(
+                    supabase, phone_number, user_id, number_sid, account_sid, is_trial
+                )
+                self.rpc_available = True
+                return results
+            except APIError as e:
+                if e.code != MISSING_FUNCTION_CODE:
+                    results = new_results()
+                    results['error_messages'].append(f"Error storing phone number: {e.message}")
+                    logger.error(f"{STORE_NUMBER_RPC} failed for {phone_number}: {e.message}")
+                    return results
+                logger.warning(f"{STORE_NUMBER_RPC} is not deployed, storing number with batched writes")
+                self.rpc_available = False
+            except Exception as e:
+                results = new_results()
+                results['error_messages'].append(f"Error storing phone number: {str(e)}")
+                logger.error(f"{STORE_NUMBER_RPC} failed for {phone_number}: {str(e)}")
+                return results
+        return await self._store_batch(
+            supabase, phone_number, user_id, number_sid, account_sid, is_trial
+        )
+
+    async def _store_rpc(
+        self,
+        supabase: Any,
+        phone_number: str,
+        user_id: str,
+        number_sid: str,
+        account_sid: str,
+        is_trial: bool
+    ) -> Dict[str, Any]:
+        response = await supabase.rpc(STORE_NUMBER_RPC, {
+            'p_phone_number': phone_number,
+            'p_user_id': user_id,
+            'p_number_sid': number_sid,
+            'p_account_sid': account_sid,
+            'p_is_trial': is_trial
+        }).execute()
+        results = new_results()
+        results.update(response.data or {})
+        if not results['guided_setup_success']:
+            results['error_messages'].append("Failed to update guided_setup table - record may not exist")
+        results['overall_success'] = results['twilio_numbers_success'] and results['users_success']
+        return results
+
+    async def _store_batch(
+        self,
+        supabase: Any,
+        phone_number: str,
+        user_id: str,
+        number_sid: str,
+        account_sid: str,
+        is_trial: bool
+    ) -> Dict[str, Any]:
+        results = new_results()
+        errors: List[str] = results['error_messages']
+
+        try:
+            user_result, setup_result = await asyncio.gather(
+                supabase.table('users').select('telephony_numbers').eq('id', user_id).execute(),
+                supabase.table('guided_setup').select('phone_number').eq('user_id', user_id).execute()
+            )
+        except Exception as e:
+            errors.append(f"Error reading user records: {str(e)}")
+            logger.error(errors[-1])
+            return results
+
+        if not user_result.data:
+            errors.append(f"User {user_id} not found")
+            logger.error(errors[-1])
+            return results
+        telephony_numbers = with_twilio_number(user_result.data[0].get('telephony_numbers'), phone_number)
+        previous_setup_number = setup_result.data[0].get('phone_number') if setup_result.data else None
+
+        try:
+            inserted = await supabase.table('twilio_numbers').insert({
+                'phone_number': phone_number,
+                'owner_user_id': user_id,
+                'number_sid': number_sid,
+                'account_sid': account_sid,
+                'status': 'active',
+                'created_at': datetime.now().isoformat(),
+                'is_trial_number': is_trial
+            }).execute()
+        except Exception as e:
+            errors.append(f"Error storing in twilio_numbers table: {str(e)}")
+            logger.error(errors[-1])
+            return results
+        if not inserted.data:
+            errors.append("Failed to store number in twilio_numbers table")
+            logger.error(errors[-1])
+            return results
+
+        setup_update, user_update = await asyncio.gather(
+            supabase.table('guided_setup').update({
+                'phone_number': phone_number
+            }).eq('user_id', user_id).execute(),
+            supabase.table('users').update({
+                'telephony_numbers': telephony_numbers
+            }).eq('id', user_id).execute(),
+            return_exceptions=True
+        )
+
+        setup_updated = not isinstance(setup_update, BaseException) and bool(setup_update.data)
+        if isinstance(setup_update, BaseException):
+            errors.append(f"Error updating guided_setup table: {str(setup_update)}")
+        elif not setup_update.data:
+            errors.append("Failed to update guided_setup table - record may not exist")
+
+        if isinstance(user_update, BaseException) or not user_update.data:
+            detail = str(user_update) if isinstance(user_update, BaseException) else "no rows updated"
+            errors.append(f"Error updating users table: {detail}")
+            logger.error(f"{errors[-1]}; rolling back stored number {phone_number}")
+            await self._compensate(supabase, phone_number, user_id, setup_updated, previous_setup_number)
+            return results
+
+        results['twilio_numbers_success'] = True
+        results['guided_setup_success'] = setup_updated
+        results['users_success'] = True
+        results['overall_success'] = True
+        return results
+
+    async def _compensate(
+        self,
+        supabase: Any,
+        phone_number: str,
+        user_id: str,
+        setup_updated: bool,
+        previous_setup_number: Optional[str]
+    ) -> None:
+        undo = [supabase.table('twilio_numbers').delete().eq('phone_number', phone_number).execute()]
+        if setup_updated:
+            undo.append(
+                supabase.table('guided_setup').update({
+                    'phone_number': previous_setup_number
+                }).eq('user_id', user_id).execute()
+            )
+        for outcome in await asyncio.gather(*undo, return_exceptions=True):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Failed to roll back stored number {phone_number}: {str(outcome)}")
+
+
+provisioning_store = ProvisioningStore()
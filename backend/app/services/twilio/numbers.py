@@ -1,12 +1,14 @@
 from typing import Dict, Any, Optional, Tuple
 from app.core.logging_setup import logger
 from fastapi import HTTPException
-from datetime import datetime
+import asyncio
 
-from app.services.twilio.helper import get_available_numbers, purchase_number
+from app.services.twilio.helper import get_available_numbers, purchase_number, release_purchased_number
+from app.services.twilio.number_store import provisioning_store
 from app.clients.supabase_client import get_supabase
-from app.services.vapi.utils import register_phone_number_with_vapi
+from app.services.vapi.utils import deregister_phone_number_from_vapi, register_phone_number_with_vapi
 from app.services.guided_setup.setup_crud import get_phone_number_handler
+from app.services.voice.call_routing import NUMBER_CHANGED, publish_routing_event
 
 
 async def check_user_has_number(user_id: str) -> Tuple[bool, Optional[str]]:
@@ -44,7 +46,8 @@ async def store_phone_number(
     is_trial: bool
 ) -> Dict[str, Any]:
     """
-    Store a purchased phone number in the database across multiple tables
+    Store a purchased phone number in the database across multiple tables.
+    The writes are applied as one unit; on failure none of them are kept.
     
     Args:
         phone_number: The purchased phone number
@@ -57,109 +60,17 @@ async def store_phone_number(
         Dict with storage result information including success status of each operation
     """
     logger.info(f"Storing phone number {phone_number} for user {user_id}")
-    supabase = await get_supabase()
-    now = datetime.now().isoformat()
-    
-    # Track results of each operation
-    results = {
-        'twilio_numbers_success': False,
-        'guided_setup_success': False,
-        'users_success': False,
-        'overall_success': False,
-        'error_messages': []
-    }
-    
-    # 1. Store in twilio_numbers table
-    logger.info(f"Storing number in twilio_numbers table")
-    try:
-        db_result = await supabase.table('twilio_numbers').insert({
-            'phone_number': phone_number,
-            'owner_user_id': user_id,
-            'number_sid': number_sid,
-            'account_sid': account_sid,
-            'status': 'active',
-            'created_at': now,
-            'is_trial_number': is_trial
-        }).execute()
-        
-        if not db_result.data:
-            logger.error(f"Failed to store number {phone_number} in twilio_numbers table")
-            results['error_messages'].append("Failed to store number in twilio_numbers table")
-        else:
-            logger.info(f"Successfully stored number in twilio_numbers table")
-            results['twilio_numbers_success'] = True
-    except Exception as e:
-        error_msg = f"Error storing in twilio_numbers table: {str(e)}"
-        logger.error(error_msg)
-        results['error_messages'].append(error_msg)
-    
-    # 2. Update the guided_setup table
-    logger.info(f"Updating guided_setup table with number {phone_number}")
-    try:
-        guided_setup_result = await supabase.table('guided_setup').update({
-            'phone_number': phone_number
-        }).eq('user_id', user_id).execute()
-        
-        if not guided_setup_result.data:
-            logger.warning(f"Failed to update guided_setup table - record may not exist for user {user_id}")
-            results['error_messages'].append("Failed to update guided_setup table - record may not exist")
-        else:
-            logger.info(f"Successfully updated guided_setup table")
-            results['guided_setup_success'] = True
-    except Exception as e:
-        error_msg = f"Error updating guided_setup table: {str(e)}"
-        logger.error(error_msg)
-        results['error_messages'].append(error_msg)
-    
-    # 3. Update user's record with the new Twilio number
-    logger.info(f"Updating user record with new Twilio number")
-    try:
-        # Get existing telephony_numbers from user record
-        user_result = await supabase.table('users').select('telephony_numbers').eq('id', user_id).execute()
-        
-        # Initialize the telephony_numbers structure if needed
-        telephony_numbers = {}
-        twilio_numbers = []
-        
-        if user_result.data and len(user_result.data) > 0:
-            # Extract the existing telephony_numbers JSONB
-            telephony_numbers = user_result.data[0].get('telephony_numbers', {}) or {}
-            
-            # Extract the existing Twilio numbers array or create it
-            if isinstance(telephony_numbers, dict):
-                twilio_numbers = telephony_numbers.get('twilio', []) or []
-            else:
-                logger.warning(f"telephony_numbers is not a dictionary: {telephony_numbers}")
-                telephony_numbers = {}
-                twilio_numbers = []
-        
-        # Add the new number if it's not already in the list
-        if phone_number not in twilio_numbers:
-            twilio_numbers.append(phone_number)
-        
-        # Update the telephony_numbers structure
-        telephony_numbers['twilio'] = twilio_numbers
-        
-        # Update the user record with the modified telephony_numbers JSONB
-        logger.info(f"Updating users table with new telephony_numbers: {telephony_numbers}")
-        user_update_result = await supabase.table('users').update({
-            'telephony_numbers': telephony_numbers
-        }).eq('id', user_id).execute()
-        
-        if not user_update_result.data:
-            logger.warning(f"Failed to update user's telephony_numbers")
-            results['error_messages'].append("Failed to update user's telephony_numbers")
-        else:
-            logger.info(f"Successfully updated user's telephony_numbers with Twilio number: {phone_number}")
-            results['users_success'] = True
-    except Exception as e:
-        error_msg = f"Error updating users table: {str(e)}"
-        logger.error(error_msg)
-        results['error_messages'].append(error_msg)
-    
-    # Determine overall success - consider successful if at least the twilio_numbers entry was created
-    # since that's the most critical piece
-    results['overall_success'] = results['twilio_numbers_success']
+    results = await provisioning_store.store(
+        phone_number=phone_number,
+        user_id=user_id,
+        number_sid=number_sid,
+        account_sid=account_sid,
+        is_trial=is_trial
+    )
+    
+    # The writes are applied together, so success means every table was updated
+    if results['overall_success']:
+        await publish_routing_event({'type': NUMBER_CHANGED, 'phone_number': phone_number})
     
     logger.info(f"Completed storing phone number {phone_number} for user {user_id}")
     logger.info(f"Operation results: {results}")
@@ -172,6 +83,35 @@ async def store_phone_number(
         'operation_results': results
     }
 
+async def get_trial_status(user_id: str) -> bool:
+    """Whether the user is on a trial"""
+    supabase = await get_supabase()
+    logger.info(f"Checking if user {user_id} is on trial")
+    user_result = await supabase.table('users').select('is_trial').eq('id', user_id).execute()
+    
+    is_trial = False
+    if user_result.data and len(user_result.data) > 0:
+        is_trial = user_result.data[0].get('is_trial', False)
+    
+    logger.info(f"User {user_id} trial status: {is_trial}")
+    return is_trial
+
+async def discard_purchased_number(phone_number: str, number_sid: str, vapi_result: Any) -> None:
+    """
+    Undo a purchase whose storage failed: take the number off Vapi if it was
+    registered there, then release it from Twilio. Failures are logged, not
+    raised, so the caller can report the original storage error.
+    """
+    if isinstance(vapi_result, dict) and vapi_result.get('id'):
+        try:
+            await deregister_phone_number_from_vapi(vapi_result['id'])
+        except Exception as deregister_error:
+            logger.error(f"Failed to deregister number {phone_number} from Vapi: {str(deregister_error)}")
+    try:
+        await release_purchased_number(number_sid)
+    except Exception as release_error:
+        logger.error(f"Failed to release number {phone_number}: {str(release_error)}")
+
 async def provision_user_phone_number(
     country_code: str,
     number_type: str,
@@ -218,9 +158,16 @@ async def provision_user_phone_number(
         number_type = 'mobile'
         logger.info(f"Country code is GB, defaulting to mobile number type")
     
-    # Get an available number from the specified country and type
+    # Search for numbers and read the user's trial status together
     logger.info(f"Fetching available numbers for country_code={country_code}, type={number_type}")
-    available_numbers = get_available_numbers(country_code)
+    try:
+        available_numbers, is_trial = await asyncio.gather(
+            get_available_numbers(country_code),
+            get_trial_status(user_id)
+        )
+    except Exception as e:
+        logger.error(f"Failed to provision number: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to provision number: {str(e)}")
     
     if not available_numbers or number_type not in available_numbers:
         logger.error(f"No available {number_type} numbers found for country code {country_code}")
@@ -234,51 +181,46 @@ async def provision_user_phone_number(
     logger.info(f"Selected phone number {phone_number} for user {user_id}")
     
     try:
-        # Check if user is on trial
-        supabase = await get_supabase()
-        logger.info(f"Checking if user {user_id} is on trial")
-        user_result = await supabase.table('users').select('is_trial').eq('id', user_id).execute()
-        
-        is_trial = False
-        if user_result.data and len(user_result.data) > 0:
-            is_trial = user_result.data[0].get('is_trial', False)
-        
-        logger.info(f"User {user_id} trial status: {is_trial}")
-        
         # Purchase the number from Twilio
         logger.info(f"Initiating purchase of number {phone_number} for user {user_id}")
         purchase_result = await purchase_number(phone_number=phone_number)
-        # purchase_result = {
-        #     "success": True,
-        #     "number_sid": "1234567890",
-        #     "account_sid": "1234567890",
-        #     "phone_number": phone_number
-        # }
-        
-
-        # Store the purchased number in database
-        logger.info(f"Storing purchased number in database")
-        storage_result = await store_phone_number(
-            phone_number=phone_number,
-            user_id=user_id,
-            number_sid=purchase_result['number_sid'],
-            account_sid=purchase_result['account_sid'],
-            is_trial=is_trial
-        )
         
-        # Register the number with Vapi instead of LiveKit
-        logger.info(f"Registering number {phone_number} with Vapi")
-        try:
-            vapi_result = await register_phone_number_with_vapi(
+        # Store the number and register it with Vapi at the same time; Vapi
+        # only needs the purchased number and the owner's assistant
+        logger.info(f"Storing purchased number in database and registering it with Vapi")
+        storage_result, vapi_result = await asyncio.gather(
+            store_phone_number(
+                phone_number=phone_number,
+                user_id=user_id,
+                number_sid=purchase_result['number_sid'],
+                account_sid=purchase_result['account_sid'],
+                is_trial=is_trial
+            ),
+            register_phone_number_with_vapi(
                 phone_number=phone_number,
                 twilio_account_sid=purchase_result['account_sid'],
+                user_id=user_id
+            ),
+            return_exceptions=True
+        )
+        
+        if isinstance(storage_result, BaseException) or not storage_result.get('success'):
+            # Don't keep paying for a number no user record points at
+            errors = (
+                str(storage_result) if isinstance(storage_result, BaseException)
+                else "; ".join(storage_result['operation_results']['error_messages'])
             )
+            logger.error(f"Failed to store number {phone_number}, releasing it: {errors}")
+            await discard_purchased_number(phone_number, purchase_result['number_sid'], vapi_result)
+            raise Exception(f"Failed to store number: {errors}")
+        
+        if isinstance(vapi_result, BaseException):
+            # Log the error but don't fail the entire process if Vapi registration fails
+            # - the number can be registered manually later
+            logger.error(f"Failed to register number with Vapi: {str(vapi_result)}")
+        else:
             logger.info(f"Successfully registered number {phone_number} with Vapi")
             logger.debug(f"Vapi registration result: {vapi_result}")
-        except Exception as vapi_error:
-            # Log the error but don't fail the entire process if Vapi registration fails
-            logger.error(f"Failed to register number with Vapi: {str(vapi_error)}")
-            # We'll continue with the process even if this fails - the number can be registered manually later
         
         # Add additional info to the response
         result = {
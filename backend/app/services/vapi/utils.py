@@ -1,4 +1,5 @@
 from app.core.logging_setup import logger
+import asyncio
 import os
 import requests
 from typing import Dict, Any, Optional, List
@@ -169,6 +170,7 @@ async def get_user_notification_settings(user_id: str) -> Dict[str, Any]:
 async def register_phone_number_with_vapi(
     phone_number: str,
     twilio_account_sid: Optional[str] = None,
+    user_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Register a purchased Twilio phone number with Vapi.ai
@@ -176,6 +178,7 @@ async def register_phone_number_with_vapi(
     Args:
         phone_number: The purchased phone number
         twilio_account_sid: Optional Twilio account SID (if not provided, will use environment variables)
+        user_id: Optional owner of the number (if not provided, looked up from guided_setup)
         
     Returns:
         Dict with the API response from Vapi
@@ -201,7 +204,7 @@ async def register_phone_number_with_vapi(
         raise ValueError(error_msg)
 
     # Get the user ID associated with this phone number
-    user_id = await get_user_id(phone_number)
+    user_id = user_id or await get_user_id(phone_number)
     if not user_id:
         error_msg = f"No user found for phone number {phone_number}"
         logger.error(error_msg)
@@ -222,7 +225,8 @@ async def register_phone_number_with_vapi(
     try:
         # Make the API request to Vapi
         logger.info(f"Making API request to Vapi for phone number {phone_number}")
-        response = requests.post(
+        response = await asyncio.to_thread(
+            requests.post,
             "https://api.vapi.ai/phone-number",
             headers={
                 "Authorization": f"Bearer {vapi_api_key}",
@@ -260,3 +264,26 @@ async def register_phone_number_with_vapi(
                 logger.error(f"Vapi API error status code: {e.response.status_code}")
         
         raise Exception(error_msg)
+
+
+async def deregister_phone_number_from_vapi(vapi_phone_number_id: str) -> None:
+    """
+    Remove a phone number registered with Vapi.ai, e.g. when provisioning
+    fails after registration succeeded.
+
+    Raises:
+        Exception: If the API request fails
+    """
+    logger.info(f"Deregistering Vapi phone number {vapi_phone_number_id}")
+    try:
+        response = await asyncio.to_thread(
+            requests.delete,
+            f"https://api.vapi.ai/phone-number/{vapi_phone_number_id}",
+            headers={"Authorization": f"Bearer {settings.VAPI_API_PRIVATE_KEY}"},
+        )
+        response.raise_for_status()
+    except requests.RequestException as e:
+        error_msg = f"Failed to deregister phone number from Vapi: {str(e)}"
+        logger.error(error_msg)
+        raise Exception(error_msg)
+    logger.info(f"Deregistered Vapi phone number {vapi_phone_number_id}")
@@ -5,6 +5,10 @@ from typing import Any, Dict, List, Union
 from uuid import UUID
 
 from app.clients.supabase_client import get_supabase
+from app.services.voice.opening_line_cache import schedule_opening_line_render
+from app.services.voice.call_routing import AGENT_UPDATED, publish_routing_event
+
+OPENING_LINE_FIELDS = ('openingLine', 'voice', 'voiceProvider', 'language')
 # system prompt scaffold
 sys_prompt_scaffold = """
 # Role
@@ -194,6 +198,8 @@ async def create_agent(data: Dict[str, Any]) -> Dict[str, Any]:
 
     supabase = await get_supabase()
     new_agent = await supabase.table('agents').insert(data).execute()
+    if new_agent.data:
+        schedule_opening_line_render(new_agent.data[0])
     return new_agent
 
 async def get_agents(user_id: str) -> Dict[str, List[Dict[str, Any]]]:
@@ -262,6 +268,9 @@ async def update_agent(agent_id: Union[int, str, UUID], data: Dict[str, Any]) ->
             
         supabase = await get_supabase()
         response = await supabase.table('agents').update(data).eq('id', agent_id).execute()
+        if response.data and any(field in data for field in OPENING_LINE_FIELDS):
+            schedule_opening_line_render(response.data[0])
+        await publish_routing_event({'type': AGENT_UPDATED, 'agent_id': str(agent_id)})
         return response
     except Exception as e:
         logger.error(f"Error updating agent: {str(e)}")
@@ -0,0 +1,176 @@
+import asyncio
+import json
+from typing import Any, Dict, Iterable, Optional
+
+from supabase import Client
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+from app.clients.supabase_client import get_supabase
+from app.services.redis_service import cache_redis
+
+""" INBOUND CALL ROUTING """
+
+ROUTING_CHANNEL = "routing:phone_numbers"
+
+NUMBER_CHANGED = "number_changed"
+NUMBER_RELEASED = "number_released"
+AGENT_UPDATED = "agent_updated"
+
+
+class PhoneRoutingTable:
+    """
+    In-memory phone number -> agent id table held by each LiveKit worker.
+
+    Loaded at prewarm alongside the agent configs it points at, and kept
+    fresh by invalidation events on a Redis channel. A number missing from
+    the table falls back to the database and is cached. The whole table is
+    reloaded whenever the subscription reconnects, since events published
+    while disconnected are lost, and every `reload_seconds` as a backstop.
+    """
+
+    def __init__(self, client: Any, reload_seconds: float, channel: str = ROUTING_CHANNEL):
+        self.client = client
+        self.reload_seconds = reload_seconds
+        self.channel = channel
+        self._routes: Dict[str, str] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, phone_number: str) -> Optional[str]:
+        return self._routes.get(phone_number)
+
+    def set_route(self, phone_number: str, agent_id: Optional[str]) -> None:
+        if agent_id:
+            self._routes[phone_number] = agent_id
+        else:
+            self._routes.pop(phone_number, None)
+
+    def replace(self, rows: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+        self._routes = {
+            row['phone_number']: row['assigned_agent_id']
+            for row in rows
+            if row.get('phone_number') and row.get('assigned_agent_id')
+        }
+        return dict(self._routes)
+
+    def load(self, supabase: Client) -> Dict[str, str]:
+        """Load every assigned number with the worker's sync client (prewarm)."""
+        response = (
+            supabase.table('twilio_numbers')
+            .select('phone_number, assigned_agent_id')
+            .not_.is_('assigned_agent_id', 'null')
+            .execute()
+        )
+        routes = self.replace(response.data or [])
+        logger.info(f"Loaded {len(routes)} phone number routes")
+        return routes
+
+    async def reload(self) -> None:
+        supabase = await get_supabase()
+        response = await (
+            supabase.table('twilio_numbers')
+            .select('phone_number, assigned_agent_id')
+            .not_.is_('assigned_agent_id', 'null')
+            .execute()
+        )
+        routes = self.replace(response.data or [])
+        logger.info(f"Reloaded {len(routes)} phone number routes")
+
+    async def refresh_number(self, phone_number: str) -> Optional[str]:
+        supabase = await get_supabase()
+        result = await (
+            supabase.table('twilio_numbers')
+            .select('assigned_agent_id')
+            .eq('phone_number', phone_number)
+            .execute()
+        )
+        agent_id = result.data[0].get('assigned_agent_id') if result.data else None
+        self.set_route(phone_number, agent_id)
+        return agent_id
+
+    async def resolve(self, phone_number: str) -> Optional[str]:
+        """Agent id for an inbound number: table first, database on a miss."""
+        self.ensure_listener()
+        agent_id = self.lookup(phone_number)
+        if agent_id is not None:
+            self.hits += 1
+            return agent_id
+        self.misses += 1
+        logger.info(f"Routing table miss for {phone_number}, querying database")
+        return await self.refresh_number(phone_number)
+
+    async def apply_event(self, event: Dict[str, Any]) -> None:
+        kind = event.get('type')
+        if kind == NUMBER_RELEASED:
+            self.set_route(event['phone_number'], None)
+        elif kind == NUMBER_CHANGED:
+            await self.refresh_number(event['phone_number'])
+        elif kind == AGENT_UPDATED:
+            # Imported here so publishers do not pull in the voice plugins
+            from app.services.voice.worker_resources import worker_resources
+            worker_resources.invalidate_agent_config(event['agent_id'])
+        else:
+            logger.warning(f"Ignoring unknown routing event: {event}")
+
+    def ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        backoff = 0.5
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                await self.reload()
+                backoff = 0.5
+                loop = asyncio.get_running_loop()
+                next_reload = loop.time() + self.reload_seconds
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=max(0.0, next_reload - loop.time())
+                    )
+                    if loop.time() >= next_reload:
+                        # Assignments can also change outside this service
+                        await self.reload()
+                        next_reload = loop.time() + self.reload_seconds
+                    if message is None or message.get('type') != 'message':
+                        continue
+                    try:
+                        await self.apply_event(json.loads(message['data']))
+                    except Exception as e:
+                        logger.error(f"Failed to apply routing event {message['data']!r}: {str(e)}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Routing listener error, reconnecting in {backoff}s: {str(e)}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"routes": len(self._routes), "hits": self.hits, "misses": self.misses}
+
+
+call_routing = PhoneRoutingTable(cache_redis, settings.CALL_ROUTING_RELOAD_SECONDS)
+
+
+async def publish_routing_event(event: Dict[str, Any]) -> None:
+    """Tell every LiveKit worker to refresh a route or agent config."""
+    try:
+        await cache_redis.publish(ROUTING_CHANNEL, json.dumps(event))
+    except Exception as e:
+        # Workers still pick the change up on their next reload or config TTL
+        logger.error(f"Failed to publish routing event {event}: {str(e)}")
@@ -0,0 +1,183 @@
+import asyncio
+import inspect
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from livekit import rtc
+
+from app.core.logging_setup import logger
+
+""" CALL LIFECYCLE TIMERS """
+
+TimerKey = Tuple[str, str]  # (room_name, timer kind)
+
+SILENCE = "silence"
+MAX_DURATION = "max_duration"
+PARTICIPANT_JOIN = "participant_join"
+
+
+@dataclass
+class _Timer:
+    key: TimerKey
+    callback: Callable[[], Any]
+    delay: float
+    slot: int
+    rounds: int
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel shared by every call in a worker process.
+
+    A single driver task advances one slot per tick while any timer is armed,
+    so the number of wakeups does not grow with the number of active calls.
+    Scheduling, resetting and cancelling a timer are O(1); timers never fire
+    early and fire with up to one tick of lateness.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 512):
+        self.tick_seconds = tick_seconds
+        self.slots = slots
+        self._wheel: list[Dict[TimerKey, _Timer]] = [{} for _ in range(slots)]
+        self._timers: Dict[TimerKey, _Timer] = {}
+        self._by_owner: Dict[str, Set[TimerKey]] = defaultdict(set)
+        self._cursor = 0
+        # Loop time of the next advance, set while the driver runs
+        self._next_tick = 0.0
+        self._driver: Optional[asyncio.Task] = None
+        # Async callbacks in flight; the loop only keeps weak references
+        self._callbacks: Set[asyncio.Future] = set()
+
+    def schedule(self, key: TimerKey, delay: float, callback: Callable[[], Any]) -> None:
+        """Arm (or re-arm) the timer `key` to run `callback` after `delay` seconds."""
+        self.cancel(key)
+        self._ensure_driver()
+        # The next advance may be less than a tick away, so count ticks from
+        # it and round up
+        now = asyncio.get_running_loop().time()
+        ticks = max(1, math.ceil((now + delay - self._next_tick) / self.tick_seconds - 1e-9) + 1)
+        slot = (self._cursor + ticks) % self.slots
+        rounds = (ticks - 1) // self.slots
+        timer = _Timer(key=key, callback=callback, delay=delay, slot=slot, rounds=rounds)
+        self._wheel[slot][key] = timer
+        self._timers[key] = timer
+        self._by_owner[key[0]].add(key)
+
+    def reset(self, key: TimerKey) -> bool:
+        """Push an armed timer back by its original delay. Returns False if not armed."""
+        timer = self._timers.get(key)
+        if timer is None:
+            return False
+        self.schedule(key, timer.delay, timer.callback)
+        return True
+
+    def cancel(self, key: TimerKey) -> bool:
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        self._wheel[timer.slot].pop(key, None)
+        owner_keys = self._by_owner.get(key[0])
+        if owner_keys is not None:
+            owner_keys.discard(key)
+            if not owner_keys:
+                del self._by_owner[key[0]]
+        return True
+
+    def cancel_all(self, owner: str) -> None:
+        """Cancel every timer belonging to one call (room)."""
+        for key in list(self._by_owner.get(owner, ())):
+            self.cancel(key)
+
+    def is_armed(self, key: TimerKey) -> bool:
+        return key in self._timers
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def _ensure_driver(self) -> None:
+        if self._driver is None or self._driver.done():
+            self._next_tick = asyncio.get_running_loop().time() + self.tick_seconds
+            self._driver = asyncio.create_task(self._drive())
+
+    async def _drive(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._timers:
+            # Sleep to an absolute deadline so ticks do not drift under load
+            await asyncio.sleep(max(0.0, self._next_tick - loop.time()))
+            self._next_tick += self.tick_seconds
+            self._advance()
+
+    def _advance(self) -> None:
+        self._cursor = (self._cursor + 1) % self.slots
+        bucket = self._wheel[self._cursor]
+        expired = []
+        for timer in list(bucket.values()):
+            if timer.rounds > 0:
+                timer.rounds -= 1
+            else:
+                expired.append(timer)
+        for timer in expired:
+            self.cancel(timer.key)
+            self._fire(timer)
+
+    def _fire(self, timer: _Timer) -> None:
+        try:
+            result = timer.callback()
+            if inspect.isawaitable(result):
+                task = asyncio.ensure_future(result)
+                self._callbacks.add(task)
+                task.add_done_callback(lambda done: self._callback_done(timer.key, done))
+        except Exception as e:
+            logger.error(f"Timer {timer.key} callback failed: {str(e)}", exc_info=True)
+
+    def _callback_done(self, key: TimerKey, task: asyncio.Future) -> None:
+        self._callbacks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            error = task.exception()
+            logger.opt(exception=error).error(f"Timer {key} callback failed: {str(error)}")
+
+
+timer_wheel = TimerWheel()
+
+
+async def wait_for_first_participant(
+    room: rtc.Room,
+    timeout: float,
+    wheel: TimerWheel = timer_wheel
+) -> Optional[rtc.RemoteParticipant]:
+    """
+    Return the earliest remote participant in `room`, waiting for the
+    `participant_connected` event if nobody has joined yet. Returns None if
+    nobody joins within `timeout` seconds.
+    """
+    def earliest() -> Optional[rtc.RemoteParticipant]:
+        participants = sorted(
+            room.remote_participants.values(),
+            key=lambda p: p.joined_at if hasattr(p, 'joined_at') else 0
+        )
+        return participants[0] if participants else None
+
+    participant = earliest()
+    if participant is not None:
+        return participant
+
+    future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def on_participant_connected(connected: rtc.RemoteParticipant) -> None:
+        if not future.done():
+            future.set_result(connected)
+
+    def on_deadline() -> None:
+        if not future.done():
+            future.set_result(None)
+
+    key = (room.name, PARTICIPANT_JOIN)
+    room.on("participant_connected", on_participant_connected)
+    wheel.schedule(key, timeout, on_deadline)
+    try:
+        return await future
+    finally:
+        wheel.cancel(key)
+        room.off("participant_connected", on_participant_connected)
@@ -1,14 +1,11 @@
 from app.core.logging_setup import logger
-from livekit import api
-import os
-
-from app.clients.supabase_client import get_supabase
+from app.services.voice.call_routing import call_routing
+from app.services.voice.room_lifecycle import room_service
 
 """ DETECT CALL TYPE (INBOUND, OUTBOUND, WEB), EXTRACT AGENT ID, AND CREATE VOICE ASSISTANT """
 
 async def get_agent_id_from_call_data(room_name: str):    
     try:
-        supabase = await get_supabase()
         # Extract phone number from room name (format: call-_+13614281772_2p9dY5xViH9b)
         phone_number = room_name.split('_')[1] if '_' in room_name else None
         
@@ -16,14 +13,13 @@ async def get_agent_id_from_call_data(room_name: str):
             logger.error(f"Could not extract phone number from room name: {room_name}")
             return None
             
-        # Query Supabase for the twilio number and get assigned_agent_id
-        result = await supabase.table('twilio_numbers').select('assigned_agent_id').eq('phone_number', phone_number).execute()
+        # Worker routing table, falling back to twilio_numbers on a miss
+        agent_id = await call_routing.resolve(phone_number)
         
-        if not result.data:
+        if not agent_id:
             logger.error(f"No matching twilio number found in database: {phone_number}")
             return None
             
-        agent_id = result.data[0]['assigned_agent_id']
         return agent_id
 
     except Exception as e:
@@ -42,23 +38,10 @@ async def get_room_metadata(room_name: str) -> str:
         str: The metadata string or None if not found
     """
     try:
-        livekit_api = api.LiveKitAPI(
-            url=os.getenv("LIVEKIT_URL"),
-            api_key=os.getenv("LIVEKIT_API_KEY"),
-            api_secret=os.getenv("LIVEKIT_API_SECRET")
-        )
-        
-        # List rooms and find the one with matching name
-        rooms_response = await livekit_api.room.list_rooms(api.ListRoomsRequest())
-        
-        for room in rooms_response.rooms:
-            if room.name == room_name:
-                await livekit_api.aclose()
-                return room.metadata
-                
-        logger.warning(f"Room {room_name} not found when retrieving metadata")
-        await livekit_api.aclose()
-        return None
+        metadata = await room_service.get_room_metadata(room_name)
+        if metadata is None:
+            logger.warning(f"Room {room_name} not found when retrieving metadata")
+        return metadata
         
     except Exception as e:
         logger.error(f"Error retrieving room metadata: {str(e)}")
@@ -1,6 +1,5 @@
 import os
 import uuid
-import asyncio
 from app.core.logging_setup import logger
 import re
 import time
@@ -13,35 +12,30 @@ from fastapi import HTTPException, BackgroundTasks
 from livekit import api
 from livekit.agents.voice_assistant import VoiceAssistant
 from livekit.agents import llm, JobContext
-from livekit.api import (
-    LiveKitAPI,
-    CreateRoomRequest,
-    ListRoomsRequest,
-    ListParticipantsRequest
-)
-from livekit.plugins import cartesia, deepgram, openai, silero, elevenlabs
-from supabase import create_client, Client
+from livekit.api import CreateRoomRequest
+from supabase import Client
 
 from app.core.config import settings
+from app.clients.lazy import build_clients
+from app.clients.supabase_client import supabase_sync
 from app.services.voice.tool_use import AgentFunctions
+from app.services.voice.worker_resources import worker_resources
+from app.services.chat.context_window import ContextState, context_window
+from app.services.voice.room_lifecycle import room_service
+from app.services.voice.call_routing import call_routing
+from app.services.voice.turn_latency import voice_latency
+from app.services.voice.opening_line_cache import (
+    opening_line_cache,
+    play_cached_audio,
+    schedule_opening_line_render,
+)
 
 load_dotenv()
 
-supabase: Client = create_client(
-    settings.SUPABASE_URL,
-    settings.SUPABASE_SERVICE_ROLE_KEY
-)
+supabase: Client = supabase_sync
 
 room_locks = {}
 
-async def create_livekit_api() -> LiveKitAPI:
-    return LiveKitAPI(
-        url=os.getenv("LIVEKIT_URL"),
-        api_key=os.getenv("LIVEKIT_API_KEY"),
-        api_secret=os.getenv("LIVEKIT_API_SECRET")
-    )
-
-
 """ ROOM FUNCTIONS """
 
 
@@ -87,7 +81,6 @@ async def token_gen(
             ))
         )
 
-        await asyncio.sleep(1)
         await check_and_create_room(room_name, token.to_jwt(), agent_id)
 
         return token.to_jwt(), livekit_server_url, room_name
@@ -96,12 +89,11 @@ async def token_gen(
 async def check_and_create_room(room_name: str, token: str, agent_id: str) -> None:
     logger.info(f"Checking room existence: {room_name}")
     try:
-        livekit_api = await create_livekit_api()
-        room_exists = await check_room_exists(livekit_api, room_name)
+        room_exists = await check_room_exists(room_name)
 
         if room_exists:
             logger.info(f"Room {room_name} already exists")
-            await print_room_details(livekit_api, room_name, agent_id)
+            await print_room_details(room_name, agent_id)
         else:
             logger.info(
                 f"Room {room_name} doesn't exist, creating it and starting the agent"
@@ -114,36 +106,28 @@ async def check_and_create_room(room_name: str, token: str, agent_id: str) -> No
             exc_info=True
         )
         raise HTTPException(status_code=500, detail="Error checking room existence")
-    finally:
-        await livekit_api.aclose()
 
 
-async def check_room_exists(livekit_api: LiveKitAPI, room_name: str) -> bool:
-    list_request = ListRoomsRequest()
-    rooms_response = await livekit_api.room.list_rooms(list_request)
-    return any(room.name == room_name for room in rooms_response.rooms)
+async def check_room_exists(room_name: str) -> bool:
+    return await room_service.room_exists(room_name)
 
 
-async def print_room_details(livekit_api: LiveKitAPI, room_name: str, agent_id: str) -> None:
-    list_request = ListRoomsRequest()
-    rooms_response = await livekit_api.room.list_rooms(list_request)
-    logger.info("Room exists. All rooms:")
-    for room in rooms_response.rooms:
+async def print_room_details(room_name: str, agent_id: str) -> None:
+    room = await room_service.get_room(room_name)
+    if room:
         logger.info(f"Room name: {room.name}, SID: {room.sid}")
 
     try:
-        list_participants_request = ListParticipantsRequest(room=room_name)
-        participants_response = await livekit_api.room.list_participants(
-            list_participants_request
-        )
+        participants = await room_service.list_participants(room_name)
         logger.info(f"\nParticipants in room '{room_name}':")
-        for participant in participants_response.participants:
+        for participant in participants:
             logger.info(
                 f"Participant: {participant.identity}, SID: {participant.sid}"
             )
     except api.twirp_client.TwirpError as e:
         if e.code == 'not_found' and 'room does not exist' in e.message:
             logger.warning(f"Room {room_name} not found when listing participants")
+            room_service.registry.mark_gone(room_name)
             token = (
                 api.AccessToken(os.getenv("LIVEKIT_API_KEY"), os.getenv("LIVEKIT_API_SECRET"))
                 .with_identity(f"agent_{agent_id}")
@@ -163,24 +147,17 @@ async def print_room_details(livekit_api: LiveKitAPI, room_name: str, agent_id:
 
 
 async def create_room(room_name: str, access_token: str, agent_id: str) -> None:
-    try:
-        logger.info(f"Starting create_agent_request for room: {room_name}")
-        livekit_api = await create_livekit_api()
-
-        create_request = CreateRoomRequest(
-            name=room_name,
-            empty_timeout=120,
-            max_participants=2
-        )
-        room = await livekit_api.room.create_room(create_request)
-        logger.info(f"Created room: {room.name} with SID: {room.sid}")
-
-        logger.info("Room created, starting agent")
-        await start_agent_request(access_token, agent_id, room_name)
+    logger.info(f"Starting create_agent_request for room: {room_name}")
+    create_request = CreateRoomRequest(
+        name=room_name,
+        empty_timeout=120,
+        max_participants=2
+    )
+    room = await room_service.create_room(create_request)
+    logger.info(f"Created room: {room.name} with SID: {room.sid}")
 
-    finally:
-        await livekit_api.aclose()
-        logger.info("livekit_api closed in create_room")
+    logger.info("Room created, starting agent")
+    await start_agent_request(access_token, agent_id, room_name)
 
 
 """ AGENT FUNCTIONS """
@@ -188,11 +165,8 @@ async def create_room(room_name: str, access_token: str, agent_id: str) -> None:
 
 async def start_agent_request(access_token: str, agent_id: str, room_name: str) -> None:
     logger.info(f"Starting agent request for room: {room_name}")
-    livekit_api = await create_livekit_api()
     try:
-        room = await livekit_api.room.create_room(
-            CreateRoomRequest(name=room_name)
-        )
+        room = await room_service.ensure_room(room_name)
         logger.info(f"Room verified: {room.name} with SID: {room.sid}")
 
         logger.info("Initializing agent session")
@@ -201,9 +175,6 @@ async def start_agent_request(access_token: str, agent_id: str, room_name: str)
     except Exception as e:
         logger.error(f"Error in start_agent_request: {str(e)}", exc_info=True)
         raise
-    finally:
-        await livekit_api.aclose()
-        logger.info("LiveKit API connection closed")
 
 
 async def maintain_agent_session(room_name: str, agent_id: str) -> None:
@@ -215,25 +186,6 @@ async def maintain_agent_session(room_name: str, agent_id: str) -> None:
         logger.error(f"Session maintenance error: {str(e)}", exc_info=True)
 
 
-lang_options = {
-    "en-US": {
-        "deepgram": "en-US",
-        "cartesia": "en",
-        "cartesia_model": "sonic-english"
-    },
-    "en-GB": {
-        "deepgram": "en-GB",
-        "cartesia": "en",
-        "cartesia_model": "sonic-english"
-    },
-    "fr": {
-        "deepgram": "fr",
-        "cartesia": "fr",
-        "cartesia_model": "sonic-multilingual"
-    },
-}
-
-
 async def create_voice_assistant(
     agent_id: str,
     job_ctx: JobContext,
@@ -269,26 +221,14 @@ async def create_voice_assistant(
             fnc_ctx = AgentFunctions(job_ctx)
             await fnc_ctx.initialize_functions()
 
-        llm_instance = openai.LLM(
-            model="gpt-4o",
-            temperature=0.4
-        )
+        llm_instance = worker_resources.get_llm()
 
         logger.info(f"Voice ID: {agent['voice']}")
-        if agent.get('voiceProvider') == 'elevenlabs':
-            tts_instance = elevenlabs.TTS(
-                voice=elevenlabs.Voice(
-                    id=agent['voice'],
-                    name="",
-                    category=""
-                )
-            )
-        else:
-            tts_instance = cartesia.TTS(
-                language=lang_options[agent['language']]['cartesia'],
-                model=lang_options[agent['language']]['cartesia_model'], # type: ignore
-                voice=agent['voice']
-            )
+        tts_instance = worker_resources.get_tts(
+            agent.get('voiceProvider', ''),
+            agent['language'],
+            agent['voice']
+        )
 
         instructions = (
             agent['multi_state']
@@ -296,12 +236,11 @@ async def create_voice_assistant(
             else agent['instructions']
         )
 
+        call_latency = voice_latency.start_call(job_ctx.job.id, agent_id)
+
         assistant = VoiceAssistant(
-            vad=silero.VAD.load(),
-            stt=deepgram.STT(
-                model="nova-2-general",
-                language=lang_options[agent['language']]['deepgram'] # type: ignore
-            ),
+            vad=worker_resources.get_vad(),
+            stt=worker_resources.get_stt(agent['language']),
             llm=llm_instance,
             tts=tts_instance,
             chat_ctx=llm.ChatContext().append(
@@ -313,8 +252,10 @@ async def create_voice_assistant(
             interrupt_speech_duration=0.5,
             interrupt_min_words=2,
             min_endpointing_delay=0.7,
-            before_tts_cb=remove_special_characters
+            before_llm_cb=fit_call_context(context_window.new_state(instructions, agent)),
+            before_tts_cb=call_latency.wrap_before_tts(remove_special_characters)
         )
+        call_latency.attach(assistant)
 
         logger.info("Voice assistant created successfully")
         return assistant, agent['openingLine']
@@ -324,6 +265,56 @@ async def create_voice_assistant(
         raise
 
 
+async def deliver_opening_line(
+    assistant: VoiceAssistant,
+    room: Any,
+    agent_id: str,
+    opening_line: str
+) -> None:
+    """
+    Play the agent's pre-synthesized opening line if cached, otherwise speak it
+    through TTS and render it in the background for the next call.
+    """
+    agent = await get_agent(agent_id) or {}
+    provider = agent.get('voiceProvider') or 'cartesia'
+    voice = agent.get('voice', '')
+    language = agent.get('language', '')
+
+    cached = opening_line_cache.get(agent_id, provider, voice, language, opening_line)
+    if cached is None:
+        logger.info("Opening line not cached, synthesizing")
+        await assistant.say(opening_line, allow_interruptions=False)
+        schedule_opening_line_render(agent)
+        return
+
+    logger.info("Playing cached opening line audio")
+    try:
+        await play_cached_audio(room, cached)
+        assistant.chat_ctx.append(text=opening_line, role="assistant")
+    except Exception as e:
+        logger.error(f"Cached opening line playback failed, falling back to TTS: {str(e)}")
+        await assistant.say(opening_line, allow_interruptions=False)
+
+
+def fit_call_context(state: ContextState):
+    """
+    before_llm_cb that keeps a call's prompt within the agent's token budget.
+    The assistant's own chat context keeps the full call; only the copy sent
+    to the LLM is windowed, with older turns folded into `state.summary`.
+    """
+    def before_llm_cb(assistant: VoiceAssistant, chat_ctx: llm.ChatContext):
+        # messages[0] is the system prompt the assistant was created with
+        body = chat_ctx.messages[1:]
+        window = context_window.window(body, state)
+        chat_ctx.messages.clear()
+        chat_ctx.append(role="system", text=context_window.system_text(state))
+        chat_ctx.messages.extend(window)
+        context_window.schedule_fold(body, state)
+        return assistant.llm.chat(chat_ctx=chat_ctx, fnc_ctx=assistant.fnc_ctx)
+
+    return before_llm_cb
+
+
 def remove_special_characters(
     agent: VoiceAssistant,
     text: Union[str, AsyncIterable[str]]
@@ -350,6 +341,10 @@ def remove_special_characters(
 
 
 async def get_agent(agent_id: str) -> Optional[Dict[str, Any]]:
+    agent = worker_resources.get_agent_config(agent_id)
+    if agent is not None:
+        return agent
+
     response = (
         supabase.table('agents')
         .select('*')
@@ -357,5 +352,28 @@ async def get_agent(agent_id: str) -> Optional[Dict[str, Any]]:
         .execute()
     )
 
-    return response.data[0] if response.data else None
+    if not response.data:
+        return None
+    worker_resources.put_agent_config(response.data[0])
+    return response.data[0]
+
+
+def prewarm_worker_resources() -> None:
+    """Load the VAD model, warm plugin clients and preload likely agent configs."""
+    worker_resources.get_vad()
+    worker_resources.get_llm()
+    # Clients the call path uses, deferred at import so spawning stays cheap
+    build_clients(["supabase_sync", "openai", "anthropic_async"])
+    try:
+        routes = call_routing.load(supabase)
+        preload_ids = [
+            agent_id.strip()
+            for agent_id in settings.LIVEKIT_PRELOAD_AGENT_IDS.split(",")
+            if agent_id.strip()
+        ] or set(routes.values())
+        worker_resources.preload_agents(supabase, preload_ids)
+    except Exception as e:
+        # A cold route or agent config only costs a DB round trip at call time
+        logger.warning(f"Agent preload failed during prewarm: {str(e)}")
+    logger.info(f"Worker resources prewarmed: {worker_resources.stats()}")
 
@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from livekit import rtc
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+
+""" OPENING LINE AUDIO CACHE """
+
+SAMPLE_RATE = 24000
+NUM_CHANNELS = 1
+FRAME_MS = 20
+
+_HEADER = struct.Struct('<4sIH')
+_MAGIC = b'FLPC'
+
+
+@dataclass
+class CachedAudio:
+    pcm: bytes
+    sample_rate: int
+    num_channels: int
+
+
+class OpeningLineAudioCache:
+    """
+    Disk cache of pre-synthesized opening lines as 16-bit PCM.
+
+    Entries are keyed by (agent_id, provider, voice, language, sha256(text))
+    so an unchanged greeting is rendered once and a changed one simply
+    misses. Total size is capped; the least recently played entries are
+    evicted.
+
+    The cache is plain files under OPENING_LINE_CACHE_DIR. Renders happen
+    where the agent is saved (the API process) and playback where the call
+    runs (the LiveKit worker), so both must see the same directory: run them
+    on one host or point the setting at a shared mount. A worker that cannot
+    see the API's renders still works; it misses, speaks the line through
+    TTS and renders its own copy for the next call.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key_for(agent_id: str, provider: str, voice: str, language: str, text: str) -> str:
+        text_hash = hashlib.sha256(text.encode()).hexdigest()
+        entry_hash = hashlib.sha256(f"{provider}|{voice}|{language}|{text_hash}".encode()).hexdigest()[:32]
+        return f"{agent_id}_{entry_hash}"
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pcm"
+
+    def get(self, agent_id: str, provider: str, voice: str, language: str, text: str) -> Optional[CachedAudio]:
+        path = self._path(self.key_for(agent_id, provider, voice, language, text))
+        try:
+            with open(path, 'rb') as f:
+                magic, sample_rate, num_channels = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC:
+                    logger.warning(f"Ignoring malformed opening line cache entry: {path}")
+                    return None
+                pcm = f.read()
+            os.utime(path)  # mark as recently used
+            return CachedAudio(pcm=pcm, sample_rate=sample_rate, num_channels=num_channels)
+        except FileNotFoundError:
+            return None
+
+    def put(
+        self,
+        agent_id: str,
+        provider: str,
+        voice: str,
+        language: str,
+        text: str,
+        pcm: bytes,
+        sample_rate: int = SAMPLE_RATE,
+        num_channels: int = NUM_CHANNELS
+    ) -> Path:
+        key = self.key_for(agent_id, provider, voice, language, text)
+        path = self._path(key)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, sample_rate, num_channels))
+            f.write(pcm)
+        os.replace(tmp_path, path)
+
+        self.purge_agent(agent_id, keep=key)
+        self._enforce_limit()
+        return path
+
+    def purge_agent(self, agent_id: str, keep: Optional[str] = None) -> None:
+        """Drop stale greetings for an agent, e.g. after its opening line changed."""
+        for path in self.cache_dir.glob(f"{agent_id}_*.pcm"):
+            if path.stem != keep:
+                path.unlink(missing_ok=True)
+
+    def _enforce_limit(self) -> None:
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*.pcm'):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        while total > self.max_bytes and entries:
+            _, size, path = entries.pop(0)
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+opening_line_cache = OpeningLineAudioCache(
+    settings.OPENING_LINE_CACHE_DIR,
+    settings.OPENING_LINE_CACHE_MAX_MB * 1024 * 1024
+)
+
+
+def _synthesize_pcm(provider: str, language: str, voice: str, text: str) -> bytes:
+    """Render `text` to 24kHz mono 16-bit PCM with the agent's TTS provider."""
+    from app.services.voice.worker_resources import lang_options
+
+    if provider == 'elevenlabs':
+        from app.clients.elevenlabs_client import elevenlabs_client
+        return elevenlabs_client.generate_audio(
+            text=text,
+            voice_id=voice,
+            output_format=f"pcm_{SAMPLE_RATE}",
+        )
+
+    from cartesia import Cartesia
+    client = Cartesia(api_key=settings.CARTESIA_API_KEY)
+    return client.tts.bytes(
+        model_id=lang_options[language]['cartesia_model'],
+        transcript=text,
+        voice_id=voice,
+        language=lang_options[language]['cartesia'],
+        output_format={
+            "container": "raw",
+            "encoding": "pcm_s16le",
+            "sample_rate": SAMPLE_RATE,
+        },
+    )
+
+
+async def render_opening_line(agent: Dict[str, Any]) -> Optional[Path]:
+    """Synthesize and cache an agent's opening line if it is not cached yet."""
+    agent_id = str(agent.get('id', ''))
+    text = agent.get('openingLine')
+    voice = agent.get('voice')
+    provider = agent.get('voiceProvider') or 'cartesia'
+    language = agent.get('language')
+    if not (agent_id and text and voice and language):
+        return None
+
+    if opening_line_cache.get(agent_id, provider, voice, language, text) is not None:
+        return None
+
+    try:
+        pcm = await asyncio.to_thread(_synthesize_pcm, provider, language, voice, text)
+        path = await asyncio.to_thread(
+            opening_line_cache.put, agent_id, provider, voice, language, text, pcm
+        )
+        logger.info(f"Cached opening line audio for agent {agent_id} ({len(pcm)} bytes)")
+        return path
+    except Exception as e:
+        logger.error(f"Failed to render opening line for agent {agent_id}: {str(e)}")
+        return None
+
+
+# Background renders in flight; the loop only keeps weak references to tasks
+_render_tasks: Set[asyncio.Task] = set()
+
+
+def _render_done(task: asyncio.Task) -> None:
+    _render_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        error = task.exception()
+        logger.opt(exception=error).error(f"Opening line render failed: {str(error)}")
+
+
+def schedule_opening_line_render(agent: Dict[str, Any]) -> None:
+    """Render an opening line in the background without delaying the caller."""
+    task = asyncio.create_task(render_opening_line(agent))
+    _render_tasks.add(task)
+    task.add_done_callback(_render_done)
+
+
+async def play_cached_audio(room: rtc.Room, audio: CachedAudio) -> None:
+    """Stream cached PCM into the room on a short-lived audio track."""
+    source = rtc.AudioSource(audio.sample_rate, audio.num_channels)
+    track = rtc.LocalAudioTrack.create_audio_track("opening-line", source)
+    options = rtc.TrackPublishOptions(source=rtc.TrackSource.SOURCE_MICROPHONE)
+    publication = await room.local_participant.publish_track(track, options)
+    try:
+        samples_per_frame = audio.sample_rate * FRAME_MS // 1000
+        bytes_per_frame = samples_per_frame * audio.num_channels * 2
+        for offset in range(0, len(audio.pcm), bytes_per_frame):
+            chunk = audio.pcm[offset:offset + bytes_per_frame]
+            if len(chunk) < bytes_per_frame:
+                chunk = chunk + b'\x00' * (bytes_per_frame - len(chunk))
+            await source.capture_frame(rtc.AudioFrame(
+                data=chunk,
+                sample_rate=audio.sample_rate,
+                num_channels=audio.num_channels,
+                samples_per_channel=samples_per_frame,
+            ))
+        await source.wait_for_playout()
+    finally:
+        await room.local_participant.unpublish_track(publication.sid)
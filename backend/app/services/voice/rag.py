@@ -1,4 +1,3 @@
-from app.core.config import settings
 from dotenv import load_dotenv
 from app.core.logging_setup import logger
 import os
@@ -10,17 +9,19 @@ import re
 import json
 from requests.exceptions import Timeout, RequestException
 
-from supabase import create_client, Client
+from supabase import Client
 from openai import OpenAI
 from anthropic import AsyncAnthropic
 
+from app.clients.lazy import lazy_client
+from app.clients.supabase_client import supabase_sync
+
 load_dotenv()
-supabase: Client = create_client(
-    settings.SUPABASE_URL,
-    settings.SUPABASE_SERVICE_ROLE_KEY
+supabase: Client = supabase_sync
+openai: OpenAI = lazy_client("openai", OpenAI)
+anthropic: AsyncAnthropic = lazy_client(
+    "anthropic_async", lambda: AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
 )
-openai = OpenAI()
-anthropic = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
 JINA_API_KEY = os.getenv("JINA_API_KEY")
 
 conversation_histories: Dict[str, Any] = {}
@@ -178,7 +179,7 @@ async def filter_relevant_docs(user_query: str, docs: List) -> List[str]:
     return filtered_docs
 
 
-async def llm_response(system_prompt: str, user_prompt: str, conversation_history: Optional[Dict[str, Any]],
+async def llm_response(system_prompt: str, user_prompt: str, conversation_history: Optional[Dict[str, Any]] = None,
                        model: str = "claude", token_size: int = 1000, max_retries: int = 5) -> Optional[str]:
     messages = []
 
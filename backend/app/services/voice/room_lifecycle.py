@@ -0,0 +1,182 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from livekit import api
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+
+""" ROOM LIFECYCLE """
+
+
+@dataclass
+class RoomRecord:
+    name: str
+    sid: str = ""
+    metadata: str = ""
+    num_participants: int = 0
+
+
+class RoomRegistry:
+    """
+    Short-lived, process-local view of which rooms exist.
+
+    Entries come from our own create/lookup calls and from LiveKit webhook
+    events. A room recorded as finished is remembered as absent (None) for
+    the same TTL. Anything unknown or expired must be looked up on the server.
+
+    Each process keeps its own registry, and a webhook reaches only the API
+    worker that received it. Other workers (and the LiveKit agent workers)
+    learn about the change from their own lookups, so the TTL bounds how long
+    they can act on a stale entry.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._rooms: Dict[str, Tuple[float, Optional[RoomRecord]]] = {}
+
+    def lookup(self, room_name: str) -> Tuple[bool, Optional[RoomRecord]]:
+        """Return (known, record); a known room with record None does not exist."""
+        entry = self._rooms.get(room_name)
+        if entry is None:
+            return False, None
+        expires_at, record = entry
+        if self._clock() >= expires_at:
+            del self._rooms[room_name]
+            return False, None
+        return True, record
+
+    def put(self, record: RoomRecord) -> None:
+        self._set(record.name, record)
+
+    def mark_gone(self, room_name: str) -> None:
+        self._set(room_name, None)
+
+    def _set(self, room_name: str, record: Optional[RoomRecord]) -> None:
+        if len(self._rooms) >= self.max_entries:
+            self.purge_expired()
+        self._rooms[room_name] = (self._clock() + self.ttl_seconds, record)
+
+    def purge_expired(self) -> None:
+        now = self._clock()
+        for room_name in [n for n, (expires_at, _) in self._rooms.items() if now >= expires_at]:
+            del self._rooms[room_name]
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+
+def room_record(room: Any) -> RoomRecord:
+    """Build a RoomRecord from a LiveKit Room proto or a webhook `room` dict."""
+    if isinstance(room, dict):
+        return RoomRecord(
+            name=room.get('name', ''),
+            sid=room.get('sid', ''),
+            metadata=room.get('metadata', ''),
+            num_participants=int(room.get('numParticipants', 0) or 0),
+        )
+    return RoomRecord(
+        name=room.name,
+        sid=room.sid,
+        metadata=room.metadata,
+        num_participants=room.num_participants,
+    )
+
+
+class RoomService:
+    """
+    Room lookups and creation over one long-lived LiveKit API client.
+
+    Lookups ask the server for a single room by name and go through the
+    registry first, so the cost of finding a room does not depend on how
+    many rooms the server has.
+    """
+
+    def __init__(self, registry: RoomRegistry):
+        self.registry = registry
+        self._api: Optional[api.LiveKitAPI] = None
+
+    @property
+    def client(self) -> api.LiveKitAPI:
+        # Created on first use so the HTTP session binds to the running loop
+        if self._api is None:
+            self._api = api.LiveKitAPI(
+                url=settings.LIVEKIT_URL,
+                api_key=settings.LIVEKIT_API_KEY,
+                api_secret=settings.LIVEKIT_API_SECRET
+            )
+        return self._api
+
+    async def get_room(self, room_name: str) -> Optional[RoomRecord]:
+        known, record = self.registry.lookup(room_name)
+        if known:
+            return record
+
+        response = await self.client.room.list_rooms(api.ListRoomsRequest(names=[room_name]))
+        room = next((r for r in response.rooms if r.name == room_name), None)
+        if room is None:
+            self.registry.mark_gone(room_name)
+            return None
+        record = room_record(room)
+        self.registry.put(record)
+        return record
+
+    async def room_exists(self, room_name: str) -> bool:
+        return await self.get_room(room_name) is not None
+
+    async def get_room_metadata(self, room_name: str) -> Optional[str]:
+        record = await self.get_room(room_name)
+        return record.metadata if record else None
+
+    async def create_room(self, request: api.CreateRoomRequest) -> RoomRecord:
+        room = await self.client.room.create_room(request)
+        record = room_record(room)
+        self.registry.put(record)
+        return record
+
+    async def ensure_room(self, room_name: str) -> RoomRecord:
+        """Return the room, creating it only if the registry does not know it."""
+        known, record = self.registry.lookup(room_name)
+        if known and record is not None:
+            return record
+        return await self.create_room(api.CreateRoomRequest(name=room_name))
+
+    async def delete_room(self, room_name: str) -> None:
+        await self.client.room.delete_room(api.DeleteRoomRequest(room=room_name))
+        self.registry.mark_gone(room_name)
+
+    async def list_participants(self, room_name: str) -> list:
+        response = await self.client.room.list_participants(
+            api.ListParticipantsRequest(room=room_name)
+        )
+        return list(response.participants)
+
+    def handle_webhook_event(self, data: Dict[str, Any]) -> None:
+        """Update the registry from a LiveKit webhook payload."""
+        event = data.get('event')
+        room = data.get('room') or {}
+        room_name = room.get('name')
+        if not event or not room_name:
+            return
+
+        if event == 'room_finished':
+            self.registry.mark_gone(room_name)
+        elif event in ('room_started', 'participant_joined', 'participant_left'):
+            self.registry.put(room_record(room))
+        logger.debug(f"Room registry updated from {event} for {room_name}")
+
+    async def aclose(self) -> None:
+        if self._api is not None:
+            await self._api.aclose()
+            self._api = None
+
+
+room_service = RoomService(RoomRegistry(settings.LIVEKIT_ROOM_REGISTRY_TTL_SECONDS))
@@ -357,7 +357,7 @@ async def transfer_call(
     print(f"\n\n\n\n tool transfer_call invoked - caller_details: {caller_details}")
 
     logger.info("tool transfer_call invoked")
-    from services.initiate_outbound import create_sip_participant
+    from app.services.initiate_outbound import create_sip_participant
 
     room_name = AgentFunctions.current_room_name
     if room_name is None:
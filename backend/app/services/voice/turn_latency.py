@@ -0,0 +1,185 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from livekit.agents import llm, metrics
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+from app.utils.flow_tracker import LLM_TTFT, TTS_FIRST_BYTE, SpanRecorder
+
+""" VOICE TURN LATENCY """
+
+# Stages of one voice turn. TURN runs from the end of the caller's speech
+# to the start of the agent's reply playback; the others are its parts.
+STT_FINAL = "stt_final"
+END_OF_TURN = "end_of_turn"
+FIRST_TOKEN = "first_token"
+TOOL = "tool"
+TURN = "turn"
+
+CALL_RING_SIZE = 128
+MAX_ACTIVE_CALLS = 256
+
+
+class CallLatency:
+    """
+    Stage timings of the turns of one call.
+
+    Durations go to a per-call recorder, flushed with the call record at the
+    end, and to the agent's recorder shared by every call of that agent in
+    this worker. The stages of the turn in progress are kept until the next
+    turn starts, since LLM and TTS metrics arrive after playback begins.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        agent_id: str,
+        agent_recorder: SpanRecorder,
+        clock: Callable[[], float] = time.perf_counter
+    ):
+        self.job_id = job_id
+        self.agent_id = agent_id
+        self.agent_recorder = agent_recorder
+        self.recorder = SpanRecorder(CALL_RING_SIZE, sample_rate=1.0)
+        self.clock = clock
+        self.turns = 0
+        self._turn_started: Optional[float] = None
+        self._turn: Dict[str, float] = {}
+        self._tools: Dict[str, float] = {}
+
+    def _record(self, stage: str, seconds: float) -> None:
+        self.recorder.record(stage, seconds)
+        self.agent_recorder.record(stage, seconds)
+        self._turn[stage] = round(seconds * 1000, 2)
+
+    def _since_turn_start(self) -> Optional[float]:
+        if self._turn_started is None:
+            return None
+        return self.clock() - self._turn_started
+
+    def attach(self, assistant: Any) -> None:
+        """Subscribe to the assistant events that are not handled by the entrypoint."""
+        assistant.on("user_stopped_speaking", self.user_stopped_speaking)
+        assistant.on("function_calls_collected", self.function_calls_collected)
+        assistant.on("metrics_collected", self.metrics_collected)
+
+    def user_stopped_speaking(self) -> None:
+        self._close_turn()
+        self._turn_started = self.clock()
+
+    def metrics_collected(self, collected: Any) -> None:
+        if isinstance(collected, metrics.PipelineEOUMetrics):
+            self._record(STT_FINAL, collected.transcription_delay)
+            self._record(END_OF_TURN, collected.end_of_utterance_delay)
+        elif isinstance(collected, metrics.PipelineLLMMetrics) and not collected.cancelled:
+            self._record(LLM_TTFT, collected.ttft)
+        elif isinstance(collected, metrics.PipelineTTSMetrics) and not collected.cancelled:
+            self._record(TTS_FIRST_BYTE, collected.ttfb)
+
+    def function_calls_collected(self, calls: List[llm.FunctionCallInfo]) -> None:
+        now = self.clock()
+        for call in calls:
+            self._tools[call.tool_call_id] = now
+
+    def function_calls_finished(self, called_functions: List[llm.CalledFunction]) -> None:
+        now = self.clock()
+        for called in called_functions:
+            started = self._tools.pop(called.call_info.tool_call_id, None)
+            if started is not None:
+                self._record(f"{TOOL}:{called.call_info.function_info.name}", now - started)
+
+    def wrap_before_tts(self, callback: Callable[..., Any]) -> Callable[..., Any]:
+        """Mark the first LLM token of a turn as it reaches TTS, then run `callback`."""
+        def before_tts(agent: Any, text: Any) -> Any:
+            if isinstance(text, str):
+                return callback(agent, text)
+
+            async def first_token_marked():
+                async for part in text:
+                    elapsed = self._since_turn_start()
+                    if elapsed is not None and FIRST_TOKEN not in self._turn:
+                        self._record(FIRST_TOKEN, elapsed)
+                    yield part
+
+            return callback(agent, first_token_marked())
+
+        return before_tts
+
+    def playback_started(self) -> None:
+        elapsed = self._since_turn_start()
+        # Opening lines and follow-ups after a tool call are not new turns
+        if elapsed is None:
+            return
+        self._record(TURN, elapsed)
+        self.turns += 1
+        self._turn_started = None
+
+    def _close_turn(self) -> None:
+        if self._turn:
+            logger.debug(f"Voice turn stages for job {self.job_id}: {self._turn}")
+        self._turn = {}
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact per-call aggregates stored with the conversation log."""
+        self._close_turn()
+        self._tools.clear()
+        return {
+            "turns": self.turns,
+            "stages": {
+                stage: {key: stats[key] for key in ("count", "p50_ms", "p95_ms", "max_ms")}
+                for stage, stats in self.recorder.snapshot()["steps"].items()
+            }
+        }
+
+
+class VoiceLatency:
+    """Open calls by job id and rolling per-agent turn latency for this worker."""
+
+    def __init__(self, window: int, max_agents: int, max_calls: int = MAX_ACTIVE_CALLS):
+        self.window = window
+        self.max_agents = max_agents
+        self.max_calls = max_calls
+        self._calls: "OrderedDict[str, CallLatency]" = OrderedDict()
+        self._agents: "OrderedDict[str, SpanRecorder]" = OrderedDict()
+
+    def agent_recorder(self, agent_id: str) -> SpanRecorder:
+        recorder = self._agents.get(agent_id)
+        if recorder is None:
+            recorder = self._agents[agent_id] = SpanRecorder(self.window, sample_rate=1.0)
+        self._agents.move_to_end(agent_id)
+        while len(self._agents) > self.max_agents:
+            self._agents.popitem(last=False)
+        return recorder
+
+    def start_call(self, job_id: str, agent_id: str, **kwargs: Any) -> CallLatency:
+        call = CallLatency(job_id, agent_id, self.agent_recorder(agent_id), **kwargs)
+        self._calls[job_id] = call
+        # Calls that end without storing a conversation are never finished
+        while len(self._calls) > self.max_calls:
+            self._calls.popitem(last=False)
+        return call
+
+    def call(self, job_id: str) -> Optional[CallLatency]:
+        return self._calls.get(job_id)
+
+    def finish_call(self, job_id: str) -> Optional[Dict[str, Any]]:
+        call = self._calls.pop(job_id, None)
+        if call is None:
+            return None
+        summary = call.summary()
+        turn = self.agent_report(call.agent_id).get(TURN)
+        if turn:
+            logger.info(
+                f"Voice turn latency for agent {call.agent_id}: "
+                f"p50 {turn['p50_ms']}ms, p95 {turn['p95_ms']}ms over the last {turn['window']} turns"
+            )
+        return summary
+
+    def agent_report(self, agent_id: str) -> Dict[str, Any]:
+        recorder = self._agents.get(agent_id)
+        return recorder.snapshot()["steps"] if recorder else {}
+
+
+voice_latency = VoiceLatency(settings.VOICE_LATENCY_WINDOW, settings.VOICE_LATENCY_MAX_AGENTS)
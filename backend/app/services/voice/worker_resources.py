@@ -0,0 +1,160 @@
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from livekit.plugins import cartesia, deepgram, elevenlabs, openai, silero
+from supabase import Client
+
+from app.core.logging_setup import logger
+
+""" PER-WORKER VOICE RESOURCES """
+
+lang_options = {
+    "en-US": {
+        "deepgram": "en-US",
+        "cartesia": "en",
+        "cartesia_model": "sonic-english"
+    },
+    "en-GB": {
+        "deepgram": "en-GB",
+        "cartesia": "en",
+        "cartesia_model": "sonic-english"
+    },
+    "fr": {
+        "deepgram": "fr",
+        "cartesia": "fr",
+        "cartesia_model": "sonic-multilingual"
+    },
+}
+
+LLM_MODEL = "gpt-4o"
+LLM_TEMPERATURE = 0.4
+STT_MODEL = "nova-2-general"
+
+
+class WorkerResourceCache:
+    """
+    Models, plugin clients and agent configs held for the lifetime of a
+    LiveKit worker process.
+
+    Populated from `prewarm_fnc` so that the work happens before a job is
+    assigned; anything not prewarmed is built on first use and kept.
+    Plugin clients are keyed by (provider, language, voice) and are shared
+    between sessions, each of which opens its own streams on them.
+    """
+
+    def __init__(self, agent_config_ttl: float = 300.0):
+        self.agent_config_ttl = agent_config_ttl
+        self._vad: Any = None
+        self._plugins: Dict[Tuple[str, str, str], Any] = {}
+        self._agent_configs: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    def get_vad(self) -> Any:
+        if self._vad is None:
+            logger.info("Loading Silero VAD model")
+            self._vad = silero.VAD.load()
+        return self._vad
+
+    def _get_plugin(self, key: Tuple[str, str, str], factory: Callable[[], Any]) -> Any:
+        plugin = self._plugins.get(key)
+        if plugin is None:
+            logger.debug(f"Creating plugin client for {key}")
+            plugin = factory()
+            self._plugins[key] = plugin
+        return plugin
+
+    def get_llm(self) -> Any:
+        return self._get_plugin(
+            ("openai", LLM_MODEL, str(LLM_TEMPERATURE)),
+            lambda: openai.LLM(model=LLM_MODEL, temperature=LLM_TEMPERATURE)
+        )
+
+    def get_stt(self, language: str) -> Any:
+        return self._get_plugin(
+            ("deepgram", language, STT_MODEL),
+            lambda: deepgram.STT(
+                model=STT_MODEL,
+                language=lang_options[language]['deepgram']  # type: ignore
+            )
+        )
+
+    def get_tts(self, provider: str, language: str, voice: str) -> Any:
+        if provider == 'elevenlabs':
+            return self._get_plugin(
+                ("elevenlabs", language, voice),
+                lambda: elevenlabs.TTS(
+                    voice=elevenlabs.Voice(id=voice, name="", category="")
+                )
+            )
+        return self._get_plugin(
+            ("cartesia", language, voice),
+            lambda: cartesia.TTS(
+                language=lang_options[language]['cartesia'],
+                model=lang_options[language]['cartesia_model'],  # type: ignore
+                voice=voice
+            )
+        )
+
+    def warm_agent_plugins(self, agent: Dict[str, Any]) -> None:
+        """Construct the STT/TTS clients an agent will need."""
+        language = agent.get('language')
+        voice = agent.get('voice')
+        if language not in lang_options or not voice:
+            return
+        self.get_stt(language)
+        self.get_tts(agent.get('voiceProvider', ''), language, voice)
+
+    def get_agent_config(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._agent_configs.get(agent_id)
+        if entry is None:
+            return None
+        loaded_at, agent = entry
+        if time.monotonic() - loaded_at > self.agent_config_ttl:
+            del self._agent_configs[agent_id]
+            return None
+        return agent
+
+    def put_agent_config(self, agent: Dict[str, Any]) -> None:
+        self._agent_configs[agent['id']] = (time.monotonic(), agent)
+
+    def invalidate_agent_config(self, agent_id: str) -> None:
+        self._agent_configs.pop(agent_id, None)
+
+    def preload_agents(self, supabase: Client, agent_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Load agent configs (and warm their plugins) for the agents this worker
+        is likely to serve: the given ids, or every agent with an assigned
+        phone number when none are given.
+        """
+        if agent_ids is None:
+            numbers = (
+                supabase.table('twilio_numbers')
+                .select('assigned_agent_id')
+                .not_.is_('assigned_agent_id', 'null')
+                .execute()
+            )
+            agent_ids = {row['assigned_agent_id'] for row in numbers.data or []}
+
+        agent_ids = list(agent_ids)
+        if not agent_ids:
+            return 0
+
+        response = supabase.table('agents').select('*').in_('id', agent_ids).execute()
+        for agent in response.data or []:
+            self.put_agent_config(agent)
+            try:
+                self.warm_agent_plugins(agent)
+            except Exception as e:
+                logger.warning(f"Could not warm plugins for agent {agent.get('id')}: {str(e)}")
+
+        logger.info(f"Preloaded {len(response.data or [])} agent configs")
+        return len(response.data or [])
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "vad_loaded": int(self._vad is not None),
+            "plugins": len(self._plugins),
+            "agent_configs": len(self._agent_configs),
+        }
+
+
+worker_resources = WorkerResourceCache()
@@ -1,9 +1,18 @@
 import functools
 import logging
+import random
+import threading
 import time
 import inspect
 import json
-from typing import Any, Callable, Dict, List, Optional, TypeVar, cast
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar, cast
+
+from app.core.config import settings
 
 # Type variables for function annotations
 F = TypeVar('F', bound=Callable[..., Any])
@@ -11,85 +20,266 @@ F = TypeVar('F', bound=Callable[..., Any])
 # Configure logger
 logger = logging.getLogger("flow_tracker")
 
+# Step names shared by the instrumented call sites
+EMBEDDING = "embedding"
+RERANK = "rerank"
+RPC = "rpc"
+LLM = "llm"
+LLM_TTFT = "llm_ttft"
+TTS_FIRST_BYTE = "tts_first_byte"
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is unbounded
+BUCKET_BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+MAX_STEPS_PER_FLOW = 256
+MAX_ACTIVE_FLOWS = 1024
+
+
+@dataclass
+class Flow:
+    flow_id: str
+    description: str
+    sampled: bool
+    started: float = field(default_factory=time.monotonic)
+    steps: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=MAX_STEPS_PER_FLOW))
+
+
+class StepLatency:
+    """
+    Latency of one step: the most recent durations in a preallocated ring
+    buffer (for percentiles) and cumulative counts per histogram bucket.
+    """
+
+    __slots__ = ("_samples", "_next", "_filled", "count", "total", "max", "buckets")
+
+    def __init__(self, capacity: int):
+        self._samples = array('d', [0.0]) * capacity
+        self._next = 0
+        self._filled = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, seconds: float) -> None:
+        self._samples[self._next] = seconds
+        self._next = (self._next + 1) % len(self._samples)
+        self._filled = min(self._filled + 1, len(self._samples))
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect_left(BUCKET_BOUNDS_MS, seconds * 1000)] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        recent = sorted(self._samples[:self._filled])
+
+        def percentile(p: float) -> float:
+            if not recent:
+                return 0.0
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 2)
+
+        labels = [f"le_{bound}ms" for bound in BUCKET_BOUNDS_MS] + ["inf"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 2),
+            "p50_ms": percentile(0.50),
+            "p90_ms": percentile(0.90),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "window": len(recent),
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class SpanRecorder:
+    """Per-step latency aggregation, shared by every task and thread in the process."""
+
+    def __init__(self, capacity: int, sample_rate: float, rng: Callable[[], float] = random.random):
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self.rng = rng
+        self._steps: Dict[str, StepLatency] = {}
+        self._lock = threading.Lock()
+
+    def should_sample(self) -> bool:
+        return self.sample_rate >= 1.0 or self.rng() < self.sample_rate
+
+    def record(self, step: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._steps.get(step)
+            if stats is None:
+                stats = self._steps[step] = StepLatency(self.capacity)
+            stats.add(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            steps = {name: stats.snapshot() for name, stats in sorted(self._steps.items())}
+        return {"sample_rate": self.sample_rate, "steps": steps}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._steps.clear()
+
+
+class _Span:
+    """Times one step; usable with `with` and `async with`."""
+
+    __slots__ = ("step", "data", "_flow", "_sampled", "_started")
+
+    def __init__(self, step: str, data: Optional[Dict[str, Any]]):
+        self.step = step
+        self.data = data
+        self._flow = FlowTracker.current_flow()
+        self._sampled = self._flow.sampled if self._flow else FlowTracker.recorder.should_sample()
+        self._started = 0.0
+
+    def __enter__(self) -> "_Span":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if not self._sampled:
+            return
+        duration = time.perf_counter() - self._started
+        FlowTracker.recorder.record(self.step if exc_type is None else f"{self.step}:error", duration)
+        if self._flow is not None:
+            self._flow.steps.append({
+                "name": self.step,
+                "offset_ms": round((time.monotonic() - self._flow.started) * 1000, 2),
+                "duration_ms": round(duration * 1000, 2),
+                "data": self.data or {},
+                "error": str(exc) if exc is not None else None,
+            })
+
+    async def __aenter__(self) -> "_Span":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+
 class FlowTracker:
     """
     Utility class for tracking function execution flow with enhanced logging.
     Provides decorators and context managers for tracking function execution.
+
+    The current flow lives in a context variable, so each request or task
+    sees only its own flow. Steps are timed with a monotonic clock and fed
+    to a process-wide SpanRecorder that keeps per-step latency histograms;
+    whether a flow is recorded is decided once when it starts, by
+    TRACE_SAMPLE_RATE, which bounds the overhead.
     """
-    
-    _active_flows: Dict[str, List[Dict[str, Any]]] = {}
-    _current_flow_id: Optional[str] = None
-    
+
+    _active_flows: "OrderedDict[str, Flow]" = OrderedDict()
+    _current_flow: ContextVar[Optional[Flow]] = ContextVar("flow_tracker_current_flow", default=None)
+    recorder = SpanRecorder(settings.TRACE_RING_SIZE, settings.TRACE_SAMPLE_RATE)
+
+    @classmethod
+    def current_flow(cls) -> Optional[Flow]:
+        return cls._current_flow.get()
+
     @classmethod
     def start_flow(cls, flow_id: str, description: str = "") -> None:
         """
         Start tracking a new flow
-        
+
         Args:
             flow_id: Unique identifier for the flow
             description: Description of the flow
         """
-        cls._current_flow_id = flow_id
-        cls._active_flows[flow_id] = []
+        flow = Flow(flow_id=flow_id, description=description, sampled=cls.recorder.should_sample())
+        cls._active_flows[flow_id] = flow
+        cls._active_flows.move_to_end(flow_id)
+        while len(cls._active_flows) > MAX_ACTIVE_FLOWS:
+            abandoned, _ = cls._active_flows.popitem(last=False)
+            logger.warning(f"⚠️ Dropping flow that was never ended: {abandoned}")
+        cls._current_flow.set(flow)
         logger.info(f"🚀 Starting flow: {flow_id} - {description}")
-    
+
     @classmethod
     def end_flow(cls, flow_id: Optional[str] = None) -> Dict[str, Any]:
         """
         End tracking a flow and return the flow data
-        
+
         Args:
             flow_id: Optional flow ID. If None, uses current flow ID
-            
+
         Returns:
             Dictionary with flow data
         """
-        flow_id = flow_id or cls._current_flow_id
-        if not flow_id or flow_id not in cls._active_flows:
+        current = cls.current_flow()
+        flow_id = flow_id or (current.flow_id if current else None)
+        flow = cls._active_flows.pop(flow_id, None) if flow_id else None
+        if flow is None:
             logger.warning(f"⚠️ Attempted to end unknown flow: {flow_id}")
             return {}
-        
+
+        duration = time.monotonic() - flow.started
+        if flow.sampled:
+            cls.recorder.record(f"flow:{flow.description or 'unnamed'}", duration)
         flow_data = {
             "flow_id": flow_id,
-            "steps": cls._active_flows[flow_id]
+            "duration_ms": round(duration * 1000, 2),
+            "steps": list(flow.steps)
         }
-        
+
         logger.info(f"✅ Completed flow: {flow_id} - {len(flow_data['steps'])} steps")
-        
-        del cls._active_flows[flow_id]
-        if cls._current_flow_id == flow_id:
-            cls._current_flow_id = None
-        
+
+        if current is flow:
+            cls._current_flow.set(None)
+
         return flow_data
-    
+
+    @classmethod
+    def span(cls, step_name: str, data: Optional[Dict[str, Any]] = None) -> _Span:
+        """Time a block as `step_name` in the current flow and the latency histograms."""
+        return _Span(step_name, data)
+
+    @classmethod
+    def record(cls, step_name: str, seconds: float) -> None:
+        """Record a latency measured elsewhere, e.g. time to first token."""
+        flow = cls.current_flow()
+        if flow.sampled if flow else cls.recorder.should_sample():
+            cls.recorder.record(step_name, seconds)
+
+    @classmethod
+    def latency_report(cls) -> Dict[str, Any]:
+        report = cls.recorder.snapshot()
+        report["active_flows"] = len(cls._active_flows)
+        return report
+
     @classmethod
     def track_step(
-        cls, 
-        step_name: str, 
-        data: Dict[str, Any] = None, 
+        cls,
+        step_name: str,
+        data: Dict[str, Any] = None,
         flow_id: Optional[str] = None
     ) -> None:
         """
         Track a step in a flow
-        
+
         Args:
             step_name: Name of the step
             data: Optional data associated with the step
             flow_id: Optional flow ID. If None, uses current flow ID
         """
-        flow_id = flow_id or cls._current_flow_id
-        if not flow_id or flow_id not in cls._active_flows:
+        flow = cls._active_flows.get(flow_id) if flow_id else cls.current_flow()
+        if flow is None:
             logger.warning(f"⚠️ Attempted to track step in unknown flow: {flow_id}")
             return
-        
+
         step_data = {
             "name": step_name,
-            "timestamp": time.time(),
+            "offset_ms": round((time.monotonic() - flow.started) * 1000, 2),
             "data": data or {}
         }
-        
-        cls._active_flows[flow_id].append(step_data)
-        
+
+        flow.steps.append(step_data)
+
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
         # Pretty format data for logging if present
         data_str = ""
         if data:
@@ -102,134 +292,49 @@ class FlowTracker:
                     data_str = f" - Data: {json.dumps(data)}"
             except (TypeError, ValueError):
                 data_str = f" - Data: [complex object]"
-        
+
         logger.info(f"➡️ Step: {step_name}{data_str}")
 
     @classmethod
     def track_function(cls, flow_id: Optional[str] = None) -> Callable[[F], F]:
         """
         Decorator to track function execution as part of a flow
-        
+
         Args:
             flow_id: Optional flow ID. If None, uses current flow ID
-            
+
         Returns:
             Decorated function
         """
+        def step_args(func: Callable[..., Any], args: Any, kwargs: Any) -> Dict[str, Any]:
+            arg_values = inspect.getcallargs(func, *args, **kwargs)
+
+            # Remove self or cls from arg_values if it's there
+            arg_values.pop('self', None)
+            arg_values.pop('cls', None)
+
+            # Clean sensitive data
+            return {
+                k: v if k not in ['password', 'token', 'secret', 'key']
+                else '[REDACTED]' for k, v in arg_values.items()
+            }
+
         def decorator(func: F) -> F:
             @functools.wraps(func)
             async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
-                arg_values = inspect.getcallargs(func, *args, **kwargs)
-                
-                # Remove self or cls from arg_values if it's there
-                if 'self' in arg_values:
-                    del arg_values['self']
-                if 'cls' in arg_values:
-                    del arg_values['cls']
-                
-                # Clean sensitive data
-                clean_args = {
-                    k: v if k not in ['password', 'token', 'secret', 'key'] 
-                    else '[REDACTED]' for k, v in arg_values.items()
-                }
-                
-                # Start timing
-                start_time = time.time()
-                current_flow = flow_id or cls._current_flow_id
-                
-                # Log function entry
-                cls.track_step(
-                    f"{func.__name__}:start", 
-                    {"args": clean_args},
-                    current_flow
-                )
-                
-                try:
-                    # Call the function
-                    result = await func(*args, **kwargs)
-                    
-                    # Log function exit
-                    duration = time.time() - start_time
-                    cls.track_step(
-                        f"{func.__name__}:end",
-                        {"duration": f"{duration:.3f}s", "status": "success"},
-                        current_flow
-                    )
-                    
-                    return result
-                    
-                except Exception as e:
-                    # Log error
-                    duration = time.time() - start_time
-                    cls.track_step(
-                        f"{func.__name__}:error",
-                        {
-                            "duration": f"{duration:.3f}s", 
-                            "status": "error",
-                            "error": str(e)
-                        },
-                        current_flow
-                    )
-                    raise
-            
+                cls.track_step(f"{func.__name__}:start", {"args": step_args(func, args, kwargs)}, flow_id)
+                async with cls.span(func.__name__):
+                    return await func(*args, **kwargs)
+
             @functools.wraps(func)
             def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
-                arg_values = inspect.getcallargs(func, *args, **kwargs)
-                
-                # Remove self or cls from arg_values if it's there
-                if 'self' in arg_values:
-                    del arg_values['self']
-                if 'cls' in arg_values:
-                    del arg_values['cls']
-                
-                # Clean sensitive data
-                clean_args = {
-                    k: v if k not in ['password', 'token', 'secret', 'key'] 
-                    else '[REDACTED]' for k, v in arg_values.items()
-                }
-                
-                # Start timing
-                start_time = time.time()
-                current_flow = flow_id or cls._current_flow_id
-                
-                # Log function entry
-                cls.track_step(
-                    f"{func.__name__}:start", 
-                    {"args": clean_args},
-                    current_flow
-                )
-                
-                try:
-                    # Call the function
-                    result = func(*args, **kwargs)
-                    
-                    # Log function exit
-                    duration = time.time() - start_time
-                    cls.track_step(
-                        f"{func.__name__}:end",
-                        {"duration": f"{duration:.3f}s", "status": "success"},
-                        current_flow
-                    )
-                    
-                    return result
-                    
-                except Exception as e:
-                    # Log error
-                    duration = time.time() - start_time
-                    cls.track_step(
-                        f"{func.__name__}:error",
-                        {
-                            "duration": f"{duration:.3f}s", 
-                            "status": "error",
-                            "error": str(e)
-                        },
-                        current_flow
-                    )
-                    raise
-            
+                cls.track_step(f"{func.__name__}:start", {"args": step_args(func, args, kwargs)}, flow_id)
+                with cls.span(func.__name__):
+                    return func(*args, **kwargs)
+
             # Return the appropriate wrapper based on function type
             if inspect.iscoroutinefunction(func):
                 return cast(F, async_wrapper)
             return cast(F, sync_wrapper)
-        
-        return decorator 
\ No newline at end of file
+
+        return decorator
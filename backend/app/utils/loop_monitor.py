@@ -0,0 +1,183 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging_setup import logger
+from app.utils.flow_tracker import StepLatency
+
+""" EVENT LOOP MONITOR """
+
+LAG_RING_SIZE = 1024
+MAX_CALL_SITES = 200
+STACK_DEPTH = 12
+OTHER_SITE = "<other>"
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _format_frame(frame: traceback.FrameSummary) -> str:
+    return f"{frame.filename}:{frame.lineno} in {frame.name}"
+
+
+def call_site(stack: List[traceback.FrameSummary]) -> str:
+    """Innermost frame of our own code in `stack`, or the innermost frame if none is."""
+    for frame in reversed(stack):
+        if frame.filename.startswith(APP_ROOT) and frame.filename != __file__:
+            return f"{os.path.relpath(frame.filename, os.path.dirname(APP_ROOT))}:{frame.lineno} in {frame.name}"
+    return _format_frame(stack[-1]) if stack else "<unknown>"
+
+
+class LoopMonitor:
+    """
+    Event loop lag and stall detector.
+
+    A probe task sleeps for `interval` and records how late it wakes up. A
+    watchdog thread notices when the probe is overdue by more than
+    `threshold` and captures the loop thread's stack at that moment, which
+    is the code holding the loop. When the loop comes back, the stall's
+    length is added to that call site's totals.
+    """
+
+    def __init__(self, interval: float, threshold: float, clock: Callable[[], float] = time.monotonic):
+        self.interval = interval
+        self.threshold = threshold
+        self.clock = clock
+        self.lag = StepLatency(LAG_RING_SIZE)
+        self.stalls = 0
+        self._sites: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._due = 0.0
+        self._stall: Optional[Dict[str, Any]] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start monitoring the running loop; a no-op if already running."""
+        if self.running:
+            return
+        self._loop_thread = threading.get_ident()
+        self._due = self.clock() + self.interval
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            f"Event loop monitor started (interval {self.interval * 1000:.0f}ms, "
+            f"threshold {self.threshold * 1000:.0f}ms)"
+        )
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _probe(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            now = self.clock()
+            with self._lock:
+                lag = max(0.0, now - self._due)
+                self._due = now + self.interval
+                self.lag.add(lag)
+                stall, self._stall = self._stall, None
+            if stall is not None and lag >= self.threshold:
+                self._record_stall(stall, lag)
+
+    def _watch(self) -> None:
+        period = min(self.interval, self.threshold) / 2
+        while not self._stopped.wait(period):
+            self.check()
+
+    def check(self) -> None:
+        """Capture the loop thread's stack if the probe is overdue (watchdog thread)."""
+        if self.clock() - self._due < self.threshold or self._stall is not None:
+            return
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame)
+        with self._lock:
+            # The loop may have caught up while the stack was captured
+            if self._stall is None and self.clock() - self._due >= self.threshold:
+                self._stall = {
+                    "site": call_site(stack),
+                    "innermost": _format_frame(stack[-1]) if stack else None,
+                    "stack": [_format_frame(f) for f in stack[-STACK_DEPTH:]],
+                }
+
+    def _record_stall(self, stall: Dict[str, Any], seconds: float) -> None:
+        with self._lock:
+            self.stalls += 1
+            site = stall["site"]
+            stats = self._sites.get(site)
+            if stats is None:
+                if len(self._sites) >= MAX_CALL_SITES:
+                    site = OTHER_SITE
+                    stats = self._sites.setdefault(site, {"count": 0, "total": 0.0, "max": 0.0, "sample": None})
+                else:
+                    stats = self._sites[site] = {"count": 0, "total": 0.0, "max": 0.0, "sample": stall}
+            first = stats["count"] == 0
+            stats["count"] += 1
+            stats["total"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+
+        if first:
+            logger.warning(
+                f"Event loop blocked for {seconds * 1000:.0f}ms at {site} "
+                f"(innermost: {stall['innermost']})"
+            )
+        else:
+            logger.debug(f"Event loop blocked for {seconds * 1000:.0f}ms at {site}")
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            offenders = sorted(self._sites.items(), key=lambda item: item[1]["total"], reverse=True)
+            return {
+                "running": self.running,
+                "interval_ms": round(self.interval * 1000, 2),
+                "threshold_ms": round(self.threshold * 1000, 2),
+                "lag": self.lag.snapshot(),
+                "stalls": self.stalls,
+                "offenders": [
+                    {
+                        "site": site,
+                        "count": stats["count"],
+                        "total_ms": round(stats["total"] * 1000, 2),
+                        "max_ms": round(stats["max"] * 1000, 2),
+                        "innermost": (stats["sample"] or {}).get("innermost"),
+                        "stack": (stats["sample"] or {}).get("stack", []),
+                    }
+                    for site, stats in offenders
+                ],
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.lag = StepLatency(LAG_RING_SIZE)
+            self.stalls = 0
+            self._sites.clear()
+
+
+loop_monitor = LoopMonitor(
+    settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+    settings.LOOP_MONITOR_THRESHOLD_MS / 1000
+)
@@ -0,0 +1,47 @@
+"""
+Production server configuration.
+
+Usage (from backend/):
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Runs SERVER_WORKERS uvicorn workers (0 = one per CPU). The app is not
+preloaded, so each worker imports it after forking and builds its own
+Supabase, Redis and SDK clients in the startup hook. On SIGTERM a worker
+stops reporting ready, gives open streams SERVER_DRAIN_SECONDS to finish,
+then runs the shutdown hooks; gunicorn waits that long plus a margin for
+the hooks before killing it. run_fast.py remains the single-process,
+auto-reloading development server.
+"""
+
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings  # noqa: E402
+
+# Time the shutdown hooks get after the drain window
+SHUTDOWN_MARGIN_SECONDS = 10
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = settings.SERVER_WORKERS or multiprocessing.cpu_count()
+worker_class = "app.core.worker.AppWorker"
+preload_app = False
+
+graceful_timeout = settings.SERVER_DRAIN_SECONDS + SHUTDOWN_MARGIN_SECONDS
+# A worker whose event loop stops heartbeating for this long is restarted
+timeout = 60
+keepalive = 5
+
+accesslog = None
+errorlog = "-"
+loglevel = "info"
+
+
+def when_ready(server):
+    server.log.info(f"Serving with {workers} worker(s) on {bind}")
+
+
+def worker_exit(server, worker):
+    server.log.info(f"Worker {worker.pid} exited")
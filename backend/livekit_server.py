@@ -4,7 +4,6 @@ import asyncio
 import logging
 import os
 import sys
-import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Callable, Awaitable, Union
 
@@ -18,14 +17,12 @@ from livekit.agents import (
     WorkerType,
     cli
 )
-from livekit.plugins import silero
 from livekit.rtc import RemoteParticipant
 from livekit.agents.voice_assistant import VoiceAssistant
 
 
 from mute_track import CallTransferHandler
 from app.services.cache import get_agent_metadata
-from app.services.nylas_service import send_email
 from app.services.voice.livekit_helper import detect_call_type_and_get_agent_id
 from app.services.voice.livekit_services import create_voice_assistant
 from app.services.voice.tool_use import trigger_show_chat_input
@@ -40,15 +37,29 @@ for path in [project_root, backend_dir]:
 
 from livekit import agents, rtc, api
 from livekit.agents import AutoSubscribe, JobContext, JobProcess, JobRequest, WorkerOptions, WorkerType, cli
-from livekit.plugins import silero
 from livekit.agents.voice_assistant import VoiceAssistant
 
-from app.services.voice.livekit_services import create_voice_assistant
+from app.services.voice.livekit_services import (
+    create_voice_assistant,
+    deliver_opening_line,
+    prewarm_worker_resources,
+)
 from app.services.voice.tool_use import trigger_show_chat_input, transfer_call
-from app.services.nylas_service import send_email
 from app.services.cache import get_all_agents, call_data, get_agent_metadata, initialize_calendar_cache
 from app.services.voice.livekit_helper import detect_call_type_and_get_agent_id
 from app.services.helper import format_transcript_messages
+from app.services.voice.worker_resources import worker_resources
+from app.services.voice.call_routing import call_routing
+from app.services.post_call import post_call_pipeline
+from app.services.voice.turn_latency import voice_latency
+from app.utils.loop_monitor import loop_monitor
+from app.services.voice.call_timers import (
+    MAX_DURATION,
+    SILENCE,
+    timer_wheel,
+    wait_for_first_participant,
+)
+from app.core.config import settings
 
 # Add logging configuration
 logging.getLogger('livekit').setLevel(logging.WARNING)
@@ -92,6 +103,11 @@ async def entrypoint(ctx: JobContext):
     room_name = ctx.room.name
     room = ctx.room
 
+    # Keep this worker's phone routing table subscribed to invalidations
+    call_routing.ensure_listener()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+
     logger.info(f"Entrypoint called with job_id: {ctx.job.id}, connecting to room: {room_name}")
     await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY) 
 
@@ -99,12 +115,10 @@ async def entrypoint(ctx: JobContext):
     call_start_time = datetime.now()
     logger.info(f"Call started at: {call_start_time}")
         
-    # Add participant tracking dictionary and last_audio_time
+    # Add participant tracking dictionary
     participant_prospects = {}
-    last_audio_time = time.time()  # Track when we last received any audio
-    last_participant_audio = time.time()  # Track participant's last audio
-    last_agent_audio = time.time()  # Track agent's last audio
-    SILENCE_TIMEOUT = 90  # Timeout in seconds
+    silence_timer = (room_name, SILENCE)
+    call_ended = asyncio.Event()
 
     conversation_stored = False
 
@@ -118,33 +132,29 @@ async def entrypoint(ctx: JobContext):
 
         logger.info("Creating voice assistant")
         agent, opening_line = await create_voice_assistant(agent_id, ctx, call_type)
+        call_latency = voice_latency.call(ctx.job.id)
         agent.start(room)
 
         if call_type != "textbot":
             logger.info("Delivering opening line")
-            await agent.say(opening_line, allow_interruptions=False)
+            await deliver_opening_line(agent, room, agent_id, opening_line)
 
         agent_metadata: Dict[str, Any] = await get_agent_metadata(agent_id) or {}
         user_id: str = agent_metadata.get('userId', '')
 
-        await asyncio.sleep(3)
-
-        # Find first participant
-        first_participant: Optional[RemoteParticipant] = None
-        sorted_participants = sorted(
-            room.remote_participants.values(),
-            key=lambda p: p.joined_at if hasattr(p, 'joined_at') else 0
+        # Find first participant (event driven, bounded by the join deadline)
+        first_participant: Optional[RemoteParticipant] = await wait_for_first_participant(
+            room,
+            settings.CALL_PARTICIPANT_JOIN_TIMEOUT_SECONDS
         )
 
-        if sorted_participants:
-            first_participant = sorted_participants[0]
-            if first_participant is not None:  # Type guard
-                participant_prospects[first_participant.sid] = ""
-                logger.info(
-                    f"Added participant {first_participant.sid} "
-                    "to tracking with empty prospect status"
-                )
-                logger.info(f"Found available participant: {first_participant.identity}")
+        if first_participant is not None:
+            participant_prospects[first_participant.sid] = ""
+            logger.info(
+                f"Added participant {first_participant.sid} "
+                "to tracking with empty prospect status"
+            )
+            logger.info(f"Found available participant: {first_participant.identity}")
         else:
             logger.info("No available participants found.")
             ctx.shutdown(reason="No available participants")
@@ -156,6 +166,8 @@ async def entrypoint(ctx: JobContext):
         ) -> None:
             """Handle completion of assistant's function calls."""
             logger.info("\n\n\n[on_function_calls_finished] method called")
+            if call_latency:
+                call_latency.function_calls_finished(called_functions)
 
             for called_function in called_functions:
                 function_name = called_function.call_info.function_info.name
@@ -220,6 +232,9 @@ async def entrypoint(ctx: JobContext):
         @agent.on("agent_started_speaking")
         def on_agent_started_speaking(user_transcription: Optional[str] = None) -> None:
             logger.info("agent_started_speaking method called")
+            timer_wheel.reset(silence_timer)
+            if call_latency:
+                call_latency.playback_started()
             if user_transcription:
                 logger.info(f"Agent started speaking: {user_transcription}")
             else:
@@ -228,6 +243,15 @@ async def entrypoint(ctx: JobContext):
         @agent.on("agent_stopped_speaking")
         def on_agent_stopped_speaking() -> None:
             logger.info("Agent stopped speaking")
+            timer_wheel.reset(silence_timer)
+
+        @agent.on("user_started_speaking")
+        def on_user_started_speaking() -> None:
+            timer_wheel.reset(silence_timer)
+
+        @agent.on("user_stopped_speaking")
+        def on_user_stopped_speaking() -> None:
+            timer_wheel.reset(silence_timer)
 
         @ctx.room.on("participant_connected")
         def on_participant_connected(participant: RemoteParticipant) -> None:
@@ -254,10 +278,12 @@ async def entrypoint(ctx: JobContext):
                 ctx.shutdown(
                     reason=f"Subscribed participant disconnected after {call_duration}"
                 )
+                call_ended.set()
 
         @ctx.room.on("disconnected")
         def on_disconnected(exception: Exception) -> None:
             logger.info(f"Room {room_name} disconnected. Reason: {str(exception)}")
+            call_ended.set()
 
         @ctx.room.on("connected")
         def on_connected() -> None:
@@ -304,6 +330,8 @@ async def entrypoint(ctx: JobContext):
                 logger.info("Conversation already stored, skipping...")
                 return
 
+            latency = voice_latency.finish_call(job_id)
+
             has_user_messages = any(
                 message.role == 'user' for message in agent.chat_ctx.messages
             )
@@ -315,17 +343,16 @@ async def entrypoint(ctx: JobContext):
                     )
                 return
 
+            # Claim the store before awaiting so a concurrent end of call skips it
+            conversation_stored = True
+
             # Use the helper function to format the transcript
             conversation_history = format_transcript_messages(agent.chat_ctx.messages)
 
-            print("\n\nconversation_history:", conversation_history)
             try:
-                import aiohttp
-
-                API_BASE_URL = os.getenv('API_BASE_URL')
-                url = f"{API_BASE_URL}/conversation/store_history"
-
-                payload = {
+                # Logging, summary, lead email and usage run in the API's
+                # post-call workers
+                await post_call_pipeline.enqueue({
                     "transcript": conversation_history,
                     "job_id": job_id,
                     "participant_identity": participant_identity,
@@ -334,74 +361,47 @@ async def entrypoint(ctx: JobContext):
                     "agent_id": agent_id,
                     "prospect_status": prospect_status,
                     "call_duration": call_duration.to_dict(),
-                    "call_type": "tel" if room_name.startswith("call-") else "web"
-                }
-
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(url, json=payload) as response:
-                        if response.status == 200:
-                            logger.info("Successfully stored conversation history")
-                        else:
-                            logger.error(
-                                f"Failed to store conversation history. "
-                                f"Status: {response.status}"
-                            )
-
+                    "call_type": "tel" if room_name.startswith("call-") else "web",
+                    "latency": latency
+                })
             except Exception as e:
-                logger.error(f"Error storing conversation history: {str(e)}")
+                logger.error(f"Error queueing conversation history: {str(e)}")
 
-            if prospect_status == "yes":
-                logger.info("prospect_status is yes, sending email")
-                await send_email(participant_identity, conversation_history, agent_id)
-
-            conversation_stored = True
-
-        async def check_silence_timeout() -> None:
-            while True:
-                await asyncio.sleep(1)
-                current_time = time.time()
-                time_since_last_audio = current_time - last_audio_time
-
-                if time_since_last_audio > SILENCE_TIMEOUT:
-                    call_duration = CallDuration.from_timestamps(
-                        call_start_time,
-                        datetime.now()
-                    )
-                    
-                    if first_participant is None:
-                        logger.error("First participant is None during silence timeout")
-                        ctx.shutdown(reason="First participant not found during silence timeout")
-                        break
-                        
-                    await store_conversation_history(
-                        agent,
-                        room_name,
-                        ctx.job.id,
-                        first_participant.identity,
-                        participant_prospects[first_participant.sid],
-                        call_duration
-                    )
-                    
-                    ctx.shutdown(
-                        reason=f"Silence timeout reached after {call_duration}"
-                    )
-                    break
+        async def end_call(reason: str) -> None:
+            if call_ended.is_set():
+                return
+            call_duration = CallDuration.from_timestamps(
+                call_start_time,
+                datetime.now()
+            )
+            await store_conversation_history(
+                agent,
+                room_name,
+                ctx.job.id,
+                first_participant.identity,
+                participant_prospects[first_participant.sid],
+                call_duration
+            )
+            ctx.shutdown(reason=f"{reason} after {call_duration}")
+            call_ended.set()
 
-        SILENCE_TIMEOUT = 90
-        silence_checker_task = asyncio.create_task(check_silence_timeout())
+        timer_wheel.schedule(
+            silence_timer,
+            settings.CALL_SILENCE_TIMEOUT_SECONDS,
+            lambda: end_call("Silence timeout reached")
+        )
+        timer_wheel.schedule(
+            (room_name, MAX_DURATION),
+            settings.CALL_MAX_DURATION_SECONDS,
+            lambda: end_call("Maximum call duration reached")
+        )
 
         try:
-            while True:
-                await asyncio.sleep(0.2)
+            await call_ended.wait()
         except Exception as e:
             logger.error(f"Error in main loop: {str(e)}")
         finally:
-            if silence_checker_task and not silence_checker_task.done():
-                silence_checker_task.cancel()
-                try:
-                    await silence_checker_task
-                except asyncio.CancelledError:
-                    pass
+            timer_wheel.cancel_all(room_name)
 
     except Exception as e:
         logger.error(f"Error in entrypoint: {str(e)}")
@@ -410,7 +410,8 @@ async def entrypoint(ctx: JobContext):
 
 
 def prewarm_fnc(proc: JobProcess) -> None:
-    proc.userdata["vad"] = silero.VAD.load()
+    prewarm_worker_resources()
+    proc.userdata["vad"] = worker_resources.get_vad()
 
 # async def load_fnc(proc: JobProcess):
 #     print("load_fnc called")
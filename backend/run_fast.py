@@ -14,17 +14,21 @@ load_dotenv(os.path.join(project_root, '.env'))
 
 # Import logger after environment variables are loaded
 from app.core.logging_setup import logger
+from app.core.config import settings
 
 if __name__ == "__main__":
     # Start the server
     logger.info("Starting FastAPI server")
     try:
         logger.info("Initializing Uvicorn server")
+        # Development server: one process, auto-reload. Production runs
+        # gunicorn.conf.py with several workers.
         uvicorn.run("app.main:app", 
                     host="0.0.0.0",
                     port=8000, 
                     reload=True,
-                    log_level="info"
+                    log_level="info",
+                    timeout_graceful_shutdown=settings.SERVER_DRAIN_SECONDS
                     )
     except OSError as e:
         if e.errno == 48:  # Address already in use
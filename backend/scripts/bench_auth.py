@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Benchmark per-request auth overhead in app.core.auth.validate_token.
+
+Signs RS256 tokens with a throwaway key, serves the matching JWKS from memory
+and compares full verification against the verified-token cache.
+
+Usage:
+    python -m scripts.bench_auth --iterations 2000 --tokens 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+from unittest import mock
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.core import auth
+
+ISSUER = "https://bench.clerk.local"
+KID = "bench-kid"
+
+
+def build_keypair() -> tuple[str, Dict]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+    public_jwk["kid"] = KID
+    return private_pem, {"keys": [public_jwk]}
+
+
+def make_tokens(private_pem: str, count: int) -> List[str]:
+    exp = int(time.time()) + 3600
+    return [
+        jwt.encode(
+            {"sub": f"user_{i}", "iss": ISSUER, "aud": "bankstream", "exp": exp},
+            private_pem,
+            algorithm="RS256",
+            headers={"kid": KID},
+        )
+        for i in range(count)
+    ]
+
+
+def summarise(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "p50_us": ordered[len(ordered) // 2] * 1e6,
+        "p95_us": ordered[int(len(ordered) * 0.95) - 1] * 1e6,
+        "p99_us": ordered[int(len(ordered) * 0.99) - 1] * 1e6,
+    }
+
+
+async def run(iterations: int, token_count: int) -> Dict[str, Dict[str, float]]:
+    private_pem, jwks = build_keypair()
+    tokens = make_tokens(private_pem, token_count)
+
+    async def fake_fetch() -> Dict:
+        return jwks
+
+    results: Dict[str, Dict[str, float]] = {}
+    with mock.patch.object(auth, "CLERK_JWT_ISSUER", ISSUER), \
+            mock.patch.object(auth._jwks_cache, "_fetch", side_effect=fake_fetch):
+        auth.clear_auth_caches()
+
+        # Full RS256 verification on every request (token cache cleared each time)
+        samples = []
+        for i in range(iterations):
+            auth._token_cache.clear()
+            token = tokens[i % token_count]
+            start = time.perf_counter()
+            await auth.validate_token(token)
+            samples.append(time.perf_counter() - start)
+        results["uncached"] = summarise(samples)
+
+        # Verified-token cache hits
+        samples = []
+        for i in range(iterations):
+            token = tokens[i % token_count]
+            start = time.perf_counter()
+            await auth.validate_token(token)
+            samples.append(time.perf_counter() - start)
+        results["cached"] = summarise(samples)
+        results["token_cache"] = {
+            "hits": auth._token_cache.hits,
+            "misses": auth._token_cache.misses,
+            "size": len(auth._token_cache),
+        }
+
+    auth.clear_auth_caches()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--tokens", type=int, default=50)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.iterations, args.tokens))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
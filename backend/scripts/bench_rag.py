@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+"""
+Benchmark the voice RAG retrieval stack against synthetic knowledge bases.
+
+Generates corpora of pseudo-word chunks at each size with deterministic
+bag-of-words embeddings, then runs similarity_search -> rerank_documents ->
+filter_relevant_docs from app.services.voice.rag for a set of queries. Jina
+(embeddings and rerank), the Supabase vector RPC and the relevance LLM are
+replaced by in-process stand-ins, optionally with a simulated round trip,
+so the numbers cover this code plus the search itself and are repeatable.
+Each query is drawn from one chunk, which is the hit counted by recall@k.
+sliding_window_chunking is timed separately on synthetic documents.
+
+The report is JSON, written to --output (application logging also goes to
+stdout). With --baseline it is compared against a saved report
+and the script exits non-zero when end-to-end p95 or throughput regressed
+by more than --tolerance, or recall@k dropped.
+
+Usage:
+    python -m scripts.bench_rag --sizes 1000 10000 100000 --output bench_rag.json
+    python -m scripts.bench_rag --sizes 1000 10000 --output new.json --baseline bench_rag.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+import zlib
+from typing import Any, Dict, List, Sequence
+from unittest import mock
+
+import numpy as np
+
+SYLLABLES = [
+    "ka", "lo", "mi", "ner", "tas", "vu", "ro", "pel", "dan", "shi",
+    "qu", "bre", "xo", "fa", "gin", "tor", "ul", "zem", "ha", "wys",
+]
+CHUNK_WORDS = 60
+TOPIC_WORDS_PER_CHUNK = 36
+TOPIC_VOCABULARY = 40
+FILLER_VOCABULARY = 400
+QUERY_WORDS = 10
+
+
+class SyntheticCorpus:
+    """Chunks of pseudo-words grouped by topic, with their embedding matrix."""
+
+    def __init__(self, size: int, dim: int, seed: int = 7):
+        self.size = size
+        self.dim = dim
+        rng = random.Random(seed)
+        topics = max(10, size // 100)
+
+        vocabulary = self._vocabulary(rng, FILLER_VOCABULARY + topics * TOPIC_VOCABULARY)
+        self.word_ids = {word: i for i, word in enumerate(vocabulary)}
+        filler = list(range(FILLER_VOCABULARY))
+        topic_words = [
+            list(range(FILLER_VOCABULARY + t * TOPIC_VOCABULARY, FILLER_VOCABULARY + (t + 1) * TOPIC_VOCABULARY))
+            for t in range(topics)
+        ]
+
+        vectors = np.random.default_rng(seed).standard_normal((len(vocabulary), dim)).astype(np.float32)
+        self.word_vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        ids = np.empty((size, CHUNK_WORDS), dtype=np.int32)
+        for i in range(size):
+            topic = topic_words[i % topics]
+            words = rng.choices(topic, k=TOPIC_WORDS_PER_CHUNK) + rng.choices(filler, k=CHUNK_WORDS - TOPIC_WORDS_PER_CHUNK)
+            rng.shuffle(words)
+            ids[i] = words
+        self.chunk_ids = ids
+        self.vocabulary = vocabulary
+        self.contents = [" ".join(vocabulary[w] for w in row) for row in ids]
+
+        self.embeddings = np.empty((size, dim), dtype=np.float32)
+        for start in range(0, size, 1000):
+            self.embeddings[start:start + 1000] = self._normalise(self.word_vectors[ids[start:start + 1000]].sum(axis=1))
+
+    @staticmethod
+    def _vocabulary(rng: random.Random, count: int) -> List[str]:
+        words: List[str] = []
+        seen = set()
+        while len(words) < count:
+            word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+        return words
+
+    @staticmethod
+    def _normalise(matrix: np.ndarray) -> np.ndarray:
+        return matrix / np.maximum(np.linalg.norm(matrix, axis=-1, keepdims=True), 1e-12)
+
+    def embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.split():
+            word_id = self.word_ids.get(word)
+            if word_id is not None:
+                vector += self.word_vectors[word_id]
+            else:
+                vector += np.random.default_rng(zlib.crc32(word.encode())).standard_normal(self.dim).astype(np.float32)
+        return self._normalise(vector).tolist()
+
+    def queries(self, count: int, seed: int = 11) -> List[Dict[str, Any]]:
+        """Queries built from the topic words of randomly chosen target chunks."""
+        rng = random.Random(seed)
+        queries = []
+        for target in rng.sample(range(self.size), min(count, self.size)):
+            topic_words = sorted({w for w in self.chunk_ids[target].tolist() if w >= FILLER_VOCABULARY})
+            words = rng.sample(topic_words, min(QUERY_WORDS, len(topic_words)))
+            queries.append({"text": " ".join(self.vocabulary[w] for w in words), "target": target})
+        return queries
+
+    def nbytes(self) -> int:
+        return self.embeddings.nbytes + self.chunk_ids.nbytes + sum(len(c) for c in self.contents)
+
+
+def word_overlap(query: str, document: str) -> float:
+    query_words = set(query.split())
+    return len(query_words & set(document.split())) / max(1, len(query_words))
+
+
+class FakeResponse:
+    def __init__(self, payload: Dict[str, Any]):
+        self._payload = payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> Dict[str, Any]:
+        return self._payload
+
+
+class FakeJina:
+    """Stands in for requests.post to the Jina embeddings and rerank endpoints."""
+
+    def __init__(self, corpus: SyntheticCorpus, latency: float = 0.0):
+        self.corpus = corpus
+        self.latency = latency
+
+    def post(self, url: str, **kwargs: Any) -> FakeResponse:
+        body = kwargs.get("json") or json.loads(kwargs.get("data") or "{}")
+        if self.latency:
+            time.sleep(self.latency)
+        if url.endswith("/embeddings"):
+            return FakeResponse({"data": [{"embedding": self.corpus.embed(body["input"])}]})
+        if url.endswith("/rerank"):
+            scored = sorted(
+                ((word_overlap(body["query"], doc), i, doc) for i, doc in enumerate(body["documents"])),
+                key=lambda item: (-item[0], item[1])
+            )
+            return FakeResponse({"results": [
+                {"index": i, "relevance_score": score, "document": {"text": doc}}
+                for score, i, doc in scored[:body["top_n"]]
+            ]})
+        raise ValueError(f"Unexpected URL {url}")
+
+
+class FakeSupabase:
+    """Stands in for the Supabase client's vector search RPC with exact cosine search."""
+
+    def __init__(self, corpus: SyntheticCorpus, latency: float = 0.0):
+        self.corpus = corpus
+        self.latency = latency
+
+    def rpc(self, name: str, params: Dict[str, Any]) -> "FakeSupabase._Call":
+        return self._Call(self, params)
+
+    class _Call:
+        def __init__(self, client: "FakeSupabase", params: Dict[str, Any]):
+            self.client = client
+            self.params = params
+
+        def execute(self) -> Any:
+            corpus = self.client.corpus
+            if self.client.latency:
+                time.sleep(self.client.latency)
+            query = np.asarray(self.params["query_embedding"], dtype=np.float32)
+            similarities = corpus.embeddings @ query
+            candidates = np.flatnonzero(similarities >= self.params["similarity_threshold"])
+            limit = self.params["max_results"]
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-similarities[candidates], limit - 1)[:limit]]
+            ranked = candidates[np.argsort(-similarities[candidates], kind="stable")]
+            return mock.Mock(data=[
+                {"id": int(i), "content": corpus.contents[i], "similarity": float(similarities[i])}
+                for i in ranked
+            ])
+
+
+async def fake_relevance_judge(system_prompt: str, user_prompt: str, conversation_history: Any = None,
+                               model: str = "claude", token_size: int = 1000, max_retries: int = 5) -> str:
+    query, _, provision = user_prompt.partition("# Legal Provision")
+    query = query.replace("# User query", "")
+    return "<thinking>overlap</thinking> yes" if word_overlap(query.strip(), provision) >= 0.5 else "no"
+
+
+def summarise(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[max(0, int(len(ordered) * 0.95) - 1)] * 1000, 3),
+        "p99_ms": round(ordered[max(0, int(len(ordered) * 0.99) - 1)] * 1000, 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def bench_retrieval(corpus: SyntheticCorpus, queries: Sequence[Dict[str, Any]], k: int,
+                          search_type: str, jina_latency: float, rpc_latency: float) -> Dict[str, Any]:
+    from app.services.voice import rag
+
+    stages: Dict[str, List[float]] = {
+        "similarity_search": [], "rerank_documents": [], "filter_relevant_docs": [], "end_to_end": []
+    }
+    hits = {"search": 0, "rerank": 0, "filter": 0}
+    jina = FakeJina(corpus, jina_latency)
+
+    with mock.patch.object(rag.requests, "post", jina.post), \
+            mock.patch.object(rag, "supabase", FakeSupabase(corpus, rpc_latency)), \
+            mock.patch.object(rag, "llm_response", fake_relevance_judge), \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        for query in queries:
+            target = corpus.contents[query["target"]]
+
+            t0 = time.perf_counter()
+            rows = await rag.similarity_search(query["text"], ["user_web_data"], "bench-user", search_type)
+            t1 = time.perf_counter()
+            docs = [row["content"] for row in rows]
+            reranked = await rag.rerank_documents(query["text"], k, docs) if docs else []
+            t2 = time.perf_counter()
+            filtered = await rag.filter_relevant_docs(query["text"], reranked) if reranked else []
+            t3 = time.perf_counter()
+
+            stages["similarity_search"].append(t1 - t0)
+            stages["rerank_documents"].append(t2 - t1)
+            stages["filter_relevant_docs"].append(t3 - t2)
+            stages["end_to_end"].append(t3 - t0)
+            hits["search"] += target in docs[:k]
+            hits["rerank"] += target in reranked[:k]
+            hits["filter"] += target in filtered
+        elapsed = time.perf_counter() - started
+
+    return {
+        "queries": len(queries),
+        "throughput_qps": round(len(queries) / elapsed, 2),
+        "latency": {stage: summarise(samples) for stage, samples in stages.items()},
+        f"recall_at_{k}": {stage: round(count / len(queries), 4) for stage, count in hits.items()},
+    }
+
+
+def bench_chunking(documents: int, words_per_document: int, seed: int = 3) -> Dict[str, Any]:
+    from app.services.knowledge_base.vectorise_data import sliding_window_chunking
+
+    corpus = SyntheticCorpus(100, 8, seed=seed)
+    rng = random.Random(seed)
+    texts = [" ".join(rng.choices(corpus.vocabulary, k=words_per_document)) for _ in range(documents)]
+    try:
+        sliding_window_chunking(texts[0][:100])
+    except Exception as e:
+        # The tokenizer's BPE file is downloaded on first use
+        return {"error": f"{type(e).__name__}: {e}"}
+
+    samples = []
+    chunks = 0
+    for text in texts:
+        t0 = time.perf_counter()
+        chunks += len(sliding_window_chunking(text))
+        samples.append(time.perf_counter() - t0)
+    total = sum(samples)
+    return {
+        "documents": documents,
+        "chunks": chunks,
+        "chunks_per_second": round(chunks / total, 1),
+        "words_per_second": round(documents * words_per_document / total, 1),
+        "latency": summarise(samples),
+    }
+
+
+async def run(sizes: Sequence[int], queries: int, k: int, dim: int, search_type: str,
+              jina_latency_ms: float, rpc_latency_ms: float, chunk_documents: int) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "config": {
+            "sizes": list(sizes), "queries": queries, "k": k, "dim": dim, "search_type": search_type,
+            "jina_latency_ms": jina_latency_ms, "rpc_latency_ms": rpc_latency_ms,
+        },
+        "chunking": bench_chunking(chunk_documents, 2000) if chunk_documents else None,
+        "sizes": {},
+    }
+    for size in sizes:
+        t0 = time.perf_counter()
+        corpus = SyntheticCorpus(size, dim)
+        build_seconds = time.perf_counter() - t0
+        result = await bench_retrieval(
+            corpus, corpus.queries(queries), k, search_type, jina_latency_ms / 1000, rpc_latency_ms / 1000
+        )
+        result["corpus"] = {
+            "chunks": size,
+            "build_seconds": round(build_seconds, 2),
+            "memory_mb": round(corpus.nbytes() / (1024 * 1024), 1),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        report["sizes"][str(size)] = result
+        del corpus
+    return report
+
+
+def check_baseline(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    failures = []
+    k = report["config"]["k"]
+    for size, result in report["sizes"].items():
+        before = baseline.get("sizes", {}).get(size)
+        if not before:
+            continue
+        p95, old_p95 = result["latency"]["end_to_end"]["p95_ms"], before["latency"]["end_to_end"]["p95_ms"]
+        if p95 > old_p95 * (1 + tolerance):
+            failures.append(f"{size} chunks: end-to-end p95 {p95}ms vs baseline {old_p95}ms")
+        qps, old_qps = result["throughput_qps"], before["throughput_qps"]
+        if qps < old_qps * (1 - tolerance):
+            failures.append(f"{size} chunks: throughput {qps}/s vs baseline {old_qps}/s")
+        for stage, recall in result[f"recall_at_{k}"].items():
+            old_recall = before.get(f"recall_at_{k}", {}).get(stage)
+            if old_recall is not None and recall < old_recall:
+                failures.append(f"{size} chunks: {stage} recall@{k} {recall} vs baseline {old_recall}")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark RAG retrieval on synthetic corpora")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Corpus sizes in chunks")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per corpus")
+    parser.add_argument("-k", type=int, default=5, help="Cut-off for recall@k and the rerank top_n")
+    parser.add_argument("--dim", type=int, default=256, help="Embedding dimensions")
+    parser.add_argument("--search-type", default="Deep Search", choices=["Deep Search", "Quick Search"])
+    parser.add_argument("--jina-latency-ms", type=float, default=0.0, help="Simulated Jina round trip")
+    parser.add_argument("--rpc-latency-ms", type=float, default=0.0, help="Simulated Supabase round trip")
+    parser.add_argument("--chunk-documents", type=int, default=50, help="Documents for the chunking benchmark; 0 skips it")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression over the baseline")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(
+        args.sizes, args.queries, args.k, args.dim, args.search_type,
+        args.jina_latency_ms, args.rpc_latency_ms, args.chunk_documents
+    ))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = check_baseline(report, json.load(f), args.tolerance)
+        if failures:
+            raise SystemExit("Regressed against baseline:\n" + "\n".join(failures))
+        print(f"Within {args.tolerance:.0%} of baseline {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
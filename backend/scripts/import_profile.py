@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+Report where import time goes when a module is loaded cold.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter,
+parses the per-module timings and prints the slowest imports by
+cumulative and by self time, plus a rollup per top-level package. With
+--baseline the total is compared against a previously saved --json report
+and the script exits non-zero when it regressed by more than --tolerance.
+
+Usage:
+    python -m scripts.import_profile app.main --top 25
+    python -m scripts.import_profile livekit_server --json > import_profile.json
+    python -m scripts.import_profile app.main --baseline import_profile.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def run_importtime(module: str, python: str = sys.executable) -> str:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr[-4000:])
+        raise SystemExit(f"Importing {module} failed with exit code {result.returncode}")
+    return result.stderr
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    timings = []
+    for line in output.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(ImportTiming(
+                module=module,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=len(indent) // 2,
+            ))
+    return timings
+
+
+def total_us(timings: List[ImportTiming]) -> int:
+    # Top-level entries already include everything they imported
+    return sum(t.cumulative_us for t in timings if t.depth == 0)
+
+
+def by_package(timings: List[ImportTiming]) -> Dict[str, int]:
+    packages: Dict[str, int] = {}
+    for timing in timings:
+        package = timing.module.split(".")[0]
+        packages[package] = packages.get(package, 0) + timing.self_us
+    return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+
+
+def build_report(module: str, timings: List[ImportTiming], top: int) -> Dict:
+    return {
+        "module": module,
+        "total_ms": round(total_us(timings) / 1000, 1),
+        "modules_imported": len(timings),
+        "slowest_cumulative": [
+            asdict(t) for t in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]
+        ],
+        "slowest_self": [
+            asdict(t) for t in sorted(timings, key=lambda t: t.self_us, reverse=True)[:top]
+        ],
+        "packages_ms": {
+            package: round(us / 1000, 1) for package, us in list(by_package(timings).items())[:top]
+        },
+    }
+
+
+def print_report(report: Dict) -> None:
+    print(f"\nImport profile for {report['module']}")
+    print("=" * 72)
+    print(f"Total: {report['total_ms']:.1f}ms across {report['modules_imported']} modules\n")
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for t in report["slowest_cumulative"]:
+        print(f"{t['cumulative_us'] / 1000:>14.1f} {t['self_us'] / 1000:>9.1f}  {'  ' * t['depth']}{t['module']}")
+
+    print(f"\n{'self ms':>14}  package")
+    for package, ms in report["packages_ms"].items():
+        print(f"{ms:>14.1f}  {package}")
+
+
+def check_baseline(report: Dict, baseline_path: str, tolerance: float) -> Optional[str]:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    limit = baseline["total_ms"] * (1 + tolerance)
+    if report["total_ms"] > limit:
+        return (
+            f"Import time regressed: {report['total_ms']:.1f}ms vs baseline "
+            f"{baseline['total_ms']:.1f}ms (limit {limit:.1f}ms)"
+        )
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile cold import time of a module")
+    parser.add_argument("module", nargs="?", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=20, help="Rows per table")
+    parser.add_argument("--runs", type=int, default=1, help="Repeat and keep the fastest run")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--baseline", help="JSON report to compare the total against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression over the baseline")
+    args = parser.parse_args()
+
+    runs = [parse_importtime(run_importtime(args.module)) for _ in range(max(1, args.runs))]
+    timings = min(runs, key=total_us)
+    report = build_report(args.module, timings, args.top)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.baseline:
+        failure = check_baseline(report, args.baseline, args.tolerance)
+        if failure:
+            raise SystemExit(failure)
+        print(f"\nWithin {args.tolerance:.0%} of baseline {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
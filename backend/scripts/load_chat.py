@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+"""
+Load-test the chat SSE route and lk_chat_process in one process.
+
+Simulates --sessions concurrent widget conversations of --turns messages
+each. Every message goes through app.api.routes.chat.chat_message and its
+SSE body is consumed as the server would send it (HTTP framing excluded),
+so the whole run shares one event loop, like one worker. The LLM is a fake
+streaming model with configurable time to first token and token rate; the
+conversation summarizer is stubbed too. Redis is real: the local instance
+from REDIS_HOST / REDIS_PORT.
+
+Reported per turn: time to first content chunk, tokens/sec, Redis commands
+and bytes written, and the number of messages in the prompt. The same
+metrics are also broken down by turn number, to show how cost grows with
+conversation length. Event-loop lag is sampled throughout.
+
+RedisChatStorage keys chats by agent only, so each simulated session uses
+its own agent id. Keys written by the run are deleted afterwards.
+
+Usage:
+    python -m scripts.load_chat --sessions 50 --turns 20 --output load_chat.json
+    python -m scripts.load_chat --sessions 200 --turns 5 --ttft-ms 400 --tokens 120 --token-interval-ms 15
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+from contextvars import ContextVar
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+from unittest import mock
+
+AGENT_PREFIX = "load-agent"
+
+_turn_stats: ContextVar[Optional[Dict[str, int]]] = ContextVar("load_chat_turn_stats", default=None)
+
+
+def _written_bytes(args: Any) -> int:
+    return sum(len(arg) for arg in args if isinstance(arg, (str, bytes)))
+
+
+class CountingRedis:
+    """Forwards to a Redis client, counting commands and bytes sent per turn."""
+
+    def __init__(self, client: Any):
+        self._client = client
+        self.commands = 0
+
+    def count(self, args: Any) -> None:
+        self.commands += 1
+        stats = _turn_stats.get()
+        if stats is not None:
+            stats["redis_commands"] += 1
+            stats["redis_bytes"] += _written_bytes(args)
+
+    def pipeline(self, *args: Any, **kwargs: Any) -> "CountingPipeline":
+        return CountingPipeline(self, self._client.pipeline(*args, **kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def counted(*args: Any, **kwargs: Any) -> Any:
+            self.count(args)
+            return attr(*args, **kwargs)
+        return counted
+
+
+class CountingPipeline:
+    def __init__(self, counter: CountingRedis, pipeline: Any):
+        self._counter = counter
+        self._pipeline = pipeline
+
+    async def __aenter__(self) -> "CountingPipeline":
+        await self._pipeline.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> Any:
+        return await self._pipeline.__aexit__(*exc)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._pipeline, name)
+        if name.startswith("_") or name == "execute" or not callable(attr):
+            return attr
+
+        def queued(*args: Any, **kwargs: Any) -> Any:
+            self._counter.count(args)
+            return attr(*args, **kwargs)
+        return queued
+
+
+class FakeStreamingLLM:
+    """Streams `tokens` chunks shaped like livekit's LLM stream, recording prompt sizes."""
+
+    def __init__(self, tokens: int, ttft: float, token_interval: float):
+        self.tokens = tokens
+        self.ttft = ttft
+        self.token_interval = token_interval
+
+    def chat(self, chat_ctx: Any, fnc_ctx: Any = None, **kwargs: Any) -> AsyncIterator[Any]:
+        stats = _turn_stats.get()
+        if stats is not None:
+            stats["prompt_messages"] = len(chat_ctx.messages)
+            stats["prompt_chars"] = sum(len(str(m.content or "")) for m in chat_ctx.messages)
+        return self._stream()
+
+    async def _stream(self) -> AsyncIterator[Any]:
+        await asyncio.sleep(self.ttft)
+        for i in range(self.tokens):
+            if i:
+                await asyncio.sleep(self.token_interval)
+            delta = SimpleNamespace(content=f"tok{i} ", tool_calls=None)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+async def fake_summarizer(previous_summary: str, transcript: str) -> str:
+    return (previous_summary + " " + transcript[:200]).strip()[-1000:]
+
+
+def fake_agent_metadata(agent_id: str) -> Dict[str, Any]:
+    return {
+        "id": agent_id,
+        "instructions": "You are a helpful receptionist for a load test.",
+        "openingLine": "Hi, how can I help?",
+        "features": [],
+    }
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes a sleeping task."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+
+def percentiles(samples: List[float], scale: float = 1000.0, digits: int = 3) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+
+    def at(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * scale, digits)
+
+    return {"p50": at(0.50), "p95": at(0.95), "p99": at(0.99), "max": round(ordered[-1] * scale, digits)}
+
+
+async def run_turn(chat_message: Any, agent_id: str, room_name: str, text: str) -> Dict[str, Any]:
+    stats = {"redis_commands": 0, "redis_bytes": 0, "prompt_messages": 0, "prompt_chars": 0}
+    _turn_stats.set(stats)
+    request = mock.Mock()
+    request.json = mock.AsyncMock(return_value={"message": text, "agent_id": agent_id, "room_name": room_name})
+
+    started = time.perf_counter()
+    first_chunk = None
+    chunks = 0
+    error = None
+    response = await chat_message(request)
+    async for event in response.body_iterator:
+        if event.startswith("data: [DONE]"):
+            break
+        payload = json.loads(event[len("data: "):])
+        if "error" in payload:
+            error = payload["error"]
+            continue
+        chunks += 1
+        if first_chunk is None:
+            first_chunk = time.perf_counter()
+    finished = time.perf_counter()
+
+    streaming = finished - first_chunk if first_chunk else 0.0
+    return {
+        **stats,
+        "ttfc": (first_chunk - started) if first_chunk else None,
+        "duration": finished - started,
+        "tokens": chunks,
+        "tokens_per_second": (chunks - 1) / streaming if chunks > 1 and streaming > 0 else None,
+        "error": error,
+    }
+
+
+async def run_session(chat_message: Any, index: int, turns: int, think: float, start_delay: float,
+                      results: List[Dict[str, Any]]) -> None:
+    await asyncio.sleep(start_delay)
+    agent_id, room_name = f"{AGENT_PREFIX}-{index}", f"load-room-{index}"
+    for turn in range(turns):
+        result = await run_turn(chat_message, agent_id, room_name, f"Question {turn} from session {index}?")
+        result["turn"] = turn + 1
+        results.append(result)
+        if think:
+            await asyncio.sleep(think)
+
+
+def summarise(results: List[Dict[str, Any]], elapsed: float, lag: List[float]) -> Dict[str, Any]:
+    def column(name: str, rows: List[Dict[str, Any]]) -> List[float]:
+        return [r[name] for r in rows if r[name] is not None]
+
+    by_turn: Dict[int, List[Dict[str, Any]]] = {}
+    for result in results:
+        by_turn.setdefault(result["turn"], []).append(result)
+
+    return {
+        "turns": len(results),
+        "errors": sum(1 for r in results if r["error"]),
+        "turns_per_second": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "ttfc_ms": percentiles(column("ttfc", results)),
+        "turn_duration_ms": percentiles(column("duration", results)),
+        "tokens_per_second": percentiles(column("tokens_per_second", results), scale=1.0, digits=1),
+        "redis_commands_per_turn": round(statistics.fmean(column("redis_commands", results)), 2),
+        "redis_bytes_per_turn": round(statistics.fmean(column("redis_bytes", results)), 1),
+        "event_loop_lag_ms": percentiles(lag),
+        "by_turn": {
+            str(turn): {
+                "ttfc_p50_ms": percentiles(column("ttfc", rows))["p50"],
+                "duration_p50_ms": percentiles(column("duration", rows))["p50"],
+                "redis_commands": round(statistics.fmean(column("redis_commands", rows)), 2),
+                "redis_bytes": round(statistics.fmean(column("redis_bytes", rows)), 1),
+                "prompt_messages": round(statistics.fmean(column("prompt_messages", rows)), 1),
+                "prompt_chars": round(statistics.fmean(column("prompt_chars", rows)), 1),
+            }
+            for turn, rows in sorted(by_turn.items())
+        },
+    }
+
+
+async def run(sessions: int, turns: int, tokens: int, ttft_ms: float, token_interval_ms: float,
+              think_ms: float, ramp_seconds: float) -> Dict[str, Any]:
+    from app.api.routes.chat import chat_message
+    from app.services import redis_service
+    from app.services.chat import context_window as context_window_module
+    from app.services.chat import lk_chat
+    from app.services.chat.session_runtime import chat_sessions
+
+    counting = CountingRedis(redis_service.chat_redis)
+    try:
+        await counting._client.ping()
+    except Exception as e:
+        raise SystemExit(f"Redis is not reachable: {e}")
+
+    async def agent_metadata(agent_id: str) -> Dict[str, Any]:
+        return fake_agent_metadata(agent_id)
+
+    fake_llm = FakeStreamingLLM(tokens, ttft_ms / 1000, token_interval_ms / 1000)
+    results: List[Dict[str, Any]] = []
+    monitor = LoopLagMonitor()
+    hits, misses = chat_sessions.hits, chat_sessions.misses
+
+    with mock.patch.object(redis_service, "chat_redis", counting), \
+            mock.patch.object(context_window_module, "chat_redis", counting), \
+            mock.patch.object(context_window_module.context_window, "summarizer", fake_summarizer), \
+            mock.patch.object(lk_chat, "get_agent_metadata", agent_metadata), \
+            mock.patch.object(lk_chat, "get_chat_llm", lambda: fake_llm), \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        monitor.start()
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(
+                run_session(chat_message, i, turns, think_ms / 1000, ramp_seconds * i / max(1, sessions), results)
+                for i in range(sessions)
+            ))
+            elapsed = time.perf_counter() - started
+        finally:
+            await monitor.stop()
+            for i in range(sessions):
+                await redis_service.RedisChatStorage.delete_chat(f"{AGENT_PREFIX}-{i}", f"load-room-{i}")
+                await context_window_module.context_window.delete_state(f"{AGENT_PREFIX}-{i}", f"load-room-{i}")
+                chat_sessions.evict(f"{AGENT_PREFIX}-{i}", f"load-room-{i}")
+
+    report = summarise(results, elapsed, monitor.samples)
+    report["config"] = {
+        "sessions": sessions, "turns": turns, "tokens": tokens, "ttft_ms": ttft_ms,
+        "token_interval_ms": token_interval_ms, "think_ms": think_ms, "ramp_seconds": ramp_seconds,
+    }
+    report["session_cache"] = {"hits": chat_sessions.hits - hits, "misses": chat_sessions.misses - misses}
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the chat SSE route in one process")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent conversations")
+    parser.add_argument("--turns", type=int, default=10, help="Messages per conversation")
+    parser.add_argument("--tokens", type=int, default=60, help="Tokens per fake LLM reply")
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="Fake LLM time to first token")
+    parser.add_argument("--token-interval-ms", type=float, default=10.0, help="Fake LLM delay between tokens")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between a reply and the next message")
+    parser.add_argument("--ramp-seconds", type=float, default=1.0, help="Spread session starts over this long")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(
+        args.sessions, args.turns, args.tokens, args.ttft_ms,
+        args.token_interval_ms, args.think_ms, args.ramp_seconds
+    ))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(
+            f"{report['turns']} turns, {report['turns_per_second']}/s, "
+            f"TTFC p95 {report['ttfc_ms']['p95']}ms, loop lag p99 {report['event_loop_lag_ms']['p99']}ms",
+            file=sys.stderr
+        )
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+-- Persist a newly purchased Twilio number in one transaction: the
+-- twilio_numbers row, the guided_setup phone number and the user's
+-- telephony_numbers list. Called from app/services/twilio/number_store.py.
+create or replace function public.store_provisioned_number(
+    p_phone_number text,
+    p_user_id text,
+    p_number_sid text,
+    p_account_sid text,
+    p_is_trial boolean
+) returns jsonb
+language plpgsql
+as $$
+declare
+    v_telephony jsonb;
+    v_twilio jsonb;
+    v_guided_setup_rows integer;
+    v_users_rows integer;
+begin
+    insert into public.twilio_numbers (
+        phone_number, owner_user_id, number_sid, account_sid,
+        status, created_at, is_trial_number
+    ) values (
+        p_phone_number, p_user_id, p_number_sid, p_account_sid,
+        'active', now(), p_is_trial
+    );
+
+    update public.guided_setup
+       set phone_number = p_phone_number
+     where user_id = p_user_id;
+    get diagnostics v_guided_setup_rows = row_count;
+
+    select telephony_numbers into v_telephony
+      from public.users
+     where id = p_user_id
+       for update;
+
+    if v_telephony is null or jsonb_typeof(v_telephony) <> 'object' then
+        v_telephony := '{}'::jsonb;
+    end if;
+    v_twilio := v_telephony -> 'twilio';
+    if v_twilio is null or jsonb_typeof(v_twilio) <> 'array' then
+        v_twilio := '[]'::jsonb;
+    end if;
+    if not v_twilio @> jsonb_build_array(p_phone_number) then
+        v_twilio := v_twilio || jsonb_build_array(p_phone_number);
+    end if;
+
+    update public.users
+       set telephony_numbers = jsonb_set(v_telephony, '{twilio}', v_twilio)
+     where id = p_user_id;
+    get diagnostics v_users_rows = row_count;
+
+    if v_users_rows = 0 then
+        raise exception 'User % not found', p_user_id using errcode = 'P0002';
+    end if;
+
+    return jsonb_build_object(
+        'twilio_numbers_success', true,
+        'guided_setup_success', v_guided_setup_rows > 0,
+        'users_success', true
+    );
+end;
+$$;
@@ -0,0 +1,5 @@
+-- Per-call voice turn latency aggregates (turn count and p50/p95/max per
+-- stage), written by the post-call store_log stage from
+-- app/services/voice/turn_latency.py.
+alter table public.conversation_logs
+    add column if not exists latency jsonb;
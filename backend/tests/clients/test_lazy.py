@@ -0,0 +1,97 @@
+import threading
+import unittest.mock as mock
+
+import pytest
+
+from app.clients import lazy
+from app.clients.lazy import LazyClient, build_clients, lazy_client, registered_clients, warm_up
+from scripts.import_profile import build_report, parse_importtime
+
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       2500 |     spacy.util
+import time:       300 |       2800 |   spacy
+import time:       400 |       3200 | app.services.knowledge_base.vectorise_data
+import time:        60 |         60 | json
+"""
+
+
+@pytest.fixture(autouse=True)
+def isolated_registry():
+    with mock.patch.dict(lazy._registry, clear=True):
+        yield
+
+
+class TestLazyClient:
+    """Test suite for deferred client construction"""
+
+    def test_builds_on_first_use_only(self):
+        factory = mock.Mock(return_value=mock.Mock(name="client"))
+        client = LazyClient("thing", factory)
+        factory.assert_not_called()
+
+        client.chat.completions.create(model="x")
+        client.chat.completions.create(model="y")
+
+        factory.assert_called_once()
+        assert client.built
+        assert client.get().chat.completions.create.call_count == 2
+
+    def test_forwards_calls(self):
+        nlp = LazyClient("nlp", lambda: (lambda text: text.upper()))
+        assert nlp("hello") == "HELLO"
+
+    def test_concurrent_first_use_builds_once(self):
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def factory():
+            calls.append(1)
+            return object()
+
+        client = LazyClient("shared", factory)
+
+        def use():
+            barrier.wait()
+            client.get()
+
+        threads = [threading.Thread(target=use) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+
+    def test_same_name_shares_one_client(self):
+        first = lazy_client("openai", object)
+        second = lazy_client("openai", object)
+        assert first is second
+
+    @pytest.mark.asyncio
+    async def test_warm_up_builds_selected_and_survives_failures(self):
+        lazy_client("good", object)
+        lazy_client("bad", mock.Mock(side_effect=RuntimeError("no key")))
+        lazy_client("untouched", object)
+
+        await warm_up(["good", "bad"])
+        assert registered_clients() == {"good": True, "bad": False, "untouched": False}
+
+        build_clients()
+        assert registered_clients()["untouched"]
+
+
+class TestImportProfile:
+    """Test suite for the import time report"""
+
+    def test_parses_and_ranks_imports(self):
+        timings = parse_importtime(IMPORTTIME_OUTPUT)
+        report = build_report("app", timings, top=2)
+
+        assert report["total_ms"] == 3.3
+        assert [t["module"] for t in report["slowest_cumulative"]] == [
+            "app.services.knowledge_base.vectorise_data", "spacy"
+        ]
+        assert report["slowest_self"][0]["module"] == "spacy.util"
+        assert report["packages_ms"] == {"spacy": 2.3, "app": 0.4}
@@ -9,4 +9,23 @@ def mock_request():
 
 @pytest.fixture
 def mock_current_user():
-    return "test_user_id" 
\ No newline at end of file
+    return "test_user_id"
+
+@pytest.fixture
+def redis_client():
+    """In-memory redis.asyncio client, isolated per test"""
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+class FakeClock:
+    """Settable stand-in for time.monotonic"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
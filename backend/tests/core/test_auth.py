@@ -0,0 +1,123 @@
+import time
+import pytest
+import unittest.mock as mock
+from fastapi import HTTPException
+
+from app.core.auth import JWKSCache, VerifiedTokenCache
+
+
+def make_jwks(*kids):
+    return {"keys": [{"kid": kid, "kty": "RSA"} for kid in kids]}
+
+
+class TestJWKSCache:
+    """Test suite for the TTL JWKS cache"""
+
+    @pytest.mark.asyncio
+    async def test_fetches_once_while_fresh(self):
+        cache = JWKSCache(ttl_seconds=3600, min_refresh_interval=30)
+        fetch = mock.AsyncMock(return_value=make_jwks("a"))
+        with mock.patch.object(cache, "_fetch", fetch):
+            assert (await cache.get_key("a"))["kid"] == "a"
+            assert (await cache.get_key("a"))["kid"] == "a"
+        assert fetch.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_triggers_refresh(self):
+        cache = JWKSCache(ttl_seconds=3600, min_refresh_interval=0)
+        fetch = mock.AsyncMock(side_effect=[make_jwks("a"), make_jwks("a", "b")])
+        with mock.patch.object(cache, "_fetch", fetch):
+            await cache.get_key("a")
+            key = await cache.get_key("b")
+        assert key["kid"] == "b"
+        assert fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refresh_is_rate_limited(self):
+        cache = JWKSCache(ttl_seconds=3600, min_refresh_interval=60)
+        fetch = mock.AsyncMock(return_value=make_jwks("a"))
+        with mock.patch.object(cache, "_fetch", fetch):
+            await cache.get_key("a")
+            assert await cache.get_key("bogus") is None
+            assert await cache.get_key("bogus") is None
+        assert fetch.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_refresh_is_single_flight(self):
+        import asyncio
+
+        cache = JWKSCache(ttl_seconds=3600, min_refresh_interval=30)
+
+        async def slow_fetch():
+            await asyncio.sleep(0.01)
+            return make_jwks("a")
+
+        fetch = mock.AsyncMock(side_effect=slow_fetch)
+        with mock.patch.object(cache, "_fetch", fetch):
+            keys = await asyncio.gather(*(cache.get_key("a") for _ in range(20)))
+        assert all(key["kid"] == "a" for key in keys)
+        assert fetch.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_serves_cached_keys(self):
+        cache = JWKSCache(ttl_seconds=0, min_refresh_interval=0)
+        fetch = mock.AsyncMock(side_effect=[make_jwks("a"), Exception("boom")])
+        with mock.patch.object(cache, "_fetch", fetch):
+            await cache.get_key("a")
+            key = await cache.get_key("a")
+        assert key["kid"] == "a"
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_backs_off(self):
+        import asyncio
+
+        cache = JWKSCache(ttl_seconds=0, min_refresh_interval=30)
+
+        async def fetch_once():
+            if fetch.await_count == 1:
+                return make_jwks("a")
+            await asyncio.sleep(0.01)
+            raise Exception("timeout")
+
+        fetch = mock.AsyncMock(side_effect=fetch_once)
+        with mock.patch.object(cache, "_fetch", fetch):
+            await cache.get_key("a")
+            keys = await asyncio.gather(*(cache.get_key("a") for _ in range(10)))
+            assert (await cache.get_key("a"))["kid"] == "a"
+        assert all(key["kid"] == "a" for key in keys)
+        # One failed fetch, then cached keys until the interval passes
+        assert fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_initial_fetch_raises(self):
+        cache = JWKSCache(ttl_seconds=3600, min_refresh_interval=30)
+        with mock.patch.object(cache, "_fetch", mock.AsyncMock(side_effect=Exception("boom"))):
+            with pytest.raises(HTTPException) as exc_info:
+                await cache.get_key("a")
+        assert exc_info.value.status_code == 500
+
+
+class TestVerifiedTokenCache:
+    """Test suite for the verified-token LRU"""
+
+    def test_hit_until_exp(self):
+        cache = VerifiedTokenCache(max_size=10)
+        cache.put("token", "user_1", time.time() + 60)
+        assert cache.get("token") == "user_1"
+
+    def test_expired_entry_is_dropped(self):
+        cache = VerifiedTokenCache(max_size=10)
+        cache.put("token", "user_1", time.time() - 1)
+        assert cache.get("token") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = VerifiedTokenCache(max_size=2)
+        exp = time.time() + 60
+        cache.put("t1", "u1", exp)
+        cache.put("t2", "u2", exp)
+        cache.get("t1")
+        cache.put("t3", "u3", exp)
+        assert cache.get("t2") is None
+        assert cache.get("t1") == "u1"
+        assert cache.get("t3") == "u3"
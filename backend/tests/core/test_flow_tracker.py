@@ -0,0 +1,86 @@
+import asyncio
+import unittest.mock as mock
+
+import pytest
+
+from app.utils.flow_tracker import FlowTracker, SpanRecorder, StepLatency
+
+
+@pytest.fixture(autouse=True)
+def fresh_recorder():
+    with mock.patch.object(FlowTracker, "recorder", SpanRecorder(capacity=8, sample_rate=1.0)), \
+         mock.patch.object(FlowTracker, "_active_flows", type(FlowTracker._active_flows)()):
+        yield FlowTracker.recorder
+    FlowTracker._current_flow.set(None)
+
+
+class TestFlowTracker:
+    """Test suite for the contextvar-based FlowTracker"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_flows_do_not_mix(self):
+        async def request(flow_id, steps):
+            FlowTracker.start_flow(flow_id, "request")
+            for step in range(steps):
+                async with FlowTracker.span(f"step{step}"):
+                    await asyncio.sleep(0)
+            return FlowTracker.end_flow()
+
+        first, second = await asyncio.gather(request("a", 2), request("b", 3))
+
+        assert first["flow_id"] == "a"
+        assert [s["name"] for s in first["steps"]] == ["step0", "step1"]
+        assert second["flow_id"] == "b"
+        assert len(second["steps"]) == 3
+        assert FlowTracker.current_flow() is None
+
+    @pytest.mark.asyncio
+    async def test_tracked_function_records_latency_and_errors(self, fresh_recorder):
+        @FlowTracker.track_function()
+        async def fetch(key):
+            if key == "bad":
+                raise ValueError("boom")
+            return key
+
+        assert await fetch("ok") == "ok"
+        with pytest.raises(ValueError):
+            await fetch("bad")
+
+        steps = fresh_recorder.snapshot()["steps"]
+        assert steps["fetch"]["count"] == 1
+        assert steps["fetch:error"]["count"] == 1
+
+    def test_unsampled_flow_records_nothing(self, fresh_recorder):
+        fresh_recorder.sample_rate = 0.0
+        fresh_recorder.rng = lambda: 0.5
+        FlowTracker.start_flow("quiet")
+        with FlowTracker.span("embedding"):
+            pass
+        FlowTracker.record("llm_ttft", 0.2)
+        assert FlowTracker.end_flow()["steps"] == []
+        assert fresh_recorder.snapshot()["steps"] == {}
+
+    def test_abandoned_flows_are_bounded(self):
+        with mock.patch("app.utils.flow_tracker.MAX_ACTIVE_FLOWS", 3):
+            for i in range(10):
+                FlowTracker.start_flow(f"leak{i}")
+        assert list(FlowTracker._active_flows) == ["leak7", "leak8", "leak9"]
+
+
+class TestStepLatency:
+    """Test suite for the per-step ring buffer and histogram"""
+
+    def test_ring_buffer_keeps_recent_window_and_total_histogram(self):
+        stats = StepLatency(capacity=4)
+        for ms in (3, 30, 300, 3000, 20, 20):
+            stats.add(ms / 1000)
+        snapshot = stats.snapshot()
+
+        assert snapshot["count"] == 6
+        assert snapshot["window"] == 4
+        assert snapshot["max_ms"] == 3000.0
+        # Window now holds 300, 3000, 20, 20
+        assert snapshot["p50_ms"] == 300.0
+        assert snapshot["histogram"]["le_5ms"] == 1
+        assert snapshot["histogram"]["le_25ms"] == 2
+        assert snapshot["histogram"]["le_5000ms"] == 1
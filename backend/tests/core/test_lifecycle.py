@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from app.core.lifecycle import Lifecycle
+
+
+async def ok():
+    return True
+
+
+async def failing():
+    raise ConnectionError("down")
+
+
+async def slow():
+    await asyncio.sleep(1)
+    return True
+
+
+class TestLifecycle:
+    """Test suite for worker readiness and drain"""
+
+    @pytest.mark.asyncio
+    async def test_ready_after_start_when_checks_pass(self):
+        lifecycle = Lifecycle()
+        lifecycle.add_check("redis", ok)
+        assert (await lifecycle.readiness())["ready"] is False
+
+        lifecycle.mark_started()
+        report = await lifecycle.readiness()
+        assert report["ready"] is True
+        assert report["checks"] == {"redis": True}
+
+    @pytest.mark.asyncio
+    async def test_failing_or_slow_checks_are_not_ready(self):
+        lifecycle = Lifecycle(check_timeout=0.05)
+        lifecycle.add_check("redis", failing)
+        lifecycle.add_check("supabase", slow)
+        lifecycle.mark_started()
+
+        report = await lifecycle.readiness()
+        assert report["ready"] is False
+        assert report["checks"] == {"redis": False, "supabase": False}
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_open_streams(self):
+        lifecycle = Lifecycle()
+        lifecycle.mark_started()
+        release = asyncio.Event()
+        closed = []
+
+        async def body():
+            try:
+                yield "data: 1\n\n"
+                await release.wait()
+                yield "data: [DONE]\n\n"
+            finally:
+                closed.append(True)
+
+        async def consume():
+            return [chunk async for chunk in lifecycle.stream(body())]
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        assert lifecycle.streams == 1
+
+        drain = asyncio.create_task(lifecycle.drain(timeout=2))
+        await asyncio.sleep(0.05)
+        assert (await lifecycle.readiness())["ready"] is False
+        assert not drain.done()
+
+        release.set()
+        assert await drain == 0
+        assert await consumer == ["data: 1\n\n", "data: [DONE]\n\n"]
+        assert closed == [True]
+
+    @pytest.mark.asyncio
+    async def test_drain_gives_up_after_timeout(self):
+        lifecycle = Lifecycle()
+        # A stream that never finishes
+        lifecycle.streams = 1
+        assert await lifecycle.drain(timeout=0.05) == 1
+        assert lifecycle.draining
+
+    @pytest.mark.asyncio
+    async def test_abandoned_stream_closes_body(self):
+        lifecycle = Lifecycle()
+        closed = []
+
+        async def body():
+            try:
+                while True:
+                    yield "heartbeat"
+            finally:
+                closed.append(True)
+
+        stream = lifecycle.stream(body())
+        assert await stream.__anext__() == "heartbeat"
+        await stream.aclose()
+        assert lifecycle.streams == 0
+        assert closed == [True]
+
+    @pytest.mark.asyncio
+    async def test_event_feed_closes_when_drain_begins(self):
+        lifecycle = Lifecycle()
+        closed = []
+
+        async def feed():
+            try:
+                yield "data: 1\n\n"
+                # Waits for events that never come
+                await asyncio.Event().wait()
+            finally:
+                closed.append(True)
+
+        async def consume():
+            return [chunk async for chunk in lifecycle.stream(feed(), close_on_drain=True)]
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0.01)
+        assert lifecycle.streams == 1
+
+        lifecycle.begin_drain()
+        assert await asyncio.wait_for(consumer, 1) == ["data: 1\n\n"]
+        assert lifecycle.streams == 0
+        assert closed == [True]
+
+    @pytest.mark.asyncio
+    async def test_drain_keeps_the_deadline_set_when_it_began(self, clock):
+        lifecycle = Lifecycle(drain_seconds=5, clock=clock)
+        lifecycle.streams = 1
+        lifecycle.begin_drain()
+        assert lifecycle.drain_deadline == 5
+
+        # The server's wait used up the budget, so the hook does not wait again
+        clock.now = 5
+        assert await asyncio.wait_for(lifecycle.drain(timeout=5), 0.5) == 1
+        assert lifecycle.drain_deadline == 5
@@ -0,0 +1,90 @@
+import json
+import unittest.mock as mock
+
+import pytest
+
+from app.core import logging_setup
+from app.core.logging_setup import (
+    _Throttle,
+    logger,
+    null_logger,
+    parse_module_levels,
+    sampled,
+    throttled,
+    truncate,
+)
+
+
+@pytest.fixture
+def records():
+    """Collect records from a synchronous sink"""
+    collected = []
+    handler_id = logger.add(lambda message: collected.append(message.record), level="DEBUG")
+    yield collected
+    logger.remove(handler_id)
+
+
+class TestLoggingSetup:
+    """Test suite for logging helpers"""
+
+    def test_truncate(self):
+        assert truncate("abc", 5) == "abc"
+        assert truncate("abcdefgh", 3) == "abc... [truncated 5 chars]"
+        assert truncate("abcdefgh", 0) == "abcdefgh"
+
+    def test_patcher_truncates_message_and_extra(self, records):
+        with mock.patch.object(logging_setup.settings, "LOG_MAX_MESSAGE_CHARS", 10):
+            logger.bind(payload="y" * 50).info("x" * 50)
+
+        assert records[0]["message"] == "x" * 10 + "... [truncated 40 chars]"
+        assert records[0]["extra"]["payload"] == "y" * 10 + "... [truncated 40 chars]"
+
+    def test_json_record(self, records):
+        with mock.patch.object(logging_setup.settings, "LOG_JSON", True):
+            logger.bind(call_id="c1").warning("hello")
+
+        data = json.loads(records[0]["extra"]["serialized"])
+        assert data["message"] == "hello"
+        assert data["level"] == "WARNING"
+        assert data["extra"] == {"call_id": "c1"}
+
+    def test_parse_module_levels(self):
+        assert parse_module_levels("app.services.redis_service=warning, app.api = DEBUG,bad") == {
+            "app.services.redis_service": "WARNING",
+            "app.api": "DEBUG",
+        }
+        assert parse_module_levels("") == {}
+
+    def test_lazy_arguments_skipped_below_level(self, records):
+        expensive = mock.Mock(return_value="payload")
+        logger.opt(lazy=True).log(1, "{}", expensive)
+        expensive.assert_not_called()
+
+        logger.opt(lazy=True).debug("{}", expensive)
+        expensive.assert_called_once()
+
+    def test_throttle_counts_suppressed(self):
+        throttle = _Throttle()
+        with mock.patch.object(logging_setup.time, "monotonic", side_effect=[0.0, 1.0, 2.0, 11.0]):
+            assert throttle.allow("k", 10) == 0
+            assert throttle.allow("k", 10) is None
+            assert throttle.allow("k", 10) is None
+            assert throttle.allow("k", 10) == 2
+
+    def test_throttle_keys_are_bounded(self):
+        throttle = _Throttle(max_keys=2)
+        for key in "abc":
+            throttle.allow(key, 10)
+        assert list(throttle._last) == ["b", "c"]
+
+    def test_throttled_logger(self, records):
+        key = "test_throttled_logger"
+        throttled(key, 60).info("first")
+        throttled(key, 60).info("second")
+        assert throttled(key, 60) is null_logger
+        assert [r["message"] for r in records] == ["first"]
+
+    def test_sampled(self):
+        assert sampled(1.0) is logger
+        assert sampled(0.0) is null_logger
+        null_logger.info("dropped", extra=1)
@@ -0,0 +1,68 @@
+import asyncio
+import time
+import traceback
+import unittest.mock as mock
+
+import pytest
+
+from app.utils import loop_monitor as loop_monitor_module
+from app.utils.loop_monitor import LoopMonitor, call_site
+
+
+def blocking_helper(seconds):
+    time.sleep(seconds)
+
+
+class TestLoopMonitor:
+    """Test suite for the event loop stall detector"""
+
+    @pytest.mark.asyncio
+    async def test_captures_blocking_call_site(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.03)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            blocking_helper(0.2)
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+
+        report = monitor.report()
+        assert report["stalls"] == 1
+        assert report["lag"]["max_ms"] >= 150
+        offender = report["offenders"][0]
+        assert offender["count"] == 1
+        assert offender["total_ms"] >= 150
+        assert "blocking_helper" in offender["innermost"] or "blocking_helper" in " ".join(offender["stack"])
+
+        monitor.reset()
+        assert monitor.report()["offenders"] == []
+
+    @pytest.mark.asyncio
+    async def test_start_is_idempotent(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        monitor.start()
+        task = monitor._task
+        monitor.start()
+        assert monitor._task is task
+        await monitor.stop()
+        assert not monitor.running
+
+    def test_call_site_prefers_app_frames(self):
+        app_file = f"{loop_monitor_module.APP_ROOT}/services/voice/rag.py"
+        stack = [
+            traceback.FrameSummary(app_file, 259, "similarity_search"),
+            traceback.FrameSummary("/usr/lib/python3.11/ssl.py", 1100, "read"),
+        ]
+        assert call_site(stack) == "app/services/voice/rag.py:259 in similarity_search"
+        assert call_site(stack[1:]) == "/usr/lib/python3.11/ssl.py:1100 in read"
+
+    def test_call_sites_are_bounded(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        with mock.patch.object(loop_monitor_module, "MAX_CALL_SITES", 2):
+            for i in range(4):
+                monitor._record_stall({"site": f"site{i}", "innermost": None, "stack": []}, 0.1)
+
+        sites = [o["site"] for o in monitor.report()["offenders"]]
+        assert sorted(sites) == ["<other>", "site0", "site1"]
+        assert monitor.stalls == 4
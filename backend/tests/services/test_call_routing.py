@@ -0,0 +1,79 @@
+import pytest
+import unittest.mock as mock
+
+from app.services.voice.call_routing import (
+    AGENT_UPDATED,
+    NUMBER_CHANGED,
+    NUMBER_RELEASED,
+    PhoneRoutingTable,
+)
+
+
+def make_table(rows=()):
+    table = PhoneRoutingTable(mock.MagicMock(), reload_seconds=300)
+    table.replace(rows)
+    table.ensure_listener = mock.MagicMock()
+    return table
+
+
+def mock_supabase(data):
+    supabase = mock.MagicMock()
+    query = supabase.table.return_value.select.return_value.eq.return_value
+    query.execute = mock.AsyncMock(return_value=mock.MagicMock(data=data))
+    return supabase
+
+
+class TestPhoneRoutingTable:
+    """Test suite for the worker phone number routing table"""
+
+    def test_replace_skips_unassigned_numbers(self):
+        table = make_table([
+            {"phone_number": "+441", "assigned_agent_id": "agent-1"},
+            {"phone_number": "+442", "assigned_agent_id": None},
+        ])
+        assert table.lookup("+441") == "agent-1"
+        assert table.lookup("+442") is None
+
+    @pytest.mark.asyncio
+    async def test_resolve_hit_does_not_query_database(self):
+        table = make_table([{"phone_number": "+441", "assigned_agent_id": "agent-1"}])
+        with mock.patch("app.services.voice.call_routing.get_supabase") as get_supabase:
+            assert await table.resolve("+441") == "agent-1"
+        get_supabase.assert_not_called()
+        assert table.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_resolve_miss_falls_back_and_caches(self):
+        table = make_table()
+        supabase = mock_supabase([{"assigned_agent_id": "agent-2"}])
+        with mock.patch(
+            "app.services.voice.call_routing.get_supabase",
+            mock.AsyncMock(return_value=supabase)
+        ):
+            assert await table.resolve("+443") == "agent-2"
+        assert table.lookup("+443") == "agent-2"
+        assert table.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_release_event_removes_route(self):
+        table = make_table([{"phone_number": "+441", "assigned_agent_id": "agent-1"}])
+        await table.apply_event({"type": NUMBER_RELEASED, "phone_number": "+441"})
+        assert table.lookup("+441") is None
+
+    @pytest.mark.asyncio
+    async def test_number_changed_event_refreshes_route(self):
+        table = make_table([{"phone_number": "+441", "assigned_agent_id": "agent-1"}])
+        supabase = mock_supabase([{"assigned_agent_id": "agent-9"}])
+        with mock.patch(
+            "app.services.voice.call_routing.get_supabase",
+            mock.AsyncMock(return_value=supabase)
+        ):
+            await table.apply_event({"type": NUMBER_CHANGED, "phone_number": "+441"})
+        assert table.lookup("+441") == "agent-9"
+
+    @pytest.mark.asyncio
+    async def test_agent_updated_event_invalidates_agent_config(self):
+        table = make_table()
+        with mock.patch("app.services.voice.worker_resources.worker_resources") as resources:
+            await table.apply_event({"type": AGENT_UPDATED, "agent_id": "agent-1"})
+        resources.invalidate_agent_config.assert_called_once_with("agent-1")
@@ -0,0 +1,105 @@
+import asyncio
+import unittest.mock as mock
+
+import pytest
+
+from app.services.voice import call_timers
+from app.services.voice.call_timers import TimerWheel, SILENCE, MAX_DURATION
+
+
+class TestTimerWheel:
+    """Test suite for the per-worker call timer wheel"""
+
+    @pytest.mark.asyncio
+    async def test_fires_after_delay(self):
+        wheel = TimerWheel(tick_seconds=0.01, slots=8)
+        fired = asyncio.Event()
+        wheel.schedule(("room", SILENCE), 0.03, fired.set)
+        await asyncio.wait_for(fired.wait(), 1)
+        assert len(wheel) == 0
+
+    @pytest.mark.asyncio
+    async def test_delay_longer_than_one_revolution(self):
+        wheel = TimerWheel(tick_seconds=0.01, slots=4)
+        loop = asyncio.get_running_loop()
+        fired_at = loop.create_future()
+        start = loop.time()
+        wheel.schedule(("room", SILENCE), 0.1, lambda: fired_at.set_result(loop.time()))
+        elapsed = await asyncio.wait_for(fired_at, 1) - start
+        assert elapsed >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_timer_armed_mid_tick_is_not_early(self):
+        wheel = TimerWheel(tick_seconds=0.05, slots=8)
+        loop = asyncio.get_running_loop()
+        # Keeps the driver ticking
+        wheel.schedule(("room_a", MAX_DURATION), 1, lambda: None)
+        await asyncio.sleep(0.07)
+
+        fired_at = loop.create_future()
+        start = loop.time()
+        wheel.schedule(("room_b", SILENCE), 0.05, lambda: fired_at.set_result(loop.time()))
+        elapsed = await asyncio.wait_for(fired_at, 1) - start
+        wheel.cancel_all("room_a")
+        assert 0.05 <= elapsed < 0.15
+
+    @pytest.mark.asyncio
+    async def test_reset_pushes_deadline_back(self):
+        wheel = TimerWheel(tick_seconds=0.01, slots=16)
+        fired = []
+        key = ("room", SILENCE)
+        wheel.schedule(key, 0.05, lambda: fired.append(key))
+        for _ in range(5):
+            await asyncio.sleep(0.02)
+            assert wheel.reset(key)
+        assert fired == []
+        await asyncio.sleep(0.1)
+        assert fired == [key]
+
+    @pytest.mark.asyncio
+    async def test_cancel_all_for_room(self):
+        wheel = TimerWheel(tick_seconds=0.01, slots=8)
+        fired = []
+        wheel.schedule(("room_a", SILENCE), 0.02, lambda: fired.append("a_silence"))
+        wheel.schedule(("room_a", MAX_DURATION), 0.02, lambda: fired.append("a_max"))
+        wheel.schedule(("room_b", SILENCE), 0.02, lambda: fired.append("b_silence"))
+        wheel.cancel_all("room_a")
+        await asyncio.sleep(0.08)
+        assert fired == ["b_silence"]
+
+    @pytest.mark.asyncio
+    async def test_async_callback_is_scheduled(self):
+        wheel = TimerWheel(tick_seconds=0.01, slots=8)
+        done = asyncio.Event()
+
+        async def callback():
+            done.set()
+
+        wheel.schedule(("room", SILENCE), 0.01, callback)
+        await asyncio.wait_for(done.wait(), 1)
+
+    @pytest.mark.asyncio
+    async def test_failed_async_callback_is_logged_and_released(self):
+        wheel = TimerWheel(tick_seconds=0.01, slots=8)
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def callback():
+            started.set()
+            await release.wait()
+            raise RuntimeError("hangup failed")
+
+        with mock.patch.object(call_timers, "logger") as logger:
+            wheel.schedule(("room", MAX_DURATION), 0.01, callback)
+            await asyncio.wait_for(started.wait(), 1)
+            # Held by the wheel while it runs
+            assert len(wheel._callbacks) == 1
+            release.set()
+            for _ in range(3):
+                await asyncio.sleep(0)
+        assert wheel._callbacks == set()
+        assert "hangup failed" in logger.opt.return_value.error.call_args[0][0]
+
+    def test_reset_unarmed_timer(self):
+        wheel = TimerWheel(tick_seconds=0.01, slots=8)
+        assert wheel.reset(("room", SILENCE)) is False
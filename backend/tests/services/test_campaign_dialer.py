@@ -0,0 +1,272 @@
+import asyncio
+import time
+import unittest.mock as mock
+from datetime import datetime
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.routes import outbound
+from app.services.campaigns.dialer import FakeSipDialer, outcome_from_sip_error
+from app.services.campaigns.leads import parse_lead_csv
+from app.services.campaigns.models import (
+    CallOutcome,
+    Campaign,
+    CampaignStatus,
+    Lead,
+    LeadStatus,
+    in_quiet_hours,
+    next_callable_at,
+)
+from app.services.campaigns.scheduler import CampaignScheduler
+from app.services.campaigns.store import CampaignStore
+
+pytest.importorskip("lupa")
+
+
+ROOFERS_CSV = '''name,address,phone,website
+Dils Roofing & Solar,"
+2230 La Mirada Dr, Vista, CA",\"
++1 760-727-6000\",https://www.dilsroofing.com/
+The Roof Masters,"2304 La Mirada Dr",(844) 766-3968,http://socalroofmasters.com/
+Duplicate,"x",+1 760 727 6000,
+No Phone,"y",,
+'''
+
+# Noon UTC, a weekday
+NOON_UTC = datetime(2026, 10, 19, 12, 0, tzinfo=ZoneInfo("UTC")).timestamp()
+
+
+def make_campaign(**overrides):
+    fields = dict(
+        id="c1", user_id="user-1", agent_id="agent-1", trunk_id="ST_1",
+        calls_per_second=1000.0, max_concurrent_calls=2, retry_delay_seconds=0,
+        status=CampaignStatus.RUNNING
+    )
+    fields.update(overrides)
+    return Campaign(**fields)
+
+
+def make_leads(count):
+    return [Lead(id=f"lead-{i}", phone_number=f"+1555000{i:04d}") for i in range(count)]
+
+
+def make_scheduler(client, dialer, clock=lambda: NOON_UTC, max_calls_per_trunk=10):
+    store = CampaignStore(client)
+    scheduler = CampaignScheduler(
+        store, dialer, max_calls_per_trunk=max_calls_per_trunk, poll_seconds=0.01, clock=clock
+    )
+    return scheduler, store
+
+
+async def run_campaign(scheduler, campaign, leads):
+    await scheduler.create_campaign(campaign, leads)
+    await scheduler.start(campaign.id)
+    await asyncio.wait_for(scheduler.wait(campaign.id), timeout=5)
+
+
+class TestLeadImport:
+    """Test suite for CSV lead list parsing"""
+
+    def test_parses_scraped_roofers_csv(self):
+        leads = parse_lead_csv(ROOFERS_CSV)
+        assert [lead.phone_number for lead in leads] == ["+17607276000", "+18447663968"]
+        assert leads[0].name == "Dils Roofing & Solar"
+
+
+class TestQuietHours:
+    """Test suite for per-lead quiet hours"""
+
+    def test_quiet_hours_wrap_midnight(self):
+        assert in_quiet_hours(22, 21, 9)
+        assert in_quiet_hours(3, 21, 9)
+        assert not in_quiet_hours(12, 21, 9)
+
+    def test_lead_time_zone_delays_call_until_morning(self):
+        campaign = make_campaign()
+        # Noon UTC is 05:00 in Los Angeles
+        lead = Lead(id="l", phone_number="+1", timezone="America/Los_Angeles")
+        callable_at = next_callable_at(lead, campaign, NOON_UTC)
+        local = datetime.fromtimestamp(callable_at, ZoneInfo("America/Los_Angeles"))
+        assert (local.day, local.hour) == (19, 9)
+        assert next_callable_at(Lead(id="m", phone_number="+2"), campaign, NOON_UTC) == NOON_UTC
+
+    def test_sip_errors_map_to_outcomes(self):
+        assert outcome_from_sip_error(Exception("SIP 486 Busy Here")) == CallOutcome.BUSY
+        assert outcome_from_sip_error(Exception("480 Temporarily Unavailable")) == CallOutcome.NO_ANSWER
+        assert outcome_from_sip_error(Exception("403 Forbidden")) == CallOutcome.FAILED
+
+
+class TestCampaignScheduler:
+    """Test suite for the outbound campaign dialer"""
+
+    @pytest.mark.asyncio
+    async def test_dials_every_lead_within_concurrency_limit(self, redis_client):
+        dialer = FakeSipDialer(call_seconds=0.02)
+        scheduler, store = make_scheduler(redis_client, dialer)
+        await run_campaign(scheduler, make_campaign(), make_leads(6))
+
+        assert len(dialer.calls) == 6
+        assert dialer.max_active <= 2
+        assert (await store.progress("c1")) == {"completed": 6}
+        assert (await store.get_campaign("c1")).status == CampaignStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_trunk_limit_applies(self, redis_client):
+        dialer = FakeSipDialer(call_seconds=0.02)
+        scheduler, _ = make_scheduler(redis_client, dialer, max_calls_per_trunk=1)
+        await run_campaign(scheduler, make_campaign(max_concurrent_calls=5), make_leads(3))
+        assert dialer.max_active == 1
+
+    @pytest.mark.asyncio
+    async def test_busy_and_no_answer_are_retried_until_max_attempts(self, redis_client):
+        dialer = FakeSipDialer(outcomes={
+            "+15550000000": [CallOutcome.BUSY, CallOutcome.ANSWERED],
+            "+15550000001": [CallOutcome.NO_ANSWER] * 5,
+        })
+        scheduler, store = make_scheduler(redis_client, dialer)
+        await run_campaign(scheduler, make_campaign(max_attempts=3), make_leads(2))
+
+        leads = {lead.id: lead for lead in await store.get_leads("c1")}
+        assert leads["lead-0"].status == LeadStatus.COMPLETED
+        assert leads["lead-0"].attempts == 2
+        assert leads["lead-1"].status == LeadStatus.FAILED
+        assert leads["lead-1"].attempts == 3
+        assert leads["lead-1"].last_outcome == CallOutcome.NO_ANSWER
+
+    @pytest.mark.asyncio
+    async def test_pause_stops_new_calls(self, redis_client):
+        dialer = FakeSipDialer(call_seconds=0.05)
+        scheduler, store = make_scheduler(redis_client, dialer)
+        await scheduler.create_campaign(make_campaign(max_concurrent_calls=1), make_leads(5))
+        await scheduler.start("c1")
+        await asyncio.sleep(0.01)
+        await scheduler.pause("c1")
+        await asyncio.wait_for(scheduler.wait("c1"), timeout=5)
+
+        assert len(dialer.calls) == 1
+        assert (await store.progress("c1")) == {"completed": 1, "pending": 4}
+
+    @pytest.mark.asyncio
+    async def test_resume_retries_lead_left_mid_dial(self, redis_client):
+        dialer = FakeSipDialer()
+        scheduler, store = make_scheduler(redis_client, dialer)
+        lead = Lead(id="lead-0", phone_number="+15550000000", status=LeadStatus.DIALING, attempts=1)
+        await store.save_campaign(make_campaign())
+        await store.add_leads("c1", [lead])
+
+        await scheduler.resume_running()
+        await asyncio.wait_for(scheduler.wait("c1"), timeout=5)
+
+        (resumed,) = await store.get_leads("c1")
+        assert resumed.status == LeadStatus.COMPLETED
+        assert resumed.attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_campaign_locked_by_another_process_is_skipped(self, redis_client):
+        dialer = FakeSipDialer()
+        scheduler, store = make_scheduler(redis_client, dialer)
+        await store.acquire_lock("c1", "someone-else", 60)
+        await run_campaign(scheduler, make_campaign(), make_leads(1))
+        assert dialer.calls == []
+
+    @pytest.mark.asyncio
+    async def test_lock_is_refreshed_while_pacing(self, redis_client):
+        dialer = FakeSipDialer()
+        scheduler, store = make_scheduler(redis_client, dialer)
+        scheduler.lock_ttl_seconds = 0.3
+        refreshes = []
+        acquire_lock = store.acquire_lock
+
+        async def counting_acquire(*args):
+            refreshes.append(time.monotonic())
+            return await acquire_lock(*args)
+
+        store.acquire_lock = counting_acquire
+        # One dial every 0.5s, longer than the lock TTL
+        await run_campaign(scheduler, make_campaign(calls_per_second=2.0), make_leads(2))
+
+        assert len(dialer.calls) == 2
+        gaps = [b - a for a, b in zip(refreshes, refreshes[1:])]
+        assert max(gaps) < 0.3
+
+    @pytest.mark.asyncio
+    async def test_stops_dialing_when_lock_is_lost(self, redis_client):
+        dialer = FakeSipDialer()
+        scheduler, store = make_scheduler(redis_client, dialer)
+        scheduler.lock_ttl_seconds = 0.3
+        await scheduler.create_campaign(make_campaign(calls_per_second=2.0), make_leads(3))
+        await scheduler.start("c1")
+        await asyncio.sleep(0.05)
+        # The lock expired and another process took it during the pacing sleep
+        await store.client.set(store.lock_key("c1"), "someone-else")
+        await asyncio.wait_for(scheduler.wait("c1"), timeout=5)
+
+        assert len(dialer.calls) == 1
+        assert await store.client.get(store.lock_key("c1")) == "someone-else"
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limits_hold_across_processes(self, redis_client):
+        # Two workers sharing Redis, each dialing a campaign of the same agent
+        dialer = FakeSipDialer(call_seconds=0.05)
+        first, _ = make_scheduler(redis_client, dialer, max_calls_per_trunk=3)
+        second, _ = make_scheduler(redis_client, dialer, max_calls_per_trunk=3)
+        await asyncio.gather(
+            run_campaign(first, make_campaign(id="c1"), make_leads(4)),
+            run_campaign(second, make_campaign(id="c2"), make_leads(4)),
+        )
+
+        assert len(dialer.calls) == 8
+        assert dialer.max_active == 2
+        assert await redis_client.keys("campaign_calls:*") == []
+
+
+class TestCampaignStore:
+    """Test suite for the campaign lock and call slots in Redis"""
+
+    @pytest.mark.asyncio
+    async def test_lock_is_only_extended_or_released_by_its_owner(self, redis_client):
+        store = CampaignStore(redis_client)
+        assert await store.acquire_lock("c1", "me", 60)
+        assert await store.acquire_lock("c1", "me", 60)
+        assert not await store.acquire_lock("c1", "other", 60)
+
+        await store.release_lock("c1", "other")
+        assert await redis_client.get(store.lock_key("c1")) == "me"
+        await store.release_lock("c1", "me")
+        assert await store.acquire_lock("c1", "other", 60)
+
+    @pytest.mark.asyncio
+    async def test_call_slots_are_all_or_nothing_and_leases_expire(self, redis_client):
+        store = CampaignStore(redis_client)
+        campaign = make_campaign(max_concurrent_calls=2)
+        assert await store.take_call_slot(campaign, "call-1", 1, lease_seconds=0.05)
+        # The trunk is full, so the agent is not charged either
+        assert not await store.take_call_slot(campaign, "call-2", 1, lease_seconds=60)
+        assert await redis_client.zcard(store.agent_calls_key("agent-1")) == 1
+
+        # The first call's process died without releasing its slot
+        await asyncio.sleep(0.1)
+        assert await store.take_call_slot(campaign, "call-2", 1, lease_seconds=60)
+        await store.release_call_slot(campaign, "call-2")
+        assert await redis_client.zcard(store.trunk_calls_key("ST_1")) == 0
+
+
+class TestOutboundOwnership:
+    """Test suite for agent ownership on the outbound routes"""
+
+    @pytest.mark.asyncio
+    async def test_only_the_agent_owner_can_dial(self):
+        response = SimpleNamespace(data=[{"id": "agent-1", "userId": "user-1"}])
+        with mock.patch.object(outbound, "get_agent_content", mock.AsyncMock(return_value=response)):
+            assert (await outbound.get_owned_agent("agent-1", "user-1"))["id"] == "agent-1"
+            with pytest.raises(HTTPException) as exc:
+                await outbound.get_owned_agent("agent-1", "user-2")
+        assert exc.value.status_code == 404
+
+        missing = SimpleNamespace(data=[])
+        with mock.patch.object(outbound, "get_agent_content", mock.AsyncMock(return_value=missing)):
+            with pytest.raises(HTTPException):
+                await outbound.get_owned_agent("agent-9", "user-1")
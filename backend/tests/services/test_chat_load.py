@@ -0,0 +1,144 @@
+import asyncio
+import unittest.mock as mock
+
+import pytest
+
+from app.services import redis_service
+from app.services.chat import context_window as context_window_module
+from app.services.chat import lk_chat
+from app.services.chat.session_runtime import chat_sessions
+from scripts.load_chat import CountingRedis, FakeStreamingLLM, fake_agent_metadata, run
+
+pytest.importorskip("lupa")
+
+
+@pytest.fixture
+def fake_redis(redis_client):
+    with mock.patch.object(redis_service, "chat_redis", redis_client), \
+         mock.patch.object(context_window_module, "chat_redis", redis_client), \
+         mock.patch.object(context_window_module, "count_tokens", side_effect=lambda text: len(text.split())):
+        yield redis_client
+
+
+class TestChatLoad:
+    """Test suite for the chat SSE load-test harness"""
+
+    @pytest.mark.asyncio
+    async def test_counts_redis_commands_per_turn(self, fake_redis):
+        counting = CountingRedis(fake_redis)
+        async with counting.pipeline() as pipe:
+            await pipe.set("a", "12345")
+            await pipe.expire("a", 10)
+            await pipe.execute()
+        await counting.get("a")
+        assert counting.commands == 3
+
+    @pytest.mark.asyncio
+    async def test_reports_streaming_and_history_growth(self, fake_redis):
+        report = await run(sessions=3, turns=3, tokens=5, ttft_ms=1, token_interval_ms=0,
+                           think_ms=0, ramp_seconds=0)
+
+        assert report["turns"] == 9
+        assert report["errors"] == 0
+        assert report["ttfc_ms"]["p50"] > 0
+        assert report["redis_commands_per_turn"] > 0
+        by_turn = report["by_turn"]
+        assert by_turn["3"]["prompt_messages"] > by_turn["1"]["prompt_messages"]
+        assert by_turn["3"]["redis_bytes"] > by_turn["1"]["redis_bytes"]
+        # Chats written by the run are cleaned up
+        assert await fake_redis.keys("*") == []
+
+
+class TestChatVersions:
+    """Test suite for versioned chat writes and warm session reloads"""
+
+    @pytest.mark.asyncio
+    async def test_save_is_compare_and_set(self, fake_redis):
+        storage = redis_service.RedisChatStorage
+        first = await storage.save_chat("a1", "r1", {"messages": []})
+        assert await storage.get_chat_version("a1", "r1") == first
+        assert (await storage.get_chat("a1", "r1"))["version"] == first
+
+        second = await storage.save_chat("a1", "r1", {"messages": []}, expected_version=first)
+        assert second and second != first
+        # A writer holding the old version loses
+        assert await storage.save_chat("a1", "r1", {"messages": []}, expected_version=first) is None
+        assert await storage.get_chat_version("a1", "r1") == second
+
+    @pytest.mark.asyncio
+    async def test_conflicting_save_merges_and_leaves_history_stale(self, fake_redis):
+        history = lk_chat.ChatHistory()
+        history.add_message("assistant", "Hi")
+        await lk_chat.save_chat_history("a1", "r1", history)
+        loaded_at = history.version
+
+        # Another worker appends to the same chat
+        other = await redis_service.RedisChatStorage.get_chat("a1", "r1")
+        other["messages"].append({"role": "user", "content": "from elsewhere", "timestamp": "9999"})
+        await redis_service.RedisChatStorage.save_chat("a1", "r1", other)
+
+        history.add_message("user", "from here")
+        await lk_chat.save_chat_history("a1", "r1", history)
+
+        stored = await redis_service.RedisChatStorage.get_chat("a1", "r1")
+        assert [m["content"] for m in stored["messages"]] == ["Hi", "from here", "from elsewhere"]
+        assert history.version == loaded_at != stored["version"]
+
+    @pytest.mark.asyncio
+    async def test_warm_session_reloads_after_outside_write(self, fake_redis):
+        fake_llm = FakeStreamingLLM(tokens=2, ttft=0, token_interval=0)
+
+        async def agent_metadata(agent_id):
+            return fake_agent_metadata(agent_id)
+
+        async def turn(text):
+            return [chunk async for chunk in lk_chat.lk_chat_process(text, "a1", "r1")]
+
+        with mock.patch.object(lk_chat, "get_agent_metadata", agent_metadata), \
+             mock.patch.object(lk_chat, "get_chat_llm", lambda: fake_llm), \
+             mock.patch.object(lk_chat, "load_chat_session", wraps=lk_chat.load_chat_session) as load:
+            try:
+                await turn("first")
+                await turn("second")
+                assert load.call_count == 1
+
+                chat = await redis_service.RedisChatStorage.get_chat("a1", "r1")
+                chat["messages"].append({"role": "user", "content": "form data", "timestamp": "9999"})
+                await redis_service.RedisChatStorage.save_chat("a1", "r1", chat)
+
+                await turn("third")
+                assert load.call_count == 2
+                session = chat_sessions.get("a1", "r1")
+                assert "form data" in [m.content for m in session.chat_history.messages]
+            finally:
+                chat_sessions.evict("a1", "r1")
+
+    @pytest.mark.asyncio
+    async def test_rooms_of_one_agent_stay_separate(self, fake_redis):
+        fake_llm = FakeStreamingLLM(tokens=2, ttft=0, token_interval=0)
+
+        async def agent_metadata(agent_id):
+            return fake_agent_metadata(agent_id)
+
+        async def turn(text, room_name):
+            return [chunk async for chunk in lk_chat.lk_chat_process(text, "a1", room_name)]
+
+        with mock.patch.object(lk_chat, "get_agent_metadata", agent_metadata), \
+             mock.patch.object(lk_chat, "get_chat_llm", lambda: fake_llm), \
+             mock.patch.object(lk_chat, "load_chat_session", wraps=lk_chat.load_chat_session) as load:
+            try:
+                for i in range(3):
+                    await asyncio.gather(turn(f"r1 turn {i}", "r1"), turn(f"r2 turn {i}", "r2"))
+                # Each room stays warm despite the other room's writes
+                assert load.call_count == 2
+
+                for room_name, other in (("r1", "r2"), ("r2", "r1")):
+                    session = chat_sessions.get("a1", room_name)
+                    contents = [m.content for m in session.chat_history.messages]
+                    stored = await redis_service.RedisChatStorage.get_chat("a1", room_name)
+                    assert f"{room_name} turn 2" in contents
+                    assert not any(other in content for content in contents)
+                    assert not any(other in m["content"] for m in stored["messages"])
+            finally:
+                chat_sessions.evict("a1", "r1")
+                chat_sessions.evict("a1", "r2")
@@ -0,0 +1,56 @@
+import time
+import unittest.mock as mock
+
+from app.services.chat.session_runtime import ChatSession, ChatSessionCache
+
+
+def make_session(agent_id="agent", room_name="room"):
+    chat_history = mock.MagicMock()
+    chat_history.add_message.return_value = True
+    return ChatSession(
+        agent_id=agent_id,
+        room_name=room_name,
+        chat_history=chat_history,
+        llm_instance=mock.MagicMock(),
+        chat_ctx=mock.MagicMock(),
+        fnc_ctx=mock.MagicMock(),
+    )
+
+
+class TestChatSessionCache:
+    """Test suite for the warm chat session LRU"""
+
+    def test_hit_after_put(self):
+        cache = ChatSessionCache(max_sessions=10, idle_seconds=60)
+        session = make_session()
+        cache.put(session)
+        assert cache.get("agent", "room") is session
+        assert cache.hits == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = ChatSessionCache(max_sessions=2, idle_seconds=60)
+        cache.put(make_session(room_name="r1"))
+        cache.put(make_session(room_name="r2"))
+        cache.get("agent", "r1")
+        cache.put(make_session(room_name="r3"))
+        assert cache.get("agent", "r2") is None
+        assert cache.get("agent", "r1") is not None
+
+    def test_evicts_idle_sessions(self):
+        cache = ChatSessionCache(max_sessions=10, idle_seconds=60)
+        session = make_session()
+        cache.put(session)
+        session.last_used = time.monotonic() - 120
+        assert cache.get("agent", "room") is None
+        assert len(cache) == 0
+
+    def test_record_appends_new_messages_to_context(self):
+        session = make_session()
+        assert session.record("assistant", "hello")
+        session.chat_ctx.append.assert_called_once_with(role="assistant", text="hello")
+
+    def test_record_skips_duplicates(self):
+        session = make_session()
+        session.chat_history.add_message.return_value = False
+        assert not session.record("assistant", "hello")
+        session.chat_ctx.append.assert_not_called()
@@ -0,0 +1,116 @@
+import asyncio
+import unittest.mock as mock
+
+import pytest
+
+from app.services.chat.context_window import ContextState, ContextWindowManager
+
+
+def word_count(text):
+    return len(text.split())
+
+
+def make_turns(count, words=10):
+    messages = []
+    for i in range(count):
+        messages.append({"role": "user", "content": " ".join([f"q{i}"] * words)})
+        messages.append({"role": "assistant", "content": " ".join([f"a{i}"] * words)})
+    return messages
+
+
+@pytest.fixture(autouse=True)
+def cheap_token_count():
+    with mock.patch("app.services.chat.context_window.count_tokens", side_effect=word_count):
+        yield
+
+
+class TestContextWindowManager:
+    """Test suite for the token-budgeted context window"""
+
+    def make_manager(self, summarizer=None, keep_turns=2, fold_batch_turns=2):
+        return ContextWindowManager(
+            default_budget=10_000,
+            keep_turns=keep_turns,
+            fold_batch_turns=fold_batch_turns,
+            summarizer=summarizer or mock.AsyncMock(return_value="summary"),
+        )
+
+    def test_short_conversation_is_sent_verbatim(self):
+        manager = self.make_manager()
+        messages = make_turns(3)
+        state = ContextState(system_prompt="system", budget=10_000)
+        assert manager.window(messages, state) == messages
+        assert manager.fold_end(messages, state) is None
+
+    def test_window_drops_whole_turns_to_fit_budget(self):
+        manager = self.make_manager(keep_turns=10)
+        messages = make_turns(10)
+        # Each turn is 2 * (10 words + 4 overhead) = 28 tokens
+        state = ContextState(system_prompt="system", budget=100)
+        window = manager.window(messages, state)
+        assert window[0]["role"] == "user"
+        assert window == messages[-6:]
+
+    def test_latest_turn_is_kept_even_if_over_budget(self):
+        manager = self.make_manager()
+        messages = make_turns(3, words=100)
+        state = ContextState(system_prompt="system", budget=10)
+        assert manager.window(messages, state) == messages[-2:]
+
+    def test_fold_waits_for_a_full_batch(self):
+        manager = self.make_manager(keep_turns=2, fold_batch_turns=3)
+        state = ContextState(system_prompt="system", budget=10_000)
+        assert manager.fold_end(make_turns(4), state) is None
+        # 5 turns: 3 beyond the 2 kept verbatim
+        assert manager.fold_end(make_turns(5), state) == 6
+
+    def test_system_text_includes_summary(self):
+        state = ContextState(system_prompt="system", summary="- caller wants a quote")
+        text = ContextWindowManager.system_text(state)
+        assert text.startswith("system")
+        assert "- caller wants a quote" in text
+
+    @pytest.mark.asyncio
+    async def test_fold_is_incremental(self):
+        summarizer = mock.AsyncMock(side_effect=["first", "second"])
+        manager = self.make_manager(summarizer=summarizer)
+        state = ContextState(system_prompt="system", budget=10_000)
+
+        messages = make_turns(4)
+        assert await manager.fold(messages, state, manager.fold_end(messages, state))
+        assert (state.summary, state.folded) == ("first", 4)
+
+        messages += make_turns(2)
+        assert await manager.fold(messages, state, manager.fold_end(messages, state))
+        assert (state.summary, state.folded) == ("second", 8)
+        # The second fold only sees the turns the summary did not cover yet
+        previous_summary, transcript = summarizer.call_args.args
+        assert previous_summary == "first"
+        assert "q0" not in transcript
+
+    @pytest.mark.asyncio
+    async def test_failed_summary_leaves_state_unchanged(self):
+        manager = self.make_manager(summarizer=mock.AsyncMock(return_value=None))
+        state = ContextState(system_prompt="system", budget=10_000)
+        messages = make_turns(4)
+        assert not await manager.fold(messages, state, 4)
+        assert (state.summary, state.folded) == ("", 0)
+
+    @pytest.mark.asyncio
+    async def test_history_window_schedules_background_fold(self):
+        manager = self.make_manager()
+        history = {"user_history": [], "assistant_history": [], "function_history": []}
+        for message in make_turns(4):
+            history[f"{message['role']}_history"].append(message)
+
+        system_prompt, messages = manager.history_window(history, "system")
+        assert system_prompt == "system"
+        assert len(messages) == 8
+
+        state = history["context_state"]
+        assert state.folding
+        while state.folding:
+            await asyncio.sleep(0)
+        system_prompt, messages = manager.history_window(history, "system")
+        assert "summary" in system_prompt
+        assert messages == manager.history_messages(history)[4:]
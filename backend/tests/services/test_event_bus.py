@@ -0,0 +1,58 @@
+import asyncio
+import json
+import pytest
+import unittest.mock as mock
+
+from app.services.event_bus import EventSubscription, RedisEventBus
+
+
+class TestEventSubscription:
+    """Test suite for bounded per-connection queues"""
+
+    def test_drops_oldest_when_full(self):
+        subscription = EventSubscription("participant", max_queue_size=2)
+        for i in range(3):
+            subscription.offer({"n": i})
+        assert subscription.dropped == 1
+        assert subscription.queue.get_nowait() == {"n": 1}
+        assert subscription.queue.get_nowait() == {"n": 2}
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_on_silence(self):
+        subscription = EventSubscription("participant", max_queue_size=2)
+        events = subscription.events(heartbeat_seconds=0.01)
+        assert await events.__anext__() is None
+
+
+class TestRedisEventBus:
+    """Test suite for the Redis pub/sub event bus"""
+
+    @pytest.mark.asyncio
+    async def test_fans_out_to_all_local_subscribers(self, redis_client):
+        bus = RedisEventBus(redis_client, max_queue_size=8, heartbeat_seconds=0.05)
+        async with bus.subscribe("p1") as first, bus.subscribe("p1") as second:
+            assert bus.subscriber_count("p1") == 2
+            receivers = await bus.publish("p1", {"type": "show_chat_input"})
+            assert receivers == 1  # one shared pub/sub connection per process
+            assert await asyncio.wait_for(first.queue.get(), 1) == {"type": "show_chat_input"}
+            assert await asyncio.wait_for(second.queue.get(), 1) == {"type": "show_chat_input"}
+        assert bus.subscriber_count("p1") == 0
+        await bus.close()
+
+    @pytest.mark.asyncio
+    async def test_channels_are_isolated_per_participant(self, redis_client):
+        bus = RedisEventBus(redis_client, max_queue_size=8, heartbeat_seconds=0.05)
+        async with bus.subscribe("p1") as first, bus.subscribe("p2") as second:
+            await bus.publish("p2", {"type": "show_chat_input"})
+            assert await asyncio.wait_for(second.queue.get(), 1) == {"type": "show_chat_input"}
+            assert first.queue.empty()
+        await bus.close()
+
+    def test_malformed_payload_is_dropped(self):
+        bus = RedisEventBus(mock.MagicMock(), max_queue_size=8, heartbeat_seconds=1)
+        subscription = EventSubscription("p1", max_queue_size=8)
+        bus._subscribers[bus.channel_for("p1")].add(subscription)
+        bus._dispatch(bus.channel_for("p1"), "not json")
+        bus._dispatch(bus.channel_for("p1"), json.dumps({"type": "ok"}))
+        assert subscription.queue.get_nowait() == {"type": "ok"}
+        assert subscription.queue.empty()
@@ -0,0 +1,81 @@
+import asyncio
+import time
+import unittest.mock as mock
+
+import pytest
+
+from app.services.email_outbox import EmailOutbox
+from app.services.notification_routing import NotificationRoutingCache
+
+
+ROUTE = {"user_id": "user-1", "email": "owner@example.com", "account_settings": {"email": "owner@example.com"}}
+
+
+class TestNotificationRoutingCache:
+    """Test suite for the per-agent lead notification routes"""
+
+    @pytest.mark.asyncio
+    async def test_route_is_loaded_once_per_agent(self, redis_client):
+        routes = NotificationRoutingCache(redis_client, ttl_seconds=60)
+        with mock.patch.object(routes, '_load', new_callable=mock.AsyncMock, return_value=ROUTE) as load:
+            assert await routes.get_route("agent-1") == ROUTE
+            assert await routes.get_route("agent-1") == ROUTE
+        load.assert_awaited_once_with("agent-1")
+
+    @pytest.mark.asyncio
+    async def test_settings_change_invalidates_owner_routes(self, redis_client):
+        routes = NotificationRoutingCache(redis_client, ttl_seconds=60)
+        with mock.patch.object(routes, '_load', new_callable=mock.AsyncMock, return_value=ROUTE) as load:
+            await routes.get_route("agent-1")
+            await routes.get_route("agent-2")
+            await routes.invalidate_user("user-1")
+            await routes.get_route("agent-1")
+        assert load.await_count == 3
+        assert await redis_client.smembers("notification_route:user:user-1") == {"agent-1"}
+
+    @pytest.mark.asyncio
+    async def test_unknown_agent_is_not_cached(self, redis_client):
+        routes = NotificationRoutingCache(redis_client, ttl_seconds=60)
+        with mock.patch.object(routes, '_load', new_callable=mock.AsyncMock, return_value=None):
+            assert await routes.get_route("missing") is None
+        assert await redis_client.keys() == []
+
+
+class TestEmailOutbox:
+    """Test suite for the rate-limited email outbox"""
+
+    @pytest.mark.asyncio
+    async def test_sends_are_paced_to_the_rate_limit(self):
+        sent_at = []
+
+        def sender(grant_id, request_body):
+            sent_at.append(time.monotonic())
+            return {"id": request_body["to"][0]["email"]}
+
+        outbox = EmailOutbox(sender, rate_per_second=50, batch_size=10)
+        results = await asyncio.gather(*(
+            outbox.send("grant", {"to": [{"email": f"lead{i}@example.com"}]}) for i in range(5)
+        ))
+        await outbox.close()
+
+        assert [r["id"] for r in results] == [f"lead{i}@example.com" for i in range(5)]
+        gaps = [b - a for a, b in zip(sent_at, sent_at[1:])]
+        assert min(gaps) >= 0.015
+
+    @pytest.mark.asyncio
+    async def test_failed_send_raises_in_caller_only(self):
+        def sender(grant_id, request_body):
+            if request_body["to"][0]["email"] == "bad@example.com":
+                raise RuntimeError("rate limited by provider")
+            return "ok"
+
+        outbox = EmailOutbox(sender, rate_per_second=0, batch_size=10)
+        bad, good = await asyncio.gather(
+            outbox.send("grant", {"to": [{"email": "bad@example.com"}]}),
+            outbox.send("grant", {"to": [{"email": "good@example.com"}]}),
+            return_exceptions=True
+        )
+        await outbox.close()
+
+        assert isinstance(bad, RuntimeError)
+        assert good == "ok"
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import time
+import unittest.mock as mock
+
+import pytest
+
+from app.services.voice import opening_line_cache as opening_line_module
+from app.services.voice.opening_line_cache import OpeningLineAudioCache
+
+
+class TestOpeningLineAudioCache:
+    """Test suite for the pre-synthesized opening line cache"""
+
+    def test_round_trip(self, tmp_path):
+        cache = OpeningLineAudioCache(str(tmp_path), max_bytes=1024 * 1024)
+        cache.put("agent1", "elevenlabs", "voice1", "en", "Hello there", b"\x01\x02" * 100)
+        audio = cache.get("agent1", "elevenlabs", "voice1", "en", "Hello there")
+        assert audio.pcm == b"\x01\x02" * 100
+        assert audio.sample_rate == 24000
+        assert audio.num_channels == 1
+
+    def test_changed_text_or_voice_misses(self, tmp_path):
+        cache = OpeningLineAudioCache(str(tmp_path), max_bytes=1024 * 1024)
+        cache.put("agent1", "elevenlabs", "voice1", "en", "Hello there", b"\x00" * 10)
+        assert cache.get("agent1", "elevenlabs", "voice1", "en", "Hi there") is None
+        assert cache.get("agent1", "elevenlabs", "voice2", "en", "Hello there") is None
+        assert cache.get("agent1", "cartesia", "voice1", "en", "Hello there") is None
+        assert cache.get("agent1", "elevenlabs", "voice1", "es", "Hello there") is None
+
+    def test_new_greeting_replaces_old_one_for_agent(self, tmp_path):
+        cache = OpeningLineAudioCache(str(tmp_path), max_bytes=1024 * 1024)
+        cache.put("agent1", "elevenlabs", "voice1", "en", "Old greeting", b"\x00" * 10)
+        cache.put("agent1", "elevenlabs", "voice1", "en", "New greeting", b"\x00" * 10)
+        assert len(list(tmp_path.glob("agent1_*.pcm"))) == 1
+        assert cache.get("agent1", "elevenlabs", "voice1", "en", "New greeting") is not None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = OpeningLineAudioCache(str(tmp_path), max_bytes=250)
+        cache.put("agent1", "elevenlabs", "v", "en", "one", b"\x00" * 100)
+        old = time.time() - 60
+        for path in tmp_path.glob("agent1_*.pcm"):
+            os.utime(path, (old, old))
+        cache.put("agent2", "elevenlabs", "v", "en", "two", b"\x00" * 100)
+        cache.put("agent3", "elevenlabs", "v", "en", "three", b"\x00" * 100)
+        assert cache.get("agent1", "elevenlabs", "v", "en", "one") is None
+        assert cache.get("agent3", "elevenlabs", "v", "en", "three") is not None
+
+    @pytest.mark.asyncio
+    async def test_background_render_is_held_and_failures_logged(self):
+        async def failing_render(agent):
+            raise RuntimeError("tts down")
+
+        with mock.patch.object(opening_line_module, "render_opening_line", failing_render), \
+             mock.patch.object(opening_line_module, "logger") as logger:
+            opening_line_module.schedule_opening_line_render({"id": "agent1"})
+            assert len(opening_line_module._render_tasks) == 1
+            for _ in range(3):
+                await asyncio.sleep(0)
+        assert opening_line_module._render_tasks == set()
+        assert "tts down" in logger.opt.return_value.error.call_args[0][0]
@@ -0,0 +1,140 @@
+import json
+import unittest.mock as mock
+
+import pytest
+
+from app.services import nylas_service, post_call
+from app.services.chat import lk_chat
+from app.services.post_call import PostCallPipeline, call_duration_seconds, detect_lead
+
+
+def make_job(**overrides):
+    job = {"job_id": "job-1", "room_name": "room-1", "agent_id": "agent-1", "transcript": []}
+    job.update(overrides)
+    return job
+
+
+def make_pipeline(client, stages, max_attempts=3):
+    return PostCallPipeline(
+        client, stages, workers=1, max_attempts=max_attempts,
+        retry_after_seconds=1, state_ttl_seconds=60
+    )
+
+
+async def deliver(pipeline, job):
+    """Queue `job` and read it back as a worker would; returns the entry id"""
+    await pipeline._ensure_group()
+    await pipeline.enqueue(job)
+    entry_id, _ = await pipeline._next_entry()
+    return entry_id
+
+
+async def pending(pipeline):
+    return (await pipeline.client.xpending(pipeline.stream, pipeline.group))["pending"]
+
+
+class TestPostCallPipeline:
+    """Test suite for the queued post-call pipeline"""
+
+    @pytest.mark.asyncio
+    async def test_enqueue_dedupes_by_job_id(self, redis_client):
+        pipeline = make_pipeline(redis_client, [])
+        assert await pipeline.enqueue(make_job())
+        assert not await pipeline.enqueue(make_job())
+        ((_, fields),) = await redis_client.xrange("post_call:jobs")
+        assert json.loads(fields["job"])["job_id"] == "job-1"
+
+    @pytest.mark.asyncio
+    async def test_each_chat_flush_is_its_own_job(self, redis_client):
+        pipeline = make_pipeline(redis_client, [])
+        chat = {"messages": [{"role": "user", "content": "hello", "timestamp": "2026-01-01T00:00:00"}]}
+        with mock.patch.object(lk_chat, "post_call_pipeline", pipeline), \
+             mock.patch.object(lk_chat.RedisChatStorage, "get_chat", mock.AsyncMock(return_value=chat)), \
+             mock.patch.object(lk_chat.RedisChatStorage, "delete_chat", mock.AsyncMock()), \
+             mock.patch.object(lk_chat.context_window, "delete_state", mock.AsyncMock()):
+            # The visitor reconnects to the same room after the first flush
+            await lk_chat.save_chat_history_to_supabase("agent-1", "room-1")
+            await lk_chat.save_chat_history_to_supabase("agent-1", "room-1")
+
+        jobs = [json.loads(fields["job"]) for _, fields in await redis_client.xrange("post_call:jobs")]
+        assert len(jobs) == 2
+        assert jobs[0]["job_id"] != jobs[1]["job_id"]
+        assert all(job["room_name"] == "room-1" for job in jobs)
+
+    @pytest.mark.asyncio
+    async def test_retry_skips_checkpointed_stages(self, redis_client):
+        calls = []
+
+        async def store(job, results):
+            calls.append("store")
+            return {"stored": True}
+
+        async def summary(job, results):
+            calls.append("summary")
+            if calls.count("summary") == 1:
+                raise RuntimeError("llm down")
+            assert results["store"] == {"stored": True}
+            return {"summary": "ok"}
+
+        pipeline = make_pipeline(redis_client, [("store", store), ("summary", summary)])
+        entry_id = await deliver(pipeline, make_job())
+
+        # First attempt leaves the entry pending for a later retry
+        assert not await pipeline.process(entry_id, make_job())
+        assert await pending(pipeline) == 1
+
+        assert await pipeline.process(entry_id, make_job())
+        assert calls == ["store", "summary", "summary"]
+        assert await pending(pipeline) == 0
+        assert await redis_client.xlen("post_call:jobs") == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_lead_email_does_not_resend_owner_email(self, redis_client):
+        pipeline = make_pipeline(redis_client, [
+            ("lead", post_call.lead_stage),
+            ("owner_email", post_call.owner_email_stage),
+            ("lead_email", post_call.lead_email_stage),
+        ])
+        job = make_job(transcript=[{"user_message": "user input data: {'Email Address': 'lead@example.com'}"}])
+        owner_body = {"to": [{"email": "owner@example.com"}]}
+        with mock.patch.object(nylas_service, "send_owner_email", mock.AsyncMock(return_value=owner_body)) as owner, \
+             mock.patch.object(nylas_service, "send_lead_email", mock.AsyncMock(side_effect=[RuntimeError("nylas 429"), {"to": []}])) as lead, \
+             mock.patch.object(nylas_service, "record_email_notification", mock.AsyncMock()) as record:
+            entry_id = await deliver(pipeline, job)
+            assert not await pipeline.process(entry_id, job)
+            assert await pipeline.process(entry_id, job)
+
+        owner.assert_awaited_once()
+        assert lead.await_count == 2
+        record.assert_awaited_once_with("room-1", owner_body, {"to": []})
+
+    @pytest.mark.asyncio
+    async def test_dead_letters_after_max_attempts(self, redis_client):
+
+        async def broken(job, results):
+            raise RuntimeError("boom")
+
+        pipeline = make_pipeline(redis_client, [("broken", broken)], max_attempts=2)
+        entry_id = await deliver(pipeline, make_job())
+        assert not await pipeline.process(entry_id, make_job())
+        assert await pipeline.process(entry_id, make_job())
+
+        ((_, fields),) = await redis_client.xrange("post_call:jobs:dead")
+        assert fields["stage"] == "broken"
+        assert fields["error"] == "boom"
+        assert await pending(pipeline) == 0
+
+
+class TestLeadDetection:
+    """Test suite for post-call lead detection"""
+
+    def test_form_submission_marks_lead(self):
+        transcript = [{"user_message": "user input data: name=Ann, email=a@b.c"}]
+        assert detect_lead(make_job(transcript=transcript, prospect_status="no")) == "yes"
+        assert detect_lead(make_job(prospect_status="yes")) == "yes"
+        assert detect_lead(make_job()) == "unknown"
+
+    def test_call_duration_accepts_dict_and_number(self):
+        assert call_duration_seconds({"call_duration": {"total_seconds": 42}}) == 42
+        assert call_duration_seconds({"call_duration": 7}) == 7
+        assert call_duration_seconds({}) == 0
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.services.guided_setup.preview_audio import PreviewAudioCache, media_type_for
+
+
+class FakeSynthesizer:
+    """Streams fixed chunks and counts TTS requests"""
+
+    def __init__(self, chunks=(b"ID3", b"\x00" * 97), delay=0.0):
+        self.chunks = chunks
+        self.delay = delay
+        self.requests = []
+
+    async def __call__(self, text, voice_id, model_id, output_format):
+        self.requests.append((voice_id, model_id, output_format, text))
+        for chunk in self.chunks:
+            await asyncio.sleep(self.delay)
+            yield chunk
+
+
+class TestPreviewAudioCache:
+    """Test suite for the onboarding preview audio cache"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_preview_is_served_from_disk(self, tmp_path):
+        tts = FakeSynthesizer()
+        cache = PreviewAudioCache(str(tmp_path), max_bytes=1024 * 1024, synthesize=tts)
+
+        key = await cache.get_or_create("Hello, thank you for calling Acme.", "voice1")
+        again = await cache.get_or_create("Hello, thank you for calling Acme.", "voice1")
+
+        assert key == again
+        assert len(tts.requests) == 1
+        assert await cache.read_bytes(key) == b"ID3" + b"\x00" * 97
+        assert media_type_for(cache.path_for(key)) == "audio/mpeg"
+
+    @pytest.mark.asyncio
+    async def test_key_covers_voice_model_format_and_text(self, tmp_path):
+        tts = FakeSynthesizer()
+        cache = PreviewAudioCache(str(tmp_path), max_bytes=1024 * 1024, synthesize=tts)
+        keys = {
+            await cache.get_or_create("Hello", "voice1"),
+            await cache.get_or_create("Hello", "voice2"),
+            await cache.get_or_create("Hello", "voice1", model_id="eleven_turbo_v2"),
+            await cache.get_or_create("Hello", "voice1", output_format="pcm_24000"),
+            await cache.get_or_create("Hi", "voice1"),
+        }
+        assert len(keys) == 5
+        assert len(tts.requests) == 5
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_synthesis(self, tmp_path):
+        tts = FakeSynthesizer(delay=0.01)
+        cache = PreviewAudioCache(str(tmp_path), max_bytes=1024 * 1024, synthesize=tts)
+        keys = await asyncio.gather(*(cache.get_or_create("Hello", "voice1") for _ in range(5)))
+        assert len(set(keys)) == 1
+        assert len(tts.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_synthesis_leaves_nothing_behind(self, tmp_path):
+        async def broken(**kwargs):
+            yield b"partial"
+            raise RuntimeError("quota exceeded")
+
+        cache = PreviewAudioCache(str(tmp_path), max_bytes=1024 * 1024, synthesize=broken)
+        with pytest.raises(RuntimeError):
+            await cache.get_or_create("Hello", "voice1")
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_served(self, tmp_path):
+        cache = PreviewAudioCache(str(tmp_path), max_bytes=250, synthesize=FakeSynthesizer())
+        first = await cache.get_or_create("one", "v")
+        old = time.time() - 60
+        os.utime(cache.path_for(first), (old, old))
+        await cache.get_or_create("two", "v")
+        third = await cache.get_or_create("three", "v")
+        assert cache.path_for(first) is None
+        assert cache.path_for(third) is not None
+
+    def test_rejects_keys_that_are_not_content_hashes(self, tmp_path):
+        cache = PreviewAudioCache(str(tmp_path), max_bytes=1024)
+        assert cache.path_for("../../etc/passwd") is None
@@ -0,0 +1,49 @@
+import copy
+
+import pytest
+
+from scripts.bench_rag import FakeJina, SyntheticCorpus, check_baseline, run
+
+
+class TestSyntheticCorpus:
+    """Test suite for the synthetic knowledge base used by the RAG benchmark"""
+
+    def test_corpus_and_queries_are_deterministic(self):
+        first, second = SyntheticCorpus(300, 32), SyntheticCorpus(300, 32)
+        assert first.contents == second.contents
+        assert (first.embeddings == second.embeddings).all()
+        assert first.queries(5) == second.queries(5)
+
+    def test_query_embedding_is_closest_to_its_topic(self):
+        corpus = SyntheticCorpus(300, 64)
+        query = corpus.queries(1)[0]
+        response = FakeJina(corpus).post("https://api.jina.ai/v1/embeddings", data=f'{{"input": "{query["text"]}"}}')
+        similarities = corpus.embeddings @ response.json()["data"][0]["embedding"]
+        best = int(similarities.argmax())
+        # A 300 chunk corpus has 10 topics, assigned round robin
+        assert best % 10 == query["target"] % 10
+
+
+class TestRagBenchmark:
+    """Test suite for the retrieval benchmark report"""
+
+    @pytest.mark.asyncio
+    async def test_reports_latency_throughput_and_recall(self):
+        report = await run([200], queries=10, k=5, dim=64, search_type="Deep Search",
+                           jina_latency_ms=0, rpc_latency_ms=0, chunk_documents=0)
+        result = report["sizes"]["200"]
+
+        assert result["queries"] == 10
+        assert result["throughput_qps"] > 0
+        assert set(result["latency"]) == {
+            "similarity_search", "rerank_documents", "filter_relevant_docs", "end_to_end"
+        }
+        assert result["recall_at_5"]["search"] > 0
+        assert result["corpus"]["chunks"] == 200
+
+        assert check_baseline(report, report, tolerance=0.2) == []
+        slower = copy.deepcopy(report)
+        slower["sizes"]["200"]["latency"]["end_to_end"]["p95_ms"] *= 2
+        slower["sizes"]["200"]["recall_at_5"]["rerank"] -= 0.1
+        failures = check_baseline(slower, report, tolerance=0.2)
+        assert len(failures) == 2
@@ -0,0 +1,111 @@
+import asyncio
+import unittest.mock as mock
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import rate_limits
+from app.api.routes import conversation
+from app.services.redis_service import RedisRateLimiter, acquire_all
+
+pytest.importorskip("lupa")
+
+
+class TestRateLimiter:
+    """Test suite for the Lua token bucket rate limiter"""
+
+    @pytest.mark.asyncio
+    async def test_rejections_do_not_consume(self, redis_client):
+        limiter = RedisRateLimiter("rate_limit:test", max_requests=3, window_seconds=60, client=redis_client)
+
+        assert [await limiter.acquire("u1") for _ in range(3)] == [True, True, True]
+        for _ in range(5):
+            result = await limiter.check("u1")
+            assert not result.allowed
+            # One token refills every 20s
+            assert 19 < result.retry_after <= 20
+            assert result.limited_by == "rate_limit:test:u1"
+
+        assert await limiter.acquire("u2")
+        # Constant memory per key: one small hash
+        assert await redis_client.hkeys("rate_limit:test:u1") == ["t", "ts"]
+        assert 0 < await redis_client.pttl("rate_limit:test:u1") <= 61000
+
+    @pytest.mark.asyncio
+    async def test_refills_over_time(self, redis_client):
+        limiter = RedisRateLimiter("rate_limit:test", max_requests=2, window_seconds=0.2, client=redis_client)
+        assert await limiter.acquire("u1")
+        assert await limiter.acquire("u1")
+        assert not await limiter.acquire("u1")
+        await asyncio.sleep(0.12)
+        assert await limiter.acquire("u1")
+
+    @pytest.mark.asyncio
+    async def test_multiple_limits_are_all_or_nothing(self, redis_client):
+        user = RedisRateLimiter("rate_limit:user", max_requests=5, client=redis_client)
+        tenant = RedisRateLimiter("rate_limit:tenant", max_requests=2, client=redis_client)
+
+        for _ in range(2):
+            assert (await acquire_all([(user, "u1"), (tenant, "t1")])).allowed
+        result = await acquire_all([(user, "u1"), (tenant, "t1")])
+        assert not result.allowed
+        assert result.limited_by == "rate_limit:tenant:t1"
+
+        # The rejected call did not charge the user bucket
+        assert (await user.get_remaining("u1"))["remaining"] == 3
+
+    @pytest.mark.asyncio
+    async def test_cost(self, redis_client):
+        limiter = RedisRateLimiter("rate_limit:test", max_requests=5, client=redis_client)
+        assert (await limiter.check("u1", cost=4)).remaining == 1
+        assert not (await limiter.check("u1", cost=2)).allowed
+        assert (await limiter.check("u1", cost=1)).allowed
+
+    @pytest.mark.asyncio
+    async def test_cost_over_capacity_has_no_retry_hint(self, redis_client):
+        limiter = RedisRateLimiter("rate_limit:test", max_requests=5, client=redis_client)
+        result = await limiter.check("u1", cost=6)
+        assert not result.allowed
+        assert result.max_cost == 5
+        assert "Retry-After" not in result.headers()
+        # Nothing was charged
+        assert (await limiter.check("u1", cost=5)).allowed
+
+        with pytest.raises(HTTPException) as exc:
+            await rate_limits.enforce_rate_limits([(limiter, "u2")], cost=6)
+        assert exc.value.status_code == 413
+        assert "at most 5" in exc.value.detail
+
+    @pytest.mark.asyncio
+    async def test_enforce_raises_429_with_retry_after(self, redis_client):
+        limiter = RedisRateLimiter("rate_limit:test", max_requests=1, client=redis_client)
+        await rate_limits.enforce_rate_limits([(limiter, "u1")])
+
+        with pytest.raises(HTTPException) as exc:
+            await rate_limits.enforce_rate_limits([(limiter, "u1")])
+        assert exc.value.status_code == 429
+        assert exc.value.headers["Retry-After"] == "60"
+        assert exc.value.headers["X-RateLimit-Remaining"] == "0"
+
+    @pytest.mark.asyncio
+    async def test_served_chat_route_is_limited(self, redis_client):
+        room = RedisRateLimiter("rate_limit:chat_room", max_requests=1, client=redis_client)
+        request = mock.Mock()
+        request.method = "POST"
+        request.json = mock.AsyncMock(return_value={
+            "room_name": "agent_a1_room_visitor_v1",
+            "participant_identity": "agent_a1_room_visitor_v1",
+            "message": "hi"
+        })
+        with mock.patch.object(conversation, "chat_limits", lambda agent_id, room_name: [(room, room_name)]):
+            await conversation.chat_message(request)
+            with pytest.raises(HTTPException) as exc:
+                await conversation.chat_message(request)
+        assert exc.value.status_code == 429
+        conversation.chat_messages.pop("agent_a1_room_visitor_v1", None)
+
+    @pytest.mark.asyncio
+    async def test_enforce_fails_open_without_redis(self):
+        limiter = RedisRateLimiter("rate_limit:test", max_requests=1)
+        with mock.patch.object(rate_limits, "acquire_all", side_effect=rate_limits.redis.ConnectionError("down")):
+            await rate_limits.enforce_rate_limits([(limiter, "u1")])
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.services.redis_service import (
+    MeteredConnectionPool,
+    RedisPools,
+    connection_kwargs,
+    parse_pool_sizes,
+)
+
+
+class StubConnection:
+    """Connection that never touches a socket"""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    async def connect(self):
+        pass
+
+    async def can_read_destructive(self):
+        return False
+
+    async def disconnect(self, nowait=False):
+        pass
+
+
+def stub_pool(max_connections, timeout=0.05):
+    return MeteredConnectionPool(
+        "test",
+        max_connections=max_connections,
+        timeout=timeout,
+        connection_class=StubConnection
+    )
+
+
+class TestRedisPools:
+    """Test suite for the workload Redis pools"""
+
+    def test_parse_pool_sizes(self):
+        assert parse_pool_sizes("chat=20, cache = 5,bad") == {"chat": 20, "cache": 5}
+        assert parse_pool_sizes("") == {}
+
+    @pytest.mark.asyncio
+    async def test_pool_is_bounded_and_counts_exhaustion(self):
+        pool = stub_pool(max_connections=2)
+        first = await pool.get_connection("GET")
+        second = await pool.get_connection("GET")
+        assert pool.stats()["in_use"] == 2
+
+        with pytest.raises(redis.ConnectionError):
+            await pool.get_connection("GET")
+        assert pool.stats()["exhausted"] == 1
+
+        await pool.release(first)
+        await pool.release(second)
+        stats = pool.stats()
+        assert (stats["in_use"], stats["idle"]) == (0, 2)
+        assert stats["acquire"]["count"] == 3
+
+    @pytest.mark.asyncio
+    async def test_waits_for_released_connection(self):
+        pool = stub_pool(max_connections=1, timeout=1)
+        held = await pool.get_connection("GET")
+
+        waiter = asyncio.create_task(pool.get_connection("GET"))
+        await asyncio.sleep(0.02)
+        assert not waiter.done()
+
+        await pool.release(held)
+        assert await waiter is held
+        assert pool.stats()["exhausted"] == 0
+
+    def test_workloads_get_separate_pools(self):
+        pools = RedisPools({"chat": 3}, split=True)
+        assert pools.client("chat").connection_pool is not pools.client("cache").connection_pool
+        assert pools.pools["chat"].max_connections == 3
+        # Unknown workloads use the default pool
+        assert pools.client("other") is pools.client("default")
+
+    def test_shared_pool_when_not_split(self):
+        pools = RedisPools({"default": 4}, split=False)
+        assert list(pools.pools) == ["default"]
+        assert pools.client("chat") is pools.client("default")
+
+    def test_blocking_workloads_have_no_socket_timeout(self):
+        pools = RedisPools({}, split=True)
+        assert pools.pools["streams"].connection_kwargs["socket_timeout"] is None
+        assert pools.pools["chat"].connection_kwargs["socket_timeout"] > 0
+        kwargs = connection_kwargs()
+        assert kwargs["retry"]._retries == settings.REDIS_RETRIES
+        assert redis.TimeoutError in kwargs["retry_on_error"]
+
+    @pytest.mark.asyncio
+    async def test_ping_reports_unreachable_pools(self):
+        pools = RedisPools({}, split=False, host="127.0.0.1", port=1, retry=None, retry_on_error=[])
+        assert await pools.ping() == {"default": False}
+        await pools.aclose()
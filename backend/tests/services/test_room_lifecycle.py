@@ -0,0 +1,153 @@
+import base64
+import hashlib
+import json
+
+import pytest
+import unittest.mock as mock
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from livekit import api
+
+from app.api.routes import voice
+from app.services.voice.room_lifecycle import RoomRecord, RoomRegistry, RoomService
+
+
+def make_room(name, metadata=""):
+    room = mock.MagicMock()
+    room.name = name
+    room.sid = f"RM_{name}"
+    room.metadata = metadata
+    room.num_participants = 1
+    return room
+
+
+def make_service(clock, rooms=()):
+    service = RoomService(RoomRegistry(ttl_seconds=30, clock=clock))
+    service._api = mock.MagicMock()
+    service._api.room.list_rooms = mock.AsyncMock(
+        return_value=mock.MagicMock(rooms=list(rooms))
+    )
+    service._api.room.create_room = mock.AsyncMock(
+        side_effect=lambda request: make_room(request.name)
+    )
+    return service
+
+
+class TestRoomRegistry:
+    """Test suite for the process-local room registry"""
+
+    def test_entries_expire(self, clock):
+        registry = RoomRegistry(ttl_seconds=30, clock=clock)
+        registry.put(RoomRecord(name="room"))
+        assert registry.lookup("room")[0]
+        clock.now = 31
+        assert registry.lookup("room") == (False, None)
+
+    def test_finished_rooms_are_known_absent(self, clock):
+        registry = RoomRegistry(ttl_seconds=30, clock=clock)
+        registry.mark_gone("room")
+        assert registry.lookup("room") == (True, None)
+
+    def test_purges_expired_entries_when_full(self, clock):
+        registry = RoomRegistry(ttl_seconds=30, max_entries=2, clock=clock)
+        registry.put(RoomRecord(name="a"))
+        registry.put(RoomRecord(name="b"))
+        clock.now = 31
+        registry.put(RoomRecord(name="c"))
+        assert len(registry) == 1
+
+
+class TestRoomService:
+    """Test suite for name-filtered room lookups"""
+
+    @pytest.mark.asyncio
+    async def test_lookup_filters_by_name_and_is_cached(self, clock):
+        service = make_service(clock, [make_room("room", metadata="agent-1")])
+
+        assert await service.get_room_metadata("room") == "agent-1"
+        assert await service.room_exists("room")
+
+        service._api.room.list_rooms.assert_awaited_once()
+        request = service._api.room.list_rooms.call_args.args[0]
+        assert list(request.names) == ["room"]
+
+    @pytest.mark.asyncio
+    async def test_missing_room_is_cached_as_absent(self, clock):
+        service = make_service(clock)
+        assert not await service.room_exists("room")
+        assert not await service.room_exists("room")
+        service._api.room.list_rooms.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_created_room_skips_lookup(self, clock):
+        service = make_service(clock)
+        await service.create_room(SimpleNamespace(name="room"))
+        assert await service.room_exists("room")
+        await service.ensure_room("room")
+        service._api.room.list_rooms.assert_not_awaited()
+        service._api.room.create_room.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_webhook_events_update_registry(self, clock):
+        service = make_service(clock)
+        service.handle_webhook_event({
+            "event": "room_started",
+            "room": {"name": "room", "sid": "RM_1", "metadata": "agent-1"}
+        })
+        assert await service.get_room_metadata("room") == "agent-1"
+
+        service.handle_webhook_event({"event": "room_finished", "room": {"name": "room"}})
+        assert not await service.room_exists("room")
+        service._api.room.list_rooms.assert_not_awaited()
+
+
+class TestRoomWebhookRoute:
+    """Test suite for the signed LiveKit webhook route"""
+
+    def signed(self, body, secret="secret"):
+        digest = base64.b64encode(hashlib.sha256(body.encode()).digest()).decode()
+        return api.AccessToken("key", secret).with_sha256(digest).to_jwt()
+
+    @pytest.fixture
+    def client(self, clock):
+        service = make_service(clock)
+        receiver = api.WebhookReceiver(api.TokenVerifier("key", "secret"))
+        app = FastAPI()
+        app.include_router(voice.router)
+        with mock.patch.object(voice, "room_service", service), \
+             mock.patch.object(voice, "_webhook_receiver", receiver):
+            yield TestClient(app), service
+
+    @pytest.mark.asyncio
+    async def test_signed_webhook_updates_registry(self, client):
+        http, service = client
+        body = json.dumps({"event": "room_started", "room": {"name": "room", "metadata": "agent-1"}})
+        response = http.post("/wh", content=body, headers={"Authorization": self.signed(body)})
+        assert response.status_code == 200
+        assert await service.get_room_metadata("room") == "agent-1"
+        service._api.room.list_rooms.assert_not_awaited()
+
+    def test_unsigned_or_tampered_webhook_is_rejected(self, client):
+        http, service = client
+        body = json.dumps({"event": "room_finished", "room": {"name": "room"}})
+        assert http.post("/wh", content=body).status_code == 401
+        forged = {"Authorization": self.signed(body, secret="wrong")}
+        assert http.post("/wh", content=body, headers=forged).status_code == 401
+        tampered = {"Authorization": self.signed(body.replace("room_finished", "room_started"))}
+        assert http.post("/wh", content=body, headers=tampered).status_code == 401
+        assert len(service.registry) == 0
+
+    def test_sip_participant_is_recorded_in_memory_only(self, client, tmp_path, monkeypatch):
+        http, _ = client
+        monkeypatch.chdir(tmp_path)
+        body = json.dumps({
+            "event": "participant_joined",
+            "room": {"name": "call-1"},
+            "participant": {"kind": "SIP", "attributes": {"sip.twilio.callSid": "CA1"}}
+        })
+        with mock.patch.dict(voice.call_data, clear=True):
+            assert http.post("/wh", content=body, headers={"Authorization": self.signed(body)}).status_code == 200
+            assert voice.call_data["call-1"]["twilio_call_sid"] == "CA1"
+        assert list(tmp_path.iterdir()) == []
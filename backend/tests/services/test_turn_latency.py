@@ -0,0 +1,105 @@
+import unittest.mock as mock
+
+import pytest
+from livekit.agents import metrics
+
+from app.services.voice.turn_latency import VoiceLatency
+
+
+def called_function(tool_call_id, name):
+    called = mock.Mock()
+    called.call_info.tool_call_id = tool_call_id
+    called.call_info.function_info.name = name
+    return called
+
+
+def llm_metrics(ttft):
+    return metrics.PipelineLLMMetrics(
+        request_id="r", timestamp=0.0, ttft=ttft, duration=1.0, label="llm", cancelled=False,
+        completion_tokens=10, prompt_tokens=100, total_tokens=110, tokens_per_second=10.0,
+        error=None, sequence_id="s"
+    )
+
+
+@pytest.fixture
+def registry():
+    return VoiceLatency(window=16, max_agents=2, max_calls=2)
+
+
+class TestCallLatency:
+    """Test suite for per-turn voice latency stages"""
+
+    @pytest.mark.asyncio
+    async def test_turn_stages_are_recorded(self, registry, clock):
+        call = registry.start_call("job1", "agent1", clock=clock)
+
+        call.user_stopped_speaking()
+        clock.now += 0.3
+        call.metrics_collected(metrics.PipelineEOUMetrics(
+            sequence_id="s", timestamp=0.0, end_of_utterance_delay=0.3, transcription_delay=0.1
+        ))
+        call.function_calls_collected([called_function("t1", "question_and_answer").call_info])
+        clock.now += 0.4
+        call.function_calls_finished([called_function("t1", "question_and_answer")])
+
+        before_tts = call.wrap_before_tts(lambda agent, text: text)
+
+        async def tokens():
+            for part in ("Hello", " there"):
+                yield part
+                clock.now += 0.1
+
+        clock.now += 0.2
+        assert [part async for part in before_tts(None, tokens())] == ["Hello", " there"]
+        clock.now += 0.1
+        call.playback_started()
+        call.metrics_collected(llm_metrics(0.25))
+
+        summary = registry.finish_call("job1")
+        stages = summary["stages"]
+        assert summary["turns"] == 1
+        assert stages["stt_final"]["p50_ms"] == 100.0
+        assert stages["end_of_turn"]["p95_ms"] == 300.0
+        assert stages["tool:question_and_answer"]["max_ms"] == pytest.approx(400.0)
+        assert stages["first_token"]["p50_ms"] == pytest.approx(900.0)
+        assert stages["llm_ttft"]["count"] == 1
+        assert stages["turn"]["p50_ms"] == pytest.approx(1200.0)
+        assert registry.call("job1") is None
+
+    def test_playback_without_user_turn_is_ignored(self, registry, clock):
+        call = registry.start_call("job1", "agent1", clock=clock)
+        call.playback_started()
+        call.user_stopped_speaking()
+        clock.now += 0.5
+        call.playback_started()
+        # A second reply in the same turn, e.g. after a tool call
+        clock.now += 2.0
+        call.playback_started()
+
+        assert call.summary()["stages"]["turn"]["count"] == 1
+        assert call.turns == 1
+
+
+class TestVoiceLatency:
+    """Test suite for the per-agent and per-call registry"""
+
+    def test_agent_percentiles_span_calls(self, registry, clock):
+        for job_id, seconds in (("a", 0.5), ("b", 1.5)):
+            call = registry.start_call(job_id, "agent1", clock=clock)
+            call.user_stopped_speaking()
+            clock.now += seconds
+            call.playback_started()
+            registry.finish_call(job_id)
+
+        turn = registry.agent_report("agent1")["turn"]
+        assert turn["count"] == 2
+        assert turn["p95_ms"] == pytest.approx(1500.0)
+
+    def test_calls_and_agents_are_bounded(self, registry):
+        for i in range(4):
+            registry.start_call(f"job{i}", f"agent{i}")
+
+        assert registry.call("job0") is None
+        assert registry.call("job3") is not None
+        assert registry.agent_report("agent0") == {}
+        assert registry.finish_call("missing") is None
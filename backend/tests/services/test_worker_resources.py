@@ -0,0 +1,46 @@
+import unittest.mock as mock
+
+from app.services.voice import worker_resources as worker_resources_module
+from app.services.voice.worker_resources import WorkerResourceCache
+
+AGENT = {"id": "agent-1", "instructions": "Be brief"}
+
+
+class TestAgentConfigCache:
+    """Test suite for the per-worker agent config cache"""
+
+    def test_config_expires_after_ttl(self):
+        cache = WorkerResourceCache(agent_config_ttl=60)
+        with mock.patch.object(worker_resources_module.time, "monotonic", return_value=1000.0) as monotonic:
+            cache.put_agent_config(AGENT)
+
+            monotonic.return_value = 1060.0
+            assert cache.get_agent_config("agent-1") == AGENT
+
+            monotonic.return_value = 1060.5
+            assert cache.get_agent_config("agent-1") is None
+        # The expired entry is dropped, not just hidden
+        assert cache.stats()["agent_configs"] == 0
+
+    def test_put_refreshes_expiry(self):
+        cache = WorkerResourceCache(agent_config_ttl=60)
+        with mock.patch.object(worker_resources_module.time, "monotonic", return_value=1000.0) as monotonic:
+            cache.put_agent_config(AGENT)
+            monotonic.return_value = 1050.0
+            cache.put_agent_config({**AGENT, "instructions": "Be thorough"})
+
+            monotonic.return_value = 1100.0
+            assert cache.get_agent_config("agent-1")["instructions"] == "Be thorough"
+
+    def test_invalidate_drops_config(self):
+        cache = WorkerResourceCache(agent_config_ttl=60)
+        cache.put_agent_config(AGENT)
+        cache.put_agent_config({"id": "agent-2"})
+
+        cache.invalidate_agent_config("agent-1")
+        assert cache.get_agent_config("agent-1") is None
+        assert cache.get_agent_config("agent-2") == {"id": "agent-2"}
+
+        # Unknown ids are ignored
+        cache.invalidate_agent_config("missing")
+        assert cache.stats()["agent_configs"] == 1
@@ -0,0 +1,95 @@
+import pytest
+import unittest.mock as mock
+from types import SimpleNamespace
+
+from app.services.twilio.number_search import NumberSearchService, monthly_costs
+
+
+PRICES = [
+    {"number_type": "local", "base_price": "1.15", "current_price": "1.15"},
+    {"number_type": "toll free", "base_price": "2.15", "current_price": "2.00"},
+    {"number_type": "mobile", "base_price": "1.00", "current_price": "1.00"},
+]
+
+
+def make_client(numbers):
+    client = mock.MagicMock()
+    client.pricing.v1.phone_numbers.countries.return_value.fetch.return_value = (
+        SimpleNamespace(phone_number_prices=PRICES)
+    )
+    country = client.available_phone_numbers.return_value
+    for number_type in ("local", "toll_free", "mobile", "national"):
+        getattr(country, number_type).list.return_value = [
+            SimpleNamespace(phone_number=number) for number in numbers.get(number_type, [])
+        ]
+    client.available_phone_numbers.list.return_value = [
+        SimpleNamespace(country_code="US"), SimpleNamespace(country_code="GB")
+    ]
+    return client
+
+
+def make_service(numbers, clock):
+    return NumberSearchService(
+        make_client(numbers),
+        pricing_ttl=86400,
+        availability_ttl=60,
+        countries_ttl=86400,
+        clock=clock
+    )
+
+
+class TestNumberSearchService:
+    """Test suite for the cached Twilio number search"""
+
+    def test_monthly_costs_use_highest_price_with_margin(self):
+        assert monthly_costs(PRICES) == {"local": 2.4, "toll_free": 3.6, "mobile": 1.2}
+
+    @pytest.mark.asyncio
+    async def test_pricing_fetched_once_per_country(self, clock):
+        service = make_service({"local": ["+15550001"], "toll_free": ["+18000001"]}, clock)
+
+        result = await service.available_numbers("US")
+        assert result == {
+            "local": {"monthly_cost": 2.4, "numbers": ["+15550001"]},
+            "toll_free": {"monthly_cost": 3.6, "numbers": ["+18000001"]},
+        }
+
+        clock.now = 61
+        await service.available_numbers("US")
+        countries = service.client.pricing.v1.phone_numbers.countries
+        assert countries.call_count == 1
+        assert service.client.available_phone_numbers.return_value.local.list.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_availability_is_cached_briefly(self, clock):
+        service = make_service({"local": ["+15550001"]}, clock)
+        await service.available_numbers("US")
+        await service.available_numbers("US")
+        assert service.client.available_phone_numbers.return_value.local.list.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_gb_prefers_mobile_numbers(self, clock):
+        service = make_service({"local": ["+442000001"], "mobile": ["+447000001"]}, clock)
+        assert list(await service.available_numbers("GB")) == ["mobile"]
+
+    @pytest.mark.asyncio
+    async def test_failed_type_is_skipped(self, clock):
+        service = make_service({"local": ["+15550001"]}, clock)
+        country = service.client.available_phone_numbers.return_value
+        country.mobile.list.side_effect = Exception("not supported")
+        assert list(await service.available_numbers("US")) == ["local"]
+
+    @pytest.mark.asyncio
+    async def test_purchased_number_is_discarded(self, clock):
+        service = make_service({"local": ["+15550001", "+15550002"]}, clock)
+        await service.available_numbers("US")
+        service.discard_number("+15550001")
+        result = await service.available_numbers("US")
+        assert result["local"]["numbers"] == ["+15550002"]
+
+    @pytest.mark.asyncio
+    async def test_country_codes_are_cached(self, clock):
+        service = make_service({}, clock)
+        assert await service.country_codes() == ["US", "GB"]
+        await service.country_codes()
+        service.client.available_phone_numbers.list.assert_called_once()
@@ -0,0 +1,135 @@
+import pytest
+import unittest.mock as mock
+
+from postgrest.exceptions import APIError
+
+from app.services.twilio.number_store import ProvisioningStore, with_twilio_number
+
+
+def result(data):
+    return mock.MagicMock(data=data)
+
+
+class FakeTable:
+    """Records writes and answers each chained query with a canned result"""
+
+    def __init__(self, name, supabase):
+        self.name = name
+        self.supabase = supabase
+        self.op = None
+
+    def select(self, *args):
+        self.op = 'select'
+        return self
+
+    def insert(self, row):
+        self.op = 'insert'
+        self.supabase.writes.append((self.name, 'insert', row))
+        return self
+
+    def update(self, row):
+        self.op = 'update'
+        self.supabase.writes.append((self.name, 'update', row))
+        return self
+
+    def delete(self):
+        self.op = 'delete'
+        self.supabase.writes.append((self.name, 'delete', None))
+        return self
+
+    def eq(self, *args):
+        return self
+
+    async def execute(self):
+        outcome = self.supabase.responses.get((self.name, self.op), result([{}]))
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_supabase(responses=None, rpc_error=None):
+    supabase = mock.MagicMock()
+    supabase.writes = []
+    supabase.responses = responses or {}
+    supabase.table.side_effect = lambda name: FakeTable(name, supabase)
+    rpc = supabase.rpc.return_value
+    if rpc_error is not None:
+        rpc.execute = mock.AsyncMock(side_effect=rpc_error)
+    else:
+        rpc.execute = mock.AsyncMock(return_value=result({
+            'twilio_numbers_success': True,
+            'guided_setup_success': True,
+            'users_success': True
+        }))
+    return supabase
+
+
+def missing_rpc():
+    return APIError({'code': 'PGRST202', 'message': 'Could not find the function'})
+
+
+async def store(supabase, store=None):
+    store = store or ProvisioningStore()
+    with mock.patch(
+        'app.services.twilio.number_store.get_supabase',
+        mock.AsyncMock(return_value=supabase)
+    ):
+        return await store.store('+15550001', 'user-1', 'PN1', 'AC1', False)
+
+
+class TestProvisioningStore:
+    """Test suite for the provisioned number persistence layer"""
+
+    def test_with_twilio_number_adds_once(self):
+        numbers = {'twilio': ['+15550001'], 'other': ['x']}
+        assert with_twilio_number(numbers, '+15550001') == numbers
+        assert with_twilio_number(None, '+15550002') == {'twilio': ['+15550002']}
+
+    @pytest.mark.asyncio
+    async def test_uses_single_rpc_when_deployed(self):
+        supabase = make_supabase()
+        results = await store(supabase)
+        assert results['overall_success'] is True
+        supabase.rpc.assert_called_once()
+        assert supabase.writes == []
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_batch_when_rpc_missing(self):
+        supabase = make_supabase(rpc_error=missing_rpc())
+        provisioning_store = ProvisioningStore()
+        results = await store(supabase, provisioning_store)
+
+        assert results['overall_success'] is True
+        assert provisioning_store.rpc_available is False
+        assert [(table, op) for table, op, _ in supabase.writes] == [
+            ('twilio_numbers', 'insert'),
+            ('guided_setup', 'update'),
+            ('users', 'update'),
+        ]
+        assert supabase.writes[-1][2] == {'telephony_numbers': {'twilio': ['+15550001']}}
+
+    @pytest.mark.asyncio
+    async def test_failed_user_update_rolls_back(self):
+        supabase = make_supabase(
+            responses={
+                ('users', 'select'): result([{'telephony_numbers': {}}]),
+                ('guided_setup', 'select'): result([{'phone_number': None}]),
+                ('users', 'update'): Exception("connection reset"),
+            },
+            rpc_error=missing_rpc()
+        )
+        results = await store(supabase)
+
+        assert results['overall_success'] is False
+        assert results['twilio_numbers_success'] is False
+        assert ('twilio_numbers', 'delete', None) in supabase.writes
+        assert ('guided_setup', 'update', {'phone_number': None}) in supabase.writes
+
+    @pytest.mark.asyncio
+    async def test_rpc_failure_is_reported(self):
+        supabase = make_supabase(
+            rpc_error=APIError({'code': '23505', 'message': 'duplicate key value'})
+        )
+        results = await store(supabase)
+        assert results['overall_success'] is False
+        assert supabase.writes == []
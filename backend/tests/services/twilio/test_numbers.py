@@ -4,6 +4,7 @@ from fastapi import HTTPException
 import datetime
 
 # Import the function to test
+from app.services.twilio import numbers
 from app.services.twilio.numbers import provision_user_phone_number, check_user_has_number, store_phone_number
 
 class TestProvisionUserPhoneNumber:
@@ -47,7 +48,7 @@ class TestProvisionUserPhoneNumber:
     @pytest.fixture
     def mock_get_available_numbers(self):
         """Mock the get_available_numbers function"""
-        with mock.patch('app.services.twilio.numbers.get_available_numbers') as mock_get:
+        with mock.patch('app.services.twilio.numbers.get_available_numbers', new_callable=mock.AsyncMock) as mock_get:
             yield mock_get
     
     @pytest.fixture
@@ -244,4 +245,37 @@ class TestProvisionUserPhoneNumber:
         # Assert main process completed successfully despite LiveKit error
         assert result["success"] is True
         assert result["number"] == test_number
-        assert result["already_exists"] is False 
\ No newline at end of file
+        assert result["already_exists"] is False 
+
+
+class TestStorageFailureCleanup:
+    """Test suite for undoing a purchase when storing the number fails"""
+
+    @pytest.fixture
+    def provisioning(self):
+        with mock.patch.object(numbers, "get_phone_number_handler", mock.AsyncMock(return_value={"success": False})), \
+             mock.patch.object(numbers, "get_available_numbers", mock.AsyncMock(return_value={"local": {"numbers": ["+15550001111"]}})), \
+             mock.patch.object(numbers, "get_trial_status", mock.AsyncMock(return_value=False)), \
+             mock.patch.object(numbers, "purchase_number", mock.AsyncMock(return_value={"number_sid": "PN1", "account_sid": "AC1"})), \
+             mock.patch.object(numbers, "store_phone_number", mock.AsyncMock(side_effect=RuntimeError("db down"))), \
+             mock.patch.object(numbers, "register_phone_number_with_vapi", mock.AsyncMock(return_value={"id": "vapi-1"})), \
+             mock.patch.object(numbers, "deregister_phone_number_from_vapi", mock.AsyncMock()) as deregister, \
+             mock.patch.object(numbers, "release_purchased_number", mock.AsyncMock()) as release:
+            yield deregister, release
+
+    @pytest.mark.asyncio
+    async def test_registered_vapi_number_is_removed(self, provisioning):
+        deregister, release = provisioning
+        with pytest.raises(HTTPException):
+            await provision_user_phone_number(country_code="US", number_type="local", area_code=None, user_id="user-1")
+        deregister.assert_awaited_once_with("vapi-1")
+        release.assert_awaited_once_with("PN1")
+
+    @pytest.mark.asyncio
+    async def test_release_still_runs_when_deregister_fails(self, provisioning):
+        deregister, release = provisioning
+        deregister.side_effect = RuntimeError("vapi down")
+        with pytest.raises(HTTPException) as exc:
+            await provision_user_phone_number(country_code="US", number_type="local", area_code=None, user_id="user-1")
+        assert "db down" in exc.value.detail
+        release.assert_awaited_once_with("PN1")
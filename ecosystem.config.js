@@ -13,9 +13,11 @@ module.exports = {
     },
     {
       name: "backend",
-      script: "./venv/bin/python",
-      args: "run_fast.py",
+      script: "./venv/bin/gunicorn",
+      args: "-c gunicorn.conf.py app.main:app",
       cwd: "./backend",
+      // Let gunicorn drain its workers (SERVER_DRAIN_SECONDS + margin) on stop
+      kill_timeout: 35000,
       env: {
         PYTHONUNBUFFERED: "1"
       }